@@ -3,11 +3,13 @@ from django.views.generic import TemplateView, DetailView
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import PermissionDenied
 from estudiantes.models import Estudiante, Nota, Acudiente
-from comportamiento.models import Comportamiento, Asistencia
+from comportamiento.models import Comportamiento, Asistencia, ResumenAsistenciaPeriodo
 from academico.models import HorarioClase
 from matricula.models import AsignaturaGradoAñoLectivo, PeriodoAcademico
 from gestioncolegio.models import AñoLectivo
 from gestioncolegio.views import RoleRequiredMixin
+from gestioncolegio.services import totales_asistencia
+from django.db.models import Count, Q
 from django.contrib.auth.mixins import LoginRequiredMixin
 from datetime import date, datetime
 
@@ -122,7 +124,7 @@ class NotasEstudianteView(RoleRequiredMixin, TemplateView):
             # Obtener periodos disponibles para este año
             periodos_disponibles = PeriodoAcademico.objects.filter(
                 año_lectivo=año_lectivo
-            ).order_by('periodo__nombre')
+            ).select_related('periodo').order_by('periodo__nombre')
             context['periodos_disponibles'] = periodos_disponibles
             
             if periodo_id:
@@ -130,12 +132,15 @@ class NotasEstudianteView(RoleRequiredMixin, TemplateView):
                 notas_query = notas_query.filter(periodo_academico=periodo)
                 context['periodo_seleccionado'] = periodo
         
-        # Agrupar notas por asignatura y periodo
-        notas_agrupadas = {}
-        for nota in notas_query.select_related(
+        # Una sola consulta: las mismas filas sirven para la tabla y los promedios
+        notas = list(notas_query.select_related(
             'asignatura_grado_año_lectivo__asignatura',
             'periodo_academico__periodo'
-        ).order_by('periodo_academico__periodo__nombre'):
+        ).order_by('periodo_academico__periodo__nombre'))
+
+        # Agrupar notas por asignatura y periodo
+        notas_agrupadas = {}
+        for nota in notas:
             
             asignatura = nota.asignatura_grado_año_lectivo.asignatura
             periodo = nota.periodo_academico.periodo
@@ -151,19 +156,19 @@ class NotasEstudianteView(RoleRequiredMixin, TemplateView):
         context['notas_agrupadas'] = notas_agrupadas
         
         # Calcular promedios
-        context['promedios'] = self.calcular_promedios(notas_query)
+        context['promedios'] = self.calcular_promedios(notas)
         
         return context
     
-    def calcular_promedios(self, notas_query):
-        """Calcula promedios por periodo y general"""
+    def calcular_promedios(self, notas):
+        """Calcula promedios por periodo y general (notas con periodo_academico__periodo cargado)"""
         promedios = {
             'por_periodo': {},
             'general': 0.0
         }
         
         notas_por_periodo = {}
-        for nota in notas_query:
+        for nota in notas:
             periodo_nombre = nota.periodo_academico.periodo.nombre
             if periodo_nombre not in notas_por_periodo:
                 notas_por_periodo[periodo_nombre] = []
@@ -243,19 +248,29 @@ class AsistenciaEstudianteView(RoleRequiredMixin, TemplateView):
         # Ordenar por fecha
         asistencias_query = asistencias_query.order_by('-fecha')
         
-        # Estadísticas
-        total_asistencias = asistencias_query.count()
-        faltas = asistencias_query.filter(estado='F').count()
-        faltas_justificadas = asistencias_query.filter(estado='J').count()
-        asistencias = total_asistencias - faltas - faltas_justificadas
+        # Estadísticas: del resumen por período si no hay filtro de mes,
+        # o con un único conteo agrupado sobre el mes seleccionado
+        if 'mes_seleccionado' in context:
+            conteos = asistencias_query.aggregate(
+                asistencias=Count('id', filter=Q(estado='A')),
+                faltas=Count('id', filter=Q(estado='F')),
+                justificadas=Count('id', filter=Q(estado='J')),
+            )
+            resumen = {**conteos, 'total': sum(conteos.values())}
+            resumen['porcentaje'] = round(resumen['asistencias'] / resumen['total'] * 100, 2) if resumen['total'] > 0 else 0
+        else:
+            resumenes = ResumenAsistenciaPeriodo.objects.filter(estudiante=estudiante)
+            if año_lectivo_actual:
+                resumenes = resumenes.filter(periodo_academico__año_lectivo=año_lectivo_actual)
+            resumen = totales_asistencia(resumenes)
         
         context['asistencias'] = asistencias_query
         context['estadisticas'] = {
-            'total': total_asistencias,
-            'asistencias': asistencias,
-            'faltas': faltas,
-            'faltas_justificadas': faltas_justificadas,
-            'porcentaje_asistencia': round((asistencias / total_asistencias * 100), 2) if total_asistencias > 0 else 0
+            'total': resumen['total'],
+            'asistencias': resumen['asistencias'],
+            'faltas': resumen['faltas'],
+            'faltas_justificadas': resumen['justificadas'],
+            'porcentaje_asistencia': resumen['porcentaje']
         }
         
         # Meses disponibles para filtro
@@ -297,7 +312,8 @@ class ComportamientoEstudianteView(RoleRequiredMixin, TemplateView):
             estudiante=estudiante
         ).select_related(
             'docente__usuario',
-            'periodo_academico__periodo'
+            'periodo_academico__periodo',
+            'periodo_academico__año_lectivo'
         ).order_by('-fecha')
         
         # Aplicar filtros
@@ -325,15 +341,24 @@ class ComportamientoEstudianteView(RoleRequiredMixin, TemplateView):
             except ValueError:
                 pass
         
-        # Estadísticas
-        total_comportamientos = comportamientos_query.count()
-        positivos = comportamientos_query.filter(tipo='Positivo').count()
-        negativos = comportamientos_query.filter(tipo='Negativo').count()
-        
+        # Estadísticas: un solo conteo agrupado en lugar de una consulta por tipo y categoría
+        conteos = comportamientos_query.aggregate(
+            total=Count('id'),
+            positivos=Count('id', filter=Q(tipo='Positivo')),
+            negativos=Count('id', filter=Q(tipo='Negativo')),
+            **{
+                f'categoria_{indice}': Count('id', filter=Q(categoria=cat[0]))
+                for indice, cat in enumerate(Comportamiento.CATEGORIAS)
+            }
+        )
+        total_comportamientos = conteos['total']
+        positivos = conteos['positivos']
+        negativos = conteos['negativos']
+
         # Agrupar por categoría para gráfico
         categorias_data = {}
-        for cat in Comportamiento.CATEGORIAS:
-            count = comportamientos_query.filter(categoria=cat[0]).count()
+        for indice, cat in enumerate(Comportamiento.CATEGORIAS):
+            count = conteos[f'categoria_{indice}']
             if count > 0:
                 categorias_data[cat[1]] = count
         
@@ -6,6 +6,8 @@ from usuarios.models import Usuario, TipoDocumento, TipoUsuario, Docente
 from estudiantes.models import Estudiante, Acudiente, Matricula
 from matricula.models import PeriodoAcademico, AsignaturaGradoAñoLectivo, GradoAñoLectivo
 from django.core.exceptions import ValidationError
+from gestioncolegio.services import autocompletar
+from gestioncolegio.widgets import SelectAutocompletar, SelectMultipleAutocompletar
 
 class MatriculaForm(forms.ModelForm):
     """Formulario para crear/editar matrículas con opción de crear estudiante"""
@@ -133,12 +135,9 @@ class MatriculaForm(forms.ModelForm):
         else:
             # Si no viene con estudiante_id, mostrar selector de estudiante existente
             self.fields['estudiante_existente'] = forms.ModelChoiceField(
-                queryset=Estudiante.objects.filter().select_related('usuario'),
+                queryset=autocompletar.fuente('estudiantes_todos').queryset(),
                 required=False,
-                widget=forms.Select(attrs={
-                    'class': 'form-select',
-                    'data-placeholder': 'Buscar estudiante...'
-                }),
+                widget=SelectAutocompletar('estudiantes_todos', placeholder='Buscar estudiante...'),
                 label="Seleccionar estudiante existente"
             )
         
@@ -429,7 +428,7 @@ class MatriculaBulkForm(forms.Form):
     
     estudiantes = forms.ModelMultipleChoiceField(
         queryset=None,
-        widget=forms.SelectMultiple(attrs={'class': 'form-select', 'size': 10}),
+        widget=SelectMultipleAutocompletar('estudiantes_sin_matricula'),
         label="Estudiantes a matricular",
         required=True
     )
@@ -437,24 +436,11 @@ class MatriculaBulkForm(forms.Form):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         
-        from estudiantes.models import Estudiante
         from gestioncolegio.models import AñoLectivo
         
-        # Filtrar estudiantes que no tienen matrícula en el año actual
+        # Estudiantes que no tienen matrícula en el año actual (se buscan al escribir)
         año_actual = AñoLectivo.objects.filter(estado=True).first()
-        
-        if año_actual:
-            estudiantes_con_matricula = Matricula.objects.filter(
-                año_lectivo=año_actual
-            ).values_list('estudiante_id', flat=True)
-            
-            self.fields['estudiantes'].queryset = Estudiante.objects.filter(
-                estado=True
-            ).exclude(id__in=estudiantes_con_matricula).select_related('usuario')
-        else:
-            self.fields['estudiantes'].queryset = Estudiante.objects.filter(
-                estado=True
-            ).select_related('usuario')
+        self.fields['estudiantes'].queryset = autocompletar.fuente('estudiantes_sin_matricula').queryset()
         
         # Filtrar años lectivos
         self.fields['año_lectivo'].queryset = AñoLectivo.objects.all().order_by('-anho')
@@ -705,8 +691,8 @@ class AcudienteForm(forms.ModelForm):
         model = Acudiente
         fields = ['acudiente', 'estudiante', 'parentesco']
         widgets = {
-            'acudiente': forms.Select(attrs={'class': 'form-control'}),
-            'estudiante': forms.Select(attrs={'class': 'form-control'}),
+            'acudiente': SelectAutocompletar('usuarios'),
+            'estudiante': SelectAutocompletar('estudiantes_todos'),
             'parentesco': forms.TextInput(attrs={'class': 'form-control'}),
         }
     
@@ -211,6 +211,11 @@ urlpatterns = [
     path('configuracion/parametros/crear/', views.ParametroSistemaCreateView.as_view(), name='parametro_create'),
     path('configuracion/parametros/<int:pk>/editar/', views.ParametroSistemaUpdateView.as_view(), name='parametro_update'),
 
+    # Rendimiento (InstrumentacionMiddleware)
+    path('configuracion/rendimiento/', views.PerfilVistasView.as_view(), name='perfil_vistas'),
+    path('configuracion/rendimiento/perfil/', views.ProgramarPerfilView.as_view(), name='programar_perfil'),
+    path('configuracion/rendimiento/muestras/<int:pk>/', views.PerfilMuestraView.as_view(), name='perfil_muestra'),
+
      #vista para el historial académico en matricula.py
      path('estudiantes/<int:pk>/historial-academico/', views.EstudianteHistorialAcademicoView.as_view(), name='estudiante_historial_academico'),
 
@@ -222,6 +227,9 @@ urlpatterns = [
     path('calificaciones/ajax/guardar-calificaciones/', views.GuardarCalificacionesView.as_view(), name='guardar_calificaciones'),
     path('calificaciones/ajax/calificaciones/', views.CalificacionesAjaxView.as_view(), name='calificaciones_ajax'),
     path('calificaciones/reporte/<int:periodo_id>/', views.ReporteCalificacionesView.as_view(), name='reporte_calificaciones'),
+    path('calificaciones/pendientes/', views.CalificacionesPendientesView.as_view(), name='calificaciones_pendientes'),
+    path('calificaciones/monitor/', views.MonitorCalificacionesView.as_view(), name='monitor_calificaciones'),
+    path('calificaciones/monitor/datos/', views.MonitorCalificacionesDatosView.as_view(), name='monitor_calificaciones_datos'),
     path('calificaciones/exportar/', views.ExportarCalificacionesView.as_view(), name='exportar_calificaciones'),
     
     
@@ -6,8 +6,10 @@ from django.http import JsonResponse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import View, TemplateView
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q, Count, Avg, Max, Min
 import json
+from collections import defaultdict
 
 from gestioncolegio.mixins import RoleRequiredMixin
 from gestioncolegio.models import AñoLectivo, Sede
@@ -15,6 +17,7 @@ from usuarios.models import Docente, Usuario
 from matricula.models import GradoAñoLectivo, AsignaturaGradoAñoLectivo, PeriodoAcademico, DocenteSede
 from estudiantes.models import Estudiante, Matricula, Nota
 from academico.models import Logro, Grado, Asignatura, Periodo
+from gestioncolegio.services import auditoria, obtener_matriz, pendientes_por_docente, progreso_asignaturas, resumen_progreso
 
 
 class GestionCalificacionesView(RoleRequiredMixin, TemplateView):
@@ -27,7 +30,7 @@ class GestionCalificacionesView(RoleRequiredMixin, TemplateView):
         
         # Obtener años lectivos activos
         #años_lectivos = AñoLectivo.objects.filter(estado=True).order_by('-anho')
-        años_lectivos = AñoLectivo.objects.filter().order_by('-anho')
+        años_lectivos = AñoLectivo.objects.filter().select_related('sede').order_by('-anho')
         
         # Estadísticas generales
         total_docentes = Docente.objects.filter(estado=True).count()
@@ -251,11 +254,13 @@ class CargarEstudiantesCalificacionesView(RoleRequiredMixin, View):
                 return JsonResponse({'error': 'Parámetros incompletos'}, status=400)
             
             # Obtener el año lectivo desde el período
-            periodo = PeriodoAcademico.objects.get(id=periodo_id)
+            periodo = PeriodoAcademico.objects.select_related('periodo', 'año_lectivo').get(id=periodo_id)
             año_lectivo = periodo.año_lectivo
             
             # Obtener asignatura específica
-            asignatura_grado = AsignaturaGradoAñoLectivo.objects.get(
+            asignatura_grado = AsignaturaGradoAñoLectivo.objects.select_related(
+                'asignatura__area', 'grado_año_lectivo__grado', 'sede'
+            ).get(
                 id=asignatura_id,
                 grado_año_lectivo__grado_id=grado_id,
                 sede_id=sede_id,
@@ -273,35 +278,50 @@ class CargarEstudiantesCalificacionesView(RoleRequiredMixin, View):
                 'estudiante__usuario'
             ).order_by('estudiante__usuario__apellidos', 'estudiante__usuario__nombres')
             
+            # Logros de la asignatura, grado y período (iguales para todos los estudiantes)
+            logros = [
+                {
+                    'id': logro.id,
+                    'tema': logro.tema,
+                    'descripciones': {
+                        'superior': logro.descripcion_superior or '',
+                        'alto': logro.descripcion_alto or '',
+                        'basico': logro.descripcion_basico or '',
+                        'bajo': logro.descripcion_bajo or '',
+                    }
+                }
+                for logro in Logro.objects.filter(
+                    asignatura=asignatura_grado.asignatura,
+                    grado_id=grado_id,
+                    periodo_academico=periodo
+                ).order_by('tema')
+            ]
+            
+            # Notas de la asignatura de todos los estudiantes en una consulta:
+            # la del período actual y las de períodos anteriores
+            notas_actuales = {}
+            notas_anteriores = defaultdict(list)
+            for nota in Nota.objects.filter(
+                asignatura_grado_año_lectivo=asignatura_grado,
+                estudiante_id__in=matriculas.values('estudiante_id')
+            ):
+                if nota.periodo_academico_id == periodo.id:
+                    notas_actuales[nota.estudiante_id] = nota
+                else:
+                    notas_anteriores[nota.estudiante_id].append(nota.calificacion)
+            
             estudiantes_data = []
             notas_ids = []
             
             for matricula in matriculas:
                 estudiante = matricula.estudiante
+                nota_existente = notas_actuales.get(estudiante.id)
                 
-                # Obtener nota existente
-                nota_existente = Nota.objects.filter(
-                    estudiante=estudiante,
-                    asignatura_grado_año_lectivo=asignatura_grado,
-                    periodo_academico=periodo
-                ).first()
-                
-                # Obtener logros para esta asignatura, grado y período
-                logros = Logro.objects.filter(
-                    asignatura=asignatura_grado.asignatura,
-                    grado_id=grado_id,
-                    periodo_academico=periodo
-                ).order_by('tema')
-                
-                # Obtener calificaciones anteriores del estudiante en esta asignatura
-                notas_anteriores = Nota.objects.filter(
-                    estudiante=estudiante,
-                    asignatura_grado_año_lectivo=asignatura_grado
-                ).exclude(periodo_academico=periodo).order_by('periodo_academico__periodo__nombre')
-                
+                # Calificaciones anteriores del estudiante en esta asignatura
+                anteriores = notas_anteriores.get(estudiante.id, [])
                 promedio_historico = 0
-                if notas_anteriores.exists():
-                    promedio_historico = sum([n.calificacion for n in notas_anteriores]) / notas_anteriores.count()
+                if anteriores:
+                    promedio_historico = sum(anteriores) / len(anteriores)
                 
                 estudiante_data = {
                     'id': estudiante.id,
@@ -314,20 +334,8 @@ class CargarEstudiantesCalificacionesView(RoleRequiredMixin, View):
                     'nota_id': nota_existente.id if nota_existente else None,
                     'observaciones': nota_existente.observaciones if nota_existente else '',
                     'promedio_historico': round(promedio_historico, 1),
-                    'total_notas_anteriores': notas_anteriores.count(),
-                    'logros': [
-                        {
-                            'id': logro.id,
-                            'tema': logro.tema,
-                            'descripciones': {
-                                'superior': logro.descripcion_superior or '',
-                                'alto': logro.descripcion_alto or '',
-                                'basico': logro.descripcion_basico or '',
-                                'bajo': logro.descripcion_bajo or '',
-                            }
-                        }
-                        for logro in logros
-                    ]
+                    'total_notas_anteriores': len(anteriores),
+                    'logros': logros
                 }
                 
                 estudiantes_data.append(estudiante_data)
@@ -416,62 +424,63 @@ class GuardarCalificacionesView(RoleRequiredMixin, View):
                 'errores': []
             }
             
-            for calificacion_data in calificaciones:
-                try:
-                    estudiante_id = calificacion_data.get('estudiante_id')
-                    calificacion_valor = calificacion_data.get('calificacion')
-                    observaciones = calificacion_data.get('observaciones', '')
-                    nota_id = calificacion_data.get('nota_id')
+            # Un solo bloque: el ranking (posiciones) se recalcula una vez al confirmar,
+            # no una vez por estudiante. Cada fila usa su propio savepoint para que
+            # un error solo descarte esa calificación.
+            with transaction.atomic():
+                for calificacion_data in calificaciones:
+                    try:
+                        estudiante_id = calificacion_data.get('estudiante_id')
+                        calificacion_valor = calificacion_data.get('calificacion')
+                        observaciones = calificacion_data.get('observaciones', '')
+                        nota_id = calificacion_data.get('nota_id')
+                        
+                        # Validar calificación (0-100)
+                        calificacion_valor = float(calificacion_valor)
+                        if calificacion_valor < 0 or calificacion_valor > 100:
+                            resultados['errores'].append({
+                                'estudiante_id': estudiante_id,
+                                'error': f'Calificación inválida: {calificacion_valor} (debe ser entre 0 y 100)'
+                            })
+                            continue
+                        
+                        with transaction.atomic():
+                            # Obtener objetos
+                            estudiante = Estudiante.objects.get(id=estudiante_id)
+                            asignatura_grado = AsignaturaGradoAñoLectivo.objects.get(id=asignatura_grado_id)
+                            periodo = PeriodoAcademico.objects.get(id=periodo_id)
+                            
+                            if nota_id:
+                                # Actualizar nota existente
+                                nota = Nota.objects.get(id=nota_id)
+                                nota.calificacion = calificacion_valor
+                                nota.observaciones = observaciones
+                                nota.save()
+                                resultados['actualizadas'] += 1
+                            else:
+                                # Crear nueva nota
+                                Nota.objects.create(
+                                    estudiante=estudiante,
+                                    asignatura_grado_año_lectivo=asignatura_grado,
+                                    periodo_academico=periodo,
+                                    calificacion=calificacion_valor,
+                                    observaciones=observaciones
+                                )
+                                resultados['guardadas'] += 1
                     
-                    # Validar calificación (0-100)
-                    calificacion_valor = float(calificacion_valor)
-                    if calificacion_valor < 0 or calificacion_valor > 100:
+                    except Exception as e:
                         resultados['errores'].append({
                             'estudiante_id': estudiante_id,
-                            'error': f'Calificación inválida: {calificacion_valor} (debe ser entre 0 y 100)'
+                            'error': str(e)
                         })
-                        continue
-                    
-                    # Obtener objetos
-                    estudiante = Estudiante.objects.get(id=estudiante_id)
-                    asignatura_grado = AsignaturaGradoAñoLectivo.objects.get(id=asignatura_grado_id)
-                    periodo = PeriodoAcademico.objects.get(id=periodo_id)
-                    
-                    if nota_id:
-                        # Actualizar nota existente
-                        nota = Nota.objects.get(id=nota_id)
-                        nota.calificacion = calificacion_valor
-                        nota.observaciones = observaciones
-                        nota.save()
-                        resultados['actualizadas'] += 1
-                    else:
-                        # Crear nueva nota
-                        Nota.objects.create(
-                            estudiante=estudiante,
-                            asignatura_grado_año_lectivo=asignatura_grado,
-                            periodo_academico=periodo,
-                            calificacion=calificacion_valor,
-                            observaciones=observaciones
-                        )
-                        resultados['guardadas'] += 1
-                        
-                except Exception as e:
-                    resultados['errores'].append({
-                        'estudiante_id': estudiante_id,
-                        'error': str(e)
-                    })
             
             # Registrar auditoría
-            if request.user.is_authenticated and hasattr(request.user, 'usuario'):
-                from gestioncolegio.models import AuditoriaSistema
-                
-                AuditoriaSistema.objects.create(
-                    usuario=request.user.usuario,
-                    accion='modificacion_masiva',
-                    modelo_afectado='Nota',
-                    descripcion=f"Guardadas {resultados['guardadas']} nuevas y actualizadas {resultados['actualizadas']} calificaciones",
-                    ip_address=request.META.get('REMOTE_ADDR')
-                )
+            auditoria.registrar(
+                request,
+                accion='modificacion_masiva',
+                modelo_afectado='Nota',
+                descripcion=f"Guardadas {resultados['guardadas']} nuevas y actualizadas {resultados['actualizadas']} calificaciones",
+            )
             
             return JsonResponse({
                 'success': True,
@@ -534,6 +543,84 @@ class ReporteCalificacionesView(RoleRequiredMixin, TemplateView):
         return render(request, self.template_name, contexto)
 
 
+class CalificacionesPendientesView(RoleRequiredMixin, TemplateView):
+    """Reporte de docentes con calificaciones pendientes en un período"""
+    template_name = 'administrador/calificaciones/calificaciones_pendientes.html'
+    allowed_roles = ['Administrador', 'Rector']
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        
+        periodo_id = self.request.GET.get('periodo_id')
+        if periodo_id:
+            periodo = PeriodoAcademico.objects.select_related('periodo', 'año_lectivo').filter(id=periodo_id).first()
+        else:
+            periodo = PeriodoAcademico.objects.select_related('periodo', 'año_lectivo').filter(
+                año_lectivo__estado=True,
+                estado=True
+            ).order_by('-fecha_inicio').first()
+        
+        context.update({
+            'title': 'Calificaciones Pendientes',
+            'periodo': periodo,
+            'periodos': PeriodoAcademico.objects.select_related(
+                'periodo', 'año_lectivo__sede'
+            ).order_by('-año_lectivo__anho', 'periodo__nombre'),
+            'docentes_pendientes': [],
+            'resumen': None,
+        })
+        
+        if periodo:
+            context['docentes_pendientes'] = pendientes_por_docente(periodo)
+            context['resumen'] = resumen_progreso(progreso_asignaturas(periodo))
+        
+        return context
+
+
+class MonitorCalificacionesMixin:
+    """Resuelve el año lectivo del monitor (GET año_lectivo_id o el activo)"""
+    
+    def get_año_lectivo(self):
+        año_lectivo_id = self.request.GET.get('año_lectivo_id')
+        queryset = AñoLectivo.objects.select_related('sede')
+        if año_lectivo_id:
+            return queryset.filter(id=año_lectivo_id).first()
+        return queryset.filter(estado=True).first()
+
+
+class MonitorCalificacionesView(MonitorCalificacionesMixin, RoleRequiredMixin, TemplateView):
+    """Avance de calificación de todo el colegio (docente × asignatura × período)"""
+    template_name = 'administrador/calificaciones/monitor_calificaciones.html'
+    allowed_roles = ['Administrador', 'Rector']
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        año_lectivo = self.get_año_lectivo()
+        
+        context.update({
+            'title': 'Monitor de Calificaciones',
+            'año_lectivo': año_lectivo,
+            'años_lectivos': AñoLectivo.objects.select_related('sede').order_by('-anho'),
+            'matriz': obtener_matriz(año_lectivo) if año_lectivo else None,
+        })
+        return context
+
+
+class MonitorCalificacionesDatosView(MonitorCalificacionesMixin, RoleRequiredMixin, View):
+    """Matriz del monitor en JSON"""
+    allowed_roles = ['Administrador', 'Rector']
+    
+    def get(self, request):
+        año_lectivo = self.get_año_lectivo()
+        if not año_lectivo:
+            return JsonResponse({'error': 'Año lectivo no encontrado'}, status=404)
+        
+        try:
+            return JsonResponse({'success': True, 'matriz': obtener_matriz(año_lectivo)})
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
 class ExportarCalificacionesView(RoleRequiredMixin, View):
     """Exportar calificaciones a Excel"""
     allowed_roles = ['Administrador', 'Rector']
@@ -5,7 +5,8 @@ from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
 from django.http import HttpResponseRedirect
 from django.db.models import Q
-from django.views.generic import View
+from django.views.generic import View, TemplateView
+from django.conf import settings
 
 
 from gestioncolegio.mixins import RoleRequiredMixin
@@ -18,6 +19,9 @@ from gestioncolegio.models import (
     ParametroSistema,
 )
 
+from gestioncolegio.models import MuestraRendimiento
+from gestioncolegio.services import rendimiento
+
 from ..forms.formularios import AñoLectivoForm
 from ..forms.config import *
 
@@ -418,3 +422,72 @@ class ParametroSistemaUpdateView(RoleRequiredMixin, SuccessMessageMixin, UpdateV
         context['title'] = 'Editar Parámetro'
         context['submit_text'] = 'Actualizar Parámetro'
         return context
+
+
+# ===================== RENDIMIENTO =====================
+
+class PerfilVistasView(RoleRequiredMixin, TemplateView):
+    """Percentiles de latencia, consultas y N+1 por vista (InstrumentacionMiddleware)"""
+    template_name = 'administrador/configuracion/perfil_vistas.html'
+    allowed_roles = ['Administrador']
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            dias = max(1, int(self.request.GET.get('dias', 7)))
+        except ValueError:
+            dias = 7
+        vista = self.request.GET.get('vista', '')
+
+        # Las muestras aún en el búfer de este proceso también cuentan
+        rendimiento.vaciar_buffer()
+
+        context.update({
+            'title': 'Perfil de Vistas',
+            'activa': getattr(settings, 'INSTRUMENTACION_ACTIVA', False),
+            'dias': dias,
+            'vista': vista,
+            'resumen': rendimiento.resumen_por_vista(dias),
+            'peores': rendimiento.peores_muestras(vista or None, dias),
+            'huellas': rendimiento.huellas_frecuentes(dias),
+            'objetivo': rendimiento.objetivo_perfil(),
+            'perfiles': MuestraRendimiento.objects.exclude(perfil='').only(
+                'id', 'vista', 'ruta', 'duracion_ms', 'consultas', 'created_at'
+            )[:10],
+        })
+        return context
+
+
+class PerfilMuestraView(RoleRequiredMixin, DetailView):
+    """Salida de cProfile de una muestra"""
+    model = MuestraRendimiento
+    template_name = 'administrador/configuracion/perfil_muestra.html'
+    context_object_name = 'muestra'
+    allowed_roles = ['Administrador']
+
+
+class ProgramarPerfilView(RoleRequiredMixin, View):
+    """Programa (o cancela) capturas de cProfile para una vista"""
+    allowed_roles = ['Administrador']
+
+    def post(self, request):
+        if request.POST.get('cancelar'):
+            rendimiento.cancelar_perfil()
+            messages.info(request, 'Captura de perfil cancelada')
+            return redirect('administrador:perfil_vistas')
+
+        vista = request.POST.get('vista', '').strip()
+        if not vista:
+            messages.error(request, 'Debe indicar el nombre de la vista')
+            return redirect('administrador:perfil_vistas')
+
+        try:
+            capturas = min(50, max(1, int(request.POST.get('capturas', 5))))
+            muestreo = min(1.0, max(0.01, float(request.POST.get('muestreo', 1.0))))
+        except ValueError:
+            messages.error(request, 'Capturas y muestreo deben ser numéricos')
+            return redirect('administrador:perfil_vistas')
+
+        rendimiento.programar_perfil(vista, capturas, muestreo)
+        messages.success(request, f'Se capturarán {capturas} perfiles de {vista}')
+        return redirect(f"{reverse_lazy('administrador:perfil_vistas')}?vista={vista}")
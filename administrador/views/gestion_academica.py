@@ -9,7 +9,8 @@ from django.contrib.messages.views import SuccessMessageMixin
 from academico.models import Grado, NivelEscolar, Area, Asignatura, Periodo
 from matricula.models import PeriodoAcademico
 from estudiantes.models import Matricula
-from gestioncolegio.models import AñoLectivo, AuditoriaSistema
+from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services import auditoria
 from gestioncolegio.mixins import RoleRequiredMixin
 from ..forms.formularios import *
 from django.db.models import Count, Q
@@ -919,12 +920,11 @@ class AsignaturaGradoAñoLectivoCopyView(RoleRequiredMixin, View):
                     )
                 
                 # Registrar la acción
-                AuditoriaSistema.objects.create(
-                    usuario=request.user.usuario if hasattr(request.user, 'usuario') else None,
+                auditoria.registrar(
+                    request,
                     accion='creacion_masiva',
                     modelo_afectado='AsignaturaGradoAñoLectivo',
                     descripcion=f"Copia masiva de asignaturas de {año_origen.anho} a {año_destino.anho}",
-                    ip_address=request.META.get('REMOTE_ADDR')
                 )
                 
                 return redirect('administrador:asignatura_grado_list')
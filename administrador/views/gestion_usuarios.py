@@ -14,6 +14,7 @@ from usuarios.models import Usuario, TipoUsuario, TipoDocumento, Docente, Contac
 from estudiantes.models import Estudiante, Acudiente,Matricula
 from gestioncolegio.models import Colegio, Sede
 from gestioncolegio.mixins import RoleRequiredMixin
+from gestioncolegio.services import precargar_estudiantes
 from administrador.forms import *
 
 # ========================
@@ -524,6 +525,12 @@ class EstudianteListView(RoleRequiredMixin, ListView):
     paginate_by = 15
     
     def get_queryset(self):
+        # Conteo de acudientes por fila en la misma consulta de la página
+        return self.estudiantes_filtrados().annotate(
+            total_acudientes=Count('acudientes', distinct=True)
+        )
+    
+    def estudiantes_filtrados(self):
         # Incluir todos los estudiantes (activos e inactivos) pero ordenados
         queryset = Estudiante.objects.select_related(
             'usuario',
@@ -638,8 +645,11 @@ class EstudianteListView(RoleRequiredMixin, ListView):
         año_actual = AñoLectivo.objects.filter(estado=True).first()
         context['año_lectivo_actual'] = año_actual
         
+        # Matrícula actual de la página en lote (la plantilla la usa por fila)
+        context['estudiantes'] = context['object_list'] = precargar_estudiantes(context['estudiantes'])
+        
         # Estadísticas basadas en los filtros aplicados
-        queryset = self.get_queryset()
+        queryset = self.estudiantes_filtrados()
         context['total_estudiantes'] = queryset.count()
         
         # Estudiantes por género
@@ -779,7 +789,7 @@ class EstudianteDetailView(RoleRequiredMixin, DetailView):
         from comportamiento.models import Asistencia
         asistencias_query = Asistencia.objects.filter(estudiante=estudiante)
         context['asistencias_recientes'] = asistencias_query.order_by('-fecha')[:10]
-        context['estadisticas_asistencia'] = self.calcular_estadisticas_asistencia(asistencias_query)
+        context['estadisticas_asistencia'] = self.calcular_estadisticas_asistencia(asistencias_query, estudiante)
         
         # === INCONSISTENCIAS Y OBSERVACIONES ===
         from comportamiento.models import Inconsistencia
@@ -926,9 +936,22 @@ class EstudianteDetailView(RoleRequiredMixin, DetailView):
             'color_tendencia': color_tendencia,
         }
     
-    def calcular_estadisticas_asistencia(self, asistencias_query):
-        """Estadísticas avanzadas de asistencia"""
-        if not asistencias_query.exists():
+    def calcular_estadisticas_asistencia(self, asistencias_query, estudiante=None):
+        """Estadísticas avanzadas de asistencia (totales desde el resumen por período)"""
+        from comportamiento.models import ResumenAsistenciaPeriodo
+        from gestioncolegio.services import totales_asistencia
+        
+        if estudiante is not None:
+            resumen = totales_asistencia(ResumenAsistenciaPeriodo.objects.filter(estudiante=estudiante), 1)
+        else:
+            conteos = asistencias_query.aggregate(
+                asistencias=Count('id', filter=Q(estado='A')),
+                faltas=Count('id', filter=Q(estado='F')),
+                justificadas=Count('id', filter=Q(estado='J')),
+            )
+            resumen = {**conteos, 'total': sum(conteos.values())}
+        
+        if not resumen['total']:
             return {
                 'total': 0,
                 'asistencias': 0,
@@ -938,14 +961,14 @@ class EstudianteDetailView(RoleRequiredMixin, DetailView):
                 'tendencia': 'Sin datos'
             }
         
-        total = asistencias_query.count()
-        asistencias = asistencias_query.filter(estado='A').count()
-        faltas = asistencias_query.filter(estado='F').count()
-        justificadas = asistencias_query.filter(estado='J').count()
+        total = resumen['total']
+        asistencias = resumen['asistencias']
+        faltas = resumen['faltas']
+        justificadas = resumen['justificadas']
         
         # Tendencia por mes
         from django.db.models.functions import TruncMonth
-        from django.db.models import Count, Case, When, FloatField
+        from django.db.models import Case, When, FloatField
         
         tendencia_mensual = asistencias_query.annotate(
             mes=TruncMonth('fecha')
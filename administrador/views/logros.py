@@ -12,6 +12,7 @@ import json
 
 from gestioncolegio.mixins import RoleRequiredMixin
 from gestioncolegio.models import AñoLectivo, Sede
+from gestioncolegio.services import auditoria
 from usuarios.models import Docente
 from matricula.models import GradoAñoLectivo, AsignaturaGradoAñoLectivo, PeriodoAcademico
 from estudiantes.models import Estudiante
@@ -324,17 +325,13 @@ class GuardarLogroView(RoleRequiredMixin, View):
                 mensaje = 'Logro creado exitosamente'
             
             # Registrar auditoría
-            if request.user.is_authenticated and hasattr(request.user, 'usuario'):
-                from gestioncolegio.models import AuditoriaSistema
-                
-                AuditoriaSistema.objects.create(
-                    usuario=request.user.usuario,
-                    accion='creacion' if not logro_id else 'modificacion',
-                    modelo_afectado='Logro',
-                    objeto_id=str(logro.id),
-                    descripcion=f"Logro {accion}: {tema[:50]}... para {asignatura.nombre} - {grado.nombre}",
-                    ip_address=request.META.get('REMOTE_ADDR')
-                )
+            auditoria.registrar(
+                request,
+                accion='creacion' if not logro_id else 'modificacion',
+                modelo_afectado='Logro',
+                objeto_id=logro.id,
+                descripcion=f"Logro {accion}: {tema[:50]}... para {asignatura.nombre} - {grado.nombre}",
+            )
             
             return JsonResponse({
                 'success': True,
@@ -379,16 +376,12 @@ class EliminarLogroView(RoleRequiredMixin, View):
             logro.delete()
             
             # Registrar auditoría
-            if request.user.is_authenticated and hasattr(request.user, 'usuario'):
-                from gestioncolegio.models import AuditoriaSistema
-                
-                AuditoriaSistema.objects.create(
-                    usuario=request.user.usuario,
-                    accion='eliminacion',
-                    modelo_afectado='Logro',
-                    descripcion=f"Logro eliminado: {logro_info['tema'][:50]}... para {logro_info['asignatura']} - {logro_info['grado']}",
-                    ip_address=request.META.get('REMOTE_ADDR')
-                )
+            auditoria.registrar(
+                request,
+                accion='eliminacion',
+                modelo_afectado='Logro',
+                descripcion=f"Logro eliminado: {logro_info['tema'][:50]}... para {logro_info['asignatura']} - {logro_info['grado']}",
+            )
             
             return JsonResponse({
                 'success': True,
@@ -468,16 +461,12 @@ class CopiarLogrosView(RoleRequiredMixin, View):
                     logros_omitidos += 1
             
             # Registrar auditoría
-            if request.user.is_authenticated and hasattr(request.user, 'usuario'):
-                from gestioncolegio.models import AuditoriaSistema
-                
-                AuditoriaSistema.objects.create(
-                    usuario=request.user.usuario,
-                    accion='creacion_masiva',
-                    modelo_afectado='Logro',
-                    descripcion=f"Copiados {logros_copiados} logros de {origen_periodo.periodo.nombre} a {destino_periodo.periodo.nombre}",
-                    ip_address=request.META.get('REMOTE_ADDR')
-                )
+            auditoria.registrar(
+                request,
+                accion='creacion_masiva',
+                modelo_afectado='Logro',
+                descripcion=f"Copiados {logros_copiados} logros de {origen_periodo.periodo.nombre} a {destino_periodo.periodo.nombre}",
+            )
             
             return JsonResponse({
                 'success': True,
@@ -4,8 +4,8 @@ Módulo de Reportes - Administrador
 import csv
 import xlwt
 from datetime import datetime, date, timedelta
-from django.db.models import Q, Count, Avg, Max, Min, Sum, F, FloatField, Case, When
-from django.db.models.functions import TruncMonth, TruncYear, Cast
+from django.db.models import Q, Count, Avg, Max, Min, Sum, F
+from django.db.models.functions import TruncYear, Cast
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, permission_required
@@ -15,16 +15,18 @@ from django.views.generic import View, TemplateView
 from django.core.exceptions import PermissionDenied
 from collections import defaultdict
 import json
-from django.db.models.functions import ExtractMonth, ExtractDay, ExtractYear
-from django.db.models import ExpressionWrapper, Value
+from django.db.models.functions import ExtractMonth
 
 from gestioncolegio.mixins import RoleRequiredMixin
 from usuarios.models import Usuario, Docente
 from estudiantes.models import Estudiante, Matricula, Nota, Acudiente
 from academico.models import Grado, Asignatura, Periodo, Logro, Area, NivelEscolar
-from comportamiento.models import Comportamiento, Asistencia, Inconsistencia
+from comportamiento.models import Comportamiento, Asistencia, Inconsistencia, ResumenAsistenciaCurso, ResumenAsistenciaPeriodo
 from gestioncolegio.models import Sede, AñoLectivo, ConfiguracionGeneral, Colegio
 from matricula.models import PeriodoAcademico, AsignaturaGradoAñoLectivo, GradoAñoLectivo
+from gestioncolegio.services import calendario, serie_mensual, totales_asistencia
+from gestioncolegio.services.estadisticas import estadisticas_demograficas, resumen_notas
+from gestioncolegio.services.histograma import FILTROS as FILTROS_HISTOGRAMA, histograma_notas, validar_ancho
 
 # ========== VISTAS PRINCIPALES DE REPORTES ==========
 
@@ -258,7 +260,6 @@ class ReporteNotasView(RoleRequiredMixin, TemplateView):
             'grados': Grado.objects.all(),
             'asignaturas': Asignatura.objects.all(),
             'sedes': Sede.objects.filter(estado=True),
-            'estudiantes': Estudiante.objects.filter(estado=True).select_related('usuario'),
             'tipo_reporte': tipo_reporte,
             'filtros': {
                 'periodo_id': periodo_id,
@@ -408,11 +409,9 @@ class ReporteNotasView(RoleRequiredMixin, TemplateView):
     def exportar_boletin_pdf(self, estudiante, notas):
         """Exportar boletín a PDF"""
         from reportlab.lib.pagesizes import letter
-        from reportlab.pdfgen import canvas
         from reportlab.lib import colors
         from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-        from reportlab.lib.styles import getSampleStyleSheet
-        from reportlab.lib.units import inch
+        from gestioncolegio.services import documentos_pdf
         
         response = HttpResponse(content_type='application/pdf')
         filename = f"boletin_{estudiante.usuario.apellidos}_{estudiante.usuario.nombres}.pdf"
@@ -421,7 +420,10 @@ class ReporteNotasView(RoleRequiredMixin, TemplateView):
         # Crear documento
         doc = SimpleDocTemplate(response, pagesize=letter)
         elements = []
-        styles = getSampleStyleSheet()
+        styles = documentos_pdf.estilos()
+        recursos_pdf = documentos_pdf.recursos_colegio()
+        if recursos_pdf:
+            elements.extend(recursos_pdf.encabezado(styles))
         
         # Título
         title = Paragraph(f"BOLETÍN DE NOTAS - {estudiante.usuario.get_full_name()}", styles['Title'])
@@ -473,7 +475,11 @@ class ReporteNotasView(RoleRequiredMixin, TemplateView):
             elements.append(Paragraph("<b>No hay notas registradas</b>", styles['Normal']))
         
         # Construir PDF
-        doc.build(elements)
+        if recursos_pdf:
+            marca_agua = recursos_pdf.marca_agua("BOLETÍN DE NOTAS")
+            doc.build(elements, onFirstPage=marca_agua, onLaterPages=marca_agua)
+        else:
+            doc.build(elements)
         return response
 
 class ReporteAsistenciaView(RoleRequiredMixin, TemplateView):
@@ -526,38 +532,42 @@ class ReporteAsistenciaView(RoleRequiredMixin, TemplateView):
         if estudiante_id:
             asistencias = asistencias.filter(estudiante_id=estudiante_id)
         
-        # Calcular estadísticas
-        total_registros = asistencias.count()
-        asistencias_totales = asistencias.filter(estado='A').count()
-        faltas_totales = asistencias.filter(estado='F').count()
-        faltas_justificadas = asistencias.filter(estado='J').count()
+        # Calcular estadísticas: sin filtro de sede ni estudiante basta con los
+        # resúmenes diarios por curso; en otro caso un único conteo agrupado
+        if not sede_id and not estudiante_id:
+            resumenes_curso = ResumenAsistenciaCurso.objects.all()
+            if fecha_inicio:
+                resumenes_curso = resumenes_curso.filter(fecha__gte=fecha_inicio)
+            if fecha_fin:
+                resumenes_curso = resumenes_curso.filter(fecha__lte=fecha_fin)
+            if grado_id:
+                resumenes_curso = resumenes_curso.filter(grado_año_lectivo__grado_id=grado_id)
+            resumen = totales_asistencia(resumenes_curso)
+        else:
+            conteos = asistencias.aggregate(
+                asistencias=Count('id', filter=Q(estado='A')),
+                faltas=Count('id', filter=Q(estado='F')),
+                justificadas=Count('id', filter=Q(estado='J')),
+            )
+            total = sum(conteos.values())
+            resumen = {
+                **conteos,
+                'total': total,
+                'porcentaje': round(conteos['asistencias'] / total * 100, 2) if total > 0 else 0,
+            }
         
-        porcentaje_asistencia = (asistencias_totales / total_registros * 100) if total_registros > 0 else 0
+        total_registros = resumen['total']
+        asistencias_totales = resumen['asistencias']
+        faltas_totales = resumen['faltas']
+        faltas_justificadas = resumen['justificadas']
+        porcentaje_asistencia = resumen['porcentaje']
         
         # Agrupar por estudiante para tabla resumen
         asistencias_por_estudiante = []
         if not estudiante_id:  # Solo si no se filtró por estudiante específico
-            estudiantes_ids = asistencias.values_list('estudiante', flat=True).distinct()
-            
-            for est_id in estudiantes_ids:
-                asist_est = asistencias.filter(estudiante_id=est_id)
-                total_asist = asist_est.filter(estado='A').count()
-                total_faltas = asist_est.filter(estado='F').count()
-                total_justificadas = asist_est.filter(estado='J').count()
-                total_reg = asist_est.count()
-                
-                porcentaje = (total_asist / total_reg * 100) if total_reg > 0 else 0
-                
-                estudiante_obj = asist_est.first().estudiante
-                
-                asistencias_por_estudiante.append({
-                    'estudiante': estudiante_obj,
-                    'total_asistencias': total_asist,
-                    'total_faltas': total_faltas,
-                    'total_justificadas': total_justificadas,
-                    'porcentaje_asistencia': round(porcentaje, 2),
-                    'total_registros': total_reg,
-                })
+            asistencias_por_estudiante = self.resumen_por_estudiante(
+                asistencias, sede_id, grado_id, usar_resumen=not (fecha_inicio or fecha_fin)
+            )
         
         # Asistencias detalladas para tabla principal
         asistencias_detalladas = asistencias.order_by('-fecha')[:100]  # Limitar a 100 registros
@@ -576,7 +586,6 @@ class ReporteAsistenciaView(RoleRequiredMixin, TemplateView):
             'fecha_fin': fecha_fin.strftime('%Y-%m-%d') if fecha_fin else '',
             'sedes': Sede.objects.filter(estado=True),
             'grados': Grado.objects.all(),
-            'estudiantes': Estudiante.objects.filter(estado=True).select_related('usuario'),
             'filtros': {
                 'fecha_inicio': fecha_inicio.strftime('%Y-%m-%d') if fecha_inicio else '',
                 'fecha_fin': fecha_fin.strftime('%Y-%m-%d') if fecha_fin else '',
@@ -588,6 +597,51 @@ class ReporteAsistenciaView(RoleRequiredMixin, TemplateView):
         
         return context
 
+    def resumen_por_estudiante(self, asistencias, sede_id, grado_id, usar_resumen):
+        """Conteos por estudiante en una consulta (resumen por período si no hay rango de fechas)"""
+        if usar_resumen:
+            filas = ResumenAsistenciaPeriodo.objects.all()
+            # Subconsultas para no duplicar filas por cada matrícula
+            if sede_id:
+                filas = filas.filter(estudiante_id__in=Matricula.objects.filter(
+                    sede_id=sede_id
+                ).values('estudiante_id'))
+            if grado_id:
+                filas = filas.filter(estudiante_id__in=Matricula.objects.filter(
+                    grado_año_lectivo__grado_id=grado_id
+                ).values('estudiante_id'))
+            filas = filas.values('estudiante_id').annotate(
+                total_asistencias=Sum('asistencias'),
+                total_faltas=Sum('faltas'),
+                total_justificadas=Sum('justificadas'),
+            )
+        else:
+            filas = asistencias.values('estudiante_id').annotate(
+                total_asistencias=Count('id', filter=Q(estado='A')),
+                total_faltas=Count('id', filter=Q(estado='F')),
+                total_justificadas=Count('id', filter=Q(estado='J')),
+            )
+        filas = list(filas.order_by())
+        
+        estudiantes = Estudiante.objects.select_related('usuario').in_bulk(
+            [fila['estudiante_id'] for fila in filas]
+        )
+        
+        resultado = []
+        for fila in filas:
+            total_reg = fila['total_asistencias'] + fila['total_faltas'] + fila['total_justificadas']
+            if not total_reg or fila['estudiante_id'] not in estudiantes:
+                continue
+            resultado.append({
+                'estudiante': estudiantes[fila['estudiante_id']],
+                'total_asistencias': fila['total_asistencias'],
+                'total_faltas': fila['total_faltas'],
+                'total_justificadas': fila['total_justificadas'],
+                'porcentaje_asistencia': round(fila['total_asistencias'] / total_reg * 100, 2),
+                'total_registros': total_reg,
+            })
+        return resultado
+
 class ReporteComportamientoView(RoleRequiredMixin, TemplateView):
     """Reporte de comportamiento"""
     template_name = 'administrador/reportes/comportamiento.html'
@@ -692,7 +746,6 @@ class ReporteComportamientoView(RoleRequiredMixin, TemplateView):
             'top_negativos': top_negativos,
             'periodos': PeriodoAcademico.objects.filter(estado=True).select_related('periodo'),
             'docentes': Docente.objects.filter(estado=True).select_related('usuario'),
-            'estudiantes': Estudiante.objects.filter(estado=True).select_related('usuario'),
             'categorias': Comportamiento.CATEGORIAS,
             'tipos_comportamiento': Comportamiento.TIPOS_COMPORTAMIENTO,
             'filtros': {
@@ -772,30 +825,17 @@ class EstadisticasGeneralesView(RoleRequiredMixin, TemplateView):
         promedio_general = 0
         tasa_aprobacion = 0
         if año_actual:
-            # Notas del año actual
-            notas_año = Nota.objects.filter(
-                periodo_academico__año_lectivo=año_actual
-            )
-            
-            if notas_año.exists():
-                promedio_general = notas_año.aggregate(Avg('calificacion'))['calificacion__avg'] or 0
-                
-                # Calcular tasa de aprobación (asumiendo 3.0 como mínimo)
-                total_notas = notas_año.count()
-                aprobados = notas_año.filter(calificacion__gte=3.0).count()
-                tasa_aprobacion = (aprobados / total_notas * 100) if total_notas > 0 else 0
+            # Notas del año actual: promedio y aprobación (3.0 como mínimo) en una consulta
+            estadisticas_notas = histograma_notas(año_lectivo=año_actual.id)['estadisticas']
+            promedio_general = estadisticas_notas['promedio']
+            tasa_aprobacion = estadisticas_notas['tasa_aprobacion']
         
         # Asistencia promedio
         asistencia_promedio = 0
         if año_actual:
-            asistencias_año = Asistencia.objects.filter(
-                periodo_academico__año_lectivo=año_actual
-            )
-            
-            if asistencias_año.exists():
-                total_asistencias = asistencias_año.count()
-                asistencias_real = asistencias_año.filter(estado='A').count()
-                asistencia_promedio = (asistencias_real / total_asistencias * 100) if total_asistencias > 0 else 0
+            asistencia_promedio = totales_asistencia(
+                ResumenAsistenciaPeriodo.objects.filter(periodo_academico__año_lectivo=año_actual)
+            )['porcentaje']
         
         # Comportamiento
         comportamientos_positivos = 0
@@ -896,33 +936,40 @@ class ObtenerDatosReporteView(RoleRequiredMixin, View):
         
         return JsonResponse({'error': 'Año lectivo no especificado'}, status=400)
     
+    # Rangos históricos del gráfico de distribución (intervalos semiabiertos)
+    RANGOS_GRAFICO_NOTAS = [
+        ('Bajo (0-2.9)', None, 3.0),
+        ('Básico (3.0-3.5)', 3.0, 3.6),
+        ('Alto (3.6-4.0)', 3.6, 4.1),
+        ('Superior (4.1-5.0)', 4.1, None),
+    ]
+
     def obtener_estadisticas_notas(self, periodo_id):
-        """Obtener estadísticas de notas por periodo"""
+        """Obtener estadísticas de notas por periodo (opcionalmente por sede, grado, asignatura o docente)"""
         try:
             if periodo_id:
                 periodo = PeriodoAcademico.objects.get(id=periodo_id)
-                notas = Nota.objects.filter(periodo_academico=periodo)
-                
-                # Distribución por rangos de calificación
-                rangos = [
-                    {'min': 0.0, 'max': 2.9, 'label': 'Bajo (0-2.9)'},
-                    {'min': 3.0, 'max': 3.5, 'label': 'Básico (3.0-3.5)'},
-                    {'min': 3.6, 'max': 4.0, 'label': 'Alto (3.6-4.0)'},
-                    {'min': 4.1, 'max': 5.0, 'label': 'Superior (4.1-5.0)'},
-                ]
+                filtros = {
+                    nombre: self.request.GET.get(f'{nombre}_id')
+                    for nombre in ('sede', 'grado', 'asignatura', 'docente')
+                }
+                try:
+                    ancho = validar_ancho(self.request.GET.get('ancho'))
+                except ValueError as e:
+                    return JsonResponse({'error': str(e)}, status=400)
                 
-                datos_rangos = []
-                for rango in rangos:
-                    count = notas.filter(
-                        calificacion__gte=rango['min'],
-                        calificacion__lte=rango['max']
-                    ).count()
-                    datos_rangos.append({
-                        'rango': rango['label'],
-                        'cantidad': count
-                    })
+                # Bandas, intervalos y estadísticas en una sola consulta (en caché)
+                histograma = histograma_notas(
+                    bandas=self.RANGOS_GRAFICO_NOTAS,
+                    ancho=ancho,
+                    periodo=periodo.id,
+                    **filtros
+                )
                 
                 # Top 5 asignaturas con mejor promedio
+                notas = Nota.objects.filter(periodo_academico=periodo).filter(**{
+                    FILTROS_HISTOGRAMA[nombre]: valor for nombre, valor in filtros.items() if valor
+                })
                 top_asignaturas = notas.values(
                     'asignatura_grado_año_lectivo__asignatura__nombre'
                 ).annotate(
@@ -930,15 +977,17 @@ class ObtenerDatosReporteView(RoleRequiredMixin, View):
                     total=Count('id')
                 ).order_by('-promedio')[:5]
                 
+                estadisticas = histograma['estadisticas']
                 return JsonResponse({
                     'success': True,
-                    'datos_rangos': list(datos_rangos),
+                    'datos_rangos': histograma['bandas'],
+                    'intervalos': histograma['intervalos'],
                     'top_asignaturas': list(top_asignaturas),
                     'estadisticas_generales': {
-                        'promedio': notas.aggregate(Avg('calificacion'))['calificacion__avg'] or 0,
-                        'maxima': notas.aggregate(Max('calificacion'))['calificacion__max'] or 0,
-                        'minima': notas.aggregate(Min('calificacion'))['calificacion__min'] or 0,
-                        'total': notas.count(),
+                        'promedio': estadisticas['promedio'],
+                        'maxima': estadisticas['maxima'],
+                        'minima': estadisticas['minima'],
+                        'total': estadisticas['total'],
                     }
                 })
         except Exception as e:
@@ -952,18 +1001,10 @@ class ObtenerDatosReporteView(RoleRequiredMixin, View):
             if año_lectivo_id:
                 año_lectivo = AñoLectivo.objects.get(id=año_lectivo_id)
                 
-                # Obtener asistencias por mes
-                asistencias = Asistencia.objects.filter(
-                    periodo_academico__año_lectivo=año_lectivo
-                ).annotate(
-                    mes=TruncMonth('fecha')
-                ).values('mes').annotate(
-                    total=Count('id'),
-                    presentes=Count('id', filter=Q(estado='A')),
-                    porcentaje=(Count('id', filter=Q(estado='A')) * 100.0 / Count('id'))
-                ).order_by('mes')
-                
-                datos = list(asistencias)
+                # Serie mensual desde el resumen diario por curso
+                datos = serie_mensual(
+                    ResumenAsistenciaCurso.objects.filter(grado_año_lectivo__año_lectivo=año_lectivo)
+                )
                 
                 return JsonResponse({
                     'success': True,
@@ -995,7 +1036,7 @@ class ReporteEstudiantesRiesgoView(RoleRequiredMixin, TemplateView):
             periodo = PeriodoAcademico.objects.get(id=periodo_id)
         else:
             # Buscar el periodo actual o el más reciente
-            periodo = PeriodoAcademico.objects.filter(estado=True).order_by('-fecha_fin').first()
+            periodo = calendario.ultimo_periodo_activo()
         
         if not periodo:
             context['error'] = 'No hay periodos académicos activos'
@@ -1585,6 +1626,7 @@ class ExportarReporteView(RoleRequiredMixin, View):
         """Generar boletín en PDF"""
         from reportlab.lib.pagesizes import letter
         from reportlab.pdfgen import canvas
+        from gestioncolegio.services import documentos_pdf
         
         response = HttpResponse(content_type='application/pdf')
         filename = f"boletin_{estudiante.usuario.apellidos}_{estudiante.usuario.nombres}.pdf"
@@ -1592,8 +1634,17 @@ class ExportarReporteView(RoleRequiredMixin, View):
         
         p = canvas.Canvas(response, pagesize=letter)
         width, height = letter
+        recursos_pdf = documentos_pdf.recursos_colegio()
+        
+        def marca_agua():
+            if recursos_pdf:
+                recursos_pdf.dibujar_marca_agua(p, letter, "BOLETÍN DE NOTAS")
         
         # Encabezado
+        marca_agua()
+        if recursos_pdf and recursos_pdf.escudo is not None:
+            p.drawImage(recursos_pdf.escudo, width - 160, height - 130, width=60, height=60,
+                        preserveAspectRatio=True, mask='auto')
         p.setFont("Helvetica-Bold", 16)
         p.drawString(100, height - 100, "BOLETÍN DE NOTAS")
         p.setFont("Helvetica", 12)
@@ -1619,6 +1670,7 @@ class ExportarReporteView(RoleRequiredMixin, View):
                 
                 if y < 100:
                     p.showPage()
+                    marca_agua()
                     y = height - 100
                     p.setFont("Helvetica", 10)
             
@@ -1942,140 +1994,14 @@ class EstadisticasDemograficasView(RoleRequiredMixin, TemplateView):
         if sede_id:
             matriculas = matriculas.filter(sede_id=sede_id)
         
-        # ===== DISTRIBUCIÓN POR GÉNERO =====
-        distribucion_genero = matriculas.values(
-            'estudiante__usuario__sexo'
-        ).annotate(
-            total=Count('id'),
-            promedio_edad=Avg(
-                ExpressionWrapper(
-                    hoy.year - ExtractYear('estudiante__usuario__fecha_nacimiento') -
-                    Case(
-                        When(
-                            ExtractMonth('estudiante__usuario__fecha_nacimiento') > hoy.month,
-                            then=Value(1)
-                        ),
-                        When(
-                            ExtractMonth('estudiante__usuario__fecha_nacimiento') == hoy.month,
-                            then=Case(
-                                When(
-                                    ExtractDay('estudiante__usuario__fecha_nacimiento') > hoy.day,
-                                    then=Value(1)
-                                ),
-                                default=Value(0)
-                            )
-                        ),
-                        default=Value(0)
-                    ),
-                    output_field=FloatField()
-                )
-            )
-        ).order_by('estudiante__usuario__sexo')
-        
-        # Convertir a formato amigable
-        generos = []
-        for item in distribucion_genero:
-            genero_display = dict(Usuario.SEXO_CHOICES).get(item['estudiante__usuario__sexo'], 'No especificado')
-            generos.append({
-                'genero': genero_display,
-                'codigo': item['estudiante__usuario__sexo'],
-                'total': item['total'],
-                'porcentaje': round((item['total'] / matriculas.count() * 100), 2) if matriculas.count() > 0 else 0,
-                'promedio_edad': round(item['promedio_edad'] or 0, 1),
-            })
+        # ===== DISTRIBUCIONES (una consulta, cálculo vectorizado) =====
+        demografia = estadisticas_demograficas(matriculas, hoy, dict(Usuario.SEXO_CHOICES))
+        generos = demografia['generos']
+        rangos_detallados = demografia['rangos_edad']
         
-        # ===== DISTRIBUCIÓN POR EDAD =====
-        # Calcular edades de todos los estudiantes
-        edades = []
-        rangos_detallados = {
-            '3-5': {'count': 0, 'hombres': 0, 'mujeres': 0, 'desc': 'Preescolar (3-5 años)'},
-            '6-7': {'count': 0, 'hombres': 0, 'mujeres': 0, 'desc': 'Primero-Segundo (6-7 años)'},
-            '8-9': {'count': 0, 'hombres': 0, 'mujeres': 0, 'desc': 'Tercero-Cuarto (8-9 años)'},
-            '10-11': {'count': 0, 'hombres': 0, 'mujeres': 0, 'desc': 'Quinto (10-11 años)'},
-            '12+': {'count': 0, 'hombres': 0, 'mujeres': 0, 'desc': 'Bachillerato (12+ años)'},
-        }
-        
-        for matricula in matriculas.select_related('estudiante__usuario'):
-            estudiante = matricula.estudiante
-            if estudiante.usuario.fecha_nacimiento:
-                fecha_nac = estudiante.usuario.fecha_nacimiento
-                edad = hoy.year - fecha_nac.year
-                if (hoy.month, hoy.day) < (fecha_nac.month, fecha_nac.day):
-                    edad -= 1
-                
-                edades.append(edad)
-                
-                # Clasificar en rangos
-                if 3 <= edad <= 5:
-                    rango = '3-5'
-                elif 6 <= edad <= 7:
-                    rango = '6-7'
-                elif 8 <= edad <= 9:
-                    rango = '8-9'
-                elif 10 <= edad <= 11:
-                    rango = '10-11'
-                elif edad >= 12:
-                    rango = '12+'
-                else:
-                    continue
-                
-                rangos_detallados[rango]['count'] += 1
-                
-                # Por género
-                if estudiante.usuario.sexo == 'M':
-                    rangos_detallados[rango]['hombres'] += 1
-                elif estudiante.usuario.sexo == 'F':
-                    rangos_detallados[rango]['mujeres'] += 1
-        
-        # Calcular estadísticas de edad
-        if edades:
-            promedio_edad = sum(edades) / len(edades)
-            moda_edad = max(set(edades), key=edades.count)
-            edad_min = min(edades)
-            edad_max = max(edades)
-        else:
-            promedio_edad = moda_edad = edad_min = edad_max = 0
-        
-        # ===== DISTRIBUCIÓN POR GRADO =====
-        distribucion_grado = matriculas.values(
-            'grado_año_lectivo__grado__nombre',
-            'grado_año_lectivo__grado__nivel_escolar__nombre'
-        ).annotate(
-            total=Count('id'),
-            hombres=Count('id', filter=Q(estudiante__usuario__sexo='M')),
-            mujeres=Count('id', filter=Q(estudiante__usuario__sexo='F'))
-        ).order_by(
-            'grado_año_lectivo__grado__nivel_escolar__nombre',
-            'grado_año_lectivo__grado__nombre'
-        )
-        
-        # Preparar datos por grado
-        datos_por_grado = []
-        for item in distribucion_grado:
-            total = item['total']
-            datos_por_grado.append({
-                'grado': item['grado_año_lectivo__grado__nombre'],
-                'nivel': item['grado_año_lectivo__grado__nivel_escolar__nombre'],
-                'total': total,
-                'hombres': item['hombres'],
-                'mujeres': item['mujeres'],
-                'porcentaje_hombres': round((item['hombres'] / total * 100), 2) if total > 0 else 0,
-                'porcentaje_mujeres': round((item['mujeres'] / total * 100), 2) if total > 0 else 0,
-                'densidad': self.calcular_densidad_grado(total),  # Baja, Media, Alta
-            })
-        
-        # ===== DISTRIBUCIÓN POR NIVEL ESCOLAR =====
-        distribucion_nivel = matriculas.values(
-            'grado_año_lectivo__grado__nivel_escolar__nombre'
-        ).annotate(
-            total=Count('id'),
-            promedio_edad=Avg(
-                ExpressionWrapper(
-                    hoy.year - ExtractYear('estudiante__usuario__fecha_nacimiento'),
-                    output_field=FloatField()
-                )
-            )
-        ).order_by('grado_año_lectivo__grado__nivel_escolar__nombre')
+        datos_por_grado = demografia['por_grado']
+        for item in datos_por_grado:
+            item['densidad'] = self.calcular_densidad_grado(item['total'])  # Baja, Media, Alta
         
         # ===== ACUDIENTES Y CONTACTOS =====
         # Estudiantes con acudientes registrados
@@ -2101,7 +2027,7 @@ class EstadisticasDemograficasView(RoleRequiredMixin, TemplateView):
         ).order_by('mes')
         
         # ===== PREPARAR CONTEXTO FINAL =====
-        total_estudiantes = matriculas.count()
+        total_estudiantes = demografia['total']
         
         context.update({
             # Año lectivo actual
@@ -2111,17 +2037,13 @@ class EstadisticasDemograficasView(RoleRequiredMixin, TemplateView):
             'distribucion_genero': generos,
             'rangos_edad': rangos_detallados,
             'datos_por_grado': datos_por_grado,
-            'distribucion_nivel': list(distribucion_nivel),
+            'distribucion_nivel': demografia['por_nivel'],
             'matriculas_por_mes': list(matriculas_por_mes),
             
             # Estadísticas generales
             'estadisticas': {
                 'total_estudiantes': total_estudiantes,
-                'promedio_edad': round(promedio_edad, 1),
-                'moda_edad': moda_edad,
-                'edad_minima': edad_min,
-                'edad_maxima': edad_max,
-                'desviacion_edad': self.calcular_desviacion_estandar(edades) if edades else 0,
+                **demografia['edad'],
                 
                 # Contactos
                 'estudiantes_con_acudientes': estudiantes_con_acudientes,
@@ -2171,14 +2093,7 @@ class EstadisticasDemograficasView(RoleRequiredMixin, TemplateView):
     
     def calcular_desviacion_estandar(self, datos):
         """Calcular desviación estándar"""
-        import math
-        if not datos:
-            return 0
-        
-        n = len(datos)
-        media = sum(datos) / n
-        varianza = sum((x - media) ** 2 for x in datos) / n
-        return round(math.sqrt(varianza), 2)
+        return resumen_notas(datos)['desviacion']
     
     def get_top_grados(self, datos_por_grado, top=3, reverse=True):
         """Obtener los grados con más/menos estudiantes"""
@@ -89,8 +89,26 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'gestioncolegio.middleware.InstrumentacionMiddleware',
 ]
 
+# ===============================
+# INSTRUMENTACIÓN (opcional)
+# ===============================
+# Muestras de consultas/latencia por vista para administrador:perfil_vistas
+INSTRUMENTACION_ACTIVA = config('INSTRUMENTACION_ACTIVA', default=False, cast=bool)
+INSTRUMENTACION_MUESTREO = config('INSTRUMENTACION_MUESTREO', default=1.0, cast=float)
+INSTRUMENTACION_LOTE = config('INSTRUMENTACION_LOTE', default=20, cast=int)
+
+# ===============================
+# AUDITORÍA
+# ===============================
+# Eventos por bulk_create y espera máxima (segundos) antes de escribirlos;
+# meses que se conservan en la tabla activa (el resto va a AuditoriaArchivada)
+AUDITORIA_LOTE = config('AUDITORIA_LOTE', default=50, cast=int)
+AUDITORIA_INTERVALO = config('AUDITORIA_INTERVALO', default=5, cast=int)
+AUDITORIA_MESES_ACTIVOS = config('AUDITORIA_MESES_ACTIVOS', default=6, cast=int)
+
 # ===============================
 # URLS / WSGI
 # ===============================
@@ -116,6 +134,7 @@ TEMPLATES = [
                 'web.context_processors.programas_context',
                 'gestioncolegio.context_processors.informacion_colegio',
                 'gestioncolegio.context_processors.menu_sistema',
+                'gestioncolegio.context_processors.notificaciones_usuario',
                 'gestioncolegio.context_processors.periodo_actual_processor',
                 'gestioncolegio.context_processors.acudiente_menu',
                 'gestioncolegio.context_processors.año_lectivo_admin_context',
@@ -151,6 +170,25 @@ DATABASES = {
 
 DATABASE_ROUTERS = ['colegio_app.routers.AntiguaDBRouter']
 
+# ===============================
+# CACHE
+# ===============================
+# Caché compartida entre los procesos de Passenger. Por defecto se usa el
+# sistema de archivos para no depender de servicios externos en el hosting.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=60 * 60 * 24, cast=int),
+    }
+}
+
+# Páginas y fragmentos del sitio público (se invalidan al publicar contenido)
+SITIO_PUBLICO_CACHE_TIMEOUT = config('SITIO_PUBLICO_CACHE_TIMEOUT', default=60 * 60 * 6, cast=int)
+
+# Snapshots del dashboard del estudiante
+DASHBOARD_ESTUDIANTE_CACHE_TIMEOUT = config('DASHBOARD_ESTUDIANTE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
 # ===============================
 # AUTH PASSWORD VALIDATORS
 # ===============================
@@ -179,6 +217,22 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Miniaturas y tamaños web de las imágenes subidas: al guardar (True) o solo
+# con el comando generar_derivados_imagenes (False, p. ej. desde cron)
+IMAGENES_DERIVADOS_AL_SUBIR = config('IMAGENES_DERIVADOS_AL_SUBIR', default=True, cast=bool)
+
+# Envío de PDFs en caché por el servidor web: '' (Django), 'X-Sendfile' o
+# 'X-Accel-Redirect' (nginx, con una location interna en DOCUMENTOS_SENDFILE_URL)
+DOCUMENTOS_SENDFILE_HEADER = config('DOCUMENTOS_SENDFILE_HEADER', default='')
+DOCUMENTOS_SENDFILE_URL = config('DOCUMENTOS_SENDFILE_URL', default='/documentos-internos/')
+
+# Firma digital por lotes de constancias y boletines (comando firmar_documentos)
+FIRMA_DIGITAL_ACTIVA = config('FIRMA_DIGITAL_ACTIVA', default=False, cast=bool)
+FIRMA_DIGITAL_CERTIFICADO = config('FIRMA_DIGITAL_CERTIFICADO', default='')
+FIRMA_DIGITAL_CLAVE = config('FIRMA_DIGITAL_CLAVE', default='')
+FIRMA_DIGITAL_PROCESOS = config('FIRMA_DIGITAL_PROCESOS', default=0, cast=int)
+FIRMA_DIGITAL_EMBEBER_VALIDACION = config('FIRMA_DIGITAL_EMBEBER_VALIDACION', default=False, cast=bool)
+
 # ===============================
 # AUTH REDIRECTS
 # ===============================
@@ -209,6 +263,12 @@ else:
     DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
     SERVER_EMAIL = DEFAULT_FROM_EMAIL
 
+# Bandeja de salida (comando enviar_correos). Cuotas de Gmail: 500 destinatarios
+# por día en cuentas gratuitas; el límite por minuto espacia los envíos.
+CORREO_LIMITE_DIARIO = config('CORREO_LIMITE_DIARIO', default=500, cast=int)
+CORREO_LIMITE_MINUTO = config('CORREO_LIMITE_MINUTO', default=20, cast=int)
+CORREO_MAX_INTENTOS = config('CORREO_MAX_INTENTOS', default=5, cast=int)
+
 # ===============================
 # CRISPY FORMS
 # ===============================
@@ -24,3 +24,24 @@ class InconsistenciaAdmin(admin.ModelAdmin):
     search_fields = ['estudiante__usuario__nombres', 'tipo', 'descripcion']
     autocomplete_fields = ['estudiante']
     date_hierarchy = 'fecha'
+
+@admin.register(ResumenAsistenciaPeriodo)
+class ResumenAsistenciaPeriodoAdmin(admin.ModelAdmin):
+    list_display = ['estudiante', 'periodo_academico', 'asistencias', 'faltas', 'justificadas', 'updated_at']
+    list_filter = ['periodo_academico']
+    search_fields = ['estudiante__usuario__nombres', 'estudiante__usuario__apellidos']
+    readonly_fields = ['estudiante', 'periodo_academico', 'asistencias', 'faltas', 'justificadas']
+
+@admin.register(ResumenAsistenciaCurso)
+class ResumenAsistenciaCursoAdmin(admin.ModelAdmin):
+    list_display = ['grado_año_lectivo', 'fecha', 'asistencias', 'faltas', 'justificadas', 'updated_at']
+    list_filter = ['grado_año_lectivo__año_lectivo', 'fecha']
+    readonly_fields = ['grado_año_lectivo', 'fecha', 'asistencias', 'faltas', 'justificadas']
+    date_hierarchy = 'fecha'
+
+@admin.register(SincronizacionAsistencia)
+class SincronizacionAsistenciaAdmin(admin.ModelAdmin):
+    list_display = ['clave', 'usuario', 'asistencia', 'estado', 'marca_tiempo', 'resultado', 'created_at']
+    list_filter = ['resultado', 'estado']
+    search_fields = ['clave', 'usuario__nombres', 'usuario__apellidos']
+    readonly_fields = ['clave', 'usuario', 'asistencia', 'estado', 'marca_tiempo', 'resultado', 'detalle']
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comportamiento', '0004_initial'),
+        ('estudiantes', '0002_initial'),
+        ('matricula', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAsistenciaCurso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fecha', models.DateField()),
+                ('asistencias', models.PositiveIntegerField(default=0)),
+                ('faltas', models.PositiveIntegerField(default=0)),
+                ('justificadas', models.PositiveIntegerField(default=0)),
+                ('grado_año_lectivo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia', to='matricula.gradoañolectivo')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Asistencia por Curso',
+                'verbose_name_plural': 'Resúmenes de Asistencia por Curso',
+                'constraints': [models.UniqueConstraint(fields=('grado_año_lectivo', 'fecha'), name='unique_resumen_asistencia_curso')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenAsistenciaPeriodo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('asistencias', models.PositiveIntegerField(default=0)),
+                ('faltas', models.PositiveIntegerField(default=0)),
+                ('justificadas', models.PositiveIntegerField(default=0)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia', to='estudiantes.estudiante')),
+                ('periodo_academico', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia', to='matricula.periodoacademico')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Asistencia por Período',
+                'verbose_name_plural': 'Resúmenes de Asistencia por Período',
+                'constraints': [models.UniqueConstraint(fields=('estudiante', 'periodo_academico'), name='unique_resumen_asistencia_periodo')],
+            },
+        ),
+    ]
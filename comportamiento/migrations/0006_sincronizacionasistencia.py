@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comportamiento', '0005_resumenasistenciacurso_resumenasistenciaperiodo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SincronizacionAsistencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('clave', models.CharField(max_length=64, unique=True)),
+                ('estado', models.CharField(choices=[('A', 'Asistió'), ('F', 'Faltó'), ('J', 'Falta justificada')], max_length=1)),
+                ('marca_tiempo', models.DateTimeField(help_text='Momento de la captura según el dispositivo')),
+                ('resultado', models.CharField(choices=[('aplicada', 'Aplicada'), ('descartada', 'Descartada (hay un cambio más reciente)'), ('rechazada', 'Rechazada')], max_length=10)),
+                ('detalle', models.CharField(blank=True, max_length=255)),
+                ('asistencia', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sincronizaciones', to='comportamiento.asistencia')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sincronizaciones_asistencia', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Sincronización de Asistencia',
+                'verbose_name_plural': 'Sincronizaciones de Asistencia',
+                'indexes': [models.Index(fields=['asistencia', '-created_at'], name='sinc_asistencia_reciente_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:40
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, F, Q
+
+# Estado de Asistencia -> campo del resumen (igual que gestioncolegio.services.asistencia)
+CAMPOS_ESTADO = {
+    'A': 'asistencias',
+    'F': 'faltas',
+    'J': 'justificadas',
+}
+
+
+def rellenar_resumenes(apps, schema_editor):
+    """
+    Llena los resúmenes con la asistencia ya registrada; sin esto los
+    reportes que leen ResumenAsistencia* muestran ceros tras el despliegue.
+    Misma lógica que reconstruir_resumenes(), con los modelos históricos.
+    """
+    Asistencia = apps.get_model('comportamiento', 'Asistencia')
+    ResumenAsistenciaCurso = apps.get_model('comportamiento', 'ResumenAsistenciaCurso')
+    ResumenAsistenciaPeriodo = apps.get_model('comportamiento', 'ResumenAsistenciaPeriodo')
+
+    conteos = {campo: Count('id', filter=Q(estado=estado)) for estado, campo in CAMPOS_ESTADO.items()}
+
+    ResumenAsistenciaPeriodo.objects.all().delete()
+    ResumenAsistenciaPeriodo.objects.bulk_create(
+        [
+            ResumenAsistenciaPeriodo(**fila)
+            for fila in Asistencia.objects.values('estudiante_id', 'periodo_academico_id').annotate(**conteos).order_by()
+        ],
+        batch_size=1000
+    )
+
+    por_curso = defaultdict(lambda: dict.fromkeys(CAMPOS_ESTADO.values(), 0))
+    for fila in Asistencia.objects.filter(
+        estudiante__matriculas__año_lectivo=F('periodo_academico__año_lectivo')
+    ).values('estudiante__matriculas__grado_año_lectivo_id', 'fecha').annotate(**conteos).order_by():
+        clave = (fila['estudiante__matriculas__grado_año_lectivo_id'], fila['fecha'])
+        for campo in CAMPOS_ESTADO.values():
+            por_curso[clave][campo] += fila[campo]
+
+    ResumenAsistenciaCurso.objects.all().delete()
+    ResumenAsistenciaCurso.objects.bulk_create(
+        [
+            ResumenAsistenciaCurso(grado_año_lectivo_id=grado_id, fecha=fecha, **valores)
+            for (grado_id, fecha), valores in por_curso.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comportamiento', '0006_sincronizacionasistencia'),
+        ('estudiantes', '0002_initial'),
+        ('matricula', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(rellenar_resumenes, migrations.RunPython.noop),
+    ]
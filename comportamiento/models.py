@@ -70,3 +70,73 @@ class Inconsistencia(BaseModel):
 
     def __str__(self):
         return f"{self.estudiante} - {self.tipo} - {self.fecha}"
+
+class ResumenAsistenciaPeriodo(BaseModel):
+    """Conteos de asistencia precalculados por estudiante y período (se mantienen con cada registro)"""
+    estudiante = models.ForeignKey(Estudiante, on_delete=models.CASCADE, related_name="resumenes_asistencia")
+    periodo_academico = models.ForeignKey('matricula.PeriodoAcademico', on_delete=models.CASCADE, related_name="resumenes_asistencia")
+    asistencias = models.PositiveIntegerField(default=0)
+    faltas = models.PositiveIntegerField(default=0)
+    justificadas = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['estudiante', 'periodo_academico'], name='unique_resumen_asistencia_periodo')
+        ]
+        verbose_name = "Resumen de Asistencia por Período"
+        verbose_name_plural = "Resúmenes de Asistencia por Período"
+
+    @property
+    def total(self):
+        return self.asistencias + self.faltas + self.justificadas
+
+    def __str__(self):
+        return f"{self.estudiante} - {self.periodo_academico} ({self.asistencias}/{self.total})"
+
+class ResumenAsistenciaCurso(BaseModel):
+    """Conteos de asistencia precalculados por curso y día"""
+    grado_año_lectivo = models.ForeignKey('matricula.GradoAñoLectivo', on_delete=models.CASCADE, related_name="resumenes_asistencia")
+    fecha = models.DateField()
+    asistencias = models.PositiveIntegerField(default=0)
+    faltas = models.PositiveIntegerField(default=0)
+    justificadas = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['grado_año_lectivo', 'fecha'], name='unique_resumen_asistencia_curso')
+        ]
+        verbose_name = "Resumen de Asistencia por Curso"
+        verbose_name_plural = "Resúmenes de Asistencia por Curso"
+
+    @property
+    def total(self):
+        return self.asistencias + self.faltas + self.justificadas
+
+    def __str__(self):
+        return f"{self.grado_año_lectivo} - {self.fecha} ({self.asistencias}/{self.total})"
+
+class SincronizacionAsistencia(BaseModel):
+    """Operaciones de asistencia recibidas desde dispositivos sin conexión (registro de idempotencia)"""
+    RESULTADOS = [
+        ('aplicada', 'Aplicada'),
+        ('descartada', 'Descartada (hay un cambio más reciente)'),
+        ('rechazada', 'Rechazada'),
+    ]
+
+    clave = models.CharField(max_length=64, unique=True)
+    usuario = models.ForeignKey('usuarios.Usuario', on_delete=models.CASCADE, related_name="sincronizaciones_asistencia")
+    asistencia = models.ForeignKey(Asistencia, on_delete=models.SET_NULL, null=True, blank=True, related_name="sincronizaciones")
+    estado = models.CharField(max_length=1, choices=Asistencia.ESTADO_CHOICES)
+    marca_tiempo = models.DateTimeField(help_text="Momento de la captura según el dispositivo")
+    resultado = models.CharField(max_length=10, choices=RESULTADOS)
+    detalle = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['asistencia', '-created_at'], name='sinc_asistencia_reciente_idx'),
+        ]
+        verbose_name = "Sincronización de Asistencia"
+        verbose_name_plural = "Sincronizaciones de Asistencia"
+
+    def __str__(self):
+        return f"{self.clave} - {self.get_resultado_display()}"
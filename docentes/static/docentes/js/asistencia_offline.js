@@ -0,0 +1,187 @@
+// Cola de asistencia sin conexión - asistencia_offline.js
+// Guarda las operaciones en localStorage y las envía por lotes al endpoint
+// de sincronización cuando hay red. Cada operación lleva una clave única,
+// así que reenviar un lote tras un corte no duplica registros. Solo se
+// reintenta ante errores de red o 5xx; un lote con respuesta 4xx se aparta
+// (asistencia_apartadas) para que no bloquee la cola.
+const ColaAsistencia = (function() {
+    const CLAVE_COLA = 'asistencia_cola';
+    const CLAVE_TOKEN = 'asistencia_sync_token';
+    const CLAVE_APARTADAS = 'asistencia_apartadas';
+    const TAMANO_LOTE = 200;
+
+    let config = { url: null, csrfToken: null, onSincronizado: null };
+    let sincronizando = false;
+
+    function leer(clave, defecto) {
+        try {
+            return JSON.parse(localStorage.getItem(clave)) || defecto;
+        } catch (e) {
+            return defecto;
+        }
+    }
+
+    function guardar(clave, valor) {
+        localStorage.setItem(clave, JSON.stringify(valor));
+    }
+
+    function nuevaClave() {
+        if (window.crypto && crypto.randomUUID) {
+            return crypto.randomUUID();
+        }
+        return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2, 12);
+    }
+
+    function claveToken(cursoId, periodoId) {
+        return `${CLAVE_TOKEN}_${cursoId}_${periodoId}`;
+    }
+
+    function encolar(cursoId, periodoId, fecha, asistencias) {
+        const cola = leer(CLAVE_COLA, []);
+        const ahora = new Date().toISOString();
+        asistencias.forEach(a => {
+            cola.push({
+                curso_id: cursoId,
+                periodo_id: periodoId,
+                clave: nuevaClave(),
+                estudiante_id: a.estudiante_id,
+                fecha: fecha,
+                estado: a.estado,
+                justificacion: a.justificacion || '',
+                timestamp: ahora
+            });
+        });
+        guardar(CLAVE_COLA, cola);
+        return cola.length;
+    }
+
+    function pendientes() {
+        return leer(CLAVE_COLA, []).length;
+    }
+
+    function apartadas() {
+        return leer(CLAVE_APARTADAS, []);
+    }
+
+    function quitarDeCola(lote) {
+        const enviadas = new Set(lote.map(op => op.clave));
+        const cola = leer(CLAVE_COLA, []).filter(op => !enviadas.has(op.clave));
+        guardar(CLAVE_COLA, cola);
+        return cola;
+    }
+
+    function apartar(lote, error) {
+        // Se conservan para revisarlas, pero ya no bloquean el resto de la cola
+        const lista = apartadas();
+        lote.forEach(op => lista.push(Object.assign({}, op, { error: error })));
+        guardar(CLAVE_APARTADAS, lista);
+        return quitarDeCola(lote);
+    }
+
+    // Error de red o 5xx: el lote se reintenta más tarde
+    class ErrorTemporal extends Error {}
+
+    // 4xx: reenviar el mismo lote daría el mismo error
+    class LoteRechazado extends Error {}
+
+    async function enviarLote(cursoId, periodoId, operaciones) {
+        let response;
+        try {
+            response = await fetch(config.url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': config.csrfToken
+                },
+                body: JSON.stringify({
+                    curso_id: cursoId,
+                    periodo_id: periodoId,
+                    sync_token: localStorage.getItem(claveToken(cursoId, periodoId)),
+                    operaciones: operaciones
+                })
+            });
+        } catch (error) {
+            throw new ErrorTemporal(error.message);
+        }
+
+        let data = null;
+        try {
+            data = await response.json();
+        } catch (error) {
+            // HTML de error o redirección al login
+        }
+        const mensaje = (data && data.error) || `Error de sincronización (HTTP ${response.status})`;
+        if (response.status >= 400 && response.status < 500 && response.status !== 408 && response.status !== 429) {
+            throw new LoteRechazado(mensaje);
+        }
+        if (!response.ok || !data || !data.success) {
+            throw new ErrorTemporal(mensaje);
+        }
+        localStorage.setItem(claveToken(cursoId, periodoId), data.sync_token);
+        return data;
+    }
+
+    async function sincronizar() {
+        if (sincronizando || !navigator.onLine || !config.url) {
+            return null;
+        }
+        sincronizando = true;
+        const resumen = { aplicadas: 0, descartadas: 0, rechazadas: 0, apartadas: 0, cambios: [] };
+        let enviado = false;
+
+        try {
+            let cola = leer(CLAVE_COLA, []);
+            while (cola.length > 0) {
+                // Un lote por curso/periodo
+                const primero = cola[0];
+                const lote = cola.filter(op => op.curso_id === primero.curso_id && op.periodo_id === primero.periodo_id)
+                                 .slice(0, TAMANO_LOTE);
+                let data;
+                try {
+                    data = await enviarLote(primero.curso_id, primero.periodo_id, lote);
+                } catch (error) {
+                    if (!(error instanceof LoteRechazado)) {
+                        throw error;
+                    }
+                    console.warn('Lote de asistencia rechazado:', error);
+                    resumen.rechazadas += lote.length;
+                    resumen.apartadas += lote.length;
+                    cola = apartar(lote, error.message);
+                    enviado = true;
+                    continue;
+                }
+                enviado = true;
+
+                data.resultados.forEach(r => {
+                    if (r.resultado === 'aplicada') resumen.aplicadas++;
+                    else if (r.resultado === 'descartada') resumen.descartadas++;
+                    else resumen.rechazadas++;
+                });
+                resumen.cambios = resumen.cambios.concat(data.cambios);
+
+                // Confirmadas por el servidor: se sacan de la cola
+                cola = quitarDeCola(lote);
+            }
+        } catch (error) {
+            // Sin red o error 5xx: la cola se conserva para el próximo intento
+            console.warn('Sincronización de asistencia pendiente:', error);
+            resumen.error = error.message;
+        } finally {
+            sincronizando = false;
+        }
+
+        if (config.onSincronizado && (enviado || resumen.error)) {
+            config.onSincronizado(resumen);
+        }
+        return resumen;
+    }
+
+    function iniciar(opciones) {
+        config = Object.assign(config, opciones);
+        window.addEventListener('online', sincronizar);
+        setInterval(sincronizar, 60000);
+        sincronizar();
+    }
+
+    return { iniciar, encolar, sincronizar, pendientes, apartadas };
+})();
@@ -60,6 +60,7 @@ urlpatterns = [
     path('asistencia/', views.asistencia_principal, name='asistencia_principal'),
     path('asistencia/registrar/', views.registrar_asistencia, name='registrar_asistencia'),
     path('asistencia/registrar-masivo/', views.registrar_asistencia_masiva, name='registrar_asistencia_masiva'),
+    path('asistencia/sincronizar/', views.sincronizar_asistencia, name='sincronizar_asistencia'),
     path('asistencia/calendario/<int:curso_id>/<int:periodo_id>/', views.asistencia_calendario, name='asistencia_calendario'),
     path('asistencia/historico/<int:estudiante_id>/', views.asistencia_historico, name='asistencia_historico'),
     path('asistencia/reporte/<int:curso_id>/<int:periodo_id>/', views.reporte_asistencia_curso, name='reporte_asistencia_curso'),
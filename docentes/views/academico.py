@@ -13,7 +13,8 @@ from academico.models import Asignatura, HorarioClase, Grado, NivelEscolar
 from matricula.models import AsignaturaGradoAñoLectivo, GradoAñoLectivo, PeriodoAcademico
 from usuarios.models import Docente
 from estudiantes.models import Estudiante
-from gestioncolegio.models import AñoLectivo, Sede
+from gestioncolegio.models import Sede
+from gestioncolegio.services import calendario
 
 logger = logging.getLogger(__name__)
 
@@ -200,7 +201,7 @@ class HorariosListView(RoleRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Obtener año lectivo actual
-        año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_lectivo_actual = calendario.año_activo()
         context['año_lectivo_actual'] = año_lectivo_actual
         
         # Construir queryset base
@@ -262,7 +263,7 @@ class GradosListView(RoleRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
         
         # Obtener año lectivo actual
-        año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_lectivo_actual = calendario.año_activo()
         context['año_lectivo_actual'] = año_lectivo_actual
         
         # Estudiantes por grado (solo si hay año lectivo)
@@ -2,6 +2,7 @@
 Vistas AJAX corregidas - SIN USAR distinct(field)
 """
 import json
+from django.db import transaction
 from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.decorators import login_required
@@ -18,8 +19,10 @@ from usuarios.models import Docente
 from matricula.models import AsignaturaGradoAñoLectivo, PeriodoAcademico, GradoAñoLectivo
 from comportamiento.models import Comportamiento, Asistencia
 from academico.models import Asignatura
-from gestioncolegio.models import AñoLectivo
 from docentes.mixins import DocenteRequiredMixin, DocenteBaseView, DocenteContextMixin
+from gestioncolegio.services import (
+    calendario, estadisticas_asistencia, imagenes, matriz_asistencia, progreso_asignaturas,
+)
 from .comportamiento import get_docente_usuario
 
 @require_GET
@@ -98,7 +101,7 @@ def obtener_notas_estudiantes(request):
         
         # Verificar que el docente enseña esta asignatura en este grado
         asignatura_grado = get_object_or_404(
-            AsignaturaGradoAñoLectivo,
+            AsignaturaGradoAñoLectivo.objects.select_related('asignatura', 'grado_año_lectivo__grado'),
             docente=docente,
             grado_año_lectivo__grado_id=grado_id,
             asignatura_id=asignatura_id,
@@ -106,8 +109,7 @@ def obtener_notas_estudiantes(request):
         )
         
         # Obtener año lectivo actual
-        from gestioncolegio.models import AñoLectivo
-        año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_lectivo_actual = calendario.año_activo()
         if not año_lectivo_actual:
             return JsonResponse({'error': 'No hay año lectivo activo'}, status=400)
         
@@ -124,14 +126,19 @@ def obtener_notas_estudiantes(request):
             #estado=True
         ).select_related('usuario')
         
-        estudiantes_data = []
-        for estudiante in estudiantes:
-            # Buscar nota existente
-            nota = Nota.objects.filter(
-                estudiante=estudiante,
+        # Notas existentes en una sola consulta
+        notas_existentes = {
+            nota.estudiante_id: nota
+            for nota in Nota.objects.filter(
+                estudiante_id__in=estudiantes_ids,
                 asignatura_grado_año_lectivo=asignatura_grado,
                 periodo_academico_id=periodo_id
-            ).first()
+            )
+        }
+        
+        estudiantes_data = []
+        for estudiante in estudiantes:
+            nota = notas_existentes.get(estudiante.id)
             
             estudiantes_data.append({
                 'estudiante': estudiante,
@@ -139,12 +146,23 @@ def obtener_notas_estudiantes(request):
                 'observaciones': nota.observaciones if nota else ''
             })
         
+        periodo_seleccionado = get_object_or_404(
+            PeriodoAcademico.objects.select_related('periodo'), id=periodo_id
+        )
+        
+        # Progreso de calificación de la asignatura
+        progreso = progreso_asignaturas(
+            periodo_seleccionado,
+            asignaturas=AsignaturaGradoAñoLectivo.objects.filter(id=asignatura_grado.id)
+        )
+        
         # Contexto para el template
         context = {
             'estudiantes_data': estudiantes_data,
             'grado_seleccionado': asignatura_grado.grado_año_lectivo.grado,
             'asignatura_seleccionada': asignatura_grado.asignatura,
-            'periodo_seleccionado': get_object_or_404(PeriodoAcademico, id=periodo_id)
+            'periodo_seleccionado': periodo_seleccionado,
+            'progreso': progreso[0] if progreso else None,
         }
         
         html = render_to_string(
@@ -190,28 +208,30 @@ def guardar_notas(request):
         estudiantes_actualizados = 0
         estudiantes_nuevos = 0
         
-        for key, value in request.POST.items():
-            if key.startswith('nota_'):
-                estudiante_id = key.replace('nota_', '')
-                calificacion = value.strip()
+        # Una sola transacción: los recálculos por signal se aplican una vez al final
+        with transaction.atomic():
+            for key, value in request.POST.items():
+                if key.startswith('nota_'):
+                    estudiante_id = key.replace('nota_', '')
+                    calificacion = value.strip()
                 
-                if calificacion:  # Solo procesar si hay calificación
-                    estudiante = get_object_or_404(Estudiante, id=estudiante_id)
+                    if calificacion:  # Solo procesar si hay calificación
+                        estudiante = get_object_or_404(Estudiante, id=estudiante_id)
                     
-                    nota, created = Nota.objects.update_or_create(
-                        estudiante=estudiante,
-                        asignatura_grado_año_lectivo=asignatura_grado,
-                        periodo_academico=periodo,
-                        defaults={
-                            'calificacion': calificacion,
-                            'observaciones': request.POST.get(f'observacion_{estudiante_id}', '').strip()
-                        }
-                    )
+                        nota, created = Nota.objects.update_or_create(
+                            estudiante=estudiante,
+                            asignatura_grado_año_lectivo=asignatura_grado,
+                            periodo_academico=periodo,
+                            defaults={
+                                'calificacion': calificacion,
+                                'observaciones': request.POST.get(f'observacion_{estudiante_id}', '').strip()
+                            }
+                        )
                     
-                    if created:
-                        estudiantes_nuevos += 1
-                    else:
-                        estudiantes_actualizados += 1
+                        if created:
+                            estudiantes_nuevos += 1
+                        else:
+                            estudiantes_actualizados += 1
         
         return JsonResponse({
             'success': True,
@@ -313,10 +333,9 @@ def obtener_estudiantes_por_grado(request):
     
     try:
         from estudiantes.models import Matricula
-        from gestioncolegio.models import AñoLectivo
         
         # Obtener año lectivo actual
-        año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_lectivo_actual = calendario.año_activo()
         if not año_lectivo_actual:
             return JsonResponse({'error': 'No hay año lectivo activo'}, status=400)
         
@@ -400,7 +419,7 @@ class AjaxObtenerAsignaturasPorGradoView(LoginRequiredMixin, DocenteRequiredMixi
     def get(self, request):
         grado_id = request.GET.get('grado_id')
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not grado_id or not año_actual or not docente:
             return JsonResponse({'asignaturas': [], 'error': 'Datos incompletos'})
@@ -429,7 +448,7 @@ class AjaxObtenerPeriodosView(LoginRequiredMixin, DocenteRequiredMixin, DocenteB
     """Vista AJAX para obtener periodos"""
     
     def get(self, request):
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not año_actual:
             return JsonResponse({'periodos': [], 'error': 'No hay año lectivo activo'})
@@ -582,8 +601,8 @@ def ajax_obtener_estudiantes_curso(request):
                 return JsonResponse({'success': False, 'error': 'Datos incompletos'})
             
             docente = get_object_or_404(Docente, usuario=request.user)
-            grado_año_lectivo = get_object_or_404(GradoAñoLectivo, id=curso_id)
-            periodo_academico = get_object_or_404(PeriodoAcademico, id=periodo_id)
+            grado_año_lectivo = get_object_or_404(GradoAñoLectivo.objects.select_related('grado', 'año_lectivo__sede'), id=curso_id)
+            periodo_academico = get_object_or_404(PeriodoAcademico.objects.select_related('periodo'), id=periodo_id)
             
             # Verificar que el docente tenga permiso
             if not AsignaturaGradoAñoLectivo.objects.filter(
@@ -592,105 +611,54 @@ def ajax_obtener_estudiantes_curso(request):
             ).exists():
                 return JsonResponse({'success': False, 'error': 'No tiene permiso para este curso'})
             
-            # Obtener estudiantes matriculados en este curso
-            estudiantes = Estudiante.objects.filter(
-                matriculas__grado_año_lectivo=grado_año_lectivo,
-                matriculas__estado__in=['ACT', 'PEN']
-            ).select_related('usuario').order_by('usuario__apellidos', 'usuario__nombres').distinct()
-            
-            # Obtener asistencias si se proporciona una fecha
-            asistencias_dict = {}
+            # Validar fecha (opcional) antes de consultar
+            fecha = None
             if fecha_str:
                 try:
                     fecha = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-                    
-                    # Verificar que la fecha esté dentro del periodo
-                    if not (periodo_academico.fecha_inicio <= fecha <= periodo_academico.fecha_fin):
-                        return JsonResponse({
-                            'success': False, 
-                            'error': f'La fecha debe estar entre {periodo_academico.fecha_inicio} y {periodo_academico.fecha_fin}'
-                        })
-                    
-                    asistencias = Asistencia.objects.filter(
-                        estudiante__in=estudiantes,
-                        periodo_academico=periodo_academico,
-                        fecha=fecha
-                    ).select_related('estudiante__usuario')
-                    
-                    asistencias_dict = {a.estudiante.id: {
-                        'estado': a.estado,
-                        'justificacion': a.justificacion,
-                        'id': a.id,
-                        'fecha': a.fecha.strftime('%Y-%m-%d')
-                    } for a in asistencias}
-                    
                 except ValueError:
                     return JsonResponse({'success': False, 'error': 'Formato de fecha inválido'})
-                except Exception as e:
-                    return JsonResponse({'success': False, 'error': str(e)})
-            
-            # Obtener estadísticas generales del curso para el periodo
-            total_asistencias_curso = Asistencia.objects.filter(
-                estudiante__in=estudiantes,
-                periodo_academico=periodo_academico,
-                estado='A'
-            ).count()
-            
-            total_faltas_curso = Asistencia.objects.filter(
-                estudiante__in=estudiantes,
-                periodo_academico=periodo_academico,
-                estado='F'
-            ).count()
+                
+                # Verificar que la fecha esté dentro del periodo
+                if not (periodo_academico.fecha_inicio <= fecha <= periodo_academico.fecha_fin):
+                    return JsonResponse({
+                        'success': False, 
+                        'error': f'La fecha debe estar entre {periodo_academico.fecha_inicio} y {periodo_academico.fecha_fin}'
+                    })
             
-            total_justificadas_curso = Asistencia.objects.filter(
-                estudiante__in=estudiantes,
-                periodo_academico=periodo_academico,
-                estado='J'
-            ).count()
+            # Roster, asistencia del día y conteos del periodo en consultas fijas
+            matriz = matriz_asistencia(grado_año_lectivo, periodo_academico, fecha, fecha, con_periodo=True)
             
-            total_registros_curso = total_asistencias_curso + total_faltas_curso + total_justificadas_curso
-            if total_registros_curso > 0:
-                porcentaje_curso = (total_asistencias_curso / total_registros_curso) * 100
-            else:
-                porcentaje_curso = 0
+            # Estadísticas generales del curso para el periodo
+            conteo_curso = {'A': 0, 'F': 0, 'J': 0}
+            for conteo in matriz['conteos_periodo'].values():
+                for estado in conteo_curso:
+                    conteo_curso[estado] += conteo[estado]
+            total_asistencias_curso = conteo_curso['A']
+            total_faltas_curso = conteo_curso['F']
+            total_justificadas_curso = conteo_curso['J']
+            porcentaje_curso = estadisticas_asistencia(conteo_curso)['porcentaje']
             
             # Preparar datos de estudiantes
             estudiantes_data = []
-            for estudiante in estudiantes:
-                # Calcular estadísticas individuales del periodo
-                asistencias_estudiante = Asistencia.objects.filter(
-                    estudiante=estudiante,
-                    periodo_academico=periodo_academico
-                )
-                
-                total_individual = asistencias_estudiante.count()
-                asistencias_individual = asistencias_estudiante.filter(estado='A').count()
-                faltas_individual = asistencias_estudiante.filter(estado='F').count()
-                justificadas_individual = asistencias_estudiante.filter(estado='J').count()
-                
-                if total_individual > 0:
-                    porcentaje_individual = (asistencias_individual / total_individual) * 100
-                else:
-                    porcentaje_individual = 0
-                
+            for estudiante in matriz['estudiantes']:
                 estudiante_data = {
                     'id': estudiante.id,
                     'nombre_completo': estudiante.usuario.get_full_name(),
                     'numero_documento': estudiante.usuario.numero_documento,
-                    'foto_url': estudiante.foto.url if estudiante.foto else '',
-                    'estadisticas': {
-                        'total': total_individual,
-                        'asistencias': asistencias_individual,
-                        'faltas': faltas_individual,
-                        'justificadas': justificadas_individual,
-                        'porcentaje': round(porcentaje_individual, 1)
-                    }
+                    'foto_url': imagenes.url(estudiante.foto, 'thumb'),
+                    'estadisticas': estadisticas_asistencia(matriz['conteos_periodo'][estudiante.id])
                 }
                 
                 # Agregar información de asistencia para la fecha específica
-                if fecha_str and estudiante.id in asistencias_dict:
-                    asistencia = asistencias_dict[estudiante.id]
-                    estudiante_data['asistencia'] = asistencia
+                registro = matriz['registros'].get((estudiante.id, fecha)) if fecha else None
+                if registro:
+                    estudiante_data['asistencia'] = {
+                        'estado': registro['estado'],
+                        'justificacion': registro['justificacion'],
+                        'id': registro['id'],
+                        'fecha': fecha_str
+                    }
                 
                 estudiantes_data.append(estudiante_data)
             
@@ -767,60 +735,42 @@ def ajax_obtener_asistencia_dia(request):
                     'error': f'La fecha debe estar entre {periodo_academico.fecha_inicio} y {periodo_academico.fecha_fin}'
                 })
             
-            # Obtener estudiantes del curso
-            estudiantes = Estudiante.objects.filter(
-                matriculas__grado_año_lectivo=grado_año_lectivo,
-                matriculas__estado__in=['ACT', 'PEN']
-            ).select_related('usuario').distinct()
-            
-            # Obtener asistencias del día
-            asistencias = Asistencia.objects.filter(
-                estudiante__in=estudiantes,
-                periodo_academico=periodo_academico,
-                fecha=fecha
-            ).select_related('estudiante__usuario')
+            # Roster y asistencia del día (consultas fijas)
+            matriz = matriz_asistencia(grado_año_lectivo, periodo_academico, fecha, fecha)
+            estudiantes = matriz['estudiantes']
             
             # Organizar datos
             asistencias_data = []
-            for asistencia in asistencias:
-                asistencias_data.append({
-                    'estudiante_id': asistencia.estudiante.id,
-                    'estudiante_nombre': asistencia.estudiante.usuario.get_full_name(),
-                    'estudiante_documento': asistencia.estudiante.usuario.numero_documento,
-                    'estado': asistencia.estado,
-                    'justificacion': asistencia.justificacion,
-                    'fecha': asistencia.fecha.strftime('%Y-%m-%d'),
-                    'id': asistencia.id,
-                    'hora_registro': asistencia.created_at.strftime('%H:%M') if asistencia.created_at else None
-                })
-            
-            # Crear lista completa de estudiantes con su estado
             estudiantes_completos = []
             for estudiante in estudiantes:
-                asistencia_estudiante = asistencias.filter(estudiante=estudiante).first()
-                if asistencia_estudiante:
-                    estado = asistencia_estudiante.estado
-                    justificacion = asistencia_estudiante.justificacion
-                    asistencia_id = asistencia_estudiante.id
-                else:
-                    estado = None
-                    justificacion = ''
-                    asistencia_id = None
+                registro = matriz['registros'].get((estudiante.id, fecha))
+                if registro:
+                    asistencias_data.append({
+                        'estudiante_id': estudiante.id,
+                        'estudiante_nombre': estudiante.usuario.get_full_name(),
+                        'estudiante_documento': estudiante.usuario.numero_documento,
+                        'estado': registro['estado'],
+                        'justificacion': registro['justificacion'],
+                        'fecha': fecha_str,
+                        'id': registro['id'],
+                        'hora_registro': registro['created_at'].strftime('%H:%M') if registro['created_at'] else None
+                    })
                 
                 estudiantes_completos.append({
                     'estudiante_id': estudiante.id,
                     'estudiante_nombre': estudiante.usuario.get_full_name(),
                     'estudiante_documento': estudiante.usuario.numero_documento,
-                    'estado': estado,
-                    'justificacion': justificacion,
-                    'asistencia_id': asistencia_id
+                    'estado': registro['estado'] if registro else None,
+                    'justificacion': registro['justificacion'] if registro else '',
+                    'asistencia_id': registro['id'] if registro else None
                 })
             
             # Estadísticas
-            total_estudiantes = estudiantes.count()
-            asistencias_count = asistencias.filter(estado='A').count()
-            faltas_count = asistencias.filter(estado='F').count()
-            justificadas_count = asistencias.filter(estado='J').count()
+            conteo_dia = matriz['conteos_dia'][fecha]
+            total_estudiantes = len(estudiantes)
+            asistencias_count = conteo_dia['A']
+            faltas_count = conteo_dia['F']
+            justificadas_count = conteo_dia['J']
             sin_registro = total_estudiantes - (asistencias_count + faltas_count + justificadas_count)
             
             # Calcular porcentajes
@@ -893,7 +843,7 @@ def ajax_obtener_dias_semana(request):
                 })
             
             # Obtener información de periodos académicos activos
-            año_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_actual = calendario.año_activo()
             periodos_semana = []
             if año_actual:
                 periodos_semana = PeriodoAcademico.objects.filter(
@@ -936,7 +886,7 @@ def ajax_obtener_cursos_docente(request):
     if request.method == 'GET':
         try:
             docente = get_object_or_404(Docente, usuario=request.user)
-            año_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_actual = calendario.año_activo()
             
             if not año_actual:
                 return JsonResponse({'success': False, 'error': 'No hay año lectivo activo'})
@@ -13,7 +13,9 @@ from estudiantes.models import Estudiante, Matricula
 from comportamiento.models import Asistencia
 from academico.models import Grado, Asignatura, Periodo
 from matricula.models import PeriodoAcademico, AsignaturaGradoAñoLectivo, GradoAñoLectivo
-from gestioncolegio.models import AñoLectivo, Sede
+from gestioncolegio.models import Sede
+from gestioncolegio.services import calendario, estadisticas_asistencia, matriz_asistencia, resumen_estudiante
+from gestioncolegio.services.sincronizacion_asistencia import ErrorSincronizacion, sincronizar
 
 @login_required
 def asistencia_principal(request):
@@ -21,7 +23,7 @@ def asistencia_principal(request):
     docente = get_object_or_404(Docente, usuario=request.user)
     
     # Obtener año lectivo actual
-    año_actual = AñoLectivo.objects.filter(estado=True).first()
+    año_actual = calendario.año_activo()
     
     # Obtener cursos del docente en el año actual
     cursos = []
@@ -117,12 +119,6 @@ def asistencia_calendario(request, curso_id, periodo_id):
         messages.error(request, 'No tiene permiso para ver la asistencia de este curso.')
         return redirect('docentes:asistencia_principal')
     
-    # Obtener estudiantes matriculados en este curso
-    estudiantes = Estudiante.objects.filter(
-        matriculas__grado_año_lectivo=grado_año_lectivo,
-        matriculas__estado__in=['ACT', 'PEN']
-    ).select_related('usuario').distinct()
-    
     # Obtener el mes y año actual
     hoy = timezone.now().date()
     mes = request.GET.get('mes', hoy.month)
@@ -166,49 +162,31 @@ def asistencia_calendario(request, curso_id, periodo_id):
     else:
         ultima_fecha = date(año, mes + 1, 1) - timedelta(days=1)
     
-    # Obtener asistencias del mes
-    asistencias = Asistencia.objects.filter(
-        estudiante__in=estudiantes,
-        periodo_academico=periodo_academico,
-        fecha__range=[primera_fecha, ultima_fecha]
-    ).select_related('estudiante__usuario')
+    # Roster y asistencias del mes (consultas fijas, sin importar el tamaño del curso)
+    matriz = matriz_asistencia(grado_año_lectivo, periodo_academico, primera_fecha, ultima_fecha)
     
     # Organizar asistencias por día y tipo
-    asistencias_por_dia = {}
-    for asistencia in asistencias:
-        key = f"{asistencia.estudiante.id}_{asistencia.fecha.strftime('%Y-%m-%d')}"
-        if key not in asistencias_por_dia:
-            asistencias_por_dia[key] = asistencia.estado
+    asistencias_por_dia = {
+        f"{estudiante_id}_{fecha.strftime('%Y-%m-%d')}": registro['estado']
+        for (estudiante_id, fecha), registro in matriz['registros'].items()
+    }
     
     # Agrupar conteos por día (para mostrar en el calendario)
-    conteos_por_dia = {}
-    for fecha in asistencias.values_list('fecha', 'estado'):
-        fecha_str = fecha[0].strftime('%Y-%m-%d')
-        if fecha_str not in conteos_por_dia:
-            conteos_por_dia[fecha_str] = {'A': 0, 'F': 0, 'J': 0}
-        conteos_por_dia[fecha_str][fecha[1]] += 1
+    conteos_por_dia = {
+        fecha.strftime('%Y-%m-%d'): conteo
+        for fecha, conteo in matriz['conteos_dia'].items()
+    }
     
     # Calcular estadísticas por estudiante para el mes
     estudiantes_con_estadisticas = []
-    for estudiante in estudiantes:
-        # Filtrar asistencias del estudiante en el mes
-        asistencias_estudiante = asistencias.filter(estudiante=estudiante)
-        asistencias_count = asistencias_estudiante.filter(estado='A').count()
-        faltas_count = asistencias_estudiante.filter(estado='F').count()
-        justificadas_count = asistencias_estudiante.filter(estado='J').count()
-        total_registros = asistencias_count + faltas_count + justificadas_count
-        
-        if total_registros > 0:
-            porcentaje = (asistencias_count / total_registros) * 100
-        else:
-            porcentaje = 0
-        
+    for estudiante in matriz['estudiantes']:
+        conteo = matriz['conteos_rango'][estudiante.id]
         estudiantes_con_estadisticas.append({
             'estudiante': estudiante,
-            'asistencias_count': asistencias_count,
-            'faltas_count': faltas_count,
-            'justificadas_count': justificadas_count,
-            'porcentaje': round(porcentaje, 1)
+            'asistencias_count': conteo['A'],
+            'faltas_count': conteo['F'],
+            'justificadas_count': conteo['J'],
+            'porcentaje': estadisticas_asistencia(conteo)['porcentaje']
         })
     
     # Calcular días hábiles del mes (lunes a viernes)
@@ -455,6 +433,56 @@ def registrar_asistencia_masiva(request):
     
     return JsonResponse({'success': False, 'error': 'Método no permitido'})
 
+@login_required
+def sincronizar_asistencia(request):
+    """
+    Sincroniza un lote de asistencias capturadas sin conexión.
+    
+    Espera JSON: {curso_id, periodo_id, sync_token, operaciones: [{clave,
+    estudiante_id, fecha, estado, justificacion, timestamp}]} y responde con
+    el resultado de cada operación, los cambios del curso desde sync_token y
+    el token para la próxima sincronización.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+    
+    try:
+        data = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({'success': False, 'error': 'Error en el formato de datos JSON'}, status=400)
+    
+    curso_id = data.get('curso_id')
+    periodo_id = data.get('periodo_id')
+    if not curso_id or not periodo_id:
+        return JsonResponse({'success': False, 'error': 'Datos incompletos'}, status=400)
+    
+    grado_año_lectivo = get_object_or_404(GradoAñoLectivo, id=curso_id)
+    periodo_academico = get_object_or_404(PeriodoAcademico, id=periodo_id)
+    
+    # Verificar que el docente tenga permiso
+    docente = get_object_or_404(Docente, usuario=request.user)
+    if not AsignaturaGradoAñoLectivo.objects.filter(
+        docente=docente,
+        grado_año_lectivo=grado_año_lectivo
+    ).exists():
+        return JsonResponse({'success': False, 'error': 'No tiene permiso para este curso'}, status=403)
+    
+    try:
+        resultado = sincronizar(
+            request.user,
+            grado_año_lectivo,
+            periodo_academico,
+            data.get('operaciones', []),
+            data.get('sync_token')
+        )
+    except ErrorSincronizacion as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        print(f"Error sincronizando asistencia: {str(e)}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    
+    return JsonResponse({'success': True, **resultado})
+
 @login_required
 def justificar_asistencia(request):
     """Justificar una asistencia específica"""
@@ -507,7 +535,7 @@ def asistencia_historico(request, estudiante_id):
     docente = get_object_or_404(Docente, usuario=request.user)
     
     # Verificar que el estudiante esté en algún curso del docente en el año actual
-    año_actual = AñoLectivo.objects.filter(estado=True).first()
+    año_actual = calendario.año_activo()
     
     if año_actual:
         # Obtener cursos del docente en el año actual
@@ -530,12 +558,7 @@ def asistencia_historico(request, estudiante_id):
     
     if matricula_actual and año_actual:
         # Obtener periodo académico actual
-        periodo_actual = PeriodoAcademico.objects.filter(
-            año_lectivo=año_actual,
-            estado=True,
-            fecha_inicio__lte=timezone.now().date(),
-            fecha_fin__gte=timezone.now().date()
-        ).first()
+        periodo_actual = calendario.periodo_en_fecha(año_actual, timezone.now().date(), solo_activos=True)
     
     # Obtener todos los periodos académicos del estudiante
     periodos_estudiante = PeriodoAcademico.objects.filter(
@@ -557,36 +580,33 @@ def asistencia_historico(request, estudiante_id):
             estudiante=estudiante
         ).select_related('periodo_academico__año_lectivo', 'periodo_academico__periodo').order_by('-fecha')
     
-    # Estadísticas generales
-    total_asistencias = asistencias.count()
-    asistencias_count = asistencias.filter(estado='A').count()
-    faltas_count = asistencias.filter(estado='F').count()
-    justificadas_count = asistencias.filter(estado='J').count()
-    
+    # Estadísticas desde el resumen materializado por período
+    resumenes = resumen_estudiante(estudiante)
+    if periodo_filtrado:
+        resumenes = {k: v for k, v in resumenes.items() if k == periodo_filtrado.id}
+
+    total_asistencias = sum(r['total'] for r in resumenes.values())
+    asistencias_count = sum(r['asistencias'] for r in resumenes.values())
+    faltas_count = sum(r['faltas'] for r in resumenes.values())
+    justificadas_count = sum(r['justificadas'] for r in resumenes.values())
+
     if total_asistencias > 0:
         porcentaje_asistencia = (asistencias_count / total_asistencias) * 100
     else:
         porcentaje_asistencia = 0
-    
+
     # Estadísticas por periodo
     estadisticas_periodo = []
     for periodo in periodos_estudiante:
-        asistencias_periodo = Asistencia.objects.filter(
-            estudiante=estudiante,
-            periodo_academico=periodo
-        )
-        total_periodo = asistencias_periodo.count()
-        if total_periodo > 0:
-            asist_periodo = asistencias_periodo.filter(estado='A').count()
-            porcentaje_periodo = (asist_periodo / total_periodo) * 100
-            
+        resumen = resumenes.get(periodo.id)
+        if resumen and resumen['total'] > 0:
             estadisticas_periodo.append({
                 'periodo': periodo,
-                'total': total_periodo,
-                'asistencias': asist_periodo,
-                'faltas': asistencias_periodo.filter(estado='F').count(),
-                'justificadas': asistencias_periodo.filter(estado='J').count(),
-                'porcentaje': round(porcentaje_periodo, 1)
+                'total': resumen['total'],
+                'asistencias': resumen['asistencias'],
+                'faltas': resumen['faltas'],
+                'justificadas': resumen['justificadas'],
+                'porcentaje': resumen['porcentaje']
             })
     
     context = {
@@ -622,12 +642,6 @@ def reporte_asistencia_curso(request, curso_id, periodo_id):
         messages.error(request, 'No tiene permiso para ver este reporte.')
         return redirect('docentes:asistencia_principal')
     
-    # Obtener estudiantes del curso
-    estudiantes = Estudiante.objects.filter(
-        matriculas__grado_año_lectivo=grado_año_lectivo,
-        matriculas__estado__in=['ACT', 'PEN']
-    ).select_related('usuario').distinct().order_by('usuario__apellidos', 'usuario__nombres')
-    
     # Obtener todas las fechas del periodo
     fecha_inicio = periodo_academico.fecha_inicio
     fecha_fin = periodo_academico.fecha_fin
@@ -640,12 +654,9 @@ def reporte_asistencia_curso(request, curso_id, periodo_id):
             dias_habiles.append(fecha_actual)
         fecha_actual += timedelta(days=1)
     
-    # Obtener asistencias del periodo
-    asistencias = Asistencia.objects.filter(
-        estudiante__in=estudiantes,
-        periodo_academico=periodo_academico,
-        fecha__range=[fecha_inicio, fecha_fin]
-    ).select_related('estudiante__usuario')
+    # Roster, detalle diario y conteos del periodo desde la matriz compartida
+    matriz = matriz_asistencia(grado_año_lectivo, periodo_academico, fecha_inicio, fecha_fin, con_periodo=True)
+    estudiantes = matriz['estudiantes']
     
     # Organizar datos para el reporte
     reporte_data = []
@@ -654,42 +665,26 @@ def reporte_asistencia_curso(request, curso_id, periodo_id):
     total_justificadas_general = 0
     
     for estudiante in estudiantes:
-        estudiante_asistencias = asistencias.filter(estudiante=estudiante)
-        
-        # Contar por tipo
-        asistencias_count = estudiante_asistencias.filter(estado='A').count()
-        faltas_count = estudiante_asistencias.filter(estado='F').count()
-        justificadas_count = estudiante_asistencias.filter(estado='J').count()
-        
-        total_registros = asistencias_count + faltas_count + justificadas_count
+        resumen = estadisticas_asistencia(matriz['conteos_periodo'][estudiante.id], 2)
         
         # Sumar al total general
-        total_asistencias_general += asistencias_count
-        total_faltas_general += faltas_count
-        total_justificadas_general += justificadas_count
-        
-        # Calcular porcentaje
-        if total_registros > 0:
-            porcentaje = (asistencias_count / total_registros) * 100
-        else:
-            porcentaje = 0
+        total_asistencias_general += resumen['asistencias']
+        total_faltas_general += resumen['faltas']
+        total_justificadas_general += resumen['justificadas']
         
         # Obtener detalle por día
         detalle_dias = {}
         for dia in dias_habiles:
-            asistencia_dia = estudiante_asistencias.filter(fecha=dia).first()
-            if asistencia_dia:
-                detalle_dias[dia] = asistencia_dia.estado
-            else:
-                detalle_dias[dia] = '-'
+            registro = matriz['registros'].get((estudiante.id, dia))
+            detalle_dias[dia] = registro['estado'] if registro else '-'
         
         reporte_data.append({
             'estudiante': estudiante,
-            'asistencias': asistencias_count,
-            'faltas': faltas_count,
-            'justificadas': justificadas_count,
-            'total': total_registros,
-            'porcentaje': round(porcentaje, 2),
+            'asistencias': resumen['asistencias'],
+            'faltas': resumen['faltas'],
+            'justificadas': resumen['justificadas'],
+            'total': resumen['total'],
+            'porcentaje': resumen['porcentaje'],
             'detalle_dias': detalle_dias
         })
     
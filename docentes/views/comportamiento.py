@@ -12,7 +12,7 @@ from django.utils import timezone
 
 from comportamiento.models import Comportamiento, Asistencia
 from estudiantes.models import Estudiante, Matricula
-from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services import calendario
 from matricula.models import AsignaturaGradoAñoLectivo, PeriodoAcademico
 from usuarios.models import Docente
 from docentes.mixins import DocenteRequiredMixin
@@ -87,7 +87,7 @@ class ListaComportamientosView(LoginRequiredMixin, DocenteRequiredMixin, ListVie
     
     def _get_estudiantes_docente(self, docente):
         """Obtener estudiantes de los grados asignados al docente"""
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if not año_actual:
             return Estudiante.objects.none()
         
@@ -112,7 +112,7 @@ class ListaComportamientosView(LoginRequiredMixin, DocenteRequiredMixin, ListVie
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not docente or not año_actual:
             context['periodos'] = PeriodoAcademico.objects.none()
@@ -175,7 +175,7 @@ class CrearComportamientoView(LoginRequiredMixin, DocenteRequiredMixin, CreateVi
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not año_actual or not docente:
             messages.error(self.request, 'No hay un año lectivo activo o no tiene perfil de docente.')
@@ -258,7 +258,7 @@ class DetalleComportamientoView(LoginRequiredMixin, DocenteRequiredMixin, Detail
     
     def _get_estudiantes_docente(self, docente):
         """Obtener estudiantes de los grados asignados al docente"""
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if not año_actual:
             return Estudiante.objects.none()
         
@@ -296,7 +296,7 @@ class EditarComportamientoView(LoginRequiredMixin, DocenteRequiredMixin, UpdateV
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not año_actual or not docente:
             messages.error(self.request, 'No hay un año lectivo activo o no tiene perfil de docente.')
@@ -349,7 +349,7 @@ class EditarComportamientoView(LoginRequiredMixin, DocenteRequiredMixin, UpdateV
         if not docente:
             return Comportamiento.objects.none()
         
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if not año_actual:
             return Comportamiento.objects.none()
         
@@ -13,6 +13,7 @@ logger = logging.getLogger(__name__)
 
 # Mixins
 from gestioncolegio.mixins import DocenteAccessMixin
+from gestioncolegio.services import calendario
 
 # Forms & Models
 from docentes.forms import LogroForm, ComportamientoForm, NotaForm
@@ -166,8 +167,6 @@ def verificar_permiso_logro(docente, logro):
     según la estructura del proyecto colegio_app
     """
     try:
-        from gestioncolegio.models import AñoLectivo
-        
         # Obtener año lectivo del logro
         año_lectivo_logro = logro.periodo_academico.año_lectivo
         
@@ -182,7 +181,7 @@ def verificar_permiso_logro(docente, logro):
         
         # Si no tiene permiso para ese año, verificar si tiene asignación actual
         if not tiene_permiso:
-            año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_lectivo_actual = calendario.año_activo()
             if año_lectivo_actual:
                 # Verificar si el docente enseña esa asignatura actualmente
                 tiene_permiso = AsignaturaGradoAñoLectivo.objects.filter(
@@ -214,7 +213,6 @@ def tiene_permiso_logro(docente, logro):
     try:
         # Verificar si el docente enseña la asignatura y grado del logro
         from matricula.models import AsignaturaGradoAñoLectivo
-        from gestioncolegio.models import AñoLectivo
         
         # Obtener año lectivo del logro
         año_lectivo_logro = logro.periodo_academico.año_lectivo
@@ -232,7 +230,7 @@ def tiene_permiso_logro(docente, logro):
             return True
         
         # Si no hay asignación en ese año, verificar en el año actual
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if año_actual:
             asignacion_actual = AsignaturaGradoAñoLectivo.objects.filter(
                 docente=docente,
@@ -4,18 +4,24 @@ from django.views.generic import ListView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import HttpResponse
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, Q
+from itertools import groupby
+from operator import itemgetter
 import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
 from estudiantes.models import Estudiante, Matricula, Acudiente
-from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services import calendario, precargar_estudiantes
 from matricula.models import AsignaturaGradoAñoLectivo
-from usuarios.models import Docente
+from usuarios.models import Docente, Usuario
 from docentes.mixins import DocenteRequiredMixin
 from .comportamiento import get_docente_usuario
 
+SEXOS = dict(Usuario.SEXO_CHOICES)
+ESTADOS_MATRICULA = dict(Matricula.ESTADOS_MATRICULA)
+
 class ListaEstudiantesView(LoginRequiredMixin, DocenteRequiredMixin, ListView):
     """Vista para listar estudiantes a cargo del docente"""
     model = Estudiante
@@ -31,7 +37,7 @@ class ListaEstudiantesView(LoginRequiredMixin, DocenteRequiredMixin, ListView):
         if not docente:
             return Estudiante.objects.none()
         
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if not año_actual:
             return Estudiante.objects.none()
         
@@ -76,7 +82,7 @@ class ListaEstudiantesView(LoginRequiredMixin, DocenteRequiredMixin, ListView):
     
     def get_grados_docente(self, docente):
         """Obtener grados asignados al docente"""
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if not año_actual:
             return []
         
@@ -92,7 +98,7 @@ class ListaEstudiantesView(LoginRequiredMixin, DocenteRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not docente or not año_actual:
             context['grados'] = []
@@ -109,205 +115,236 @@ class ListaEstudiantesView(LoginRequiredMixin, DocenteRequiredMixin, ListView):
         estudiantes = self.get_queryset()
         context['total_estudiantes'] = estudiantes.count()
         
-        # Obtener distribución por grado
-        distribucion_grados = {}
-        for estudiante in estudiantes:
-            matricula_actual = estudiante.matricula_actual
-            if matricula_actual and matricula_actual.grado_año_lectivo:
-                grado_nombre = matricula_actual.grado_año_lectivo.grado.nombre
-                distribucion_grados[grado_nombre] = distribucion_grados.get(grado_nombre, 0) + 1
+        # Obtener distribución por grado (una consulta agregada)
+        context['distribucion_grados'] = dict(
+            Matricula.objects.filter(
+                estudiante_id__in=estudiantes.values('id'),
+                año_lectivo=año_actual,
+                estado__in=['ACT', 'PEN']
+            ).values_list('grado_año_lectivo__grado__nombre').annotate(
+                total=Count('id')
+            ).order_by()
+        )
         
-        context['distribucion_grados'] = distribucion_grados
+        # Matrícula actual de la página en lote (la plantilla la usa por fila)
+        context['estudiantes'] = context['object_list'] = precargar_estudiantes(context['estudiantes'])
         
         return context
 
 
 class ExportarEstudiantesExcelView(LoginRequiredMixin, DocenteRequiredMixin, TemplateView):
-    """Vista para exportar estudiantes a Excel"""
-    
+    """
+    Vista para exportar estudiantes a Excel
+
+    Usa un libro en modo write_only (las filas se escriben a disco a medida
+    que se generan) con estilos con nombre registrados una sola vez, y lee
+    los datos con una única consulta .iterator() sobre Matricula unida a los
+    acudientes; las filas de un mismo estudiante llegan consecutivas y se
+    agrupan al vuelo, así la memoria no crece con el tamaño del curso.
+    """
+
+    ESTILO_ENCABEZADO = 'exp_encabezado'
+    ESTILO_ETIQUETA = 'exp_etiqueta'
+
+    # Columnas numéricas o cortas (índices desde 1)
+    COLUMNAS_CENTRADAS = {1, 2, 6, 7, 12, 13, 15, 16, 18}
+
+    HEADERS = [
+        'N°', 'Documento', 'Nombres', 'Apellidos', 'Fecha Nacimiento',
+        'Edad', 'Sexo', 'Grado', 'Email', 'Teléfono', 'Dirección',
+        'Acudiente 1', 'Teléfono Acudiente 1', 'Parentesco 1',
+        'Acudiente 2', 'Teléfono Acudiente 2', 'Parentesco 2',
+        'Estado Matrícula'
+    ]
+
+    COLUMN_WIDTHS = [5, 15, 20, 20, 15, 8, 10, 15, 25, 15, 30, 25, 15, 15, 25, 15, 15, 15]
+
+    CAMPOS = (
+        'id',
+        'estado',
+        'estudiante__usuario__numero_documento',
+        'estudiante__usuario__nombres',
+        'estudiante__usuario__apellidos',
+        'estudiante__usuario__fecha_nacimiento',
+        'estudiante__usuario__sexo',
+        'estudiante__usuario__email',
+        'estudiante__usuario__telefono',
+        'estudiante__usuario__direccion',
+        'grado_año_lectivo__grado__nombre',
+        'estudiante__acudientes__parentesco',
+        'estudiante__acudientes__acudiente__nombres',
+        'estudiante__acudientes__acudiente__apellidos',
+        'estudiante__acudientes__acudiente__telefono',
+    )
+
     def get_docente(self):
         return get_docente_usuario(self.request.user)
-    
-    def get(self, request, *args, **kwargs):
-        docente = self.get_docente()
-        if not docente:
-            return HttpResponse("No tiene permisos", status=403)
-        
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
-        if not año_actual:
-            return HttpResponse("No hay año lectivo activo", status=400)
-        
-        # Obtener parámetros de filtro
-        grado_id = request.GET.get('grado')
-        
+
+    def registrar_estilos(self, wb):
+        """Registra los estilos con nombre del libro (una vez por exportación)"""
+        thin = Side(style='thin')
+        borde = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+        encabezado = NamedStyle(name=self.ESTILO_ENCABEZADO)
+        encabezado.font = Font(bold=True, color="FFFFFF")
+        encabezado.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        encabezado.alignment = Alignment(horizontal="center", vertical="center")
+        encabezado.border = borde
+        wb.add_named_style(encabezado)
+
+        etiqueta = NamedStyle(name=self.ESTILO_ETIQUETA)
+        etiqueta.font = Font(bold=True)
+        wb.add_named_style(etiqueta)
+
+        # Filas alternas × alineación
+        for paridad, color in (('par', 'F2F2F2'), ('impar', 'FFFFFF')):
+            for alineacion in ('center', 'left'):
+                estilo = NamedStyle(name=self.nombre_estilo(paridad, alineacion))
+                estilo.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+                estilo.alignment = Alignment(horizontal=alineacion)
+                estilo.border = borde
+                wb.add_named_style(estilo)
+
+    @staticmethod
+    def nombre_estilo(paridad, alineacion):
+        return f'exp_{paridad}_{alineacion}'
+
+    def celda(self, ws, valor, estilo):
+        cell = WriteOnlyCell(ws, value=valor)
+        cell.style = estilo
+        return cell
+
+    def get_queryset(self, docente, año_actual, grado_id=None):
         # Obtener grados asignados al docente
         grados_docente = AsignaturaGradoAñoLectivo.objects.filter(
             docente=docente,
             grado_año_lectivo__año_lectivo=año_actual
         ).values_list('grado_año_lectivo__grado_id', flat=True).distinct()
-        
-        # Filtrar estudiantes
-        estudiantes = Estudiante.objects.filter(
-            matriculas__grado_año_lectivo__grado_id__in=grados_docente,
-            matriculas__año_lectivo=año_actual,
-            matriculas__estado__in=['ACT', 'PEN']
-        ).select_related(
-            'usuario'
-        ).prefetch_related(
-            'acudientes__acudiente'
-        ).distinct()
-        
+
+        # Una matrícula por estudiante y año; el LEFT JOIN a acudientes
+        # produce una fila por acudiente (o una sola si no tiene)
+        matriculas = Matricula.objects.filter(
+            año_lectivo=año_actual,
+            grado_año_lectivo__grado_id__in=grados_docente,
+            estado__in=['ACT', 'PEN']
+        )
+
         if grado_id:
-            estudiantes = estudiantes.filter(
-                matriculas__grado_año_lectivo__grado_id=grado_id
+            matriculas = matriculas.filter(grado_año_lectivo__grado_id=grado_id)
+
+        return matriculas.order_by(
+            'estudiante__usuario__apellidos',
+            'estudiante__usuario__nombres',
+            'id',
+            'estudiante__acudientes__id',
+        ).values(*self.CAMPOS)
+
+    def iterar_estudiantes(self, queryset):
+        """Agrupa las filas consecutivas de cada matrícula (estudiante + acudientes)"""
+        for _, filas in groupby(queryset.iterator(chunk_size=2000), key=itemgetter('id')):
+            filas = list(filas)
+            acudientes = [
+                fila for fila in filas
+                if fila['estudiante__acudientes__acudiente__nombres'] is not None
+            ]
+            yield filas[0], acudientes[:2]
+
+    def fila_estudiante(self, idx, datos, acudientes, hoy):
+        fecha_nacimiento = datos['estudiante__usuario__fecha_nacimiento']
+
+        # Calcular edad
+        edad = None
+        if fecha_nacimiento:
+            edad = hoy.year - fecha_nacimiento.year - (
+                (hoy.month, hoy.day) < (fecha_nacimiento.month, fecha_nacimiento.day)
             )
-        
-        estudiantes = estudiantes.order_by('usuario__apellidos', 'usuario__nombres')
-        
-        # Crear libro de Excel
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Estudiantes"
-        
-        # Estilos
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center")
-        
-        cell_fill_even = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
-        cell_fill_odd = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-        
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Encabezados
-        headers = [
-            'N°', 'Documento', 'Nombres', 'Apellidos', 'Fecha Nacimiento', 
-            'Edad', 'Sexo', 'Grado', 'Email', 'Teléfono', 'Dirección',
-            'Acudiente 1', 'Teléfono Acudiente 1', 'Parentesco 1',
-            'Acudiente 2', 'Teléfono Acudiente 2', 'Parentesco 2',
-            'Estado Matrícula'
+
+        columnas_acudientes = []
+        for i in range(2):
+            if i < len(acudientes):
+                acudiente = acudientes[i]
+                columnas_acudientes += [
+                    f"{acudiente['estudiante__acudientes__acudiente__nombres']} "
+                    f"{acudiente['estudiante__acudientes__acudiente__apellidos']}",
+                    acudiente['estudiante__acudientes__acudiente__telefono'] or '',
+                    acudiente['estudiante__acudientes__parentesco'] or '',
+                ]
+            else:
+                columnas_acudientes += ['', '', '']
+
+        return [
+            idx,  # N°
+            datos['estudiante__usuario__numero_documento'] or '',
+            datos['estudiante__usuario__nombres'] or '',
+            datos['estudiante__usuario__apellidos'] or '',
+            fecha_nacimiento.strftime('%d/%m/%Y') if fecha_nacimiento else '',
+            edad or '',
+            SEXOS.get(datos['estudiante__usuario__sexo'], ''),
+            datos['grado_año_lectivo__grado__nombre'] or '',
+            datos['estudiante__usuario__email'] or '',
+            datos['estudiante__usuario__telefono'] or '',
+            datos['estudiante__usuario__direccion'] or '',
+            *columnas_acudientes,
+            ESTADOS_MATRICULA.get(datos['estado'], ''),
         ]
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = thin_border
-        
+
+    def get(self, request, *args, **kwargs):
+        docente = self.get_docente()
+        if not docente:
+            return HttpResponse("No tiene permisos", status=403)
+
+        año_actual = calendario.año_activo()
+        if not año_actual:
+            return HttpResponse("No hay año lectivo activo", status=400)
+
+        matriculas = self.get_queryset(docente, año_actual, request.GET.get('grado'))
+
+        # Crear libro de Excel en modo streaming
+        wb = openpyxl.Workbook(write_only=True)
+        self.registrar_estilos(wb)
+        ws = wb.create_sheet("Estudiantes")
+
+        # En write_only los anchos deben definirse antes de escribir filas
+        for col_num, width in enumerate(self.COLUMN_WIDTHS, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = width
+
+        # Encabezados
+        ws.append([self.celda(ws, header, self.ESTILO_ENCABEZADO) for header in self.HEADERS])
+
         # Datos
-        row_num = 2
-        for idx, estudiante in enumerate(estudiantes, 1):
-            usuario = estudiante.usuario
-            matricula_actual = estudiante.matricula_actual
-            
-            # Obtener acudientes
-            acudientes = estudiante.acudientes.all()
-            acudiente1 = acudientes[0] if acudientes else None
-            acudiente2 = acudientes[1] if len(acudientes) > 1 else None
-            
-            # Calcular edad
-            edad = None
-            if usuario.fecha_nacimiento:
-                today = timezone.now().date()
-                edad = today.year - usuario.fecha_nacimiento.year - (
-                    (today.month, today.day) < (usuario.fecha_nacimiento.month, usuario.fecha_nacimiento.day)
+        hoy = timezone.now().date()
+        total = 0
+        for idx, (datos, acudientes) in enumerate(self.iterar_estudiantes(matriculas), 1):
+            paridad = 'par' if (idx + 1) % 2 == 0 else 'impar'
+            ws.append([
+                self.celda(
+                    ws, valor,
+                    self.nombre_estilo(paridad, 'center' if col_num in self.COLUMNAS_CENTRADAS else 'left')
                 )
-            
-            # Preparar datos
-            data = [
-                idx,  # N°
-                usuario.numero_documento or '',
-                usuario.nombres or '',
-                usuario.apellidos or '',
-                usuario.fecha_nacimiento.strftime('%d/%m/%Y') if usuario.fecha_nacimiento else '',
-                edad or '',
-                usuario.get_sexo_display() if usuario.sexo else '',
-                matricula_actual.grado_año_lectivo.grado.nombre if matricula_actual else '',
-                usuario.email or '',
-                usuario.telefono or '',
-                usuario.direccion or '',
-                acudiente1.acudiente.get_full_name() if acudiente1 else '',
-                acudiente1.acudiente.telefono if acudiente1 and hasattr(acudiente1.acudiente, 'telefono') else '',
-                acudiente1.parentesco if acudiente1 else '',
-                acudiente2.acudiente.get_full_name() if acudiente2 else '',
-                acudiente2.acudiente.telefono if acudiente2 and hasattr(acudiente2.acudiente, 'telefono') else '',
-                acudiente2.parentesco if acudiente2 else '',
-                matricula_actual.get_estado_display() if matricula_actual else ''
-            ]
-            
-            # Escribir fila
-            for col_num, value in enumerate(data, 1):
-                cell = ws.cell(row=row_num, column=col_num, value=value)
-                cell.border = thin_border
-                
-                # Alternar colores de fila
-                if row_num % 2 == 0:
-                    cell.fill = cell_fill_even
-                else:
-                    cell.fill = cell_fill_odd
-                
-                # Alineación
-                if col_num in [1, 2, 6, 7, 12, 13, 15, 16, 18]:  # Columnas numéricas o cortas
-                    cell.alignment = Alignment(horizontal="center")
-                else:
-                    cell.alignment = Alignment(horizontal="left")
-            
-            row_num += 1
-        
-        # Ajustar anchos de columna
-        column_widths = {
-            'A': 5,   # N°
-            'B': 15,  # Documento
-            'C': 20,  # Nombres
-            'D': 20,  # Apellidos
-            'E': 15,  # Fecha Nacimiento
-            'F': 8,   # Edad
-            'G': 10,  # Sexo
-            'H': 15,  # Grado
-            'I': 25,  # Email
-            'J': 15,  # Teléfono
-            'K': 30,  # Dirección
-            'L': 25,  # Acudiente 1
-            'M': 15,  # Teléfono Acudiente 1
-            'N': 15,  # Parentesco 1
-            'O': 25,  # Acudiente 2
-            'P': 15,  # Teléfono Acudiente 2
-            'Q': 15,  # Parentesco 2
-            'R': 15,  # Estado Matrícula
-        }
-        
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
-        
+                for col_num, valor in enumerate(self.fila_estudiante(idx, datos, acudientes, hoy), 1)
+            ])
+            total = idx
+
         # Agregar información del reporte
-        ws.cell(row=row_num + 1, column=1, value="Reporte generado el:").font = Font(bold=True)
-        ws.cell(row=row_num + 1, column=2, value=timezone.now().strftime('%d/%m/%Y %H:%M'))
-        
-        ws.cell(row=row_num + 2, column=1, value="Docente:").font = Font(bold=True)
-        ws.cell(row=row_num + 2, column=2, value=docente.usuario.get_full_name())
-        
-        ws.cell(row=row_num + 3, column=1, value="Año lectivo:").font = Font(bold=True)
-        ws.cell(row=row_num + 3, column=2, value=año_actual.anho)
-        
-        ws.cell(row=row_num + 4, column=1, value="Total estudiantes:").font = Font(bold=True)
-        ws.cell(row=row_num + 4, column=2, value=estudiantes.count())
-        
+        ws.append([])
+        for etiqueta, valor in (
+            ("Reporte generado el:", timezone.now().strftime('%d/%m/%Y %H:%M')),
+            ("Docente:", docente.usuario.get_full_name()),
+            ("Año lectivo:", año_actual.anho),
+            ("Total estudiantes:", total),
+        ):
+            ws.append([self.celda(ws, etiqueta, self.ESTILO_ETIQUETA), valor])
+
         # Preparar respuesta
         response = HttpResponse(
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
         filename = f"estudiantes_{timezone.now().strftime('%Y%m%d_%H%M')}.xlsx"
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
+
         # Guardar libro
         wb.save(response)
-        
+
         return response
 
 
@@ -339,7 +376,7 @@ class DetalleEstudianteView(LoginRequiredMixin, DocenteRequiredMixin, TemplateVi
             return context
         
         # Verificar que el estudiante esté en los grados del docente
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if año_actual:
             grados_docente = AsignaturaGradoAñoLectivo.objects.filter(
                 docente=docente,
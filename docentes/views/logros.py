@@ -15,7 +15,7 @@ from usuarios.models import Docente
 from docentes.mixins import DocenteRequiredMixin, DocenteBaseView
 from academico.models import Logro, Asignatura, Grado
 from matricula.models import PeriodoAcademico, AsignaturaGradoAñoLectivo
-from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services import calendario
 
 class DocenteRequiredMixin(UserPassesTestMixin):
     """Mixin para verificar que el usuario es docente - VERSIÓN SIMPLE"""
@@ -71,7 +71,7 @@ class ListaLogrosView(LoginRequiredMixin, DocenteRequiredMixin, ListView):
         if not docente:
             return []
         
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if not año_actual:
             return []
     
@@ -168,7 +168,7 @@ class ListaLogrosView(LoginRequiredMixin, DocenteRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not docente:
             messages.error(self.request, 'No tiene perfil de docente.')
@@ -240,7 +240,7 @@ class ListaLogrosFiltradosView(LoginRequiredMixin, DocenteRequiredMixin, Templat
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not docente or not año_actual:
             return context
@@ -310,7 +310,7 @@ class CrearLogroView(LoginRequiredMixin, DocenteRequiredMixin, CreateView):
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not año_actual or not docente:
             messages.error(self.request, 'No hay un año lectivo activo o no tiene perfil de docente.')
@@ -350,7 +350,7 @@ class DetalleLogroView(LoginRequiredMixin, DocenteRequiredMixin, DocenteBaseView
     
     def get_queryset(self):
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not año_actual or not docente:
             return Logro.objects.none()
@@ -389,7 +389,7 @@ class EditarLogroView(LoginRequiredMixin, DocenteRequiredMixin, DocenteBaseView,
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not año_actual or not docente:
             messages.error(self.request, 'No hay un año lectivo activo o no tiene perfil de docente.')
@@ -426,7 +426,7 @@ class EditarLogroView(LoginRequiredMixin, DocenteRequiredMixin, DocenteBaseView,
     
     def get_queryset(self):
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not año_actual or not docente:
             return Logro.objects.none()
@@ -463,7 +463,7 @@ class EliminarLogroView(LoginRequiredMixin, DocenteRequiredMixin, DocenteBaseVie
     
     def get_queryset(self):
         docente = self.get_docente()
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         if not año_actual or not docente:
             return Logro.objects.none()
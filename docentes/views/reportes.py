@@ -14,7 +14,7 @@ from usuarios.models import Docente
 from academico.models import Grado
 from matricula.models import PeriodoAcademico
 from comportamiento.models import Comportamiento
-from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services import calendario
 
 
 class ReportesView(RoleRequiredMixin, TemplateView):
@@ -30,7 +30,7 @@ class ReportesView(RoleRequiredMixin, TemplateView):
         context['total_docentes'] = Docente.objects.filter(estado=True).count()
         
         # Año actual
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if año_actual:
             context['matriculas_ano_actual'] = Matricula.objects.filter(
                 año_lectivo=año_actual, 
@@ -42,4 +42,11 @@ class NotaAdmin(admin.ModelAdmin):
     list_display = ['estudiante', 'asignatura_grado_año_lectivo', 'periodo_academico', 'calificacion']
     list_filter = ['periodo_academico', 'asignatura_grado_año_lectivo__sede']
     search_fields = ['estudiante__usuario__nombres', 'asignatura_grado_año_lectivo__asignatura__nombre']
-    autocomplete_fields = ['estudiante', 'asignatura_grado_año_lectivo', 'periodo_academico']
\ No newline at end of file
+    autocomplete_fields = ['estudiante', 'asignatura_grado_año_lectivo', 'periodo_academico']
+
+@admin.register(PosicionEstudiante)
+class PosicionEstudianteAdmin(admin.ModelAdmin):
+    list_display = ['estudiante', 'grado_año_lectivo', 'sede', 'periodo_academico', 'promedio', 'puesto', 'total_estudiantes', 'percentil']
+    list_filter = ['grado_año_lectivo__año_lectivo', 'sede', 'periodo_academico']
+    search_fields = ['estudiante__usuario__nombres', 'estudiante__usuario__apellidos']
+    readonly_fields = ['estudiante', 'grado_año_lectivo', 'sede', 'periodo_academico', 'promedio', 'puesto', 'total_estudiantes', 'percentil']
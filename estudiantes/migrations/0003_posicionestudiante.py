@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estudiantes', '0002_initial'),
+        ('gestioncolegio', '0002_initial'),
+        ('matricula', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PosicionEstudiante',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('promedio', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('puesto', models.PositiveIntegerField()),
+                ('total_estudiantes', models.PositiveIntegerField()),
+                ('percentil', models.DecimalField(decimal_places=2, help_text='Porcentaje del curso con promedio inferior', max_digits=5)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posiciones', to='estudiantes.estudiante')),
+                ('grado_año_lectivo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posiciones', to='matricula.gradoañolectivo')),
+                ('periodo_academico', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='posiciones', to='matricula.periodoacademico')),
+                ('sede', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posiciones', to='gestioncolegio.sede')),
+            ],
+            options={
+                'verbose_name': 'Posición del Estudiante',
+                'verbose_name_plural': 'Posiciones de Estudiantes',
+                'indexes': [models.Index(fields=['grado_año_lectivo', 'sede', 'periodo_academico'], name='posicion_curso_idx')],
+                'constraints': [models.UniqueConstraint(fields=('estudiante', 'grado_año_lectivo', 'periodo_academico'), name='unique_posicion_estudiante')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estudiantes', '0003_posicionestudiante'),
+        ('gestioncolegio', '0007_auditoria_indices_archivo'),
+        ('matricula', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='posicionestudiante',
+            name='unique_posicion_estudiante',
+        ),
+        migrations.AddConstraint(
+            model_name='posicionestudiante',
+            constraint=models.UniqueConstraint(fields=('estudiante', 'grado_año_lectivo', 'sede', 'periodo_academico'), name='unique_posicion_estudiante'),
+        ),
+    ]
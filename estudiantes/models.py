@@ -9,8 +9,13 @@ class Estudiante(BaseModel):
     @property
     def matricula_actual(self):
         """Matrícula del año lectivo activo"""
-        from gestioncolegio.models import AñoLectivo
-        año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+        # Precargada por lotes en listados (gestioncolegio.services.precarga_estudiantes)
+        precarga = self.__dict__.get('_precarga')
+        if precarga is not None and 'matricula_actual' in precarga:
+            return precarga['matricula_actual']
+
+        from gestioncolegio.services import calendario
+        año_lectivo_actual = calendario.año_activo()
         if año_lectivo_actual:
             return self.matriculas.filter(
                 año_lectivo=año_lectivo_actual,
@@ -40,10 +45,10 @@ class Estudiante(BaseModel):
     
     def matriculas_anteriores(self):
         """Todas las matrículas anteriores ordenadas por año"""
-        from gestioncolegio.models import AñoLectivo
+        from gestioncolegio.services import calendario
         
         # Obtener año actual si existe
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         
         # Filtrar matrículas que no sean del año actual
         if año_actual:
@@ -208,4 +213,32 @@ class Nota(BaseModel):
         return f"{self.estudiante} - {self.calificacion}"
 
     class Meta:
-        unique_together = ('estudiante', 'asignatura_grado_año_lectivo', 'periodo_academico')
\ No newline at end of file
+        unique_together = ('estudiante', 'asignatura_grado_año_lectivo', 'periodo_academico')
+
+class PosicionEstudiante(BaseModel):
+    """
+    Promedio, puesto y percentil precalculados del estudiante dentro de su curso
+    (grado del año lectivo) y sede; periodo_academico vacío = año completo
+    """
+    estudiante = models.ForeignKey('Estudiante', on_delete=models.CASCADE, related_name="posiciones")
+    grado_año_lectivo = models.ForeignKey('matricula.GradoAñoLectivo', on_delete=models.CASCADE, related_name="posiciones")
+    sede = models.ForeignKey('gestioncolegio.Sede', on_delete=models.CASCADE, related_name="posiciones")
+    periodo_academico = models.ForeignKey('matricula.PeriodoAcademico', on_delete=models.CASCADE, null=True, blank=True, related_name="posiciones")
+    promedio = models.DecimalField(max_digits=5, decimal_places=2)
+    puesto = models.PositiveIntegerField()
+    total_estudiantes = models.PositiveIntegerField()
+    percentil = models.DecimalField(max_digits=5, decimal_places=2, help_text="Porcentaje del curso con promedio inferior")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['estudiante', 'grado_año_lectivo', 'sede', 'periodo_academico'], name='unique_posicion_estudiante')
+        ]
+        indexes = [
+            models.Index(fields=['grado_año_lectivo', 'sede', 'periodo_academico'], name='posicion_curso_idx'),
+        ]
+        verbose_name = "Posición del Estudiante"
+        verbose_name_plural = "Posiciones de Estudiantes"
+
+    def __str__(self):
+        alcance = self.periodo_academico.periodo.nombre if self.periodo_academico else 'Año'
+        return f"{self.estudiante} - {alcance}: {self.puesto}/{self.total_estudiantes}"
@@ -1,6 +1,6 @@
 from django import template
 from estudiantes.models import Estudiante
-from matricula.models import PeriodoAcademico
+from gestioncolegio.services import calendario
 
 register = template.Library()
 
@@ -14,12 +14,7 @@ def get_periodo_actual(estudiante):
             from django.utils import timezone
             hoy = timezone.now().date()
             
-            periodo = PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo,
-                fecha_inicio__lte=hoy,
-                fecha_fin__gte=hoy,
-                estado=True
-            ).first()
+            periodo = calendario.periodo_en_fecha(año_lectivo, hoy, solo_activos=True)
             
             if periodo:
                 return periodo
@@ -5,7 +5,7 @@ from estudiantes.models import Estudiante, Nota, Acudiente, Matricula
 from matricula.models import AsignaturaGradoAñoLectivo, PeriodoAcademico
 from academico.models import HorarioClase, Logro
 from comportamiento.models import Comportamiento
-from gestioncolegio.models import Colegio, RecursosColegio, AñoLectivo
+from gestioncolegio.models import AñoLectivo
 from gestioncolegio.views import RoleRequiredMixin
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
@@ -13,22 +13,21 @@ from django.views import View
 from django.http import HttpResponse, Http404
 from django.template.loader import get_template
 from io import BytesIO 
-import os
 from django.db.models import Q
 from django.contrib import messages
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from django.core.exceptions import ObjectDoesNotExist
 
 # ReportLab imports
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import cm
 from reportlab.lib import colors
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 )
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from io import BytesIO
 from estudiantes.mixins import PeriodoActualMixin
+from gestioncolegio.services import calendario, documentos_generados, documentos_pdf, imagenes
+from gestioncolegio.services.posiciones import posicion_estudiante
 
 # =============================================
 # VISTAS BASE Y PRINCIPALES
@@ -40,46 +39,7 @@ class BaseEstudianteView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
     
     def obtener_periodo_actual_inteligente(self, año_lectivo, hoy):
         """Obtiene el período académico actual o más reciente"""
-        if not año_lectivo:
-            return None
-        
-        try:
-            # 1. Buscar período activo que contenga la fecha actual
-            periodo = PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo,
-                fecha_inicio__lte=hoy,
-                fecha_fin__gte=hoy
-            ).first()
-            
-            if periodo:
-                return periodo
-            
-            # 2. Buscar último período que terminó
-            periodo = PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo,
-                fecha_fin__lt=hoy
-            ).order_by('-fecha_fin').first()
-            
-            if periodo:
-                return periodo
-            
-            # 3. Buscar próximo período
-            periodo = PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo,
-                fecha_inicio__gt=hoy
-            ).order_by('fecha_inicio').first()
-            
-            if periodo:
-                return periodo
-            
-            # 4. Usar cualquier período del año
-            return PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo
-            ).first()
-            
-        except Exception as e:
-            print(f"Error obteniendo período: {e}")
-            return None
+        return calendario.periodo_actual(año_lectivo, hoy)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -107,7 +67,7 @@ class BaseEstudianteView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
                     'grado_actual': estudiante.grado_actual.grado.nombre if estudiante.grado_actual else 'No asignado',
                     'año_lectivo': estudiante.grado_actual.año_lectivo.anho if estudiante.grado_actual else 'No asignado',
                     'año_lectivo_id': estudiante.grado_actual.año_lectivo.id if estudiante.grado_actual else None,
-                    'foto_url': estudiante.foto.url if estudiante.foto else None,
+                    'foto_url': imagenes.url(estudiante.foto, 'thumb') or None,
                     'usuario': {
                         'tipo_documento': estudiante.usuario.tipo_documento.nombre if estudiante.usuario.tipo_documento else None,
                         'numero_documento': estudiante.usuario.numero_documento,
@@ -502,21 +462,6 @@ class ConstanciaEstudioPDFView(View):
         'bottom': 1.8 * cm
     }
 
-    def _obtener_o_crear_recursos(self, colegio):
-        """Obtiene o crea los recursos del colegio si no existen"""
-        try:
-            # Intentar obtener los recursos existentes
-            return colegio.recursos
-        except ObjectDoesNotExist:
-            # Si no existen, crear unos por defecto
-            recursos = RecursosColegio.objects.create(
-                colegio=colegio,
-                sitio_web='https://colegiocrishadai.edu.co',
-                email='migueliose@colegiocrishadai.edu.co',
-                telefono='+57 123 456 7890',
-            )
-            return recursos
-
     def get(self, request, *args, **kwargs):
         try:
             # Obtener estudiante según parámetro de URL o GET
@@ -571,37 +516,24 @@ class ConstanciaEstudioPDFView(View):
                 # Si no hay matrícula actual pero sí hay matrícula del año, es año anterior
                 es_año_anterior = True
             
-            colegio = Colegio.objects.filter(estado=True).first()
+            self.recursos_pdf = documentos_pdf.recursos_colegio()
 
-            if not colegio:
+            if not self.recursos_pdf:
                 raise Http404("Configuración del colegio no encontrada")
+            colegio = self.recursos_pdf.colegio
 
-            buffer = BytesIO()
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=letter,
-                rightMargin=self.MARGINS['right'],
-                leftMargin=self.MARGINS['left'],
-                topMargin=self.MARGINS['top'],
-                bottomMargin=self.MARGINS['bottom']
-            )
-
-            # Pasar la matrícula específica del año y si es año anterior
-            elements = self._construir_elementos(estudiante, colegio, año_lectivo, matricula_año, es_año_anterior)
+            nombre_archivo = f"constancia_{estudiante.usuario.nombres.replace(' ', '_')}_{año_lectivo.anho if año_lectivo else ''}_{timezone.now().strftime('%Y%m%d')}.pdf"
 
-            doc.build(
-                elements,
-                onFirstPage=self._agregar_marca_agua,
-                onLaterPages=self._agregar_marca_agua
+            # La constancia lleva la fecha de expedición: se regenera una vez por día
+            huella = documentos_generados.huella_estudiante(
+                estudiante, año_lectivo,
+                extra=(self.recursos_pdf.clave, getattr(matricula_año, 'id', None), es_año_anterior, timezone.localdate())
+            )
+            return documentos_generados.servir_documento(
+                request, 'constancia', estudiante.id, año_lectivo.id, huella,
+                lambda: self._generar_pdf(estudiante, colegio, año_lectivo, matricula_año, es_año_anterior),
+                nombre_archivo
             )
-
-            pdf = buffer.getvalue()
-            buffer.close()
-
-            nombre_archivo = f"constancia_{estudiante.usuario.nombres.replace(' ', '_')}_{año_lectivo.anho if año_lectivo else ''}_{timezone.now().strftime('%Y%m%d')}.pdf"
-            response = HttpResponse(pdf, content_type="application/pdf")
-            response["Content-Disposition"] = f'inline; filename="{nombre_archivo}"'
-            return response
 
         except Estudiante.DoesNotExist:
             return HttpResponse("Estudiante no encontrado", status=404)
@@ -610,59 +542,38 @@ class ConstanciaEstudioPDFView(View):
             print(f"Error generando constancia: {e}")
             return HttpResponse("Error interno del servidor", status=500)
 
-    # -------------------- MARCA DE AGUA --------------------
-    def _agregar_marca_agua(self, canvas, doc):
-        """Agrega marca de agua institucional."""
-        try:
-            colegio = Colegio.objects.filter(estado=True).first()
-            if colegio:
-                # Verificar si existe el objeto recursos
-                try:
-                    recursos = self._obtener_o_crear_recursos(colegio)
-                    if recursos.escudo and os.path.exists(recursos.escudo.path):
-                        logo_path = recursos.escudo.path
-                        canvas.saveState()
-                        canvas.setFillAlpha(0.07)
-
-                        # Centrar imagen
-                        page_width, page_height = doc.pagesize
-                        wm_w, wm_h = 12 * cm, 12 * cm
-                        x = (page_width - wm_w) / 2
-                        y = (page_height - wm_h) / 2
-
-                        canvas.drawImage(
-                            logo_path, x, y, width=wm_w, height=wm_h,
-                            preserveAspectRatio=True, mask='auto'
-                        )
-                        canvas.restoreState()
-                        return
-                except (ObjectDoesNotExist, AttributeError, ValueError, OSError) as e:
-                    print(f"Error con recursos en marca de agua: {e}")
-                    # Si hay algún error, usar marca de agua de texto
-                    
-            self._agregar_marca_agua_texto(canvas, doc)
-        except Exception as e:
-            print(f"Error en marca de agua: {e}")
-            self._agregar_marca_agua_texto(canvas, doc)
+    def _generar_pdf(self, estudiante, colegio, año_lectivo, matricula_año, es_año_anterior):
+        """Bytes del PDF de la constancia"""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=letter,
+            rightMargin=self.MARGINS['right'],
+            leftMargin=self.MARGINS['left'],
+            topMargin=self.MARGINS['top'],
+            bottomMargin=self.MARGINS['bottom']
+        )
 
-    def _agregar_marca_agua_texto(self, canvas, doc):
-        """Marca de agua de texto como fallback"""
-        try:
-            canvas.saveState()
-            canvas.setFont("Helvetica-Bold", 50)
-            canvas.setFillAlpha(0.07)
-            canvas.rotate(45)
-            canvas.drawCentredString(doc.pagesize[0] / 2, doc.pagesize[1] / 3, "CONSTANCIA DE ESTUDIO")
-            canvas.restoreState()
-        except Exception as e:
-            print(f"Error en marca de agua de texto: {e}")
+        # Pasar la matrícula específica del año y si es año anterior
+        elements = self._construir_elementos(estudiante, colegio, año_lectivo, matricula_año, es_año_anterior)
+
+        marca_agua = self.recursos_pdf.marca_agua("CONSTANCIA DE ESTUDIO")
+        doc.build(
+            elements,
+            onFirstPage=marca_agua,
+            onLaterPages=marca_agua
+        )
+
+        pdf = buffer.getvalue()
+        buffer.close()
+        return pdf
 
     # -------------------- CONSTRUCCIÓN --------------------
     def _construir_elementos(self, estudiante, colegio, año_lectivo, matricula_año=None, es_año_anterior=False):
-        styles = self._crear_estilos()
+        styles = documentos_pdf.estilos()
         elements = []
 
-        elements.extend(self._crear_encabezado(colegio, styles))
+        elements.extend(self.recursos_pdf.encabezado(styles))
         elements.extend(self._crear_titulo_constancia(styles))
         elements.extend(self._crear_contenido(estudiante, colegio, styles, año_lectivo, matricula_año, es_año_anterior))
         elements.extend(self._crear_firma_y_sello(estudiante, styles, año_lectivo))
@@ -670,60 +581,7 @@ class ConstanciaEstudioPDFView(View):
 
         return elements
 
-    # -------------------- ESTILOS --------------------
-    def _crear_estilos(self):
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name="TituloColegio", fontSize=18, alignment=1, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="Subtitulo", fontSize=11, alignment=1))
-        styles.add(ParagraphStyle(name="TituloConstancia", fontSize=14, alignment=1, spaceAfter=15, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="TextoNormal", fontSize=12, alignment=4, leading=15))
-        styles.add(ParagraphStyle(name="TextoResaltado", fontSize=12, alignment=4, leading=15, backColor=colors.whitesmoke))
-        styles.add(ParagraphStyle(name="Sello", fontSize=9, textColor=colors.HexColor("#0A4BA0")))
-        styles.add(ParagraphStyle(name="PiePagina", fontSize=9, alignment=1, textColor=colors.HexColor("#444")))
-        styles.add(ParagraphStyle(name="FirmaNombre", fontSize=12, alignment=2, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="FirmaCargo", fontSize=11, alignment=2))
-        return styles
-
     # -------------------- SECCIONES --------------------
-    def _crear_encabezado(self, colegio, styles):
-        """Crear encabezado con manejo de errores para recursos"""
-        logo = None
-        try:
-            # Obtener recursos (se crearán automáticamente si no existen)
-            recursos = self._obtener_o_crear_recursos(colegio)
-            if recursos.escudo and os.path.exists(recursos.escudo.path):
-                logo = Image(recursos.escudo.path, width=80, height=80)
-        except (ObjectDoesNotExist, AttributeError, ValueError, OSError) as e:
-            print(f"Error cargando logo: {e}")
-            # Continuar sin logo
-
-        logo_cell = logo or Paragraph("ESCUDO<br/>NO DISPONIBLE", styles["Subtitulo"])
-
-        # Información del colegio con valores por defecto
-        resolucion = colegio.resolucion if colegio.resolucion else "---"
-        dane = colegio.dane if colegio.dane else "---"
-        direccion = colegio.direccion if colegio.direccion else "Valledupar - Cesar"
-
-        info = [
-            Paragraph("COLEGIO CRISTIANO EL SHADAI", styles["TituloColegio"]),
-            Paragraph(f"Resolución de Estudios N.º {resolucion}", styles["Subtitulo"]),
-            Paragraph(f"<b>COD. DANE {dane}</b>", styles["Subtitulo"]),
-            Paragraph("Educación Preescolar – Básica Primaria", styles["Subtitulo"]),
-            Paragraph(direccion, styles["Subtitulo"])
-        ]
-        info_table = Table([[line] for line in info])
-
-        header = Table([[logo_cell, info_table]], colWidths=[3 * cm, 13 * cm])
-        header.setStyle(TableStyle([
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ]))
-
-        linea = Table([[""]], colWidths=[16 * cm])
-        linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 2, colors.black)]))
-
-        return [header, Spacer(1, 10), linea, Spacer(1, 25)]
-
     def _crear_titulo_constancia(self, styles):
         return [Paragraph("CONSTANCIA DE ESTUDIO", styles["TituloConstancia"])]
 
@@ -836,38 +694,11 @@ class ConstanciaEstudioPDFView(View):
     def _crear_pie_pagina(self, colegio, estudiante, styles, año_lectivo):
         """Pie de página con manejo seguro de recursos"""
         try:
-            # Obtener información de contacto
-            direccion = colegio.direccion if colegio.direccion else "Dirección no especificada"
-            
-            # Obtener recursos (se crearán automáticamente si no existen)
-            try:
-                recursos = self._obtener_o_crear_recursos(colegio)
-                telefono = recursos.telefono or ""
-                celular = getattr(recursos, "celular", "") or ""
-                email = recursos.email or ""
-                web = recursos.sitio_web or ""
-            except Exception as e:
-                print(f"Error obteniendo recursos para pie de página: {e}")
-                telefono = celular = email = web = ""
-
             año_lectivo_str = str(año_lectivo.anho) if año_lectivo else "No especificado"
-            
-            lineas = [
-                "<b>COLEGIO CRISTIANO EL SHADAI</b>",
-                f"{direccion}" + (f" | Tel: {telefono}" if telefono else "") + (f" | Cel: {celular}" if celular else ""),
-                (f"Email: {email}" if email else "") + (f" | Web: {web}" if web else ""),
+            return self.recursos_pdf.pie_pagina(
+                styles,
                 f"Constancia de: {estudiante.usuario.nombres} {estudiante.usuario.apellidos} | Año: {año_lectivo_str} | Generado: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
-            ]
-            
-            # Filtrar líneas vacías
-            lineas = [linea for linea in lineas if linea.strip()]
-            texto = "<br/>".join(lineas)
-
-            linea = Table([[""]], colWidths=[15 * cm])
-            linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 1, colors.HexColor('#888'))]))
-
-            return [Spacer(1, 40), linea, Spacer(1, 8), Paragraph(texto, styles["PiePagina"])]
-
+            )
         except Exception as e:
             print(f"Error en pie de página: {e}")
             return [Spacer(1, 40)]
@@ -891,21 +722,6 @@ class ObservadorEstudiantePDFView(View):
         'bottom': 1.5 * cm
     }
 
-    def _obtener_o_crear_recursos(self, colegio):
-        """Obtiene o crea los recursos del colegio si no existen"""
-        try:
-            # Intentar obtener los recursos existentes
-            return colegio.recursos
-        except ObjectDoesNotExist:
-            # Si no existen, crear unos por defecto
-            recursos = RecursosColegio.objects.create(
-                colegio=colegio,
-                sitio_web='https://colegiocrishadai.edu.co',
-                email='info@colegiocrishadai.edu.co',
-                telefono='+57 123 456 7890',
-            )
-            return recursos
-
     def get(self, request, *args, **kwargs):
         try:
             # Obtener estudiante según el tipo de usuario
@@ -994,10 +810,11 @@ class ObservadorEstudiantePDFView(View):
                     'docente__usuario'
                 ).order_by('-fecha', '-created_at')
             
-            colegio = Colegio.objects.filter(estado=True).first()
+            self.recursos_pdf = documentos_pdf.recursos_colegio()
 
-            if not colegio:
+            if not self.recursos_pdf:
                 raise Http404("Configuración del colegio no encontrada")
+            colegio = self.recursos_pdf.colegio
 
             buffer = BytesIO()
             doc = SimpleDocTemplate(
@@ -1019,10 +836,11 @@ class ObservadorEstudiantePDFView(View):
                     estudiante, observaciones, año_lectivo, colegio
                 )
 
+            marca_agua = self.recursos_pdf.marca_agua("OBSERVADOR ESTUDIANTIL")
             doc.build(
                 elements,
-                onFirstPage=self._agregar_marca_agua,
-                onLaterPages=self._agregar_marca_agua
+                onFirstPage=marca_agua,
+                onLaterPages=marca_agua
             )
 
             pdf = buffer.getvalue()
@@ -1044,59 +862,12 @@ class ObservadorEstudiantePDFView(View):
             print(f"Error generando observador: {e}")
             return HttpResponse("Error interno del servidor", status=500)
 
-    # -------------------- MARCA DE AGUA --------------------
-    def _agregar_marca_agua(self, canvas, doc):
-        """Agrega marca de agua institucional."""
-        try:
-            colegio = Colegio.objects.filter(estado=True).first()
-            if colegio:
-                # Verificar si existe el objeto recursos
-                try:
-                    recursos = self._obtener_o_crear_recursos(colegio)
-                    if recursos.escudo and os.path.exists(recursos.escudo.path):
-                        logo_path = recursos.escudo.path
-                        canvas.saveState()
-                        canvas.setFillAlpha(0.07)
-
-                        # Centrar imagen
-                        page_width, page_height = doc.pagesize
-                        wm_w, wm_h = 12 * cm, 12 * cm
-                        x = (page_width - wm_w) / 2
-                        y = (page_height - wm_h) / 2
-
-                        canvas.drawImage(
-                            logo_path, x, y, width=wm_w, height=wm_h,
-                            preserveAspectRatio=True, mask='auto'
-                        )
-                        canvas.restoreState()
-                        return
-                except (ObjectDoesNotExist, AttributeError, ValueError, OSError) as e:
-                    print(f"Error con recursos en marca de agua: {e}")
-                    # Si hay algún error, usar marca de agua de texto
-                    
-            self._agregar_marca_agua_texto(canvas, doc)
-        except Exception as e:
-            print(f"Error en marca de agua: {e}")
-            self._agregar_marca_agua_texto(canvas, doc)
-
-    def _agregar_marca_agua_texto(self, canvas, doc):
-        """Marca de agua de texto como fallback"""
-        try:
-            canvas.saveState()
-            canvas.setFont("Helvetica-Bold", 50)
-            canvas.setFillAlpha(0.07)
-            canvas.rotate(45)
-            canvas.drawCentredString(doc.pagesize[0] / 2, doc.pagesize[1] / 3, "OBSERVADOR ESTUDIANTIL")
-            canvas.restoreState()
-        except Exception as e:
-            print(f"Error en marca de agua de texto: {e}")
-
     # -------------------- CONSTRUCCIÓN OBSERVADOR --------------------
     def _construir_elementos_observador(self, estudiante, observaciones, año_lectivo, colegio):
-        styles = self._crear_estilos()
+        styles = documentos_pdf.estilos()
         elements = []
 
-        elements.extend(self._crear_encabezado(colegio, styles))
+        elements.extend(self.recursos_pdf.encabezado(styles))
         elements.extend(self._crear_titulo_observador(styles, año_lectivo))
         elements.extend(self._crear_info_estudiante(estudiante, año_lectivo, styles))
         elements.extend(self._crear_resumen_observaciones(observaciones, styles))
@@ -1108,10 +879,10 @@ class ObservadorEstudiantePDFView(View):
 
     # -------------------- CONSTRUCCIÓN BOLETÍN FINAL --------------------
     def _construir_elementos_boletin_final(self, estudiante, observaciones, notas, año_lectivo, colegio):
-        styles = self._crear_estilos()
+        styles = documentos_pdf.estilos()
         elements = []
 
-        elements.extend(self._crear_encabezado(colegio, styles))
+        elements.extend(self.recursos_pdf.encabezado(styles))
         elements.extend(self._crear_titulo_boletin_final(styles, año_lectivo))
         elements.extend(self._crear_info_estudiante(estudiante, año_lectivo, styles))
         
@@ -1130,69 +901,7 @@ class ObservadorEstudiantePDFView(View):
 
         return elements
 
-    # -------------------- ESTILOS --------------------
-    def _crear_estilos(self):
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name="TituloColegio", fontSize=18, alignment=1, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="Subtitulo", fontSize=11, alignment=1))
-        styles.add(ParagraphStyle(name="TituloDocumento", fontSize=14, alignment=1, spaceAfter=15, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="TituloBoletin", fontSize=16, alignment=1, spaceAfter=20, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="TextoNormal", fontSize=12, alignment=4, leading=15))
-        styles.add(ParagraphStyle(name="TextoResaltado", fontSize=12, alignment=4, leading=15, backColor=colors.whitesmoke))
-        styles.add(ParagraphStyle(name="InfoEstudiante", fontSize=12, alignment=0, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="InfoTexto", fontSize=12, alignment=0))
-        styles.add(ParagraphStyle(name="ObservacionTitulo", fontSize=11, alignment=0, fontName="Helvetica-Bold", spaceAfter=3))
-        styles.add(ParagraphStyle(name="ObservacionTexto", fontSize=10, alignment=4, leading=13))
-        styles.add(ParagraphStyle(name="ObservacionDetalle", fontSize=9, alignment=0, textColor=colors.HexColor("#666")))
-        styles.add(ParagraphStyle(name="TablaEncabezado", fontSize=10, alignment=1, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="TablaContenido", fontSize=9, alignment=1))
-        styles.add(ParagraphStyle(name="TablaAsignatura", fontSize=9, alignment=0))
-        styles.add(ParagraphStyle(name="Sello", fontSize=9, textColor=colors.HexColor("#0A4BA0")))
-        styles.add(ParagraphStyle(name="PiePagina", fontSize=9, alignment=1, textColor=colors.HexColor("#444")))
-        styles.add(ParagraphStyle(name="FirmaNombre", fontSize=12, alignment=2, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="FirmaCargo", fontSize=11, alignment=2))
-        return styles
-
     # -------------------- SECCIONES OBSERVADOR --------------------
-    def _crear_encabezado(self, colegio, styles):
-        """Crear encabezado con manejo de errores para recursos"""
-        logo = None
-        try:
-            # Obtener recursos (se crearán automáticamente si no existen)
-            recursos = self._obtener_o_crear_recursos(colegio)
-            if recursos.escudo and os.path.exists(recursos.escudo.path):
-                logo = Image(recursos.escudo.path, width=80, height=80)
-        except (ObjectDoesNotExist, AttributeError, ValueError, OSError) as e:
-            print(f"Error cargando logo: {e}")
-            # Continuar sin logo
-
-        logo_cell = logo or Paragraph("ESCUDO<br/>NO DISPONIBLE", styles["Subtitulo"])
-
-        # Información del colegio con valores por defecto
-        resolucion = colegio.resolucion if colegio.resolucion else "---"
-        dane = colegio.dane if colegio.dane else "---"
-        direccion = colegio.direccion if colegio.direccion else "Valledupar - Cesar"
-
-        info = [
-            Paragraph("COLEGIO CRISTIANO EL SHADAI", styles["TituloColegio"]),
-            Paragraph(f"Resolución de Estudios N.º {resolucion}", styles["Subtitulo"]),
-            Paragraph(f"<b>COD. DANE {dane}</b>", styles["Subtitulo"]),
-            Paragraph("Educación Preescolar – Básica Primaria", styles["Subtitulo"]),
-            Paragraph(direccion, styles["Subtitulo"])
-        ]
-        info_table = Table([[line] for line in info])
-
-        header = Table([[logo_cell, info_table]], colWidths=[3 * cm, 13 * cm])
-        header.setStyle(TableStyle([
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ]))
-
-        linea = Table([[""]], colWidths=[16 * cm])
-        linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 2, colors.black)]))
-
-        return [header, Spacer(1, 10), linea, Spacer(1, 25)]
-
     def _crear_titulo_observador(self, styles, año_lectivo):
         if año_lectivo:
             return [Paragraph(f"OBSERVADOR DEL ESTUDIANTE - AÑO LECTIVO {año_lectivo.anho}", styles["TituloDocumento"])]
@@ -1562,37 +1271,11 @@ class ObservadorEstudiantePDFView(View):
     def _crear_pie_pagina(self, colegio, estudiante, año_lectivo, styles):
         """Pie de página"""
         try:
-            # Obtener información de contacto
-            direccion = colegio.direccion if colegio.direccion else "Dirección no especificada"
-            
-            # Obtener recursos (se crearán automáticamente si no existen)
-            try:
-                recursos = self._obtener_o_crear_recursos(colegio)
-                telefono = recursos.telefono or ""
-                celular = getattr(recursos, "celular", "") or ""
-                email = recursos.email or ""
-                web = recursos.sitio_web or ""
-            except Exception as e:
-                print(f"Error obteniendo recursos para pie de página: {e}")
-                telefono = celular = email = web = ""
-
             año_lectivo_str = año_lectivo.anho if año_lectivo else "Todos los años"
-            lineas = [
-                "<b>COLEGIO CRISTIANO EL SHADAI</b>",
-                f"{direccion}" + (f" | Tel: {telefono}" if telefono else "") + (f" | Cel: {celular}" if celular else ""),
-                (f"Email: {email}" if email else "") + (f" | Web: {web}" if web else ""),
+            return self.recursos_pdf.pie_pagina(
+                styles,
                 f"Documento de: {estudiante.usuario.nombres} {estudiante.usuario.apellidos} | Año: {año_lectivo_str} | Generado: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
-            ]
-            
-            # Filtrar líneas vacías
-            lineas = [linea for linea in lineas if linea.strip()]
-            texto = "<br/>".join(lineas)
-
-            linea = Table([[""]], colWidths=[15 * cm])
-            linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 1, colors.HexColor('#888'))]))
-
-            return [Spacer(1, 40), linea, Spacer(1, 8), Paragraph(texto, styles["PiePagina"])]
-
+            )
         except Exception as e:
             print(f"Error en pie de página: {e}")
             return [Spacer(1, 40)]
@@ -1627,21 +1310,6 @@ class ReporteNotasPDFView(View):
         'bottom': 1.5 * cm
     }
 
-    def _obtener_o_crear_recursos(self, colegio):
-        """Obtiene o crea los recursos del colegio si no existen"""
-        try:
-            # Intentar obtener los recursos existentes
-            return colegio.recursos
-        except ObjectDoesNotExist:
-            # Si no existen, crear unos por defecto
-            recursos = RecursosColegio.objects.create(
-                colegio=colegio,
-                sitio_web='https://colegiocrishadai.edu.co',
-                email='info@colegiocrishadai.edu.co',
-                telefono='+57 123 456 7890',
-            )
-            return recursos
-
     def get(self, request, *args, **kwargs):
         try:
             # Determinar el tipo de reporte
@@ -1696,12 +1364,10 @@ class ReporteNotasPDFView(View):
                     periodo = get_object_or_404(PeriodoAcademico, id=periodo_id)
                 else:
                     # Obtener período actual del año lectivo activo
-                    año_actual = AñoLectivo.objects.filter(estado=True).first()
+                    año_actual = calendario.año_activo()
                     if año_actual:
-                        periodo = PeriodoAcademico.objects.filter(
-                            año_lectivo=año_actual,
-                            estado=True
-                        ).order_by('-fecha_inicio').first()
+                        activos = calendario.periodos(año_actual, solo_activos=True)
+                        periodo = activos[-1] if activos else None
                     else:
                         # Si no hay año activo, usar el último período registrado para el estudiante
                         ultimo_periodo = PeriodoAcademico.objects.filter(
@@ -1713,47 +1379,38 @@ class ReporteNotasPDFView(View):
             if not periodo and reporte_tipo == 'notas':
                 return HttpResponse("No se encontró período académico", status=400)
             
-            colegio = Colegio.objects.filter(estado=True).first()
+            self.recursos_pdf = documentos_pdf.recursos_colegio()
 
-            if not colegio:
+            if not self.recursos_pdf:
                 raise Http404("Configuración del colegio no encontrada")
-
-            buffer = BytesIO()
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=letter,
-                rightMargin=self.MARGINS['right'],
-                leftMargin=self.MARGINS['left'],
-                topMargin=self.MARGINS['top'],
-                bottomMargin=self.MARGINS['bottom']
-            )
-
-            # Construir elementos según el tipo
-            if reporte_tipo == 'final':
-                elements = self._construir_elementos_boletin_final(
-                    estudiante, periodo, año_lectivo, colegio
-                )
-            else:
-                elements = self._construir_elementos_reporte_notas(
-                    estudiante, periodo, colegio
-                )
-
-            doc.build(
-                elements,
-                onFirstPage=self._agregar_marca_agua,
-                onLaterPages=self._agregar_marca_agua
-            )
-
-            pdf = buffer.getvalue()
-            buffer.close()
+            colegio = self.recursos_pdf.colegio
 
             # Nombre del archivo según tipo
             if reporte_tipo == 'final':
                 nombre_archivo = f"boletin_final_{estudiante.usuario.nombres.replace(' ', '_')}_{año_lectivo.anho if año_lectivo else 'general'}_{timezone.now().strftime('%Y%m%d')}.pdf"
             else:
                 nombre_archivo = f"reporte_notas_{estudiante.usuario.nombres.replace(' ', '_')}_{periodo.periodo.nombre if periodo else 'actual'}_{timezone.now().strftime('%Y%m%d')}.pdf"
-            
-            response = HttpResponse(pdf, content_type="application/pdf")
+
+            def generar():
+                return self._generar_pdf(reporte_tipo, estudiante, periodo, año_lectivo, colegio)
+
+            # Los boletines de períodos (o años) cerrados se sirven desde la caché en disco
+            if reporte_tipo == 'final' and documentos_generados.año_cerrado(año_lectivo):
+                huella = documentos_generados.huella_estudiante(
+                    estudiante, año_lectivo, extra=(self.recursos_pdf.clave, getattr(periodo, 'id', None))
+                )
+                return documentos_generados.servir_documento(
+                    request, 'boletin_final', estudiante.id, año_lectivo.id, huella, generar, nombre_archivo
+                )
+            if reporte_tipo != 'final' and documentos_generados.periodo_cerrado(periodo):
+                huella = documentos_generados.huella_estudiante(
+                    estudiante, periodo.año_lectivo_id, periodo, extra=(self.recursos_pdf.clave,)
+                )
+                return documentos_generados.servir_documento(
+                    request, 'reporte_notas', estudiante.id, periodo.id, huella, generar, nombre_archivo
+                )
+
+            response = HttpResponse(generar(), content_type="application/pdf")
             response["Content-Disposition"] = f'inline; filename="{nombre_archivo}"'
             return response
 
@@ -1763,59 +1420,45 @@ class ReporteNotasPDFView(View):
             print(f"Error generando reporte de notas: {e}")
             return HttpResponse("Error interno del servidor", status=500)
 
-    # -------------------- MARCA DE AGUA --------------------
-    def _agregar_marca_agua(self, canvas, doc):
-        """Agrega marca de agua institucional."""
-        try:
-            colegio = Colegio.objects.filter(estado=True).first()
-            if colegio:
-                # Verificar si existe el objeto recursos
-                try:
-                    recursos = self._obtener_o_crear_recursos(colegio)
-                    if recursos.escudo and os.path.exists(recursos.escudo.path):
-                        logo_path = recursos.escudo.path
-                        canvas.saveState()
-                        canvas.setFillAlpha(0.07)
-
-                        # Centrar imagen
-                        page_width, page_height = doc.pagesize
-                        wm_w, wm_h = 12 * cm, 12 * cm
-                        x = (page_width - wm_w) / 2
-                        y = (page_height - wm_h) / 2
-
-                        canvas.drawImage(
-                            logo_path, x, y, width=wm_w, height=wm_h,
-                            preserveAspectRatio=True, mask='auto'
-                        )
-                        canvas.restoreState()
-                        return
-                except (ObjectDoesNotExist, AttributeError, ValueError, OSError) as e:
-                    print(f"Error con recursos en marca de agua: {e}")
-                    # Si hay algún error, usar marca de agua de texto
-                    
-            self._agregar_marca_agua_texto(canvas, doc)
-        except Exception as e:
-            print(f"Error en marca de agua: {e}")
-            self._agregar_marca_agua_texto(canvas, doc)
+    def _generar_pdf(self, reporte_tipo, estudiante, periodo, año_lectivo, colegio):
+        """Bytes del PDF del reporte de notas o del boletín final"""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=letter,
+            rightMargin=self.MARGINS['right'],
+            leftMargin=self.MARGINS['left'],
+            topMargin=self.MARGINS['top'],
+            bottomMargin=self.MARGINS['bottom']
+        )
 
-    def _agregar_marca_agua_texto(self, canvas, doc):
-        """Marca de agua de texto como fallback"""
-        try:
-            canvas.saveState()
-            canvas.setFont("Helvetica-Bold", 50)
-            canvas.setFillAlpha(0.07)
-            canvas.rotate(45)
-            canvas.drawCentredString(doc.pagesize[0] / 2, doc.pagesize[1] / 3, "REPORTE DE NOTAS")
-            canvas.restoreState()
-        except Exception as e:
-            print(f"Error en marca de agua de texto: {e}")
+        # Construir elementos según el tipo
+        if reporte_tipo == 'final':
+            elements = self._construir_elementos_boletin_final(
+                estudiante, periodo, año_lectivo, colegio
+            )
+        else:
+            elements = self._construir_elementos_reporte_notas(
+                estudiante, periodo, colegio
+            )
+
+        marca_agua = self.recursos_pdf.marca_agua("REPORTE DE NOTAS")
+        doc.build(
+            elements,
+            onFirstPage=marca_agua,
+            onLaterPages=marca_agua
+        )
+
+        pdf = buffer.getvalue()
+        buffer.close()
+        return pdf
 
     # -------------------- CONSTRUCCIÓN REPORTE NORMAL --------------------
     def _construir_elementos_reporte_notas(self, estudiante, periodo, colegio):
-        styles = self._crear_estilos()
+        styles = documentos_pdf.estilos()
         elements = []
 
-        elements.extend(self._crear_encabezado(colegio, styles))
+        elements.extend(self.recursos_pdf.encabezado(styles))
         elements.extend(self._crear_titulo_reporte(styles, periodo))
         elements.extend(self._crear_info_estudiante_periodo(estudiante, periodo, styles))
         
@@ -1832,10 +1475,10 @@ class ReporteNotasPDFView(View):
 
     # -------------------- CONSTRUCCIÓN BOLETÍN FINAL --------------------
     def _construir_elementos_boletin_final(self, estudiante, periodo, año_lectivo, colegio):
-        styles = self._crear_estilos()
+        styles = documentos_pdf.estilos()
         elements = []
 
-        elements.extend(self._crear_encabezado(colegio, styles))
+        elements.extend(self.recursos_pdf.encabezado(styles))
         elements.extend(self._crear_titulo_boletin_final(styles, año_lectivo))
         elements.extend(self._crear_info_estudiante_año(estudiante, año_lectivo, styles))
         
@@ -1854,29 +1497,6 @@ class ReporteNotasPDFView(View):
 
         return elements
 
-    # -------------------- ESTILOS --------------------
-    def _crear_estilos(self):
-        styles = getSampleStyleSheet()
-        styles.add(ParagraphStyle(name="TituloColegio", fontSize=18, alignment=1, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="Subtitulo", fontSize=11, alignment=1))
-        styles.add(ParagraphStyle(name="TituloDocumento", fontSize=14, alignment=1, spaceAfter=15, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="TituloBoletin", fontSize=16, alignment=1, spaceAfter=20, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="TextoNormal", fontSize=12, alignment=4, leading=15))
-        styles.add(ParagraphStyle(name="TextoResaltado", fontSize=12, alignment=4, leading=15, backColor=colors.whitesmoke))
-        styles.add(ParagraphStyle(name="InfoEstudiante", fontSize=12, alignment=0, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="InfoTexto", fontSize=12, alignment=0))
-        styles.add(ParagraphStyle(name="TablaEncabezado", fontSize=10, alignment=1, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="TablaContenido", fontSize=9, alignment=1))
-        styles.add(ParagraphStyle(name="TablaAsignatura", fontSize=9, alignment=0))
-        styles.add(ParagraphStyle(name="TablaDesempeno", fontSize=9, alignment=1))
-        styles.add(ParagraphStyle(name="AnalisisTitulo", fontSize=11, alignment=0, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="AnalisisTexto", fontSize=10, alignment=4))
-        styles.add(ParagraphStyle(name="Sello", fontSize=9, textColor=colors.HexColor("#0A4BA0")))
-        styles.add(ParagraphStyle(name="PiePagina", fontSize=9, alignment=1, textColor=colors.HexColor("#444")))
-        styles.add(ParagraphStyle(name="FirmaNombre", fontSize=12, alignment=2, fontName="Helvetica-Bold"))
-        styles.add(ParagraphStyle(name="FirmaCargo", fontSize=11, alignment=2))
-        return styles
-
     # -------------------- OBTENCIÓN DE DATOS --------------------
     def _obtener_datos_asignaturas_periodo(self, estudiante, periodo):
         """Obtiene las asignaturas con notas para un período específico"""
@@ -1976,6 +1596,7 @@ class ReporteNotasPDFView(View):
                 'asignaturas_evaluadas': asignaturas_evaluadas,
                 'promedio': promedio,
                 'periodo_nombre': periodo.periodo.nombre if periodo else 'Sin período',
+                'posicion': posicion_estudiante(estudiante, año_lectivo, periodo),
             }
             
         except Exception as e:
@@ -2014,6 +1635,7 @@ class ReporteNotasPDFView(View):
                 'promedio_final': promedio_final,
                 'total_periodos': len(periodos),
                 'año_lectivo': año_lectivo.anho,
+                'posicion': posicion_estudiante(estudiante, año_lectivo),
             }
             
         except Exception as e:
@@ -2027,45 +1649,6 @@ class ReporteNotasPDFView(View):
             }
 
     # -------------------- SECCIONES REPORTE NORMAL --------------------
-    def _crear_encabezado(self, colegio, styles):
-        """Crear encabezado con manejo de errores para recursos"""
-        logo = None
-        try:
-            # Obtener recursos (se crearán automáticamente si no existen)
-            recursos = self._obtener_o_crear_recursos(colegio)
-            if recursos.escudo and os.path.exists(recursos.escudo.path):
-                logo = Image(recursos.escudo.path, width=80, height=80)
-        except (ObjectDoesNotExist, AttributeError, ValueError, OSError) as e:
-            print(f"Error cargando logo: {e}")
-            # Continuar sin logo
-
-        logo_cell = logo or Paragraph("ESCUDO<br/>NO DISPONIBLE", styles["Subtitulo"])
-
-        # Información del colegio con valores por defecto
-        resolucion = colegio.resolucion if colegio.resolucion else "---"
-        dane = colegio.dane if colegio.dane else "---"
-        direccion = colegio.direccion if colegio.direccion else "Valledupar - Cesar"
-
-        info = [
-            Paragraph("COLEGIO CRISTIANO EL SHADAI", styles["TituloColegio"]),
-            Paragraph(f"Resolución de Estudios N.º {resolucion}", styles["Subtitulo"]),
-            Paragraph(f"<b>COD. DANE {dane}</b>", styles["Subtitulo"]),
-            Paragraph("Educación Preescolar – Básica Primaria", styles["Subtitulo"]),
-            Paragraph(direccion, styles["Subtitulo"])
-        ]
-        info_table = Table([[line] for line in info])
-
-        header = Table([[logo_cell, info_table]], colWidths=[3 * cm, 13 * cm])
-        header.setStyle(TableStyle([
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ]))
-
-        linea = Table([[""]], colWidths=[16 * cm])
-        linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 2, colors.black)]))
-
-        return [header, Spacer(1, 10), linea, Spacer(1, 25)]
-
     def _crear_titulo_reporte(self, styles, periodo):
         if periodo:
             return [Paragraph(f"CERTIFICADO ACADÉMICO DE NOTAS - {periodo.periodo.nombre.upper()}", styles["TituloDocumento"])]
@@ -2180,6 +1763,7 @@ class ReporteNotasPDFView(View):
                 f"<b>Promedio general:</b> <font color='{self._color_promedio(promedio)}'>{promedio:.2f}</font><br/>"
                 f"<b>Estado académico:</b> {self._estado_academico(promedio)}<br/><br/>"
             )
+            texto_resumen += self._texto_posicion(datos_asignaturas.get('posicion'))
 
             texto_resumen += (
                 f"<b>Distribución por desempeño:</b><br/>"
@@ -2424,6 +2008,15 @@ class ReporteNotasPDFView(View):
             print(f"Error en análisis de rendimiento: {e}")
             return [Spacer(1, 20)]
 
+    def _texto_posicion(self, posicion):
+        """Puesto y percentil precalculados del estudiante en su curso"""
+        if not posicion:
+            return ""
+        return (
+            f"<b>Puesto en el curso:</b> {posicion.puesto} de {posicion.total_estudiantes} "
+            f"(supera al {posicion.percentil:.0f}% del curso)<br/><br/>"
+        )
+
     def _crear_resumen_final(self, datos_completos, año_lectivo, styles):
         """Resumen final para boletín"""
         try:
@@ -2435,6 +2028,7 @@ class ReporteNotasPDFView(View):
                 f"<b>Promedio final del año:</b> <font color='{self._color_promedio(promedio_final)}'>{promedio_final:.2f}</font><br/>"
                 f"<b>Desempeño general:</b> {self._estado_academico(promedio_final)}<br/><br/>"
             )
+            texto_resumen += self._texto_posicion(datos_completos.get('posicion'))
             
             if promedios_periodos:
                 texto_resumen += "<b>Evolución por períodos:</b><br/>"
@@ -2584,33 +2178,11 @@ class ReporteNotasPDFView(View):
     def _crear_pie_pagina(self, colegio, estudiante, periodo, styles):
         """Pie de página para reporte normal"""
         try:
-            direccion = colegio.direccion if colegio.direccion else "Dirección no especificada"
-            
-            try:
-                recursos = self._obtener_o_crear_recursos(colegio)
-                telefono = recursos.telefono or ""
-                celular = getattr(recursos, "celular", "") or ""
-                email = recursos.email or ""
-                web = recursos.sitio_web or ""
-            except Exception as e:
-                telefono = celular = email = web = ""
-
             periodo_nombre = periodo.periodo.nombre if periodo else "Actual"
-            lineas = [
-                "<b>COLEGIO CRISTIANO EL SHADAI</b>",
-                f"{direccion}" + (f" | Tel: {telefono}" if telefono else "") + (f" | Cel: {celular}" if celular else ""),
-                (f"Email: {email}" if email else "") + (f" | Web: {web}" if web else ""),
+            return self.recursos_pdf.pie_pagina(
+                styles,
                 f"Reporte de: {estudiante.usuario.nombres} {estudiante.usuario.apellidos} | Período: {periodo_nombre} | Generado: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
-            ]
-            
-            lineas = [linea for linea in lineas if linea.strip()]
-            texto = "<br/>".join(lineas)
-
-            linea = Table([[""]], colWidths=[15 * cm])
-            linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 1, colors.HexColor('#888'))]))
-
-            return [Spacer(1, 40), linea, Spacer(1, 8), Paragraph(texto, styles["PiePagina"])]
-
+            )
         except Exception as e:
             print(f"Error en pie de página: {e}")
             return [Spacer(1, 40)]
@@ -2618,33 +2190,11 @@ class ReporteNotasPDFView(View):
     def _crear_pie_pagina_final(self, colegio, estudiante, año_lectivo, styles):
         """Pie de página para boletín final"""
         try:
-            direccion = colegio.direccion if colegio.direccion else "Dirección no especificada"
-            
-            try:
-                recursos = self._obtener_o_crear_recursos(colegio)
-                telefono = recursos.telefono or ""
-                celular = getattr(recursos, "celular", "") or ""
-                email = recursos.email or ""
-                web = recursos.sitio_web or ""
-            except Exception as e:
-                telefono = celular = email = web = ""
-
             año_lectivo_str = año_lectivo.anho if año_lectivo else "General"
-            lineas = [
-                "<b>COLEGIO CRISTIANO EL SHADAI</b>",
-                f"{direccion}" + (f" | Tel: {telefono}" if telefono else "") + (f" | Cel: {celular}" if celular else ""),
-                (f"Email: {email}" if email else "") + (f" | Web: {web}" if web else ""),
+            return self.recursos_pdf.pie_pagina(
+                styles,
                 f"Boletín final de: {estudiante.usuario.nombres} {estudiante.usuario.apellidos} | Año: {año_lectivo_str} | Generado: {timezone.now().strftime('%d/%m/%Y %H:%M')}"
-            ]
-            
-            lineas = [linea for linea in lineas if linea.strip()]
-            texto = "<br/>".join(lineas)
-
-            linea = Table([[""]], colWidths=[15 * cm])
-            linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 1, colors.HexColor('#888'))]))
-
-            return [Spacer(1, 40), linea, Spacer(1, 8), Paragraph(texto, styles["PiePagina"])]
-
+            )
         except Exception as e:
             print(f"Error en pie de página: {e}")
             return [Spacer(1, 40)]
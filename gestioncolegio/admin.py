@@ -45,6 +45,13 @@ class AuditoriaSistemaAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'created_at'
 
+@admin.register(AuditoriaArchivada)
+class AuditoriaArchivadaAdmin(admin.ModelAdmin):
+    list_display = ['mes', 'cantidad', 'desde_id', 'hasta_id', 'created_at']
+    list_filter = ['mes']
+    exclude = ['contenido']
+    readonly_fields = ['mes', 'cantidad', 'desde_id', 'hasta_id', 'created_at', 'updated_at']
+
 
 @admin.register(NotificacionSistema)
 class NotificacionSistemaAdmin(admin.ModelAdmin):
@@ -60,4 +67,19 @@ class NotificacionSistemaAdmin(admin.ModelAdmin):
 #     list_display = ['nombre', 'colegio', 'direccion', 'telefono', 'director', 'estado']
 #     list_filter = ['colegio', 'estado']
 #     search_fields = ['nombre', 'direccion']
-#     autocomplete_fields = ['colegio', 'director']
\ No newline at end of file
+#     autocomplete_fields = ['colegio', 'director']
+
+@admin.register(DocumentoFirmado)
+class DocumentoFirmadoAdmin(admin.ModelAdmin):
+    list_display = ['tipo', 'estudiante', 'estado', 'intentos', 'fecha_firma', 'created_at']
+    list_filter = ['tipo', 'estado']
+    search_fields = ['hash_firmado', 'archivo_original']
+    readonly_fields = ['hash_firmado', 'fecha_firma', 'created_at', 'updated_at']
+
+
+@admin.register(CorreoSaliente)
+class CorreoSalienteAdmin(admin.ModelAdmin):
+    list_display = ['asunto', 'origen', 'estado', 'intentos', 'proximo_intento', 'enviado_en']
+    list_filter = ['estado', 'origen']
+    search_fields = ['asunto', 'remitente']
+    readonly_fields = ['enviado_en', 'created_at', 'updated_at']
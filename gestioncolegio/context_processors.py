@@ -1,8 +1,7 @@
 # gestioncolegio/context_processors.py
-from gestioncolegio.models import Colegio, ConfiguracionGeneral, AñoLectivo
+from gestioncolegio.models import Colegio, ConfiguracionGeneral
+from gestioncolegio.services import calendario, menus, notificaciones
 from estudiantes.models import Acudiente, Estudiante, Matricula
-from matricula.models import PeriodoAcademico
-from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,26 +21,26 @@ def informacion_colegio(request):
     }
 
 def menu_sistema(request):
-    """Context processor para menús del sistema por tipo de usuario"""
-    menus = []
-    if request.user.is_authenticated:
-        try:
-            from gestioncolegio.models import MenuSistema
-            tipo_usuario = getattr(request.user, 'tipo_usuario', None)
-            if tipo_usuario and hasattr(tipo_usuario, 'nombre'):
-                tipo_usuario_str = tipo_usuario.nombre.lower()
-                menus = MenuSistema.objects.filter(
-                    tipo_usuario=tipo_usuario_str,
-                    activo=True,
-                    padre__isnull=True
-                ).order_by('orden').prefetch_related('hijos')
-        except:
-            menus = []
-    
+    """Menú compilado del rol del usuario (services.menus), sin consultas"""
+    if not request.user.is_authenticated:
+        return {'menus_sistema': ()}
+    rol = menus.rol_menu(request.user)
     return {
-        'menus_sistema': menus,
+        'menus_sistema': menus.menu_rol(rol),
+        # Clave del fragmento en caché: cambia si cambia el registro
+        'menu_rol_clave': f'{rol}:{menus.HUELLA}',
     }
 
+def notificaciones_usuario(request):
+    """Número de notificaciones no leídas (contador en caché, sin COUNT por página)"""
+    if not request.user.is_authenticated:
+        return {}
+    try:
+        return {'notificaciones_no_leidas': notificaciones.no_leidas(request.user)}
+    except Exception as e:
+        logger.debug(f"Error obteniendo notificaciones no leídas: {e}")
+        return {'notificaciones_no_leidas': 0}
+
 def periodo_actual_processor(request):
     """Añade periodo_actual al contexto de todas las vistas - VERSIÓN MEJORADA"""
     periodo_actual = None
@@ -59,23 +58,8 @@ def periodo_actual_processor(request):
                         matricula_actual = estudiante.matricula_actual
                         
                         if matricula_actual and matricula_actual.grado_año_lectivo:
-                            año_lectivo = matricula_actual.grado_año_lectivo.año_lectivo
-                            hoy = timezone.now().date()
-                            
-                            # Buscar período actual
-                            periodo_actual = PeriodoAcademico.objects.filter(
-                                año_lectivo=año_lectivo,
-                                fecha_inicio__lte=hoy,
-                                fecha_fin__gte=hoy,
-                                estado=True
-                            ).first()
-                            
-                            if not periodo_actual:
-                                # Buscar último período
-                                periodo_actual = PeriodoAcademico.objects.filter(
-                                    año_lectivo=año_lectivo,
-                                    estado=True
-                                ).order_by('periodo__nombre').last()
+                            año_lectivo = matricula_actual.grado_año_lectivo.año_lectivo_id
+                            periodo_actual = calendario.periodo_actual(año_lectivo, solo_activos=True)
                     
                     except Estudiante.DoesNotExist:
                         logger.debug(f"Estudiante no encontrado para usuario: {request.user}")
@@ -85,24 +69,9 @@ def periodo_actual_processor(request):
                 # Para otros tipos de usuario (incluyendo acudientes, docentes, admin)
                 else:
                     # Usar año lectivo actual del sistema
-                    año_actual = AñoLectivo.objects.filter(estado=True).first()
+                    año_actual = calendario.año_activo()
                     if año_actual:
-                        hoy = timezone.now().date()
-                        
-                        # Buscar período actual
-                        periodo_actual = PeriodoAcademico.objects.filter(
-                            año_lectivo=año_actual,
-                            fecha_inicio__lte=hoy,
-                            fecha_fin__gte=hoy,
-                            estado=True
-                        ).first()
-                        
-                        if not periodo_actual:
-                            # Buscar último período del año
-                            periodo_actual = PeriodoAcademico.objects.filter(
-                                año_lectivo=año_actual,
-                                estado=True
-                            ).order_by('periodo__nombre').last()
+                        periodo_actual = calendario.periodo_actual(año_actual, solo_activos=True)
     
     except Exception as e:
         logger.debug(f"Error en periodo_actual_processor: {e}")
@@ -146,7 +115,7 @@ def acudiente_menu(request):
             context['user_acudientes'] = list(acudientes)
             
             # Obtener año lectivo actual
-            año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_lectivo_actual = calendario.año_activo()
             if año_lectivo_actual:
                 context['año_lectivo_actual'] = año_lectivo_actual
                 
@@ -197,7 +166,7 @@ def año_lectivo_admin_context(request):
             return {}
         
         # Obtener año lectivo actual
-        año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_lectivo_actual = calendario.año_activo()
         
         return {
             'año_lectivo_actual': año_lectivo_actual,
@@ -0,0 +1,25 @@
+# management/commands/archivar_auditoria.py
+from django.core.management.base import BaseCommand
+
+from gestioncolegio.services import auditoria
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Mueve los registros de auditoría antiguos a AuditoriaArchivada (comprimidos por mes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses', type=int, help='Meses que se conservan en la tabla activa (por defecto AUDITORIA_MESES_ACTIVOS)')
+        parser.add_argument('--lote', type=int, default=5000, help='Registros por bloque archivado (por defecto 5000)')
+
+    def handle(self, *args, **options):
+        corte = auditoria.fecha_corte(options['meses'])
+        self.stdout.write(f"Archivando auditoría anterior a {corte:%d/%m/%Y}...")
+        try:
+            archivados = auditoria.archivar(options['meses'], lote=options['lote'])
+        except Exception as e:
+            logger.exception("Error archivando auditoría")
+            self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"✓ {archivados} registro(s) archivado(s)"))
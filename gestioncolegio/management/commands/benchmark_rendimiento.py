@@ -0,0 +1,95 @@
+# management/commands/benchmark_rendimiento.py
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from gestioncolegio.services import benchmark, datos_sinteticos
+
+
+class Command(BaseCommand):
+    help = ('Mide tiempo y consultas de las rutas críticas sobre un colegio sintético '
+            'y falla si hay regresión frente a la línea base JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=sorted(datos_sinteticos.ESCALAS), default='mediana')
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--base', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json'),
+                            help='Archivo JSON de la línea base')
+        parser.add_argument('--guardar-base', action='store_true', dest='guardar_base',
+                            help='Escribe los resultados como nueva línea base')
+        parser.add_argument('--umbral', type=float, default=0.25,
+                            help='Regresión de tiempo permitida (0.25 = 25%%)')
+        parser.add_argument('--tolerancia-consultas', type=int, default=0, dest='tolerancia_consultas')
+        parser.add_argument('--solo', nargs='*', help='Nombres o etiquetas de escenarios a ejecutar')
+        parser.add_argument('--keepdb', action='store_true', help='Reutiliza la base de datos de pruebas')
+
+    def handle(self, *args, **options):
+        escenarios = benchmark.ESCENARIOS
+        if options['solo']:
+            solo = set(options['solo'])
+            escenarios = [e for e in escenarios if e.nombre in solo or solo & set(e.etiquetas)]
+            if not escenarios:
+                raise CommandError("Ningún escenario coincide con --solo")
+
+        # Siempre sobre una base de datos de pruebas: los escenarios escriben notas y asistencia
+        setup_test_environment()
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            if options['keepdb'] and datos_sinteticos.existe():
+                datos_sinteticos.limpiar()
+            self.stdout.write(f"Generando colegio sintético ({options['escala']})...")
+            contexto = datos_sinteticos.generar_colegio(options['escala'])
+            resultados = self.ejecutar(escenarios, contexto, options['repeticiones'])
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        resultados['_meta'] = {'escala': options['escala'], 'conteos': contexto['conteos']}
+        self.comparar_o_guardar(resultados, options)
+
+    def ejecutar(self, escenarios, contexto, repeticiones):
+        clientes = benchmark.clientes(contexto)
+        resultados = {}
+        self.stdout.write(f"{'escenario':32} {'ms':>10} {'consultas':>10} {'estado':>7}")
+        for escenario in escenarios:
+            medida = benchmark.medir(escenario, clientes[escenario.rol], contexto, repeticiones)
+            resultados[escenario.nombre] = medida
+            estilo = self.style.SUCCESS if medida['estado'] < 400 else self.style.ERROR
+            self.stdout.write(estilo(
+                f"{escenario.nombre:32} {medida['tiempo_ms']:>10} {medida['consultas']:>10} {medida['estado']:>7}"
+            ))
+        return resultados
+
+    def comparar_o_guardar(self, resultados, options):
+        ruta = options['base']
+        if options['guardar_base']:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2, ensure_ascii=False, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"✓ Línea base guardada en {ruta}"))
+            return
+
+        if not os.path.exists(ruta):
+            self.stdout.write(self.style.WARNING(f"No hay línea base en {ruta}; use --guardar-base"))
+            return
+
+        with open(ruta, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        if base.get('_meta', {}).get('escala') != options['escala']:
+            self.stdout.write(self.style.WARNING("La línea base se tomó con otra escala"))
+
+        regresiones = benchmark.comparar(
+            {nombre: valor for nombre, valor in resultados.items() if not nombre.startswith('_')},
+            base, options['umbral'], options['tolerancia_consultas']
+        )
+        if regresiones:
+            for regresion in regresiones:
+                self.stdout.write(self.style.ERROR(f"✗ {regresion}"))
+            raise CommandError(f"{len(regresiones)} regresiones frente a la línea base")
+
+        self.stdout.write(self.style.SUCCESS("✓ Sin regresiones frente a la línea base"))
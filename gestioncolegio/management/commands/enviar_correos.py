@@ -0,0 +1,55 @@
+# management/commands/enviar_correos.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from gestioncolegio.services import correo
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Envía los correos pendientes de la bandeja de salida por una conexión SMTP persistente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help='Correos por conexión (por defecto 50)')
+        parser.add_argument('--continuo', action='store_true', help='Seguir revisando la cola indefinidamente')
+        parser.add_argument('--intervalo', type=int, default=30, help='Segundos entre revisiones en modo continuo')
+
+    def handle(self, *args, **options):
+        total = {'enviados': 0, 'reintentos': 0, 'fallidos': 0}
+        try:
+            while True:
+                try:
+                    resumen = correo.procesar_cola(lote=options['lote'])
+                except Exception as e:
+                    logger.exception("Error procesando la bandeja de salida")
+                    self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
+                    if not options['continuo']:
+                        return
+                    resumen = {'enviados': 0, 'reintentos': 0, 'fallidos': 0, 'cuota_agotada': False}
+
+                for clave in total:
+                    total[clave] += resumen[clave]
+                if resumen['enviados'] or resumen['reintentos'] or resumen['fallidos']:
+                    self.stdout.write(
+                        f"Lote: {resumen['enviados']} enviado(s), {resumen['reintentos']} para reintentar, "
+                        f"{resumen['fallidos']} fallido(s)"
+                    )
+                if resumen['cuota_agotada']:
+                    self.stdout.write(self.style.WARNING("Cuota de envío agotada: se continuará más tarde"))
+
+                lote_completo = resumen['enviados'] + resumen['reintentos'] + resumen['fallidos'] >= options['lote']
+                if lote_completo and not resumen['cuota_agotada']:
+                    # Puede haber más pendientes: siguiente lote sin esperar
+                    continue
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write("Envío interrumpido")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {total['enviados']} correo(s) enviado(s), {total['reintentos']} para reintentar, "
+            f"{total['fallidos']} fallido(s)"
+        ))
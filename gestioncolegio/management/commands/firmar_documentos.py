@@ -0,0 +1,87 @@
+# management/commands/firmar_documentos.py
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from gestioncolegio.models import DocumentoFirmado
+from gestioncolegio.services import firma_digital
+from gestioncolegio.services.documentos_generados import DIRECTORIO_DOCUMENTOS
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Firma digitalmente por lotes las constancias y boletines generados pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=200, help='Documentos por lote (por defecto 200)')
+        parser.add_argument('--limite', type=int, help='Máximo de documentos a firmar en esta ejecución')
+        parser.add_argument('--procesos', type=int, help='Procesos de firma (por defecto FIRMA_DIGITAL_PROCESOS o núcleos)')
+        parser.add_argument('--reintentar-errores', action='store_true', help='Incluir documentos que fallaron antes')
+        parser.add_argument('--escanear', action='store_true', help='Encolar PDFs en disco que aún no tienen copia firmada')
+
+    def handle(self, *args, **options):
+        if not firma_digital.firma_activa():
+            self.stdout.write(self.style.ERROR(
+                "Firma digital desactivada: configure FIRMA_DIGITAL_ACTIVA y FIRMA_DIGITAL_CERTIFICADO"
+            ))
+            return
+
+        if options['escanear']:
+            encolados = self._escanear()
+            self.stdout.write(f"{encolados} documento(s) encolado(s) desde disco")
+
+        total_firmados = total_errores = 0
+        limite = options['limite']
+        while limite is None or total_firmados + total_errores < limite:
+            tamaño = options['lote'] if limite is None else min(options['lote'], limite - total_firmados - total_errores)
+            documentos = firma_digital.pendientes(tamaño, reintentar_errores=options['reintentar_errores'])
+            if not documentos:
+                break
+
+            try:
+                firmados, errores = firma_digital.firmar_lote(documentos, procesos=options['procesos'])
+            except Exception as e:
+                logger.exception("Error firmando lote de documentos")
+                self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
+                return
+
+            total_firmados += firmados
+            total_errores += errores
+            self.stdout.write(f"Lote: {firmados} firmado(s), {errores} con error")
+            if firmados == 0:
+                # Solo errores o documentos ya inexistentes: no insistir en este ciclo
+                break
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {total_firmados} documento(s) firmado(s), {total_errores} con error"
+        ))
+
+    def _escanear(self):
+        raiz = os.path.join(settings.MEDIA_ROOT, DIRECTORIO_DOCUMENTOS)
+        if not os.path.isdir(raiz):
+            return 0
+
+        registrados = set(DocumentoFirmado.objects.filter(
+            estado__in=['PEN', 'FIR']
+        ).values_list('archivo_original', flat=True))
+        tipos = [tipo for tipo, _ in DocumentoFirmado.TIPOS]
+
+        nuevos = []
+        for carpeta in os.listdir(raiz):
+            if not carpeta.isdigit():
+                continue
+            for nombre in os.listdir(os.path.join(raiz, carpeta)):
+                if not nombre.endswith('.pdf') or nombre.endswith(firma_digital.SUFIJO_FIRMADO):
+                    continue
+                relativa = os.path.join(DIRECTORIO_DOCUMENTOS, carpeta, nombre)
+                tipo = next((t for t in tipos if nombre.startswith(f'{t}_')), None)
+                if tipo is None or relativa in registrados:
+                    continue
+                if os.path.exists(os.path.join(settings.MEDIA_ROOT, firma_digital.ruta_firmada(relativa))):
+                    continue
+                nuevos.append(DocumentoFirmado(tipo=tipo, estudiante_id=int(carpeta), archivo_original=relativa))
+
+        DocumentoFirmado.objects.bulk_create(nuevos, batch_size=500)
+        return len(nuevos)
@@ -0,0 +1,46 @@
+# management/commands/generar_colegio_sintetico.py
+from django.core.management.base import BaseCommand, CommandError
+from gestioncolegio.services import datos_sinteticos
+
+
+class Command(BaseCommand):
+    help = 'Genera un colegio sintético (sedes, grados, estudiantes e historial) para benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=sorted(datos_sinteticos.ESCALAS), default='chica',
+                            help='Tamaño base; las demás opciones lo sobrescriben')
+        parser.add_argument('--sedes', type=int)
+        parser.add_argument('--estudiantes-por-grado', type=int, dest='estudiantes_por_grado')
+        parser.add_argument('--años', type=int, help='Años lectivos de historial (incluye el actual)')
+        parser.add_argument('--dias-asistencia', type=int, dest='dias_asistencia',
+                            help='Días hábiles de asistencia por período')
+        parser.add_argument('--comportamientos', type=int, help='Registros de comportamiento por estudiante y período')
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument('--password', default='sintetico123', help='Contraseña de todos los usuarios sintéticos')
+        parser.add_argument('--limpiar', action='store_true', help='Borra el colegio sintético existente antes de generar')
+
+    def handle(self, *args, **options):
+        if datos_sinteticos.existe():
+            if not options['limpiar']:
+                raise CommandError("Ya existe un colegio sintético; use --limpiar para regenerarlo")
+            self.stdout.write("Borrando colegio sintético anterior...")
+            datos_sinteticos.limpiar()
+
+        contexto = datos_sinteticos.generar_colegio(
+            options['escala'],
+            sedes=options['sedes'],
+            estudiantes_por_grado=options['estudiantes_por_grado'],
+            años=options['años'],
+            dias_asistencia=options['dias_asistencia'],
+            comportamientos=options['comportamientos'],
+            semilla=options['semilla'],
+            password=options['password'],
+            salida=self.stdout.write,
+        )
+
+        for nombre, cantidad in contexto['conteos'].items():
+            self.stdout.write(f"  {nombre}: {cantidad}")
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Colegio sintético generado. Administrador: {contexto['usuario_admin'].username}, "
+            f"docente: {contexto['usuario_docente'].username}"
+        ))
@@ -0,0 +1,64 @@
+# management/commands/generar_derivados_imagenes.py
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from gestioncolegio.services import dashboard_estudiante, imagenes
+from web import cache_sitio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Genera las miniaturas y tamaños web (WebP/JPEG) de las imágenes ya subidas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modelo', action='append',
+                            help='Solo este modelo (p. ej. estudiantes.Estudiante); se puede repetir')
+        parser.add_argument('--forzar', action='store_true', help='Regenerar aunque los derivados ya existan')
+        parser.add_argument('--lote', type=int, default=200, help='Filas leídas por consulta (por defecto 200)')
+
+    def handle(self, *args, **options):
+        campos = imagenes.CAMPOS_IMAGEN
+        if options['modelo']:
+            pedidos = {etiqueta.lower() for etiqueta in options['modelo']}
+            campos = [(etiqueta, campo) for etiqueta, campo in campos if etiqueta.lower() in pedidos]
+            if not campos:
+                self.stdout.write(self.style.ERROR(
+                    f"Modelo no admitido. Opciones: {', '.join(e for e, _ in imagenes.CAMPOS_IMAGEN)}"
+                ))
+                return
+
+        total_imagenes = total_archivos = 0
+        for etiqueta, campo in campos:
+            modelo = apps.get_model(etiqueta)
+            filas = modelo.objects.exclude(**{campo: ''}).exclude(**{f'{campo}__isnull': True}).only('pk', campo)
+            procesadas = archivos = 0
+            vistos = set()
+            for instancia in filas.iterator(chunk_size=options['lote']):
+                archivo = getattr(instancia, campo)
+                # La migración reutiliza el mismo archivo en varias filas
+                if archivo.name in vistos:
+                    continue
+                vistos.add(archivo.name)
+                try:
+                    escritos = imagenes.generar(archivo, forzar=options['forzar'])
+                except Exception as e:
+                    logger.exception(f"Error generando derivados de {archivo.name}")
+                    self.stdout.write(self.style.ERROR(f"Error en {archivo.name}: {str(e)}"))
+                    continue
+                if escritos:
+                    procesadas += 1
+                    archivos += escritos
+
+            if procesadas and etiqueta.startswith('web.'):
+                # Las páginas públicas en caché todavía apuntan a los originales
+                cache_sitio.invalidar_modelo(etiqueta.split('.', 1)[1])
+            if procesadas and etiqueta == 'estudiantes.Estudiante':
+                dashboard_estudiante.invalidar_todos()
+            self.stdout.write(f"{etiqueta}.{campo}: {procesadas} imagen(es), {archivos} archivo(s)")
+            total_imagenes += procesadas
+            total_archivos += archivos
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {total_imagenes} imagen(es) procesada(s), {total_archivos} derivado(s) escrito(s)"
+        ))
@@ -0,0 +1,98 @@
+# management/commands/notificar_calificaciones_pendientes.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from django.utils import timezone
+
+from gestioncolegio.models import NotificacionSistema
+from gestioncolegio.services import correo, docentes_atrasados, notificaciones as servicio_notificaciones
+from matricula.models import PeriodoAcademico
+from usuarios.models import Docente
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Notifica a los docentes con calificaciones pendientes en períodos próximos a cerrar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=7, help='Días antes del cierre del período (por defecto 7)')
+        parser.add_argument('--umbral', type=float, default=100, help='Porcentaje mínimo de avance esperado (por defecto 100)')
+        parser.add_argument('--email', action='store_true', help='Enviar también un correo al docente')
+        parser.add_argument('--dry-run', action='store_true', help='Solo mostrar, no crear notificaciones')
+
+    def handle(self, *args, **options):
+        hoy = timezone.now().date()
+        limite = hoy + timedelta(days=options['dias'])
+
+        periodos = PeriodoAcademico.objects.filter(
+            año_lectivo__estado=True,
+            estado=True,
+            fecha_fin__gte=hoy,
+            fecha_fin__lte=limite,
+        ).select_related('periodo', 'año_lectivo')
+
+        if not periodos:
+            self.stdout.write(f"No hay períodos que cierren antes del {limite:%d/%m/%Y}")
+            return
+
+        try:
+            url_destino = reverse('docentes:calificar_notas')
+        except Exception:
+            url_destino = ''
+
+        total_notificaciones = 0
+        for periodo in periodos:
+            atrasados = docentes_atrasados(periodo, umbral=options['umbral'])
+            self.stdout.write(
+                f"{periodo.periodo.nombre} {periodo.año_lectivo.anho} "
+                f"(cierra {periodo.fecha_fin:%d/%m/%Y}): {len(atrasados)} docente(s) atrasado(s)"
+            )
+            if not atrasados:
+                continue
+
+            usuarios = dict(
+                Docente.objects.filter(
+                    id__in=[d['docente_id'] for d in atrasados]
+                ).values_list('id', 'usuario_id')
+            )
+
+            notificaciones = []
+            for docente in atrasados:
+                mensaje = (
+                    f"Tiene {docente['pendientes_periodo']} calificación(es) pendiente(s) en "
+                    f"{periodo.periodo.nombre} ({docente['porcentaje']}% de avance). "
+                    f"El período cierra el {periodo.fecha_fin:%d/%m/%Y}."
+                )
+                self.stdout.write(f"  - {docente['docente']}: {docente['pendientes_periodo']} pendientes")
+
+                if options['dry_run'] or docente['docente_id'] not in usuarios:
+                    continue
+
+                notificaciones.append(NotificacionSistema(
+                    usuario_id=usuarios[docente['docente_id']],
+                    titulo='Calificaciones pendientes',
+                    mensaje=mensaje,
+                    tipo='warning',
+                    url_destino=url_destino,
+                ))
+
+                if options['email'] and docente['email']:
+                    try:
+                        correo.encolar(
+                            f"Calificaciones pendientes - {periodo.periodo.nombre}",
+                            mensaje,
+                            [docente['email']],
+                            origen='calificaciones_pendientes',
+                        )
+                    except Exception as e:
+                        logger.error(f"Error encolando correo a {docente['email']}: {str(e)}")
+
+            if notificaciones:
+                total_notificaciones += servicio_notificaciones.guardar(notificaciones)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("Modo prueba: no se crearon notificaciones"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✓ {total_notificaciones} notificaciones creadas"))
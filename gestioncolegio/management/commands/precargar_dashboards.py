@@ -0,0 +1,38 @@
+# management/commands/precargar_dashboards.py
+from django.core.management.base import BaseCommand
+from estudiantes.models import Estudiante
+from gestioncolegio.services import precargar_snapshots
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Precarga en caché los dashboards de los estudiantes activos (ejecutar antes de la jornada)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estudiante_id', type=int, help='ID de un estudiante específico')
+        parser.add_argument('--sede_id', type=int, help='Solo estudiantes matriculados en esta sede')
+
+    def handle(self, *args, **options):
+        estudiantes = Estudiante.objects.filter(
+            estado=True,
+            matriculas__año_lectivo__estado=True,
+            matriculas__estado__in=['ACT', 'PEN']
+        ).select_related('usuario').distinct()
+
+        if options['estudiante_id']:
+            estudiantes = estudiantes.filter(id=options['estudiante_id'])
+
+        if options['sede_id']:
+            estudiantes = estudiantes.filter(matriculas__sede_id=options['sede_id'])
+
+        self.stdout.write("Precargando dashboards de estudiantes...")
+
+        try:
+            total = precargar_snapshots(estudiantes)
+        except Exception as e:
+            logger.exception("Error precargando dashboards")
+            self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {total} dashboards precargados"))
@@ -0,0 +1,14 @@
+# management/commands/purgar_muestras_rendimiento.py
+from django.core.management.base import BaseCommand
+from gestioncolegio.services.rendimiento import purgar_muestras
+
+
+class Command(BaseCommand):
+    help = 'Borra las muestras de instrumentación más antiguas que --dias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30, help='Conservar las muestras de los últimos N días')
+
+    def handle(self, *args, **options):
+        borradas = purgar_muestras(options['dias'])
+        self.stdout.write(self.style.SUCCESS(f"✓ {borradas} muestras eliminadas"))
@@ -0,0 +1,32 @@
+# management/commands/reconstruir_posiciones.py
+from django.core.management.base import BaseCommand
+from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services.posiciones import reconstruir_posiciones
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Recalcula promedio, puesto y percentil de los estudiantes por curso, período y año'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--año_lectivo_id', type=int, help='Solo este año lectivo')
+
+    def handle(self, *args, **options):
+        año_lectivo = None
+        if options['año_lectivo_id']:
+            año_lectivo = AñoLectivo.objects.filter(id=options['año_lectivo_id']).first()
+            if not año_lectivo:
+                self.stdout.write(self.style.ERROR("Año lectivo no encontrado"))
+                return
+
+        self.stdout.write("Reconstruyendo posiciones de estudiantes...")
+
+        try:
+            total = reconstruir_posiciones(año_lectivo)
+        except Exception as e:
+            logger.exception("Error reconstruyendo posiciones")
+            self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"✓ {total} posiciones calculadas"))
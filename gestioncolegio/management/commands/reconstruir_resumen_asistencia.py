@@ -0,0 +1,34 @@
+# management/commands/reconstruir_resumen_asistencia.py
+from django.core.management.base import BaseCommand
+from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services import reconstruir_resumenes
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Recalcula los resúmenes de asistencia por estudiante/período y por curso/día'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--año_lectivo_id', type=int, help='Solo este año lectivo')
+
+    def handle(self, *args, **options):
+        año_lectivo = None
+        if options['año_lectivo_id']:
+            año_lectivo = AñoLectivo.objects.filter(id=options['año_lectivo_id']).first()
+            if not año_lectivo:
+                self.stdout.write(self.style.ERROR("Año lectivo no encontrado"))
+                return
+
+        self.stdout.write("Reconstruyendo resúmenes de asistencia...")
+
+        try:
+            por_periodo, por_curso = reconstruir_resumenes(año_lectivo)
+        except Exception as e:
+            logger.exception("Error reconstruyendo resúmenes de asistencia")
+            self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {por_periodo} resúmenes por período y {por_curso} por curso"
+        ))
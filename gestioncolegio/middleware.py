@@ -0,0 +1,139 @@
+# middleware.py en la app gestioncolegio
+"""
+Middleware de instrumentación por vista (opcional)
+
+Se activa con INSTRUMENTACION_ACTIVA=True. Por cada petición muestreada
+registra: vista resuelta, duración, número de consultas, tiempo total de SQL,
+consultas repetidas con la misma huella (N+1), tiempo de render de la
+plantilla (TemplateResponse) y tamaño de la respuesta.
+
+Si desde la página de perfiles se programa una captura de cProfile para una
+vista, las siguientes peticiones a esa vista guardan además el perfil.
+"""
+import cProfile
+import io
+import pstats
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.urls import Resolver404, resolve
+
+from gestioncolegio.services import rendimiento
+
+
+class RegistroConsultas:
+    """execute_wrapper que mide cada consulta y guarda su huella"""
+
+    def __init__(self):
+        self.huellas = []
+        self.tiempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo += time.perf_counter() - inicio
+            self.huellas.append(rendimiento.huella_sql(sql))
+
+
+class InstrumentacionMiddleware:
+    """Muestras de consultas y latencia por vista para la página de perfiles"""
+
+    RUTAS_EXCLUIDAS = ('/static/', '/media/', '/favicon.ico')
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTACION_ACTIVA', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.muestreo = getattr(settings, 'INSTRUMENTACION_MUESTREO', 1.0)
+
+    def __call__(self, request):
+        if request.path.startswith(self.RUTAS_EXCLUIDAS):
+            return self.get_response(request)
+
+        objetivo = rendimiento.objetivo_perfil()
+        perfilar = bool(objetivo) and self.vista_de_ruta(request.path_info) == objetivo['vista'] \
+            and random.random() < objetivo.get('muestreo', 1.0)
+
+        if not perfilar and random.random() >= self.muestreo:
+            return self.get_response(request)
+
+        registro = RegistroConsultas()
+        request._instrumentacion_render = None
+        perfilador = cProfile.Profile() if perfilar else None
+
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(registro):
+            if perfilador:
+                perfilador.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if perfilador:
+                    perfilador.disable()
+        duracion = (time.perf_counter() - inicio) * 1000
+
+        try:
+            self.guardar(request, response, registro, duracion, perfilador)
+            if perfilador:
+                rendimiento.consumir_perfil(objetivo)
+        except Exception as e:
+            # La instrumentación nunca debe romper la petición
+            print(f"Error registrando instrumentación: {str(e)}")
+
+        return response
+
+    def process_template_response(self, request, response):
+        """Envuelve render() para medir el tiempo de la plantilla"""
+        render_original = response.render
+
+        def render_medido():
+            inicio = time.perf_counter()
+            resultado = render_original()
+            request._instrumentacion_render = (time.perf_counter() - inicio) * 1000
+            return resultado
+
+        response.render = render_medido
+        return response
+
+    @staticmethod
+    def vista_de_ruta(path):
+        try:
+            return resolve(path).view_name
+        except Resolver404:
+            return None
+
+    def guardar(self, request, response, registro, duracion, perfilador):
+        match = getattr(request, 'resolver_match', None)
+        vista = match.view_name if match else 'sin_resolver'
+
+        repetidas, huella = rendimiento.duplicadas(registro.huellas)
+
+        tamano = None
+        if not getattr(response, 'streaming', False):
+            tamano = len(response.content)
+
+        perfil = ''
+        if perfilador:
+            salida = io.StringIO()
+            pstats.Stats(perfilador, stream=salida).sort_stats('cumulative').print_stats(40)
+            perfil = salida.getvalue()
+
+        rendimiento.registrar_muestra(
+            vista=vista[:150],
+            metodo=request.method,
+            ruta=request.path[:255],
+            codigo_estado=response.status_code,
+            duracion_ms=round(duracion, 2),
+            consultas=len(registro.huellas),
+            tiempo_sql_ms=round(registro.tiempo * 1000, 2),
+            consultas_duplicadas=repetidas,
+            huella_duplicada=huella,
+            render_ms=round(request._instrumentacion_render, 2) if request._instrumentacion_render is not None else None,
+            tamano_bytes=tamano,
+            perfil=perfil,
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestioncolegio', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MuestraRendimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('vista', models.CharField(db_index=True, max_length=150)),
+                ('metodo', models.CharField(max_length=10)),
+                ('ruta', models.CharField(max_length=255)),
+                ('codigo_estado', models.PositiveSmallIntegerField()),
+                ('duracion_ms', models.FloatField()),
+                ('consultas', models.PositiveIntegerField(default=0)),
+                ('tiempo_sql_ms', models.FloatField(default=0)),
+                ('consultas_duplicadas', models.PositiveIntegerField(default=0)),
+                ('huella_duplicada', models.TextField(blank=True, help_text='SQL normalizado que más se repitió (posible N+1)')),
+                ('render_ms', models.FloatField(blank=True, null=True)),
+                ('tamano_bytes', models.PositiveIntegerField(blank=True, null=True)),
+                ('perfil', models.TextField(blank=True, help_text='Salida de cProfile si la petición fue perfilada')),
+            ],
+            options={
+                'verbose_name': 'Muestra de Rendimiento',
+                'verbose_name_plural': 'Muestras de Rendimiento',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['vista', '-created_at'], name='muestra_vista_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estudiantes', '0003_posicionestudiante'),
+        ('gestioncolegio', '0003_muestrarendimiento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoFirmado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tipo', models.CharField(choices=[('constancia', 'Constancia de estudio'), ('reporte_notas', 'Reporte de notas'), ('boletin_final', 'Boletín final')], max_length=20)),
+                ('archivo_original', models.CharField(db_index=True, help_text='Ruta relativa a MEDIA_ROOT', max_length=255)),
+                ('archivo_firmado', models.CharField(blank=True, max_length=255)),
+                ('hash_firmado', models.CharField(blank=True, db_index=True, help_text='SHA-256 del PDF firmado', max_length=64)),
+                ('estado', models.CharField(choices=[('PEN', 'Pendiente'), ('FIR', 'Firmado'), ('ERR', 'Error')], default='PEN', max_length=3)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('fecha_firma', models.DateTimeField(blank=True, null=True)),
+                ('estudiante', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='documentos_firmados', to='estudiantes.estudiante')),
+            ],
+            options={
+                'verbose_name': 'Documento Firmado',
+                'verbose_name_plural': 'Documentos Firmados',
+                'indexes': [models.Index(fields=['estado', 'created_at'], name='documento_firma_estado_idx')],
+            },
+        ),
+    ]
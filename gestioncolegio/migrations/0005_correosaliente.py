@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestioncolegio', '0004_documentofirmado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoSaliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('asunto', models.CharField(max_length=255)),
+                ('cuerpo', models.TextField()),
+                ('cuerpo_html', models.TextField(blank=True)),
+                ('remitente', models.CharField(max_length=254)),
+                ('destinatarios', models.JSONField(default=list)),
+                ('responder_a', models.JSONField(blank=True, default=list)),
+                ('origen', models.CharField(blank=True, help_text='Funcionalidad que generó el correo', max_length=50)),
+                ('estado', models.CharField(choices=[('PEN', 'Pendiente'), ('ENV', 'Enviado'), ('ERR', 'Fallido')], default='PEN', max_length=3)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('enviado_en', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Correo Saliente',
+                'verbose_name_plural': 'Correos Salientes',
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_intento_idx'), models.Index(fields=['estado', 'enviado_en'], name='correo_estado_enviado_idx')],
+            },
+        ),
+    ]
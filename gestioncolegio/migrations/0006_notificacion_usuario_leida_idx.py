@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestioncolegio', '0005_correosaliente'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacionsistema',
+            index=models.Index(fields=['usuario', 'leida'], name='notificacion_usuario_leida_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestioncolegio', '0006_notificacion_usuario_leida_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditoriaArchivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('mes', models.DateField(db_index=True, help_text='Primer día del mes de los eventos')),
+                ('desde_id', models.BigIntegerField()),
+                ('hasta_id', models.BigIntegerField()),
+                ('cantidad', models.PositiveIntegerField()),
+                ('contenido', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Auditoría Archivada',
+                'verbose_name_plural': 'Auditorías Archivadas',
+                'ordering': ['mes', 'desde_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='auditoriasistema',
+            index=models.Index(fields=['-created_at'], name='auditoria_recientes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditoriasistema',
+            index=models.Index(fields=['usuario', '-created_at'], name='auditoria_usuario_idx'),
+        ),
+    ]
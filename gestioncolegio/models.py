@@ -136,6 +136,28 @@ class AuditoriaSistema(BaseModel):
         verbose_name = "Auditoría del Sistema"
         verbose_name_plural = "Auditorías del Sistema"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='auditoria_recientes_idx'),
+            models.Index(fields=['usuario', '-created_at'], name='auditoria_usuario_idx'),
+        ]
+
+
+class AuditoriaArchivada(BaseModel):
+    """Bloque de eventos de auditoría antiguos (JSON por líneas comprimido con gzip)"""
+    mes = models.DateField(db_index=True, help_text="Primer día del mes de los eventos")
+    desde_id = models.BigIntegerField()
+    hasta_id = models.BigIntegerField()
+    cantidad = models.PositiveIntegerField()
+    contenido = models.BinaryField()
+
+    class Meta:
+        ordering = ['mes', 'desde_id']
+        verbose_name = "Auditoría Archivada"
+        verbose_name_plural = "Auditorías Archivadas"
+
+    def __str__(self):
+        return f"Auditoría {self.mes:%Y-%m} ({self.cantidad} eventos)"
+
 
 class NotificacionSistema(BaseModel):
     """Sistema de notificaciones"""
@@ -156,9 +178,115 @@ class NotificacionSistema(BaseModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['usuario', 'leida'], name='notificacion_usuario_leida_idx'),
+        ]
         verbose_name = "Notificación del Sistema"
         verbose_name_plural = "Notificaciones del Sistema"
     
     def __str__(self):
         return f"{self.usuario} - {self.titulo}"
 
+
+# ================ RENDIMIENTO ==================
+class MuestraRendimiento(BaseModel):
+    """Muestra de instrumentación de una petición (solo con INSTRUMENTACION_ACTIVA)"""
+    vista = models.CharField(max_length=150, db_index=True)
+    metodo = models.CharField(max_length=10)
+    ruta = models.CharField(max_length=255)
+    codigo_estado = models.PositiveSmallIntegerField()
+    duracion_ms = models.FloatField()
+    consultas = models.PositiveIntegerField(default=0)
+    tiempo_sql_ms = models.FloatField(default=0)
+    consultas_duplicadas = models.PositiveIntegerField(default=0)
+    huella_duplicada = models.TextField(blank=True, help_text="SQL normalizado que más se repitió (posible N+1)")
+    render_ms = models.FloatField(null=True, blank=True)
+    tamano_bytes = models.PositiveIntegerField(null=True, blank=True)
+    perfil = models.TextField(blank=True, help_text="Salida de cProfile si la petición fue perfilada")
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['vista', '-created_at'], name='muestra_vista_fecha_idx'),
+        ]
+        verbose_name = "Muestra de Rendimiento"
+        verbose_name_plural = "Muestras de Rendimiento"
+
+    def __str__(self):
+        return f"{self.vista} - {self.duracion_ms:.0f} ms - {self.consultas} consultas"
+
+
+# ============== DOCUMENTOS FIRMADOS ===============
+class DocumentoFirmado(BaseModel):
+    """
+    Cola y registro de firma digital de los PDF generados: las filas pendientes
+    las firma el comando firmar_documentos; las firmadas permiten verificar un
+    documento por el SHA-256 del archivo firmado
+    """
+    ESTADOS = [
+        ('PEN', 'Pendiente'),
+        ('FIR', 'Firmado'),
+        ('ERR', 'Error'),
+    ]
+    TIPOS = [
+        ('constancia', 'Constancia de estudio'),
+        ('reporte_notas', 'Reporte de notas'),
+        ('boletin_final', 'Boletín final'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    estudiante = models.ForeignKey('estudiantes.Estudiante', on_delete=models.SET_NULL, null=True, blank=True, related_name='documentos_firmados')
+    archivo_original = models.CharField(max_length=255, db_index=True, help_text="Ruta relativa a MEDIA_ROOT")
+    archivo_firmado = models.CharField(max_length=255, blank=True)
+    hash_firmado = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 del PDF firmado")
+    estado = models.CharField(max_length=3, choices=ESTADOS, default='PEN')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    fecha_firma = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'created_at'], name='documento_firma_estado_idx'),
+        ]
+        verbose_name = "Documento Firmado"
+        verbose_name_plural = "Documentos Firmados"
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.estudiante} ({self.get_estado_display()})"
+
+
+# ================ CORREO SALIENTE =================
+class CorreoSaliente(BaseModel):
+    """
+    Bandeja de salida: los correos se guardan aquí y el comando enviar_correos
+    los envía por lotes fuera de la petición
+    """
+    ESTADOS = [
+        ('PEN', 'Pendiente'),
+        ('ENV', 'Enviado'),
+        ('ERR', 'Fallido'),
+    ]
+
+    asunto = models.CharField(max_length=255)
+    cuerpo = models.TextField()
+    cuerpo_html = models.TextField(blank=True)
+    remitente = models.CharField(max_length=254)
+    destinatarios = models.JSONField(default=list)
+    responder_a = models.JSONField(default=list, blank=True)
+    origen = models.CharField(max_length=50, blank=True, help_text="Funcionalidad que generó el correo")
+    estado = models.CharField(max_length=3, choices=ESTADOS, default='PEN')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    enviado_en = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_estado_intento_idx'),
+            models.Index(fields=['estado', 'enviado_en'], name='correo_estado_enviado_idx'),
+        ]
+        verbose_name = "Correo Saliente"
+        verbose_name_plural = "Correos Salientes"
+
+    def __str__(self):
+        return f"{self.asunto} -> {', '.join(self.destinatarios)} ({self.get_estado_display()})"
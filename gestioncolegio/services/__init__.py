@@ -0,0 +1,48 @@
+# services/__init__.py
+from .dashboard_estudiante import (
+    obtener_snapshot,
+    guardar_snapshot,
+    invalidar_snapshot,
+    precargar_snapshots,
+)
+from .calificaciones import (
+    anotar_progreso,
+    progreso_asignaturas,
+    resumen_progreso,
+    pendientes_por_docente,
+    obtener_matriz,
+    invalidar_monitor,
+    docentes_atrasados,
+)
+from .asistencia import (
+    estadisticas as estadisticas_asistencia,
+    matriz_asistencia,
+    reconstruir_resumenes,
+    resumen_estudiante,
+    serie_mensual,
+    totales as totales_asistencia,
+)
+from .precarga_estudiantes import precargar_estudiantes
+from . import calendario
+
+__all__ = [
+    'obtener_snapshot',
+    'guardar_snapshot',
+    'invalidar_snapshot',
+    'precargar_snapshots',
+    'anotar_progreso',
+    'progreso_asignaturas',
+    'resumen_progreso',
+    'pendientes_por_docente',
+    'obtener_matriz',
+    'invalidar_monitor',
+    'docentes_atrasados',
+    'estadisticas_asistencia',
+    'matriz_asistencia',
+    'reconstruir_resumenes',
+    'resumen_estudiante',
+    'serie_mensual',
+    'totales_asistencia',
+    'precargar_estudiantes',
+    'calendario',
+]
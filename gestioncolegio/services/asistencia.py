@@ -0,0 +1,276 @@
+"""
+Resúmenes materializados de asistencia
+gestioncolegio/services/asistencia.py
+
+ResumenAsistenciaPeriodo (estudiante, período) y ResumenAsistenciaCurso
+(grado_año_lectivo, fecha) guardan los conteos de asistencias, faltas y
+justificadas. Cada alta, cambio de estado o borrado de una Asistencia aplica
+un delta (+1/-1) con F() sobre la fila correspondiente, así los reportes leen
+unas pocas filas pequeñas en vez de contar registros diarios.
+
+Las escrituras masivas que no disparan señales (update(), bulk_create) deben
+ir seguidas de reconstruir_resumenes().
+
+matriz_asistencia() arma el roster de un curso con su asistencia en un número
+fijo de consultas; la usan el calendario, la captura diaria y el reporte de
+curso de los docentes.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from comportamiento.models import Asistencia, ResumenAsistenciaCurso, ResumenAsistenciaPeriodo
+from estudiantes.models import Estudiante, Matricula
+
+# Estado de Asistencia -> campo del resumen
+CAMPOS_ESTADO = {
+    'A': 'asistencias',
+    'F': 'faltas',
+    'J': 'justificadas',
+}
+
+
+def _aplicar_delta(modelo, lookup, campo, delta):
+    """Suma delta al campo de la fila identificada por lookup (la crea si falta)"""
+    if modelo.objects.filter(**lookup).update(**{campo: F(campo) + delta}):
+        return
+    if delta < 0:
+        # No hay fila que descontar (resumen aún sin reconstruir)
+        return
+    try:
+        with transaction.atomic():
+            modelo.objects.create(**lookup, **{campo: delta})
+    except IntegrityError:
+        # Otra petición creó la fila entre el update y el create
+        modelo.objects.filter(**lookup).update(**{campo: F(campo) + delta})
+
+
+def _grado_del_estudiante(estudiante_id, periodo_id):
+    return Matricula.objects.filter(
+        estudiante_id=estudiante_id,
+        año_lectivo__periodos_academicos=periodo_id,
+    ).values_list('grado_año_lectivo_id', flat=True).first()
+
+
+def registrar_movimiento(estudiante_id, periodo_id, fecha, estado, delta, grado_año_lectivo_id=None):
+    """Aplica +1/-1 del estado dado en ambos resúmenes"""
+    campo = CAMPOS_ESTADO.get(estado)
+    if not campo or not periodo_id:
+        return
+
+    _aplicar_delta(
+        ResumenAsistenciaPeriodo,
+        {'estudiante_id': estudiante_id, 'periodo_academico_id': periodo_id},
+        campo, delta
+    )
+
+    grado_año_lectivo_id = grado_año_lectivo_id or _grado_del_estudiante(estudiante_id, periodo_id)
+    if grado_año_lectivo_id:
+        _aplicar_delta(
+            ResumenAsistenciaCurso,
+            {'grado_año_lectivo_id': grado_año_lectivo_id, 'fecha': fecha},
+            campo, delta
+        )
+
+
+def registrar_cambio(anterior, actual):
+    """
+    anterior y actual son tuplas (estudiante_id, periodo_id, fecha, estado)
+    o None (alta / borrado). Solo toca los resúmenes si algo cambió.
+    """
+    if anterior == actual:
+        return
+    if anterior:
+        registrar_movimiento(*anterior, delta=-1)
+    if actual:
+        registrar_movimiento(*actual, delta=1)
+
+
+def reconstruir_resumenes(año_lectivo=None):
+    """Recalcula desde cero los resúmenes (todos o de un año lectivo)"""
+    asistencias = Asistencia.objects.all()
+    resumenes_periodo = ResumenAsistenciaPeriodo.objects.all()
+    resumenes_curso = ResumenAsistenciaCurso.objects.all()
+    if año_lectivo is not None:
+        año_id = getattr(año_lectivo, 'id', año_lectivo)
+        asistencias = asistencias.filter(periodo_academico__año_lectivo_id=año_id)
+        resumenes_periodo = resumenes_periodo.filter(periodo_academico__año_lectivo_id=año_id)
+        resumenes_curso = resumenes_curso.filter(grado_año_lectivo__año_lectivo_id=año_id)
+
+    conteos = {campo: Count('id', filter=Q(estado=estado)) for estado, campo in CAMPOS_ESTADO.items()}
+
+    por_periodo = [
+        ResumenAsistenciaPeriodo(**fila)
+        for fila in asistencias.values('estudiante_id', 'periodo_academico_id').annotate(**conteos).order_by()
+    ]
+
+    # El curso sale de la matrícula del estudiante en el año del período
+    por_curso = defaultdict(lambda: dict.fromkeys(CAMPOS_ESTADO.values(), 0))
+    for fila in asistencias.filter(
+        estudiante__matriculas__año_lectivo=F('periodo_academico__año_lectivo')
+    ).values('estudiante__matriculas__grado_año_lectivo_id', 'fecha').annotate(**conteos).order_by():
+        clave = (fila['estudiante__matriculas__grado_año_lectivo_id'], fila['fecha'])
+        for campo in CAMPOS_ESTADO.values():
+            por_curso[clave][campo] += fila[campo]
+
+    with transaction.atomic():
+        resumenes_periodo.delete()
+        resumenes_curso.delete()
+        ResumenAsistenciaPeriodo.objects.bulk_create(por_periodo, batch_size=1000)
+        ResumenAsistenciaCurso.objects.bulk_create(
+            [
+                ResumenAsistenciaCurso(grado_año_lectivo_id=grado_id, fecha=fecha, **valores)
+                for (grado_id, fecha), valores in por_curso.items()
+            ],
+            batch_size=1000
+        )
+
+    return len(por_periodo), len(por_curso)
+
+
+# =============================================
+# LECTURAS
+# =============================================
+
+def _con_porcentaje(asistencias, faltas, justificadas, decimales=2):
+    total = asistencias + faltas + justificadas
+    return {
+        'total': total,
+        'asistencias': asistencias,
+        'faltas': faltas,
+        'justificadas': justificadas,
+        'porcentaje': round(asistencias / total * 100, decimales) if total > 0 else 0,
+    }
+
+
+def totales(resumenes, decimales=2):
+    """Suma un queryset de resúmenes (de período o de curso)"""
+    suma = resumenes.aggregate(
+        asistencias=Sum('asistencias'),
+        faltas=Sum('faltas'),
+        justificadas=Sum('justificadas'),
+    )
+    return _con_porcentaje(
+        suma['asistencias'] or 0,
+        suma['faltas'] or 0,
+        suma['justificadas'] or 0,
+        decimales
+    )
+
+
+def resumen_estudiante(estudiante, periodos=None):
+    """Resúmenes por período de un estudiante (una consulta)"""
+    resumenes = ResumenAsistenciaPeriodo.objects.filter(
+        estudiante=estudiante
+    ).select_related('periodo_academico__periodo', 'periodo_academico__año_lectivo')
+    if periodos is not None:
+        resumenes = resumenes.filter(periodo_academico__in=periodos)
+
+    return {
+        r.periodo_academico_id: dict(
+            _con_porcentaje(r.asistencias, r.faltas, r.justificadas, 1),
+            periodo=r.periodo_academico
+        )
+        for r in resumenes
+    }
+
+
+def serie_mensual(resumenes_curso):
+    """Serie mensual (mes, total, presentes, porcentaje) desde ResumenAsistenciaCurso"""
+    filas = resumenes_curso.annotate(mes=TruncMonth('fecha')).values('mes').annotate(
+        presentes=Sum('asistencias'),
+        ausentes=Sum('faltas'),
+        justificadas=Sum('justificadas'),
+    ).order_by('mes')
+
+    serie = []
+    for fila in filas:
+        total = fila['presentes'] + fila['ausentes'] + fila['justificadas']
+        serie.append({
+            'mes': fila['mes'],
+            'total': total,
+            'presentes': fila['presentes'],
+            'porcentaje': fila['presentes'] * 100.0 / total if total else 0,
+        })
+    return serie
+
+
+# =============================================
+# MATRIZ DE ASISTENCIA DE UN CURSO
+# =============================================
+
+def _conteo_vacio():
+    return dict.fromkeys(CAMPOS_ESTADO, 0)
+
+
+def estadisticas(conteo, decimales=1):
+    """{'A': n, 'F': n, 'J': n} -> totales con porcentaje de asistencia"""
+    return _con_porcentaje(conteo['A'], conteo['F'], conteo['J'], decimales)
+
+
+def roster_curso(grado_año_lectivo, estados=None):
+    """Estudiantes matriculados en el curso, ordenados por apellido (una consulta)"""
+    return list(
+        Estudiante.objects.filter(
+            matriculas__grado_año_lectivo=grado_año_lectivo,
+            matriculas__estado__in=estados or ['ACT', 'PEN']
+        ).select_related('usuario').order_by('usuario__apellidos', 'usuario__nombres').distinct()
+    )
+
+
+def matriz_asistencia(grado_año_lectivo, periodo, desde=None, hasta=None, con_periodo=False):
+    """
+    Roster del curso y su asistencia con un número fijo de consultas.
+
+    - estudiantes: roster_curso()
+    - registros: {(estudiante_id, fecha): {...}} de las fechas entre desde y
+      hasta (una sola consulta del rango, pivotada aquí)
+    - conteos_dia / conteos_rango: {'A', 'F', 'J'} por fecha y por
+      estudiante dentro del rango
+    - conteos_periodo: {'A', 'F', 'J'} por estudiante en el período completo,
+      leídos del resumen materializado (solo si con_periodo)
+
+    Los conteos son defaultdict: un estudiante o día sin registros da ceros.
+    """
+    estudiantes = roster_curso(grado_año_lectivo)
+    ids = [e.id for e in estudiantes]
+
+    registros = {}
+    conteos_dia = defaultdict(_conteo_vacio)
+    conteos_rango = defaultdict(_conteo_vacio)
+
+    if desde is not None and ids:
+        filas = Asistencia.objects.filter(
+            estudiante_id__in=ids,
+            periodo_academico=periodo,
+            fecha__range=[desde, hasta or desde]
+        ).values_list('id', 'estudiante_id', 'fecha', 'estado', 'justificacion', 'created_at')
+
+        for asistencia_id, estudiante_id, fecha, estado, justificacion, creado in filas:
+            registros[(estudiante_id, fecha)] = {
+                'id': asistencia_id,
+                'estado': estado,
+                'justificacion': justificacion,
+                'created_at': creado,
+            }
+            if estado in CAMPOS_ESTADO:
+                conteos_dia[fecha][estado] += 1
+                conteos_rango[estudiante_id][estado] += 1
+
+    conteos_periodo = defaultdict(_conteo_vacio)
+    if con_periodo and ids:
+        for estudiante_id, asistencias, faltas, justificadas in ResumenAsistenciaPeriodo.objects.filter(
+            periodo_academico=periodo,
+            estudiante_id__in=ids
+        ).values_list('estudiante_id', 'asistencias', 'faltas', 'justificadas'):
+            conteos_periodo[estudiante_id] = {'A': asistencias, 'F': faltas, 'J': justificadas}
+
+    return {
+        'estudiantes': estudiantes,
+        'registros': registros,
+        'conteos_dia': conteos_dia,
+        'conteos_rango': conteos_rango,
+        'conteos_periodo': conteos_periodo,
+    }
@@ -0,0 +1,176 @@
+"""
+Registro de auditoría con escritura diferida y archivo histórico
+gestioncolegio/services/auditoria.py
+
+Las vistas registraban cada acción con AuditoriaSistema.objects.create()
+dentro de la petición. registrar() arma el evento y lo deja en un búfer del
+proceso; el búfer se escribe con un solo bulk_create cuando junta
+AUDITORIA_LOTE eventos o, a más tardar, AUDITORIA_INTERVALO segundos después
+del primero (un temporizador en segundo plano). created_at corresponde al
+momento del volcado, como máximo AUDITORIA_INTERVALO segundos después del
+evento. Con AUDITORIA_LOTE <= 1 se escribe en el momento (pruebas, consola).
+
+La tabla activa solo guarda los últimos AUDITORIA_MESES_ACTIVOS meses:
+archivar() pasa los registros anteriores a AuditoriaArchivada, un bloque
+JSON comprimido con gzip por mes, y los borra de AuditoriaSistema.
+"""
+import atexit
+import gzip
+import json
+import threading
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from gestioncolegio.models import AuditoriaArchivada, AuditoriaSistema
+
+CAMPOS_ARCHIVO = [
+    'id', 'usuario_id', 'accion', 'modelo_afectado', 'objeto_id',
+    'descripcion', 'ip_address', 'user_agent', 'created_at',
+]
+
+
+# =============================================
+# BÚFER DE EVENTOS
+# =============================================
+
+_buffer = []
+_lock = threading.Lock()
+_temporizador = None
+
+
+def _ip(request):
+    reenviada = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    return reenviada.split(',')[0].strip() if reenviada else request.META.get('REMOTE_ADDR')
+
+
+def registrar(request, accion, modelo_afectado, descripcion, objeto_id='', usuario=None):
+    """Encola un evento de auditoría del usuario de la petición (o del usuario dado)"""
+    if usuario is None and request is not None and request.user.is_authenticated:
+        usuario = request.user
+    evento = AuditoriaSistema(
+        usuario=usuario,
+        accion=accion,
+        modelo_afectado=modelo_afectado,
+        objeto_id=str(objeto_id or ''),
+        descripcion=descripcion,
+        ip_address=_ip(request) if request is not None else None,
+        user_agent=request.META.get('HTTP_USER_AGENT', '')[:500] if request is not None else '',
+    )
+
+    global _temporizador
+    lote = getattr(settings, 'AUDITORIA_LOTE', 50)
+    if lote <= 1:
+        try:
+            evento.save()
+        except Exception as e:
+            print(f"Error guardando auditoría: {e}")
+        return
+    with _lock:
+        _buffer.append(evento)
+        if len(_buffer) < lote:
+            if _temporizador is None:
+                _temporizador = threading.Timer(getattr(settings, 'AUDITORIA_INTERVALO', 5), _vaciar_en_segundo_plano)
+                _temporizador.daemon = True
+                _temporizador.start()
+            return
+    vaciar_buffer()
+
+
+def vaciar_buffer():
+    """Escribe los eventos pendientes; devuelve cuántos"""
+    global _temporizador
+    with _lock:
+        pendientes = _buffer[:]
+        del _buffer[:]
+        if _temporizador is not None:
+            _temporizador.cancel()
+            _temporizador = None
+    if pendientes:
+        try:
+            AuditoriaSistema.objects.bulk_create(pendientes)
+        except Exception as e:
+            # La auditoría nunca debe tumbar la operación auditada
+            print(f"Error guardando auditoría ({len(pendientes)} eventos): {e}")
+            return 0
+    return len(pendientes)
+
+
+def _vaciar_en_segundo_plano():
+    try:
+        vaciar_buffer()
+    finally:
+        # El hilo del temporizador abrió su propia conexión
+        connection.close()
+
+
+atexit.register(vaciar_buffer)
+
+
+# =============================================
+# CONSULTA
+# =============================================
+
+def ultimas_actividades(limite=10):
+    """Últimos eventos (usa el índice por created_at)"""
+    return AuditoriaSistema.objects.select_related('usuario').order_by('-created_at')[:limite]
+
+
+# =============================================
+# ARCHIVO HISTÓRICO
+# =============================================
+
+def _inicio_mes(fecha):
+    return date(fecha.year, fecha.month, 1)
+
+
+def fecha_corte(meses=None, hoy=None):
+    """Primer día del mes más antiguo que se conserva en la tabla activa"""
+    meses = getattr(settings, 'AUDITORIA_MESES_ACTIVOS', 6) if meses is None else meses
+    hoy = hoy or timezone.localdate()
+    total = hoy.year * 12 + (hoy.month - 1) - meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def archivar(meses=None, lote=5000, hoy=None):
+    """
+    Mueve a AuditoriaArchivada los eventos anteriores al corte, por bloques
+    de 'lote' filas de un mismo mes. Devuelve cuántos eventos se archivaron.
+    """
+    corte = fecha_corte(meses, hoy)
+    limite = timezone.make_aware(datetime(corte.year, corte.month, corte.day))
+    archivados = 0
+    while True:
+        filas = list(
+            AuditoriaSistema.objects.filter(created_at__lt=limite).order_by('id').values(*CAMPOS_ARCHIVO)[:lote]
+        )
+        if not filas:
+            return archivados
+
+        # Un bloque no mezcla meses: se corta donde cambia el mes
+        mes = _inicio_mes(timezone.localtime(filas[0]['created_at']))
+        filas = [fila for fila in filas if _inicio_mes(timezone.localtime(fila['created_at'])) == mes]
+
+        contenido = gzip.compress(
+            '\n'.join(json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False) for fila in filas).encode()
+        )
+        ids = [fila['id'] for fila in filas]
+        with transaction.atomic():
+            AuditoriaArchivada.objects.create(
+                mes=mes,
+                desde_id=ids[0],
+                hasta_id=ids[-1],
+                cantidad=len(ids),
+                contenido=contenido,
+            )
+            AuditoriaSistema.objects.filter(id__in=ids).delete()
+        archivados += len(ids)
+
+
+def leer_archivo(archivo):
+    """Eventos (diccionarios) de un bloque archivado"""
+    texto = gzip.decompress(bytes(archivo.contenido)).decode()
+    return [json.loads(linea) for linea in texto.splitlines() if linea]
@@ -0,0 +1,120 @@
+"""
+Búsqueda para los selectores con autocompletado
+gestioncolegio/services/autocompletar.py
+
+Los formularios y filtros que eligen un estudiante, usuario o docente
+renderizaban un <select> con todas las filas (miles de <option> en cada carga
+del reporte de notas). Con SelectAutocompletar (gestioncolegio/widgets.py) el
+HTML lleva solo el valor elegido y las opciones se piden a AutocompletarView
+mientras se escribe.
+
+Cada fuente declara su queryset base, los roles que pueden consultarla y el
+prefijo de los campos de Usuario. El campo del formulario valida el id
+enviado contra ese mismo queryset (fuente(nombre).queryset()); si fueran
+distintos, el selector ofrecería filas que el formulario rechaza.
+
+La búsqueda usa el primer término como prefijo de nombres, apellidos o
+documento (LIKE 'x%', resuelto con los índices de usuarios_usuario); los
+demás términos solo refinan ese conjunto.
+"""
+from functools import reduce
+from operator import and_
+
+from django.db.models import Q
+
+from estudiantes.models import Estudiante, Matricula
+from gestioncolegio.services import calendario
+from usuarios.models import Docente, Usuario
+
+MINIMO_CARACTERES = 2
+TAMAÑO_PAGINA = 20
+
+ROLES_ADMINISTRATIVOS = ['Administrador', 'Rector']
+
+
+class FuenteAutocompletar:
+    """Origen de opciones de un selector con autocompletado"""
+
+    def __init__(self, queryset, roles, campo_usuario='usuario__'):
+        self._queryset = queryset
+        self.roles = roles
+        self.campo_usuario = campo_usuario
+
+    def queryset(self):
+        return self._queryset()
+
+    def etiqueta(self, objeto):
+        usuario = getattr(objeto, 'usuario', objeto) if self.campo_usuario else objeto
+        return f"{usuario.get_full_name()} - {usuario.numero_documento}"
+
+    def permitida(self, usuario):
+        if usuario.is_superuser:
+            return True
+        tipo_usuario = getattr(usuario, 'tipo_usuario', None)
+        return bool(tipo_usuario) and tipo_usuario.nombre in self.roles
+
+
+def _estudiantes():
+    return Estudiante.objects.filter(estado=True).select_related('usuario')
+
+
+def _estudiantes_todos():
+    """Activos e inactivos (matricular de nuevo a un estudiante retirado)"""
+    return Estudiante.objects.select_related('usuario')
+
+
+def _estudiantes_sin_matricula():
+    """Estudiantes activos sin matrícula en el año lectivo activo (matrícula masiva)"""
+    año_actual = calendario.año_activo()
+    estudiantes = _estudiantes()
+    if año_actual:
+        estudiantes = estudiantes.exclude(
+            id__in=Matricula.objects.filter(año_lectivo=año_actual).values('estudiante_id')
+        )
+    return estudiantes
+
+
+FUENTES = {
+    'estudiantes': FuenteAutocompletar(_estudiantes, ROLES_ADMINISTRATIVOS + ['Docente']),
+    'estudiantes_todos': FuenteAutocompletar(_estudiantes_todos, ROLES_ADMINISTRATIVOS),
+    'estudiantes_sin_matricula': FuenteAutocompletar(_estudiantes_sin_matricula, ROLES_ADMINISTRATIVOS),
+    'usuarios': FuenteAutocompletar(lambda: Usuario.objects.all(), ROLES_ADMINISTRATIVOS, campo_usuario=''),
+    'docentes': FuenteAutocompletar(
+        lambda: Docente.objects.filter(estado=True).select_related('usuario'), ROLES_ADMINISTRATIVOS
+    ),
+}
+
+
+def fuente(nombre):
+    if nombre not in FUENTES:
+        raise ValueError(f"Fuente de autocompletado no registrada: {nombre}")
+    return FUENTES[nombre]
+
+
+def buscar(nombre, termino, pagina=1, tamaño=TAMAÑO_PAGINA):
+    """
+    Opciones de la fuente para el texto escrito, en el formato de Select2:
+    ([{'id', 'text'}], hay_mas). Menos de MINIMO_CARACTERES no consulta.
+    """
+    origen = fuente(nombre)
+    terminos = (termino or '').split()
+    if len(''.join(terminos)) < MINIMO_CARACTERES:
+        return [], False
+
+    u = origen.campo_usuario
+    primero, *resto = terminos
+    filtro = (
+        Q(**{f'{u}apellidos__istartswith': primero})
+        | Q(**{f'{u}nombres__istartswith': primero})
+        | Q(**{f'{u}numero_documento__startswith': primero})
+    )
+    if resto:
+        filtro &= reduce(and_, (
+            Q(**{f'{u}nombres__icontains': t}) | Q(**{f'{u}apellidos__icontains': t}) for t in resto
+        ))
+
+    inicio = (max(pagina, 1) - 1) * tamaño
+    filas = list(origen.queryset().filter(filtro).order_by(
+        f'{u}apellidos', f'{u}nombres', 'pk'
+    )[inicio:inicio + tamaño + 1])
+    return [{'id': fila.pk, 'text': origen.etiqueta(fila)} for fila in filas[:tamaño]], len(filas) > tamaño
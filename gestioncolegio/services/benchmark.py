@@ -0,0 +1,187 @@
+"""
+Escenarios de benchmark de las rutas críticas
+gestioncolegio/services/benchmark.py
+
+Cada escenario es una petición real (django.test.Client) de un rol sobre el
+colegio sintético de datos_sinteticos: carga y guardado de la planilla de
+notas, asistencia masiva, reportes del administrador, dashboards y boletín
+PDF. medir() devuelve la mediana del tiempo de pared y el número de consultas;
+comparar() contrasta contra una línea base JSON con un umbral de regresión.
+"""
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class Escenario:
+    """Petición de un rol; url y datos son callables que reciben el contexto sintético"""
+
+    def __init__(self, nombre, rol, url, metodo='get', datos=None, json=False, etiquetas=None):
+        self.nombre = nombre
+        self.rol = rol
+        self.url = url
+        self.metodo = metodo
+        self.datos = datos
+        self.json = json
+        self.etiquetas = etiquetas or []
+
+    def peticion(self, cliente, contexto):
+        url = self.url(contexto)
+        datos = self.datos(contexto) if self.datos else None
+        if self.metodo == 'post':
+            if self.json:
+                return cliente.post(url, json.dumps(datos), content_type='application/json')
+            return cliente.post(url, datos)
+        return cliente.get(url, datos)
+
+
+def _dia_habil(contexto):
+    """Último día hábil del período que no sea futuro"""
+    periodo = contexto['periodo']
+    dia = min(periodo.fecha_fin, contexto['hoy'])
+    while dia.weekday() >= 5:
+        dia -= timedelta(days=1)
+    return dia
+
+
+def _planilla(contexto):
+    return {
+        'grado_id': contexto['grado'].id,
+        'asignatura_id': contexto['asignatura_grado'].asignatura_id,
+        'periodo_id': contexto['periodo'].id,
+    }
+
+
+def _guardar_planilla(contexto):
+    datos = _planilla(contexto)
+    for indice, estudiante_id in enumerate(contexto['estudiantes_curso']):
+        datos[f'nota_{estudiante_id}'] = f'{3.0 + (indice % 20) / 10:.1f}'
+    return datos
+
+
+ESCENARIOS = [
+    Escenario(
+        'planilla_notas_cargar', 'docente',
+        lambda c: reverse('docentes:obtener_notas_estudiantes'),
+        datos=_planilla, etiquetas=['calificaciones'],
+    ),
+    Escenario(
+        'planilla_notas_guardar', 'docente',
+        lambda c: reverse('docentes:guardar_notas'),
+        metodo='post', datos=_guardar_planilla, etiquetas=['calificaciones'],
+    ),
+    Escenario(
+        'asistencia_masiva', 'docente',
+        lambda c: reverse('docentes:registrar_asistencia_masiva'),
+        metodo='post', json=True,
+        datos=lambda c: {
+            'fecha': _dia_habil(c).isoformat(),
+            'curso_id': c['curso'].id,
+            'periodo_id': c['periodo'].id,
+            'estado': 'A',
+        },
+        etiquetas=['asistencia'],
+    ),
+    Escenario(
+        'reporte_notas', 'admin',
+        lambda c: reverse('administrador:reporte_notas'),
+        datos=lambda c: {'periodo': c['periodo'].id, 'grado': c['grado'].id, 'sede': c['sede'].id},
+        etiquetas=['reportes'],
+    ),
+    Escenario(
+        'reporte_estudiantes_riesgo', 'admin',
+        lambda c: reverse('administrador:reporte_estudiantes_riesgo'),
+        datos=lambda c: {'periodo': c['periodo'].id},
+        etiquetas=['reportes'],
+    ),
+    Escenario(
+        'dashboard_administrador', 'admin',
+        lambda c: reverse('gestioncolegio:dashboard_administrador'),
+        etiquetas=['dashboards'],
+    ),
+    Escenario(
+        'dashboard_docente', 'docente',
+        lambda c: reverse('gestioncolegio:dashboard_docente'),
+        etiquetas=['dashboards'],
+    ),
+    Escenario(
+        'dashboard_estudiante', 'estudiante',
+        lambda c: reverse('gestioncolegio:dashboard_estudiante'),
+        etiquetas=['dashboards'],
+    ),
+    Escenario(
+        'dashboard_acudiente', 'acudiente',
+        lambda c: reverse('gestioncolegio:dashboard_acudiente'),
+        etiquetas=['dashboards'],
+    ),
+    Escenario(
+        'boletin_pdf', 'admin',
+        lambda c: reverse('estudiantes:estudiante_boletin_final_año_admin', args=[c['estudiante'].id, c['año_lectivo'].id]),
+        etiquetas=['pdf'],
+    ),
+]
+
+
+def clientes(contexto):
+    """Un Client autenticado por rol"""
+    resultado = {}
+    for rol in ('admin', 'docente', 'estudiante', 'acudiente'):
+        cliente = Client()
+        cliente.force_login(contexto[f'usuario_{rol}'])
+        resultado[rol] = cliente
+    return resultado
+
+
+def medir(escenario, cliente, contexto, repeticiones=5):
+    """
+    Una petición de calentamiento y 'repeticiones' medidas.
+    Devuelve {'tiempo_ms': mediana, 'consultas': máximo, 'estado': código}.
+    """
+    escenario.peticion(cliente, contexto)
+
+    tiempos = []
+    consultas = 0
+    estado = None
+    for _ in range(repeticiones):
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            respuesta = escenario.peticion(cliente, contexto)
+            if getattr(respuesta, 'streaming', False):
+                b''.join(respuesta.streaming_content)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        consultas = max(consultas, len(capturadas))
+        estado = respuesta.status_code
+
+    return {
+        'tiempo_ms': round(statistics.median(tiempos), 2),
+        'consultas': consultas,
+        'estado': estado,
+    }
+
+
+def comparar(resultados, base, umbral=0.25, tolerancia_consultas=0):
+    """
+    Lista de regresiones frente a la línea base.
+    Tiempo: más de 'umbral' (fracción) por encima de la base.
+    Consultas: más de 'tolerancia_consultas' por encima de la base.
+    """
+    regresiones = []
+    for nombre, actual in resultados.items():
+        anterior = base.get(nombre)
+        if not anterior:
+            continue
+        if actual['tiempo_ms'] > anterior['tiempo_ms'] * (1 + umbral):
+            regresiones.append(
+                f"{nombre}: {actual['tiempo_ms']} ms (base {anterior['tiempo_ms']} ms, +{umbral:.0%} permitido)"
+            )
+        if actual['consultas'] > anterior['consultas'] + tolerancia_consultas:
+            regresiones.append(
+                f"{nombre}: {actual['consultas']} consultas (base {anterior['consultas']})"
+            )
+    return regresiones
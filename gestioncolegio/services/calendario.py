@@ -0,0 +1,236 @@
+"""
+Calendario académico en memoria
+gestioncolegio/services/calendario.py
+
+Qué año lectivo está activo y qué período corresponde a una fecha se
+consultaba en cada context processor, mixin y vista con filtros y reglas de
+respaldo distintas. Este servicio carga AñoLectivo y PeriodoAcademico una sola
+vez (2 consultas) en una instantánea por proceso: por año, los períodos quedan
+ordenados por fecha con listas de inicios y fines para búsqueda binaria, y los
+años se agrupan por sede.
+
+La instantánea se descarta cuando cambia la versión guardada en la caché
+compartida (signals de AñoLectivo y PeriodoAcademico llaman a invalidar()).
+Cada proceso revisa esa versión como máximo una vez por VERIFICACION_SEGUNDOS.
+
+Los objetos devueltos son compartidos entre peticiones: son de solo lectura.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from gestioncolegio.models import AñoLectivo
+from matricula.models import PeriodoAcademico
+
+VERSION_KEY = 'calendario:version'
+VERIFICACION_SEGUNDOS = 1.0
+
+
+class _Intervalos:
+    """Períodos de un año ordenados por fecha de inicio"""
+
+    def __init__(self, periodos):
+        self.periodos = sorted(periodos, key=lambda p: (p.fecha_inicio, p.id))
+        self.inicios = [p.fecha_inicio for p in self.periodos]
+        self.posiciones = {p.id: indice for indice, p in enumerate(self.periodos)}
+        # Orden por fecha de fin para 'último que terminó'
+        self.por_fin = sorted(self.periodos, key=lambda p: (p.fecha_fin, p.id))
+        self.fines = [p.fecha_fin for p in self.por_fin]
+
+    def en_fecha(self, fecha):
+        """Período que contiene la fecha; los períodos de un año no se solapan"""
+        indice = bisect_right(self.inicios, fecha) - 1
+        if indice >= 0 and self.periodos[indice].fecha_fin >= fecha:
+            return self.periodos[indice]
+        return None
+
+    def ultimo_terminado(self, fecha):
+        indice = bisect_left(self.fines, fecha) - 1
+        return self.por_fin[indice] if indice >= 0 else None
+
+    def proximo(self, fecha):
+        indice = bisect_right(self.inicios, fecha)
+        return self.periodos[indice] if indice < len(self.periodos) else None
+
+
+class _Instantanea:
+    """Años y períodos cargados en un momento dado"""
+
+    def __init__(self, version):
+        self.version = version
+        self.años = {}
+        self.años_por_sede = {}
+        self.activos = []
+        self.periodos_por_id = {}
+        self.intervalos = {}
+        self.intervalos_activos = {}
+        self.ultimo_activo = None
+
+        for año in AñoLectivo.objects.select_related('sede').order_by('id'):
+            self.años[año.id] = año
+            self.años_por_sede.setdefault(año.sede_id, []).append(año)
+            if año.estado:
+                self.activos.append(año)
+
+        por_año = {}
+        for periodo in PeriodoAcademico.objects.select_related('periodo').order_by('id'):
+            año = self.años.get(periodo.año_lectivo_id)
+            if año is None:
+                continue
+            # Comparte la instancia del año para no consultar al acceder a periodo.año_lectivo
+            periodo.año_lectivo = año
+            self.periodos_por_id[periodo.id] = periodo
+            por_año.setdefault(año.id, []).append(periodo)
+
+        for año_id, periodos in por_año.items():
+            self.intervalos[año_id] = _Intervalos(periodos)
+            self.intervalos_activos[año_id] = _Intervalos([p for p in periodos if p.estado])
+
+        activos = [p for p in self.periodos_por_id.values() if p.estado]
+        if activos:
+            self.ultimo_activo = max(activos, key=lambda p: (p.fecha_fin, -p.id))
+
+
+_instantanea = None
+_verificado = 0.0
+_lock = threading.Lock()
+
+
+def _version_compartida():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Caché vacía o reiniciada: nueva versión, nadie puede asumir la suya vigente
+        version = time.time_ns()
+        cache.add(VERSION_KEY, version, None)
+        version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def _obtener():
+    global _instantanea, _verificado
+    ahora = time.monotonic()
+    actual = _instantanea
+    if actual is not None and ahora - _verificado < VERIFICACION_SEGUNDOS:
+        return actual
+
+    with _lock:
+        version = _version_compartida()
+        if _instantanea is None or _instantanea.version != version:
+            _instantanea = _Instantanea(version)
+        _verificado = time.monotonic()
+        return _instantanea
+
+
+def invalidar():
+    """Descarta la instantánea de este proceso y obliga a los demás a recargar"""
+    global _instantanea
+    cache.set(VERSION_KEY, time.time_ns(), None)
+    with _lock:
+        _instantanea = None
+
+
+def _año_id(año):
+    return getattr(año, 'id', año)
+
+
+def _intervalos(año, solo_activos):
+    instantanea = _obtener()
+    tabla = instantanea.intervalos_activos if solo_activos else instantanea.intervalos
+    return tabla.get(_año_id(año))
+
+
+# =============================================
+# AÑOS LECTIVOS
+# =============================================
+
+def año_activo(sede=None):
+    """
+    Año lectivo activo (estado=True) de menor id, como
+    AñoLectivo.objects.filter(estado=True).first(); con sede, el de esa sede.
+    """
+    instantanea = _obtener()
+    if sede is None:
+        return instantanea.activos[0] if instantanea.activos else None
+    sede_id = getattr(sede, 'id', sede)
+    return next((a for a in instantanea.años_por_sede.get(sede_id, []) if a.estado), None)
+
+
+def años_activos():
+    return list(_obtener().activos)
+
+
+def año_lectivo(año_id):
+    return _obtener().años.get(año_id)
+
+
+# =============================================
+# PERÍODOS ACADÉMICOS
+# =============================================
+
+def periodos(año, solo_activos=False):
+    """Períodos del año ordenados por fecha de inicio"""
+    intervalos = _intervalos(año, solo_activos)
+    return list(intervalos.periodos) if intervalos else []
+
+
+def periodo(periodo_id):
+    return _obtener().periodos_por_id.get(periodo_id)
+
+
+def periodo_en_fecha(año, fecha, solo_activos=False):
+    """Período del año que contiene la fecha, o None"""
+    if not año:
+        return None
+    intervalos = _intervalos(año, solo_activos)
+    return intervalos.en_fecha(fecha) if intervalos else None
+
+
+def periodo_actual(año, hoy=None, solo_activos=False):
+    """
+    Período en curso del año o, si hoy no cae en ninguno: el último que
+    terminó, el próximo que empieza y por último el primero del año.
+    """
+    if not año:
+        return None
+    if hoy is None:
+        hoy = timezone.now().date()
+    intervalos = _intervalos(año, solo_activos)
+    if not intervalos or not intervalos.periodos:
+        return None
+    return (
+        intervalos.en_fecha(hoy)
+        or intervalos.ultimo_terminado(hoy)
+        or intervalos.proximo(hoy)
+        or intervalos.periodos[0]
+    )
+
+
+def _vecino(periodo_academico, desplazamiento):
+    if not periodo_academico:
+        return None
+    intervalos = _intervalos(periodo_academico.año_lectivo_id, False)
+    if not intervalos:
+        return None
+    posicion = intervalos.posiciones.get(periodo_academico.id)
+    if posicion is None:
+        return None
+    indice = posicion + desplazamiento
+    return intervalos.periodos[indice] if 0 <= indice < len(intervalos.periodos) else None
+
+
+def periodo_anterior(periodo_academico):
+    """Período inmediatamente anterior dentro del mismo año lectivo"""
+    return _vecino(periodo_academico, -1)
+
+
+def periodo_siguiente(periodo_academico):
+    """Período inmediatamente siguiente dentro del mismo año lectivo"""
+    return _vecino(periodo_academico, 1)
+
+
+def ultimo_periodo_activo():
+    """Período activo de fecha de fin más reciente entre todos los años"""
+    return _obtener().ultimo_activo
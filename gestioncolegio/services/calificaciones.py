@@ -0,0 +1,294 @@
+"""
+Progreso de calificaciones por asignatura
+gestioncolegio/services/calificaciones.py
+
+Calcula estudiantes matriculados, calificados y pendientes de cada
+AsignaturaGradoAñoLectivo en un período con una sola consulta: cada fila de
+asignatura se anota con dos subconsultas correlacionadas (matrículas del
+grado/sede y notas del período de esos mismos estudiantes).
+
+Lo usan el dashboard docente, la pantalla de calificar, el reporte
+administrativo de calificaciones pendientes y el monitor institucional
+(matriz docente × asignatura × período, en caché hasta la próxima nota).
+"""
+from django.core.cache import cache
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from estudiantes.models import Matricula, Nota
+from matricula.models import AsignaturaGradoAñoLectivo, PeriodoAcademico
+
+# Estados de matrícula que cuentan como "estudiante por calificar"
+ESTADOS_CALIFICABLES = ['ACT', 'PEN', 'INA', 'RET', 'OTRO']
+
+
+def _subconsulta_matriculados(estados):
+    return Matricula.objects.filter(
+        grado_año_lectivo=OuterRef('grado_año_lectivo'),
+        sede=OuterRef('sede'),
+        estado__in=estados,
+    ).order_by().values('grado_año_lectivo').annotate(
+        total=Count('estudiante', distinct=True)
+    ).values('total')
+
+
+def _subconsulta_calificados(periodo_id, estados):
+    return Nota.objects.filter(
+        asignatura_grado_año_lectivo=OuterRef('pk'),
+        periodo_academico_id=periodo_id,
+        estudiante__matriculas__grado_año_lectivo=OuterRef('grado_año_lectivo'),
+        estudiante__matriculas__sede=OuterRef('sede'),
+        estudiante__matriculas__estado__in=estados,
+    ).order_by().values('asignatura_grado_año_lectivo').annotate(
+        total=Count('estudiante', distinct=True)
+    ).values('total')
+
+
+def anotar_progreso(queryset, periodo, estados=None):
+    """
+    Anota un queryset de AsignaturaGradoAñoLectivo con
+    total_estudiantes, calificados y pendientes para el período dado.
+    """
+    estados = estados or ESTADOS_CALIFICABLES
+    periodo_id = getattr(periodo, 'id', periodo)
+
+    return queryset.annotate(
+        total_estudiantes=Coalesce(
+            Subquery(_subconsulta_matriculados(estados), output_field=IntegerField()),
+            Value(0)
+        ),
+        calificados=Coalesce(
+            Subquery(_subconsulta_calificados(periodo_id, estados), output_field=IntegerField()),
+            Value(0)
+        ),
+    ).annotate(
+        pendientes=F('total_estudiantes') - F('calificados')
+    )
+
+
+def _porcentaje(calificados, total):
+    return round(calificados / total * 100, 1) if total > 0 else 0
+
+
+def progreso_asignaturas(periodo, docente=None, asignaturas=None, estados=None):
+    """
+    Lista de diccionarios con el progreso de cada asignatura del período.
+
+    Si no se pasa un queryset de asignaturas se usan las del año lectivo
+    del período (opcionalmente filtradas por docente).
+    """
+    if asignaturas is None:
+        asignaturas = AsignaturaGradoAñoLectivo.objects.filter(
+            grado_año_lectivo__año_lectivo_id=periodo.año_lectivo_id
+        )
+    if docente is not None:
+        asignaturas = asignaturas.filter(docente=docente)
+
+    asignaturas = anotar_progreso(
+        asignaturas.select_related(
+            'asignatura',
+            'grado_año_lectivo__grado',
+            'sede',
+            'docente__usuario',
+        ),
+        periodo,
+        estados
+    ).order_by('grado_año_lectivo__grado__nombre', 'asignatura__nombre')
+
+    return [
+        {
+            'asignatura_grado_id': ag.id,
+            'asignatura': ag.asignatura.nombre,
+            'grado': ag.grado_año_lectivo.grado.nombre,
+            'sede': ag.sede.nombre,
+            'docente_id': ag.docente_id,
+            'docente': ag.docente.usuario.get_full_name() if ag.docente else 'Sin docente',
+            'total_estudiantes': ag.total_estudiantes,
+            'calificados': ag.calificados,
+            'pendientes': max(ag.pendientes, 0),
+            'porcentaje': _porcentaje(ag.calificados, ag.total_estudiantes),
+        }
+        for ag in asignaturas
+    ]
+
+
+def resumen_progreso(progreso):
+    """Totales a partir de la lista devuelta por progreso_asignaturas"""
+    total = sum(p['total_estudiantes'] for p in progreso)
+    calificados = sum(p['calificados'] for p in progreso)
+    return {
+        'total_asignaturas': len(progreso),
+        'total_estudiantes': total,
+        'calificados': calificados,
+        'pendientes': sum(p['pendientes'] for p in progreso),
+        'porcentaje': _porcentaje(calificados, total),
+    }
+
+
+def pendientes_por_docente(periodo, estados=None):
+    """Agrupa por docente las asignaturas con calificaciones pendientes"""
+    docentes = {}
+    for fila in progreso_asignaturas(periodo, estados=estados):
+        if fila['pendientes'] <= 0:
+            continue
+        docente = docentes.setdefault(fila['docente_id'], {
+            'docente_id': fila['docente_id'],
+            'docente': fila['docente'],
+            'asignaturas': [],
+            'pendientes': 0,
+        })
+        docente['asignaturas'].append(fila)
+        docente['pendientes'] += fila['pendientes']
+
+    return sorted(docentes.values(), key=lambda d: -d['pendientes'])
+
+
+# =============================================
+# MONITOR INSTITUCIONAL (docente × asignatura × período)
+# =============================================
+
+MONITOR_CACHE_PREFIX = 'monitor_calificaciones'
+MONITOR_VERSION_KEY = f'{MONITOR_CACHE_PREFIX}:version'
+MONITOR_CACHE_TIMEOUT = 60 * 60
+
+
+def _monitor_version():
+    version = cache.get(MONITOR_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(MONITOR_VERSION_KEY, version, None)
+    return version
+
+
+def invalidar_monitor():
+    """Se llama al escribir notas, matrículas o asignaciones"""
+    try:
+        cache.incr(MONITOR_VERSION_KEY)
+    except ValueError:
+        cache.set(MONITOR_VERSION_KEY, 2, None)
+
+
+def construir_matriz(año_lectivo, estados=None):
+    """
+    Matriz de avance de calificación de un año lectivo.
+
+    Cuatro consultas en total sin importar el tamaño del colegio:
+    asignaturas, períodos, matriculados agrupados por (grado, sede) y
+    calificados agrupados por (asignatura, período).
+    """
+    estados = estados or ESTADOS_CALIFICABLES
+    año_id = getattr(año_lectivo, 'id', año_lectivo)
+
+    asignaturas = list(
+        AsignaturaGradoAñoLectivo.objects.filter(
+            grado_año_lectivo__año_lectivo_id=año_id
+        ).select_related(
+            'asignatura', 'grado_año_lectivo__grado', 'sede', 'docente__usuario'
+        ).order_by('docente__usuario__apellidos', 'grado_año_lectivo__grado__nombre', 'asignatura__nombre')
+    )
+    periodos = list(
+        PeriodoAcademico.objects.filter(año_lectivo_id=año_id).select_related('periodo').order_by('fecha_inicio')
+    )
+
+    matriculados = {
+        (fila['grado_año_lectivo_id'], fila['sede_id']): fila['total']
+        for fila in Matricula.objects.filter(
+            año_lectivo_id=año_id,
+            estado__in=estados,
+        ).values('grado_año_lectivo_id', 'sede_id').annotate(
+            total=Count('estudiante', distinct=True)
+        )
+    }
+
+    calificados = {
+        (fila['asignatura_grado_año_lectivo_id'], fila['periodo_academico_id']): fila['total']
+        for fila in Nota.objects.filter(
+            periodo_academico__año_lectivo_id=año_id,
+            estudiante__matriculas__grado_año_lectivo=F('asignatura_grado_año_lectivo__grado_año_lectivo'),
+            estudiante__matriculas__sede=F('asignatura_grado_año_lectivo__sede'),
+            estudiante__matriculas__estado__in=estados,
+        ).values('asignatura_grado_año_lectivo_id', 'periodo_academico_id').annotate(
+            total=Count('estudiante', distinct=True)
+        )
+    }
+
+    docentes = {}
+    for ag in asignaturas:
+        total = matriculados.get((ag.grado_año_lectivo_id, ag.sede_id), 0)
+        celdas = []
+        for periodo in periodos:
+            hechos = calificados.get((ag.id, periodo.id), 0)
+            celdas.append({
+                'periodo_id': periodo.id,
+                'calificados': hechos,
+                'pendientes': max(total - hechos, 0),
+                'porcentaje': _porcentaje(hechos, total),
+            })
+
+        docente = docentes.setdefault(ag.docente_id, {
+            'docente_id': ag.docente_id,
+            'docente': ag.docente.usuario.get_full_name() if ag.docente else 'Sin docente',
+            'email': (ag.docente.usuario.email or '') if ag.docente else '',
+            'asignaturas': [],
+            'pendientes': [0] * len(periodos),
+        })
+        docente['asignaturas'].append({
+            'asignatura_grado_id': ag.id,
+            'asignatura': ag.asignatura.nombre,
+            'grado': ag.grado_año_lectivo.grado.nombre,
+            'sede': ag.sede.nombre,
+            'total_estudiantes': total,
+            'celdas': celdas,
+        })
+        for i, celda in enumerate(celdas):
+            docente['pendientes'][i] += celda['pendientes']
+
+    return {
+        'año_lectivo_id': año_id,
+        'periodos': [
+            {
+                'id': p.id,
+                'nombre': p.periodo.nombre,
+                'fecha_inicio': p.fecha_inicio.isoformat(),
+                'fecha_fin': p.fecha_fin.isoformat(),
+            }
+            for p in periodos
+        ],
+        'docentes': list(docentes.values()),
+        'generado': timezone.now().isoformat(),
+    }
+
+
+def obtener_matriz(año_lectivo, estados=None):
+    """Matriz en caché; se regenera tras cualquier escritura de notas"""
+    año_id = getattr(año_lectivo, 'id', año_lectivo)
+    key = f'{MONITOR_CACHE_PREFIX}:v{_monitor_version()}:{año_id}'
+    if estados:
+        key = f"{key}:{'-'.join(sorted(estados))}"
+
+    matriz = cache.get(key)
+    if matriz is None:
+        matriz = construir_matriz(año_id, estados)
+        cache.set(key, matriz, MONITOR_CACHE_TIMEOUT)
+    return matriz
+
+
+def docentes_atrasados(periodo, umbral=100):
+    """Docentes cuyo avance en el período está por debajo del umbral (%)"""
+    matriz = obtener_matriz(periodo.año_lectivo_id)
+    indice = next((i for i, p in enumerate(matriz['periodos']) if p['id'] == periodo.id), None)
+    if indice is None:
+        return []
+
+    atrasados = []
+    for docente in matriz['docentes']:
+        if not docente['docente_id']:
+            continue
+        total = sum(a['total_estudiantes'] for a in docente['asignaturas'])
+        hechos = sum(a['celdas'][indice]['calificados'] for a in docente['asignaturas'])
+        porcentaje = _porcentaje(hechos, total)
+        if docente['pendientes'][indice] > 0 and porcentaje < umbral:
+            atrasados.append(dict(docente, porcentaje=porcentaje, pendientes_periodo=docente['pendientes'][indice]))
+
+    return atrasados
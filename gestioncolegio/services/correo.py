@@ -0,0 +1,215 @@
+"""
+Bandeja de salida de correo
+gestioncolegio/services/correo.py
+
+Enviar por SMTP dentro de la petición hace esperar al usuario el saludo TLS y
+la entrega, y un fallo de Gmail termina en un mensaje de error aunque el
+formulario fuera válido. En su lugar encolar() guarda un CorreoSaliente (en la
+misma transacción que el resto de la petición) y el comando enviar_correos
+los despacha con procesar_cola():
+
+- Toma un lote de pendientes con SELECT ... FOR UPDATE SKIP LOCKED y los
+  reserva corriendo proximo_intento, así varios workers no envían el mismo.
+- Abre una sola conexión SMTP para todo el lote (un saludo, un login) y la
+  reabre solo si el servidor la corta.
+- Reintenta los fallos temporales (4xx, red) con espera exponencial; los
+  rechazos permanentes (5xx) y los que agotan CORREO_MAX_INTENTOS quedan
+  como fallidos.
+- Respeta las cuotas de Gmail: no pasa de CORREO_LIMITE_DIARIO destinatarios
+  en 24 horas, espacia los envíos según CORREO_LIMITE_MINUTO y, si el servidor
+  responde que se superó la cuota, detiene el lote y lo reprograma.
+"""
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from gestioncolegio.models import CorreoSaliente
+
+# Reserva de un lote tomado por un worker; si el worker muere, otro lo retoma
+DURACION_RESERVA = timedelta(minutes=10)
+ESPERA_BASE = timedelta(minutes=1)
+ESPERA_MAXIMA = timedelta(hours=6)
+# Tras una respuesta de cuota excedida no se vuelve a intentar antes de esto
+ESPERA_CUOTA = timedelta(hours=1)
+
+# Códigos extendidos con los que Gmail indica límite de envío alcanzado
+MARCAS_CUOTA = ('5.4.5', '4.7.0', '4.7.28')
+
+
+def encolar(asunto, cuerpo, destinatarios, remitente=None, responder_a=None, html='', origen=''):
+    """Guarda un correo en la bandeja de salida; lo envía el comando enviar_correos"""
+    if isinstance(destinatarios, str):
+        destinatarios = [destinatarios]
+    if isinstance(responder_a, str):
+        responder_a = [responder_a]
+    return CorreoSaliente.objects.create(
+        asunto=asunto[:255],
+        cuerpo=cuerpo,
+        cuerpo_html=html or '',
+        remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=[d for d in destinatarios if d],
+        responder_a=list(responder_a or []),
+        origen=origen,
+    )
+
+
+def espera_reintento(intentos):
+    """1, 2, 4, 8... minutos hasta un máximo de 6 horas"""
+    return min(ESPERA_BASE * (2 ** max(intentos - 1, 0)), ESPERA_MAXIMA)
+
+
+def destinatarios_ultimo_dia(ahora=None):
+    """Destinatarios enviados en las últimas 24 horas (así cuenta Gmail su cuota)"""
+    ahora = ahora or timezone.now()
+    enviados = CorreoSaliente.objects.filter(
+        estado='ENV', enviado_en__gte=ahora - timedelta(days=1)
+    ).values_list('destinatarios', flat=True)
+    return sum(len(destinatarios) for destinatarios in enviados)
+
+
+# =============================================
+# CLASIFICACIÓN DE ERRORES
+# =============================================
+
+def _es_cuota(error):
+    codigo = getattr(error, 'smtp_code', None)
+    texto = str(getattr(error, 'smtp_error', error))
+    return codigo == 421 or any(marca in texto for marca in MARCAS_CUOTA)
+
+
+def _es_permanente(error):
+    """Un 5xx no se arregla reintentando (dirección inexistente, mensaje rechazado)"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(codigo >= 500 for codigo, _ in error.recipients.values())
+    codigo = getattr(error, 'smtp_code', None)
+    return isinstance(error, smtplib.SMTPResponseException) and codigo is not None and codigo >= 500
+
+
+# =============================================
+# ENVÍO
+# =============================================
+
+def _reservar(lote, ahora):
+    with transaction.atomic():
+        correos = list(
+            CorreoSaliente.objects.select_for_update(skip_locked=True).filter(
+                estado='PEN', proximo_intento__lte=ahora
+            ).order_by('proximo_intento', 'id')[:lote]
+        )
+        if correos:
+            CorreoSaliente.objects.filter(id__in=[c.id for c in correos]).update(
+                proximo_intento=ahora + DURACION_RESERVA
+            )
+    return correos
+
+
+def _mensaje(correo, conexion):
+    mensaje = EmailMultiAlternatives(
+        subject=correo.asunto,
+        body=correo.cuerpo,
+        from_email=correo.remitente,
+        to=correo.destinatarios,
+        reply_to=correo.responder_a or None,
+        connection=conexion,
+    )
+    if correo.cuerpo_html:
+        mensaje.attach_alternative(correo.cuerpo_html, 'text/html')
+    return mensaje
+
+
+def _enviar(conexion, mensaje):
+    try:
+        conexion.send_messages([mensaje])
+    except smtplib.SMTPServerDisconnected:
+        # El servidor cerró la conexión persistente (inactividad o límite de
+        # mensajes por sesión): se reabre y se intenta una vez más
+        conexion.close()
+        conexion.open()
+        conexion.send_messages([mensaje])
+
+
+def procesar_cola(lote=50, limite_diario=None, limite_minuto=None, max_intentos=None):
+    """
+    Envía hasta 'lote' correos pendientes por una única conexión SMTP.
+    Devuelve {'enviados', 'reintentos', 'fallidos', 'cuota_agotada'}.
+    """
+    limite_diario = getattr(settings, 'CORREO_LIMITE_DIARIO', 500) if limite_diario is None else limite_diario
+    limite_minuto = getattr(settings, 'CORREO_LIMITE_MINUTO', 20) if limite_minuto is None else limite_minuto
+    max_intentos = max_intentos or getattr(settings, 'CORREO_MAX_INTENTOS', 5)
+    resumen = {'enviados': 0, 'reintentos': 0, 'fallidos': 0, 'cuota_agotada': False}
+
+    ahora = timezone.now()
+    disponibles = limite_diario - destinatarios_ultimo_dia(ahora) if limite_diario else None
+    if disponibles is not None and disponibles <= 0:
+        resumen['cuota_agotada'] = True
+        return resumen
+
+    correos = _reservar(lote, ahora)
+    if not correos:
+        return resumen
+
+    pausa = 60 / limite_minuto if limite_minuto else 0
+    procesados = set()
+    liberar_en = timezone.now()
+    conexion = get_connection(fail_silently=False)
+    try:
+        conexion.open()
+        for correo in correos:
+            if not correo.destinatarios:
+                correo.estado, correo.error = 'ERR', 'Sin destinatarios'
+                correo.save(update_fields=['estado', 'error', 'updated_at'])
+                procesados.add(correo.id)
+                resumen['fallidos'] += 1
+                continue
+            if disponibles is not None and len(correo.destinatarios) > disponibles:
+                resumen['cuota_agotada'] = True
+                break
+            if resumen['enviados'] and pausa:
+                time.sleep(pausa)
+
+            correo.intentos += 1
+            try:
+                _enviar(conexion, _mensaje(correo, conexion))
+            except Exception as e:
+                if _es_cuota(e):
+                    # No cuenta como intento: el mensaje no tiene nada de malo
+                    resumen['cuota_agotada'] = True
+                    liberar_en = timezone.now() + ESPERA_CUOTA
+                    break
+                correo.error = f"{type(e).__name__}: {e}"
+                if _es_permanente(e) or correo.intentos >= max_intentos:
+                    correo.estado = 'ERR'
+                    resumen['fallidos'] += 1
+                else:
+                    correo.proximo_intento = timezone.now() + espera_reintento(correo.intentos)
+                    resumen['reintentos'] += 1
+                correo.save(update_fields=['estado', 'intentos', 'proximo_intento', 'error', 'updated_at'])
+                procesados.add(correo.id)
+                if not isinstance(e, smtplib.SMTPException):
+                    # Error de red: el resto del lote fallaría igual
+                    break
+                continue
+
+            correo.estado = 'ENV'
+            correo.enviado_en = timezone.now()
+            correo.error = ''
+            correo.save(update_fields=['estado', 'intentos', 'enviado_en', 'error', 'updated_at'])
+            procesados.add(correo.id)
+            resumen['enviados'] += 1
+            if disponibles is not None:
+                disponibles -= len(correo.destinatarios)
+    except Exception as e:
+        # No se pudo abrir la conexión: el lote vuelve a la cola sin gastar intentos
+        print(f"Error conectando al servidor de correo: {e}")
+        liberar_en = timezone.now() + ESPERA_BASE
+    finally:
+        conexion.close()
+        pendientes = [correo.id for correo in correos if correo.id not in procesados]
+        if pendientes:
+            CorreoSaliente.objects.filter(id__in=pendientes, estado='PEN').update(proximo_intento=liberar_en)
+    return resumen
@@ -0,0 +1,318 @@
+"""
+Snapshot del dashboard del estudiante
+gestioncolegio/services/dashboard_estudiante.py
+
+El dashboard se construye una sola vez por estudiante y se guarda en caché
+como datos planos (diccionarios, fechas y números). Las señales de Nota,
+Asistencia, Comportamiento y Matricula invalidan el snapshot del estudiante
+afectado; el siguiente acceso lo reconstruye.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from comportamiento.models import Asistencia, Comportamiento
+from estudiantes.mixins import PeriodoActualMixin
+from estudiantes.models import Estudiante, Nota
+from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services import imagenes
+
+# Subir la versión cuando cambie la estructura del snapshot
+SNAPSHOT_VERSION = 1
+CACHE_PREFIX = 'dashboard_estudiante'
+GENERACION_KEY = f'{CACHE_PREFIX}:generacion'
+
+
+def _get_timeout():
+    return getattr(settings, 'DASHBOARD_ESTUDIANTE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def _get_generacion():
+    """Generación global: cambia cuando se modifican años lectivos o periodos"""
+    generacion = cache.get(GENERACION_KEY)
+    if generacion is None:
+        generacion = 1
+        cache.add(GENERACION_KEY, generacion, None)
+    return generacion
+
+
+def get_cache_key(estudiante_id, generacion=None):
+    if generacion is None:
+        generacion = _get_generacion()
+    return f'{CACHE_PREFIX}:v{SNAPSHOT_VERSION}:g{generacion}:{estudiante_id}'
+
+
+def invalidar_snapshot(estudiante_id):
+    """Elimina el snapshot de un estudiante"""
+    if estudiante_id:
+        cache.delete(get_cache_key(estudiante_id))
+
+
+def invalidar_todos():
+    """Invalida todos los snapshots cambiando la generación global"""
+    try:
+        cache.incr(GENERACION_KEY)
+    except ValueError:
+        cache.set(GENERACION_KEY, 2, None)
+
+
+# =============================================
+# SERIALIZACIÓN
+# =============================================
+
+def _año_dict(año):
+    if not año:
+        return None
+    return {
+        'id': año.id,
+        'anho': año.anho,
+        'estado': año.estado,
+    }
+
+
+def _periodo_dict(periodo):
+    if not periodo:
+        return None
+    return {
+        'id': periodo.id,
+        'periodo': {'nombre': periodo.periodo.nombre},
+        'fecha_inicio': periodo.fecha_inicio,
+        'fecha_fin': periodo.fecha_fin,
+        'año_lectivo_id': periodo.año_lectivo_id,
+    }
+
+
+def _matricula_dict(matricula):
+    if not matricula:
+        return None
+    return {
+        'id': matricula.id,
+        'estado': matricula.estado,
+        'año_lectivo_id': matricula.año_lectivo_id,
+        'grado_año_lectivo': {'grado': {'nombre': matricula.grado_año_lectivo.grado.nombre}},
+        'sede': {'nombre': matricula.sede.nombre},
+    }
+
+
+def _comportamiento_dict(comportamiento):
+    docente = comportamiento.docente
+    return {
+        'id': comportamiento.id,
+        'tipo': comportamiento.tipo,
+        'categoria': comportamiento.categoria,
+        'fecha': comportamiento.fecha,
+        'descripcion': comportamiento.descripcion,
+        'docente': {
+            'usuario': {'get_full_name': docente.usuario.get_full_name()}
+        } if docente else None,
+        'periodo_academico': {
+            'periodo': {'nombre': comportamiento.periodo_academico.periodo.nombre}
+        },
+    }
+
+
+# =============================================
+# CONSTRUCCIÓN
+# =============================================
+
+def construir_snapshot(estudiante, hoy=None):
+    """Calcula el contexto completo del dashboard para un estudiante"""
+    if hoy is None:
+        hoy = timezone.now().date()
+
+    snapshot = {
+        'fecha': hoy,
+        'estudiante': {
+            'id': estudiante.id,
+            'nombres': estudiante.usuario.nombres,
+            'apellidos': estudiante.usuario.apellidos,
+            'nombre_completo': f"{estudiante.usuario.nombres} {estudiante.usuario.apellidos}",
+            'foto_url': imagenes.url(estudiante.foto, 'thumb') or None,
+            'estado': estudiante.estado,
+        },
+    }
+
+    # 1. Matrícula del año activo o, en su defecto, la última matrícula
+    matriculas = list(
+        estudiante.matriculas.select_related(
+            'año_lectivo', 'grado_año_lectivo__grado', 'sede'
+        ).order_by('-año_lectivo__anho')
+    )
+
+    matricula_actual = next((
+        m for m in matriculas
+        if m.estado in ('ACT', 'PEN')
+        and m.año_lectivo.estado
+        and m.año_lectivo.fecha_inicio and m.año_lectivo.fecha_inicio <= hoy
+        and m.año_lectivo.fecha_fin and m.año_lectivo.fecha_fin >= hoy
+    ), None)
+
+    if not matricula_actual:
+        matricula_actual = next(
+            (m for m in matriculas if m.estado in ('ACT', 'PEN', 'INA')), None
+        )
+
+    periodo_actual = None
+    if matricula_actual:
+        snapshot['matricula_actual'] = _matricula_dict(matricula_actual)
+        snapshot['año_lectivo_actual'] = _año_dict(matricula_actual.año_lectivo)
+        snapshot['grado_actual'] = matricula_actual.grado_año_lectivo.grado.nombre
+        snapshot['sede_actual'] = matricula_actual.sede.nombre
+
+        periodo_actual = PeriodoActualMixin().obtener_periodo_actual_inteligente(
+            matricula_actual.año_lectivo, hoy
+        )
+        snapshot['periodo_actual'] = _periodo_dict(periodo_actual)
+
+    # 2. Datos del período actual
+    if periodo_actual:
+        notas_formateadas = []
+        notas_periodo = Nota.objects.filter(
+            estudiante=estudiante,
+            periodo_academico=periodo_actual
+        ).select_related(
+            'asignatura_grado_año_lectivo__asignatura__area'
+        )
+        for nota in notas_periodo:
+            asignatura = nota.asignatura_grado_año_lectivo.asignatura
+            notas_formateadas.append({
+                'nombre': asignatura.nombre,
+                'calificacion': float(nota.calificacion) if nota.calificacion else None,
+                'area': asignatura.area.nombre if asignatura.area else 'General',
+            })
+
+        snapshot['notas_periodo_actual'] = notas_formateadas
+
+        calificaciones = [n['calificacion'] for n in notas_formateadas if n['calificacion'] is not None]
+        if calificaciones:
+            snapshot['promedio_actual'] = sum(calificaciones) / len(calificaciones)
+            snapshot['nota_maxima'] = max(calificaciones)
+            snapshot['nota_minima'] = min(calificaciones)
+
+        comportamientos = list(
+            Comportamiento.objects.filter(
+                estudiante=estudiante,
+                periodo_academico__año_lectivo_id=matricula_actual.año_lectivo_id
+            ).select_related(
+                'docente__usuario',
+                'periodo_academico__periodo'
+            ).order_by('-fecha')[:5]
+        )
+        snapshot['comportamientos_recientes'] = [_comportamiento_dict(c) for c in comportamientos]
+        if comportamientos:
+            snapshot['comportamientos_positivos'] = sum(1 for c in comportamientos if c.tipo == 'Positivo')
+            snapshot['comportamientos_negativos'] = sum(1 for c in comportamientos if c.tipo == 'Negativo')
+
+        # Asistencia del período en una sola consulta
+        asistencia = Asistencia.objects.filter(
+            estudiante=estudiante,
+            periodo_academico=periodo_actual
+        ).aggregate(
+            total=Count('id'),
+            asistio=Count('id', filter=Q(estado='A')),
+        )
+        if asistencia['total']:
+            total = asistencia['total']
+            snapshot['porcentaje_asistencia'] = round(asistencia['asistio'] / total * 100, 1)
+            snapshot['total_asistencias'] = total
+            snapshot['asistencias_positivas'] = asistencia['asistio']
+
+    # 3. Años lectivos cursados
+    años_lectivos = list(
+        AñoLectivo.objects.filter(
+            matriculas__estudiante=estudiante,
+            matriculas__estado__in=['ACT', 'INA', 'RET']
+        ).distinct().order_by('-anho')
+    )
+    snapshot['años_lectivos_estudiante'] = [_año_dict(a) for a in años_lectivos]
+    snapshot['total_años_cursados'] = len(años_lectivos)
+
+    # 4. Matrículas anteriores
+    anteriores = [
+        m for m in matriculas
+        if m.estado in ('INA', 'RET') and (not matricula_actual or m.id != matricula_actual.id)
+    ]
+    snapshot['matriculas_anteriores'] = [
+        dict(_matricula_dict(m), año_lectivo=_año_dict(m.año_lectivo)) for m in anteriores[:5]
+    ]
+
+    # 5. Documentos disponibles por año (dos consultas agrupadas en vez de cuatro por año)
+    notas_por_año = {}
+    for fila in Nota.objects.filter(estudiante=estudiante).values(
+        'periodo_academico__año_lectivo_id', 'periodo_academico__periodo__nombre'
+    ).distinct():
+        periodos = notas_por_año.setdefault(fila['periodo_academico__año_lectivo_id'], set())
+        periodos.add(fila['periodo_academico__periodo__nombre'])
+
+    años_con_comportamientos = set(
+        Comportamiento.objects.filter(estudiante=estudiante).values_list(
+            'periodo_academico__año_lectivo_id', flat=True
+        ).distinct()
+    )
+
+    matricula_por_año = {}
+    for m in matriculas:
+        matricula_por_año.setdefault(m.año_lectivo_id, m)
+
+    snapshot['documentos_por_año'] = [
+        {
+            'año': _año_dict(año),
+            'matricula': _matricula_dict(matricula_por_año.get(año.id)),
+            'tiene_notas': año.id in notas_por_año,
+            'tiene_comportamientos': año.id in años_con_comportamientos,
+            'tiene_boletin_final': 'Cuarto' in notas_por_año.get(año.id, ()),
+        }
+        for año in años_lectivos
+    ]
+
+    # 6. Estado global
+    if matricula_actual:
+        snapshot['es_año_actual'] = matricula_actual.año_lectivo.estado
+    else:
+        snapshot['es_año_actual'] = False
+        snapshot['mensaje_estado'] = "Actualmente no estás matriculado en el año lectivo en curso"
+
+    return snapshot
+
+
+# =============================================
+# LECTURA / ESCRITURA EN CACHÉ
+# =============================================
+
+def guardar_snapshot(estudiante, hoy=None):
+    """Reconstruye y guarda el snapshot de un estudiante"""
+    snapshot = construir_snapshot(estudiante, hoy)
+    cache.set(get_cache_key(estudiante.id), snapshot, _get_timeout())
+    return snapshot
+
+
+def obtener_snapshot(estudiante, hoy=None):
+    """Devuelve el snapshot en caché o lo reconstruye si no existe o es de otro día"""
+    if hoy is None:
+        hoy = timezone.now().date()
+
+    snapshot = cache.get(get_cache_key(estudiante.id))
+    if snapshot is not None and snapshot.get('fecha') == hoy:
+        return snapshot
+
+    return guardar_snapshot(estudiante, hoy)
+
+
+def precargar_snapshots(estudiantes=None, hoy=None):
+    """Construye los snapshots de los estudiantes indicados (o de todos los activos)"""
+    if estudiantes is None:
+        estudiantes = Estudiante.objects.filter(
+            estado=True,
+            matriculas__año_lectivo__estado=True,
+            matriculas__estado__in=['ACT', 'PEN']
+        ).select_related('usuario').distinct()
+
+    if hasattr(estudiantes, 'iterator'):
+        estudiantes = estudiantes.iterator()
+
+    total = 0
+    for estudiante in estudiantes:
+        guardar_snapshot(estudiante, hoy)
+        total += 1
+    return total
@@ -0,0 +1,457 @@
+"""
+Generador de un colegio sintético
+gestioncolegio/services/datos_sinteticos.py
+
+Crea un colegio completo a escala configurable (sedes, grados, estudiantes
+por grado, años de historial de Nota / Asistencia / Comportamiento) para
+benchmarks y pruebas de presupuesto de consultas. Todo se inserta con
+bulk_create y un generador aleatorio con semilla, así dos ejecuciones con los
+mismos parámetros producen los mismos datos.
+
+Los usuarios sintéticos tienen documento con prefijo PREFIJO_DOCUMENTO y el
+colegio se llama NOMBRE_COLEGIO; limpiar() borra ambos.
+"""
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from academico.models import Area, Asignatura, Grado, Logro, NivelEscolar, Periodo
+from comportamiento.models import Asistencia, Comportamiento
+from estudiantes.models import Acudiente, Estudiante, Matricula, Nota
+from gestioncolegio.models import AñoLectivo, Colegio, ConfiguracionGeneral, RecursosColegio, Sede
+from matricula.models import AsignaturaGradoAñoLectivo, DocenteSede, GradoAñoLectivo, PeriodoAcademico
+from usuarios.models import Docente, TipoDocumento, TipoUsuario, Usuario
+
+from .asistencia import reconstruir_resumenes
+
+PREFIJO_DOCUMENTO = 'SIN-'
+NOMBRE_COLEGIO = 'Colegio Sintético'
+LOTE = 2000
+
+ESCALAS = {
+    'chica': {'sedes': 1, 'estudiantes_por_grado': 10, 'años': 1, 'dias_asistencia': 5},
+    'mediana': {'sedes': 2, 'estudiantes_por_grado': 30, 'años': 2, 'dias_asistencia': 15},
+    'grande': {'sedes': 3, 'estudiantes_por_grado': 40, 'años': 3, 'dias_asistencia': 40},
+}
+
+NOMBRES = [
+    'Sofía', 'Valentina', 'Isabella', 'Camila', 'Mariana', 'Luciana', 'Sara', 'Gabriela',
+    'Santiago', 'Sebastián', 'Matías', 'Nicolás', 'Samuel', 'Alejandro', 'Daniel', 'Tomás',
+]
+APELLIDOS = [
+    'Rodríguez', 'Gómez', 'González', 'Martínez', 'García', 'López', 'Hernández', 'Sánchez',
+    'Ramírez', 'Pérez', 'Díaz', 'Muñoz', 'Rojas', 'Moreno', 'Jiménez', 'Vargas', 'Castro',
+]
+
+# Áreas y asignaturas por nivel (nombre del área -> asignaturas)
+PLAN_ESTUDIOS = {
+    NivelEscolar.PREESCOLAR: {
+        'Dimensión Cognitiva': ['Pensamiento Lógico', 'Exploración del Medio'],
+        'Dimensión Comunicativa': ['Lenguaje', 'Inglés'],
+        'Dimensión Corporal': ['Psicomotricidad'],
+    },
+    NivelEscolar.PRIMARIA: {
+        'Matemáticas': ['Matemáticas', 'Geometría'],
+        'Humanidades': ['Lengua Castellana', 'Inglés'],
+        'Ciencias Naturales': ['Ciencias Naturales'],
+        'Ciencias Sociales': ['Ciencias Sociales'],
+        'Educación Artística': ['Artística'],
+        'Educación Física': ['Educación Física'],
+    },
+}
+
+NIVEL_DE_GRADO = {
+    Grado.PREJARDIN: NivelEscolar.PREESCOLAR,
+    Grado.JARDIN: NivelEscolar.PREESCOLAR,
+    Grado.TRANSICION: NivelEscolar.PREESCOLAR,
+    Grado.PRIMERO: NivelEscolar.PRIMARIA,
+    Grado.SEGUNDO: NivelEscolar.PRIMARIA,
+    Grado.TERCERO: NivelEscolar.PRIMARIA,
+    Grado.CUARTO: NivelEscolar.PRIMARIA,
+    Grado.QUINTO: NivelEscolar.PRIMARIA,
+}
+
+ORDEN_GRADOS = [valor for valor, _ in Grado.GRADOS]
+ORDEN_PERIODOS = [valor for valor, _ in Periodo.PERIODOS]
+
+
+def limpiar():
+    """Borra el colegio y los usuarios sintéticos (en cascada)"""
+    with transaction.atomic():
+        Colegio.objects.filter(nombre=NOMBRE_COLEGIO).delete()
+        Usuario.objects.filter(numero_documento__startswith=PREFIJO_DOCUMENTO).delete()
+
+
+def existe():
+    return Colegio.objects.filter(nombre=NOMBRE_COLEGIO).exists()
+
+
+def _dias_habiles(desde, hasta):
+    dia = desde
+    while dia <= hasta:
+        if dia.weekday() < 5:
+            yield dia
+        dia += timedelta(days=1)
+
+
+class GeneradorColegio:
+    """Arma el colegio paso a paso; generar() devuelve el contexto para los escenarios"""
+
+    def __init__(self, sedes=1, estudiantes_por_grado=20, años=1, dias_asistencia=10,
+                 comportamientos=1, semilla=1, password='sintetico123', salida=None):
+        self.n_sedes = sedes
+        self.estudiantes_por_grado = estudiantes_por_grado
+        self.n_años = años
+        self.dias_asistencia = dias_asistencia
+        self.comportamientos = comportamientos
+        self.rnd = random.Random(semilla)
+        self.password = make_password(password)
+        self.salida = salida
+        self.hoy = timezone.now().date()
+        self.secuencia = 0
+        self.conteos = {}
+
+    def log(self, mensaje):
+        if self.salida:
+            self.salida(mensaje)
+
+    def contar(self, nombre, cantidad):
+        self.conteos[nombre] = self.conteos.get(nombre, 0) + cantidad
+
+    # ---------- Catálogos ----------
+
+    def catalogos(self):
+        self.tipos_usuario = {
+            nombre: TipoUsuario.objects.get_or_create(nombre=nombre)[0]
+            for nombre, _ in TipoUsuario.TIPOS
+        }
+        self.tipo_ti = TipoDocumento.objects.get_or_create(nombre=TipoDocumento.TI)[0]
+        self.tipo_cc = TipoDocumento.objects.get_or_create(nombre=TipoDocumento.CC)[0]
+
+        niveles = {
+            nombre: NivelEscolar.objects.get_or_create(nombre=nombre)[0]
+            for nombre, _ in NivelEscolar.NIVELES
+        }
+        self.grados = [
+            Grado.objects.get_or_create(nombre=nombre, defaults={'nivel_escolar': niveles[NIVEL_DE_GRADO[nombre]]})[0]
+            for nombre in ORDEN_GRADOS
+        ]
+        self.periodos = [Periodo.objects.get_or_create(nombre=nombre)[0] for nombre in ORDEN_PERIODOS]
+
+        # Asignaturas por nivel
+        self.asignaturas_nivel = {}
+        for nivel_nombre, areas in PLAN_ESTUDIOS.items():
+            nivel = niveles[nivel_nombre]
+            asignaturas = []
+            for area_nombre, nombres in areas.items():
+                area = Area.objects.get_or_create(nombre=area_nombre, nivel_escolar=nivel)[0]
+                for nombre in nombres:
+                    asignaturas.append(
+                        Asignatura.objects.get_or_create(nombre=nombre, area=area, defaults={'ih': '4'})[0]
+                    )
+            self.asignaturas_nivel[nivel.id] = asignaturas
+
+    # ---------- Usuarios ----------
+
+    def nuevo_usuario(self, tipo, tipo_documento, nacimiento, **extra):
+        self.secuencia += 1
+        documento = f'{PREFIJO_DOCUMENTO}{self.secuencia:07d}'
+        nombres = self.rnd.choice(NOMBRES)
+        apellidos = f'{self.rnd.choice(APELLIDOS)} {self.rnd.choice(APELLIDOS)}'
+        return Usuario(
+            username=documento,
+            password=self.password,
+            numero_documento=documento,
+            tipo_documento=tipo_documento,
+            nombres=nombres,
+            apellidos=apellidos,
+            first_name=nombres,
+            last_name=apellidos,
+            email=f'{documento.lower()}@sintetico.test',
+            sexo=self.rnd.choice('MF'),
+            fecha_nacimiento=nacimiento,
+            tipo_usuario=self.tipos_usuario[tipo],
+            **extra
+        )
+
+    def crear_usuarios(self, usuarios):
+        Usuario.objects.bulk_create(usuarios, batch_size=LOTE)
+        # bulk_create no devuelve pk en MySQL: se releen por documento
+        por_documento = dict(Usuario.objects.filter(
+            numero_documento__in=[u.numero_documento for u in usuarios]
+        ).values_list('numero_documento', 'id'))
+        for usuario in usuarios:
+            usuario.id = por_documento[usuario.numero_documento]
+        self.contar('usuarios', len(usuarios))
+        return usuarios
+
+    # ---------- Estructura ----------
+
+    def colegio(self):
+        self.colegio_obj = Colegio.objects.create(
+            nombre=NOMBRE_COLEGIO, direccion='Calle 1 # 2-3', resolucion='RES-0001', dane='000000000000'
+        )
+        RecursosColegio.objects.create(
+            colegio=self.colegio_obj, sitio_web='https://sintetico.test', email='info@sintetico.test'
+        )
+        self.sedes = [
+            Sede.objects.create(colegio=self.colegio_obj, nombre=f'Sede {i + 1}', direccion=f'Carrera {i + 1}')
+            for i in range(self.n_sedes)
+        ]
+
+        self.admin = self.crear_usuarios([
+            self.nuevo_usuario(TipoUsuario.ADMINISTRADOR, self.tipo_cc, date(1980, 1, 1), is_staff=True)
+        ])[0]
+
+    def años_lectivos(self):
+        """Un AñoLectivo por sede y año; el actual (activo) contiene a hoy"""
+        año_actual = self.hoy.year
+        self.años = {}
+        for sede in self.sedes:
+            for atras in range(self.n_años):
+                anho = año_actual - atras
+                año = AñoLectivo.objects.create(
+                    colegio=self.colegio_obj, sede=sede, anho=str(anho),
+                    fecha_inicio=date(anho, 1, 15), fecha_fin=date(anho, 12, 15),
+                    estado=atras == 0,
+                )
+                self.años[(sede.id, atras)] = año
+
+                # Cuatro períodos de 10 semanas repartidos en el año
+                inicio = año.fecha_inicio
+                duracion = (año.fecha_fin - año.fecha_inicio).days // len(self.periodos)
+                año.periodos_sinteticos = []
+                for i, periodo in enumerate(self.periodos):
+                    fin = inicio + timedelta(days=duracion - 1) if i < len(self.periodos) - 1 else año.fecha_fin
+                    año.periodos_sinteticos.append(PeriodoAcademico.objects.create(
+                        año_lectivo=año, periodo=periodo, fecha_inicio=inicio, fecha_fin=fin,
+                        estado=atras == 0,
+                    ))
+                    inicio = fin + timedelta(days=1)
+
+        ConfiguracionGeneral.objects.get_or_create(
+            colegio=self.colegio_obj,
+            defaults={'año_lectivo_actual': self.años[(self.sedes[0].id, 0)]}
+        )
+
+    def docentes(self):
+        """Un docente por grado y sede, titular de todas las asignaturas del grado"""
+        usuarios = self.crear_usuarios([
+            self.nuevo_usuario(TipoUsuario.DOCENTE, self.tipo_cc, date(1985, 6, 1))
+            for _ in self.sedes for _ in self.grados
+        ])
+        Docente.objects.bulk_create([Docente(usuario_id=u.id) for u in usuarios])
+        docentes = list(Docente.objects.filter(usuario_id__in=[u.id for u in usuarios]).order_by('id'))
+        self.contar('docentes', len(docentes))
+
+        self.docente_de = {}
+        iterador = iter(docentes)
+        for sede in self.sedes:
+            for grado in self.grados:
+                self.docente_de[(sede.id, grado.id)] = next(iterador)
+
+        DocenteSede.objects.bulk_create([
+            DocenteSede(docente=self.docente_de[(sede.id, grado.id)], sede=sede, año_lectivo=self.años[(sede.id, atras)])
+            for sede in self.sedes for grado in self.grados for atras in range(self.n_años)
+        ], batch_size=LOTE)
+
+    def cursos(self):
+        """GradoAñoLectivo, AsignaturaGradoAñoLectivo y logros de cada año"""
+        self.cursos_año = {}
+        self.asignaturas_curso = {}
+        logros = []
+        for (sede_id, atras), año in self.años.items():
+            for grado in self.grados:
+                curso = GradoAñoLectivo.objects.create(grado=grado, año_lectivo=año)
+                self.cursos_año[(sede_id, atras, grado.id)] = curso
+                asignaturas = self.asignaturas_nivel[grado.nivel_escolar_id]
+                AsignaturaGradoAñoLectivo.objects.bulk_create([
+                    AsignaturaGradoAñoLectivo(
+                        asignatura=asignatura, grado_año_lectivo=curso, sede_id=sede_id,
+                        docente=self.docente_de[(sede_id, grado.id)],
+                    )
+                    for asignatura in asignaturas
+                ])
+                for periodo in año.periodos_sinteticos:
+                    logros.extend(
+                        Logro(
+                            asignatura=asignatura, periodo_academico=periodo, grado=grado,
+                            tema=f'Tema {periodo.periodo.nombre} de {asignatura.nombre}',
+                            descripcion_superior='Supera ampliamente los desempeños propuestos',
+                            descripcion_alto='Alcanza los desempeños propuestos',
+                            descripcion_basico='Alcanza los desempeños mínimos',
+                            descripcion_bajo='No alcanza los desempeños mínimos',
+                        )
+                        for asignatura in asignaturas
+                    )
+        Logro.objects.bulk_create(logros, batch_size=LOTE)
+        self.contar('logros', len(logros))
+
+        for asignatura_grado in AsignaturaGradoAñoLectivo.objects.filter(
+            grado_año_lectivo__año_lectivo__colegio=self.colegio_obj
+        ):
+            self.asignaturas_curso.setdefault(asignatura_grado.grado_año_lectivo_id, []).append(asignatura_grado)
+
+    def estudiantes(self):
+        """Estudiantes del año actual con acudiente; en años anteriores cursaron el grado previo"""
+        n_grados = len(self.grados)
+        por_sede_grado = {}
+        usuarios = []
+        acudientes = []
+        for sede in self.sedes:
+            for indice, grado in enumerate(self.grados):
+                edad = 3 + indice
+                for _ in range(self.estudiantes_por_grado):
+                    nacimiento = date(self.hoy.year - edad, self.rnd.randint(1, 12), self.rnd.randint(1, 28))
+                    usuarios.append(self.nuevo_usuario(TipoUsuario.ESTUDIANTE, self.tipo_ti, nacimiento))
+                    acudientes.append(self.nuevo_usuario(TipoUsuario.ACUDIENTE, self.tipo_cc, date(1985, 1, 1)))
+                    por_sede_grado.setdefault((sede.id, indice), []).append(usuarios[-1])
+
+        self.crear_usuarios(usuarios)
+        self.crear_usuarios(acudientes)
+        Estudiante.objects.bulk_create([Estudiante(usuario_id=u.id) for u in usuarios], batch_size=LOTE)
+        estudiante_de = dict(Estudiante.objects.filter(
+            usuario_id__in=[u.id for u in usuarios]
+        ).values_list('usuario_id', 'id'))
+        Acudiente.objects.bulk_create([
+            Acudiente(acudiente_id=acudiente.id, estudiante_id=estudiante_de[usuario.id], parentesco='Madre')
+            for usuario, acudiente in zip(usuarios, acudientes)
+        ], batch_size=LOTE)
+        self.contar('estudiantes', len(usuarios))
+
+        # Matrículas: año actual en su grado, años anteriores en el grado previo
+        self.matriculados = {}
+        matriculas = []
+        for (sede_id, indice), usuarios_grado in por_sede_grado.items():
+            for atras in range(self.n_años):
+                indice_año = indice - atras
+                if indice_año < 0 or indice_año >= n_grados:
+                    continue
+                año = self.años[(sede_id, atras)]
+                curso = self.cursos_año[(sede_id, atras, self.grados[indice_año].id)]
+                for usuario in usuarios_grado:
+                    estudiante_id = estudiante_de[usuario.id]
+                    self.secuencia += 1
+                    matriculas.append(Matricula(
+                        estudiante_id=estudiante_id, año_lectivo=año, sede_id=sede_id, grado_año_lectivo=curso,
+                        estado='ACT' if atras == 0 else 'INA',
+                        codigo_matricula=f'SIN-{año.anho}-{self.secuencia:07d}',
+                    ))
+                    self.matriculados.setdefault(curso.id, []).append(estudiante_id)
+        Matricula.objects.bulk_create(matriculas, batch_size=LOTE)
+        self.contar('matriculas', len(matriculas))
+
+    # ---------- Historial ----------
+
+    def historial(self):
+        """Notas, asistencia y comportamiento de cada período ya iniciado"""
+        notas, asistencias, comportamientos = [], [], []
+        for (sede_id, atras), año in self.años.items():
+            for periodo in año.periodos_sinteticos:
+                if periodo.fecha_inicio > self.hoy:
+                    continue
+                dias = list(_dias_habiles(periodo.fecha_inicio, min(periodo.fecha_fin, self.hoy)))
+                dias = dias[-self.dias_asistencia:] if self.dias_asistencia else []
+
+                for grado in self.grados:
+                    curso = self.cursos_año[(sede_id, atras, grado.id)]
+                    docente = self.docente_de[(sede_id, grado.id)]
+                    for estudiante_id in self.matriculados.get(curso.id, []):
+                        # Cada estudiante tiene su nivel base: unos pocos quedan en riesgo
+                        base = self.rnd.gauss(3.8, 0.6)
+                        for asignatura_grado in self.asignaturas_curso[curso.id]:
+                            calificacion = min(5.0, max(1.0, self.rnd.gauss(base, 0.4)))
+                            notas.append(Nota(
+                                estudiante_id=estudiante_id, asignatura_grado_año_lectivo=asignatura_grado,
+                                periodo_academico=periodo, calificacion=round(calificacion, 1),
+                            ))
+                        for dia in dias:
+                            azar = self.rnd.random()
+                            estado = 'A' if azar < 0.92 else ('F' if azar < 0.97 else 'J')
+                            asistencias.append(Asistencia(
+                                estudiante_id=estudiante_id, periodo_academico=periodo, fecha=dia, estado=estado,
+                                justificacion='Cita médica' if estado == 'J' else None,
+                            ))
+                        for _ in range(self.comportamientos):
+                            tipo = self.rnd.choice([Comportamiento.POSITIVO, Comportamiento.NEGATIVO])
+                            comportamientos.append(Comportamiento(
+                                estudiante_id=estudiante_id, periodo_academico=periodo, docente=docente,
+                                tipo=tipo, categoria=self.rnd.choice(Comportamiento.CATEGORIAS)[0],
+                                descripcion=f'Observación {tipo.lower()} sintética',
+                                fecha=self.rnd.choice(dias) if dias else periodo.fecha_inicio,
+                            ))
+
+                if len(notas) >= LOTE * 5:
+                    self.volcar(notas, asistencias, comportamientos)
+                    notas, asistencias, comportamientos = [], [], []
+        self.volcar(notas, asistencias, comportamientos)
+
+        # bulk_create no dispara las señales de los resúmenes de asistencia
+        reconstruir_resumenes()
+
+    def volcar(self, notas, asistencias, comportamientos):
+        Nota.objects.bulk_create(notas, batch_size=LOTE)
+        Asistencia.objects.bulk_create(asistencias, batch_size=LOTE)
+        Comportamiento.objects.bulk_create(comportamientos, batch_size=LOTE)
+        self.contar('notas', len(notas))
+        self.contar('asistencias', len(asistencias))
+        self.contar('comportamientos', len(comportamientos))
+        self.log(f"  {self.conteos['notas']} notas, {self.conteos['asistencias']} asistencias...")
+
+    # ---------- Contexto ----------
+
+    def contexto(self):
+        """Objetos representativos para los escenarios de benchmark y pruebas"""
+        sede = self.sedes[0]
+        año = self.años[(sede.id, 0)]
+        grado = self.grados[ORDEN_GRADOS.index(Grado.TERCERO)]
+        curso = self.cursos_año[(sede.id, 0, grado.id)]
+        periodo = next(
+            (p for p in año.periodos_sinteticos if p.fecha_inicio <= self.hoy <= p.fecha_fin),
+            año.periodos_sinteticos[0]
+        )
+        estudiante = Estudiante.objects.select_related('usuario').get(id=self.matriculados[curso.id][0])
+        docente = self.docente_de[(sede.id, grado.id)]
+        return {
+            'colegio': self.colegio_obj,
+            'sede': sede,
+            'año_lectivo': año,
+            'periodo': periodo,
+            'grado': grado,
+            'curso': curso,
+            'asignatura_grado': self.asignaturas_curso[curso.id][0],
+            'estudiantes_curso': self.matriculados[curso.id],
+            'estudiante': estudiante,
+            'docente': docente,
+            'usuario_admin': self.admin,
+            'usuario_docente': docente.usuario,
+            'usuario_estudiante': estudiante.usuario,
+            'usuario_acudiente': Acudiente.objects.select_related('acudiente').get(estudiante=estudiante).acudiente,
+            'hoy': self.hoy,
+            'conteos': self.conteos,
+        }
+
+    def generar(self):
+        self.log('Catálogos...')
+        self.catalogos()
+        self.log('Colegio, sedes y años lectivos...')
+        self.colegio()
+        self.años_lectivos()
+        self.log('Docentes y cursos...')
+        self.docentes()
+        self.cursos()
+        self.log('Estudiantes y matrículas...')
+        self.estudiantes()
+        self.log('Historial académico...')
+        self.historial()
+        return self.contexto()
+
+
+def generar_colegio(escala=None, **opciones):
+    """Genera el colegio sintético; escala es una clave de ESCALAS (las opciones la sobrescriben)"""
+    parametros = dict(ESCALAS.get(escala, {}))
+    parametros.update({clave: valor for clave, valor in opciones.items() if valor is not None})
+    return GeneradorColegio(**parametros).generar()
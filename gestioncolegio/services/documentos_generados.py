@@ -0,0 +1,197 @@
+"""
+Caché en disco de documentos PDF de estudiantes
+gestioncolegio/services/documentos_generados.py
+
+Una constancia o el boletín de un período cerrado no cambian mientras no
+cambien los datos que contienen, pero se volvían a generar en cada descarga.
+Cada PDF se guarda bajo MEDIA_ROOT/documentos_generados/<estudiante>/ con un
+nombre derivado de (tipo de documento, año/período y huella), donde la huella
+es un SHA-1 de las filas que lo alimentan (usuario, matrículas, notas,
+comportamientos, posiciones, asignaturas del curso, logros), de los recursos
+del colegio y de la versión de la plantilla.
+
+Si cambia cualquier fila la huella es otra y el documento se regenera, y al
+guardarlo se borran las versiones anteriores del mismo documento (y sus copias
+firmadas). Los documentos de otros períodos o años no se tocan.
+Las actualizaciones masivas con .update() no tocan updated_at: después de
+ellas conviene borrar DIRECTORIO_DOCUMENTOS.
+
+Cada documento guardado se encola para la firma digital por lotes
+(firma_digital); una vez firmado se sirve la copia firmada.
+
+Los archivos se sirven con ETag / Last-Modified (respuesta 304 si el navegador
+ya los tiene) y, si DOCUMENTOS_SENDFILE_HEADER está configurado, delegando el
+envío al servidor web con X-Sendfile o X-Accel-Redirect.
+"""
+import glob
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from comportamiento.models import Comportamiento
+from estudiantes.models import Matricula, Nota, PosicionEstudiante
+from academico.models import Logro
+from gestioncolegio.services import firma_digital
+from matricula.models import AsignaturaGradoAñoLectivo
+
+DIRECTORIO_DOCUMENTOS = 'documentos_generados'
+
+# Subir la versión al cambiar el diseño de un documento invalida sus copias
+VERSION_PLANTILLAS = {
+    'constancia': 1,
+    'reporte_notas': 1,
+    'boletin_final': 1,
+}
+
+
+# =============================================
+# HUELLA DE LOS DATOS
+# =============================================
+
+def huella_estudiante(estudiante, año_lectivo=None, periodo=None, extra=()):
+    """
+    SHA-1 de las filas que alimentan un documento del estudiante en el año
+    (o período) dado, más los valores de 'extra'.
+    """
+    año_id = getattr(año_lectivo, 'id', año_lectivo)
+    periodo_id = getattr(periodo, 'id', periodo)
+    usuario = estudiante.usuario
+
+    matriculas = Matricula.objects.filter(estudiante=estudiante)
+    notas = Nota.objects.filter(estudiante=estudiante)
+    comportamientos = Comportamiento.objects.filter(estudiante=estudiante)
+    posiciones = PosicionEstudiante.objects.filter(estudiante=estudiante)
+    logros = Logro.objects.none()
+    if año_id:
+        matriculas = matriculas.filter(año_lectivo_id=año_id)
+        notas = notas.filter(periodo_academico__año_lectivo_id=año_id)
+        comportamientos = comportamientos.filter(periodo_academico__año_lectivo_id=año_id)
+        posiciones = posiciones.filter(grado_año_lectivo__año_lectivo_id=año_id)
+        logros = Logro.objects.filter(periodo_academico__año_lectivo_id=año_id)
+    if periodo_id:
+        notas = notas.filter(periodo_academico_id=periodo_id)
+        logros = logros.filter(periodo_academico_id=periodo_id)
+
+    filas_matriculas = list(matriculas.order_by('id').values_list(
+        'id', 'estado', 'grado_año_lectivo_id', 'grado_año_lectivo__grado_id', 'sede_id', 'updated_at'
+    ))
+    asignaturas = []
+    if año_id and filas_matriculas:
+        cursos = Q()
+        for _, _, curso_id, _, sede_id, _ in filas_matriculas:
+            cursos |= Q(grado_año_lectivo_id=curso_id, sede_id=sede_id)
+        asignaturas = list(AsignaturaGradoAñoLectivo.objects.filter(cursos).order_by('id').values_list(
+            'id', 'docente_id', 'updated_at'
+        ))
+        logros = logros.filter(grado_id__in=[fila[3] for fila in filas_matriculas])
+    else:
+        logros = Logro.objects.none()
+
+    partes = [
+        (usuario.nombres, usuario.apellidos, usuario.numero_documento, usuario.tipo_documento_id, usuario.updated_at),
+        filas_matriculas,
+        list(notas.order_by('id').values_list('id', 'updated_at')),
+        list(comportamientos.order_by('id').values_list('id', 'updated_at')),
+        list(posiciones.order_by('periodo_academico_id', 'sede_id').values_list(
+            'periodo_academico_id', 'sede_id', 'promedio', 'puesto', 'total_estudiantes', 'percentil'
+        )),
+        asignaturas,
+        list(logros.order_by('id').values_list('id', 'updated_at')),
+        tuple(extra),
+    ]
+    return hashlib.sha1(repr(partes).encode()).hexdigest()
+
+
+# =============================================
+# DISCO
+# =============================================
+
+def _guardar(ruta, contenido):
+    """Escritura atómica: nunca se sirve un PDF a medio escribir"""
+    directorio = os.path.dirname(ruta)
+    os.makedirs(directorio, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+    except Exception:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+# =============================================
+# RESPUESTA
+# =============================================
+
+def _respuesta_archivo(ruta, relativa):
+    encabezado = getattr(settings, 'DOCUMENTOS_SENDFILE_HEADER', '')
+    if encabezado == 'X-Accel-Redirect':
+        response = HttpResponse(content_type='application/pdf')
+        response[encabezado] = settings.DOCUMENTOS_SENDFILE_URL + relativa.replace(os.sep, '/')
+    elif encabezado:
+        response = HttpResponse(content_type='application/pdf')
+        response[encabezado] = ruta
+    else:
+        response = FileResponse(open(ruta, 'rb'), content_type='application/pdf')
+    return response
+
+
+def servir_documento(request, tipo, estudiante_id, alcance, huella, generar, nombre_archivo):
+    """
+    Respuesta con el PDF en caché; generar() (que devuelve los bytes del PDF)
+    solo se llama si no existe el archivo de esta huella.
+    """
+    huella = hashlib.sha1(f'{huella}:{VERSION_PLANTILLAS[tipo]}'.encode()).hexdigest()
+    prefijo = f'{tipo}_{alcance}_'
+    relativa = os.path.join(DIRECTORIO_DOCUMENTOS, str(estudiante_id), f'{prefijo}{huella}.pdf')
+    ruta = os.path.join(settings.MEDIA_ROOT, relativa)
+
+    if not os.path.exists(ruta):
+        contenido = generar()
+        # Versiones anteriores del mismo documento
+        for anterior in glob.glob(os.path.join(os.path.dirname(ruta), f'{glob.escape(prefijo)}*.pdf')):
+            if anterior != ruta:
+                try:
+                    os.remove(anterior)
+                except OSError:
+                    pass
+        _guardar(ruta, contenido)
+        firma_digital.encolar(tipo, estudiante_id, relativa)
+
+    # Si ya pasó por la firma por lotes se entrega la copia firmada
+    firmada = firma_digital.ruta_firmada(relativa)
+    if os.path.exists(os.path.join(settings.MEDIA_ROOT, firmada)):
+        relativa = firmada
+        ruta = os.path.join(settings.MEDIA_ROOT, firmada)
+        huella = f'{huella}-firmado'
+
+    etag = f'"{huella}"'
+    ultima_modificacion = int(os.path.getmtime(ruta))
+    response = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+    if response is None:
+        response = _respuesta_archivo(ruta, relativa)
+        response['Content-Disposition'] = f'inline; filename="{nombre_archivo}"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(ultima_modificacion)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def periodo_cerrado(periodo, hoy=None):
+    """Un período inactivo o ya terminado no recibe más notas"""
+    hoy = hoy or timezone.localdate()
+    return not periodo.estado or periodo.fecha_fin < hoy
+
+
+def año_cerrado(año_lectivo, hoy=None):
+    hoy = hoy or timezone.localdate()
+    return not año_lectivo.estado or bool(año_lectivo.fecha_fin and año_lectivo.fecha_fin < hoy)
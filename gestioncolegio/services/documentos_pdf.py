@@ -0,0 +1,250 @@
+"""
+Recursos compartidos para los PDF institucionales (ReportLab)
+gestioncolegio/services/documentos_pdf.py
+
+Constancias, observadores, reportes de notas y boletines consultaban el
+colegio y sus recursos en cada página (la marca de agua se dibuja con
+onFirstPage/onLaterPages), volvían a leer y decodificar el escudo desde disco
+y reconstruían la hoja de estilos en cada petición.
+
+Aquí se guarda por proceso:
+- el escudo ya decodificado (ImageReader) para encabezado y marca de agua,
+- los textos del encabezado y del pie institucional,
+- una única hoja de estilos con los estilos de todos los documentos.
+
+La clave del caché es (colegio, Colegio.updated_at, RecursosColegio.updated_at):
+cada documento hace una sola consulta liviana para comprobarla y, si el
+colegio o sus recursos cambiaron, se recargan.
+
+Los objetos cacheados son compartidos entre peticiones: son de solo lectura.
+Los flowables se crean nuevos en cada documento porque ReportLab guarda en
+ellos el estado de maquetación.
+"""
+import os
+import threading
+
+from django.core.exceptions import ObjectDoesNotExist
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Flowable, Paragraph, Spacer, Table, TableStyle
+
+from gestioncolegio.models import Colegio, RecursosColegio
+
+NOMBRE_COLEGIO = "COLEGIO CRISTIANO EL SHADAI"
+NIVELES_EDUCATIVOS = "Educación Preescolar – Básica Primaria"
+
+RECURSOS_POR_DEFECTO = {
+    'sitio_web': 'https://colegiocrishadai.edu.co',
+    'email': 'info@colegiocrishadai.edu.co',
+    'telefono': '+57 123 456 7890',
+}
+
+TAMAÑO_MARCA_AGUA = 12 * cm
+OPACIDAD_MARCA_AGUA = 0.07
+
+
+class EscudoFlowable(Flowable):
+    """Dibuja el escudo ya decodificado sin volver a abrir el archivo"""
+
+    def __init__(self, lector, width, height):
+        super().__init__()
+        self.lector = lector
+        self.width = width
+        self.height = height
+
+    def wrap(self, disponible_ancho, disponible_alto):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(
+            self.lector, 0, 0, width=self.width, height=self.height,
+            preserveAspectRatio=True, mask='auto'
+        )
+
+
+class RecursosPDF:
+    """Colegio, escudo decodificado y textos institucionales de un momento dado"""
+
+    def __init__(self, colegio, recursos):
+        self.clave = (colegio.id, colegio.updated_at, recursos.updated_at)
+        self.colegio = colegio
+        self.recursos = recursos
+        self.escudo = self._leer_escudo(recursos)
+
+        self.resolucion = colegio.resolucion or "---"
+        self.dane = colegio.dane or "---"
+        self.direccion = colegio.direccion or "Valledupar - Cesar"
+
+        direccion_pie = colegio.direccion or "Dirección no especificada"
+        telefono = recursos.telefono or ""
+        celular = getattr(recursos, "celular", "") or ""
+        email = recursos.email or ""
+        web = recursos.sitio_web or ""
+        lineas = [
+            f"<b>{NOMBRE_COLEGIO}</b>",
+            direccion_pie + (f" | Tel: {telefono}" if telefono else "") + (f" | Cel: {celular}" if celular else ""),
+            (f"Email: {email}" if email else "") + (f" | Web: {web}" if web else ""),
+        ]
+        self.contacto = [linea for linea in lineas if linea.strip()]
+
+    @staticmethod
+    def _leer_escudo(recursos):
+        """ImageReader del escudo con los píxeles ya decodificados; None si no hay"""
+        try:
+            if recursos.escudo and os.path.exists(recursos.escudo.path):
+                lector = ImageReader(recursos.escudo.path)
+                # Decodifica una vez; drawImage reutiliza los datos en cada página
+                lector.getRGBData()
+                return lector
+        except (AttributeError, ValueError, OSError) as e:
+            print(f"Error cargando escudo para PDF: {e}")
+        return None
+
+    # -------------------- MARCA DE AGUA --------------------
+    def dibujar_marca_agua(self, canvas, pagesize, texto):
+        """Escudo centrado y translúcido; texto diagonal si no hay escudo"""
+        try:
+            canvas.saveState()
+            canvas.setFillAlpha(OPACIDAD_MARCA_AGUA)
+            page_width, page_height = pagesize
+            if self.escudo is not None:
+                x = (page_width - TAMAÑO_MARCA_AGUA) / 2
+                y = (page_height - TAMAÑO_MARCA_AGUA) / 2
+                canvas.drawImage(
+                    self.escudo, x, y, width=TAMAÑO_MARCA_AGUA, height=TAMAÑO_MARCA_AGUA,
+                    preserveAspectRatio=True, mask='auto'
+                )
+            else:
+                canvas.setFont("Helvetica-Bold", 50)
+                canvas.rotate(45)
+                canvas.drawCentredString(page_width / 2, page_height / 3, texto)
+            canvas.restoreState()
+        except Exception as e:
+            print(f"Error en marca de agua: {e}")
+
+    def marca_agua(self, texto):
+        """Función para onFirstPage/onLaterPages de doc.build()"""
+        def dibujar(canvas, doc):
+            self.dibujar_marca_agua(canvas, doc.pagesize, texto)
+        return dibujar
+
+    # -------------------- ENCABEZADO Y PIE --------------------
+    def logo(self, width=80, height=80):
+        return EscudoFlowable(self.escudo, width, height) if self.escudo is not None else None
+
+    def encabezado(self, styles):
+        """Escudo, nombre, resolución, DANE, niveles y dirección, con línea inferior"""
+        logo_cell = self.logo() or Paragraph("ESCUDO<br/>NO DISPONIBLE", styles["Subtitulo"])
+
+        info = [
+            Paragraph(NOMBRE_COLEGIO, styles["TituloColegio"]),
+            Paragraph(f"Resolución de Estudios N.º {self.resolucion}", styles["Subtitulo"]),
+            Paragraph(f"<b>COD. DANE {self.dane}</b>", styles["Subtitulo"]),
+            Paragraph(NIVELES_EDUCATIVOS, styles["Subtitulo"]),
+            Paragraph(self.direccion, styles["Subtitulo"])
+        ]
+        info_table = Table([[line] for line in info])
+
+        header = Table([[logo_cell, info_table]], colWidths=[3 * cm, 13 * cm])
+        header.setStyle(TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ]))
+
+        linea = Table([[""]], colWidths=[16 * cm])
+        linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 2, colors.black)]))
+
+        return [header, Spacer(1, 10), linea, Spacer(1, 25)]
+
+    def pie_pagina(self, styles, detalle):
+        """Datos de contacto del colegio seguidos de la línea de detalle del documento"""
+        texto = "<br/>".join(self.contacto + [detalle])
+
+        linea = Table([[""]], colWidths=[15 * cm])
+        linea.setStyle(TableStyle([("LINEABOVE", (0, 0), (-1, -1), 1, colors.HexColor('#888'))]))
+
+        return [Spacer(1, 40), linea, Spacer(1, 8), Paragraph(texto, styles["PiePagina"])]
+
+
+# =============================================
+# CACHÉ POR PROCESO
+# =============================================
+
+_recursos = None
+_estilos = None
+_lock = threading.Lock()
+
+
+def _crear_recursos_por_defecto(colegio):
+    try:
+        return colegio.recursos
+    except ObjectDoesNotExist:
+        return RecursosColegio.objects.create(colegio=colegio, **RECURSOS_POR_DEFECTO)
+
+
+def recursos_colegio():
+    """
+    RecursosPDF del colegio activo, o None si no hay colegio configurado.
+    Una consulta por llamada para validar la clave; se recarga si cambió.
+    """
+    global _recursos
+    clave = Colegio.objects.filter(estado=True).order_by('id').values_list(
+        'id', 'updated_at', 'recursos__updated_at'
+    ).first()
+    if clave is None:
+        return None
+
+    actual = _recursos
+    if actual is not None and actual.clave == clave:
+        return actual
+
+    with _lock:
+        if _recursos is not None and _recursos.clave == clave:
+            return _recursos
+        colegio = Colegio.objects.select_related('recursos').get(id=clave[0])
+        recursos = _crear_recursos_por_defecto(colegio)
+        _recursos = RecursosPDF(colegio, recursos)
+        return _recursos
+
+
+def estilos():
+    """Hoja de estilos común de los PDF institucionales, construida una sola vez"""
+    global _estilos
+    if _estilos is None:
+        with _lock:
+            if _estilos is None:
+                _estilos = _crear_estilos()
+    return _estilos
+
+
+def _crear_estilos():
+    styles = getSampleStyleSheet()
+    # Encabezado, títulos y texto
+    styles.add(ParagraphStyle(name="TituloColegio", fontSize=18, alignment=1, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name="Subtitulo", fontSize=11, alignment=1))
+    styles.add(ParagraphStyle(name="TituloConstancia", fontSize=14, alignment=1, spaceAfter=15, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name="TituloDocumento", fontSize=14, alignment=1, spaceAfter=15, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name="TituloBoletin", fontSize=16, alignment=1, spaceAfter=20, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name="TextoNormal", fontSize=12, alignment=4, leading=15))
+    styles.add(ParagraphStyle(name="TextoResaltado", fontSize=12, alignment=4, leading=15, backColor=colors.whitesmoke))
+    styles.add(ParagraphStyle(name="InfoEstudiante", fontSize=12, alignment=0, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name="InfoTexto", fontSize=12, alignment=0))
+    # Observador
+    styles.add(ParagraphStyle(name="ObservacionTitulo", fontSize=11, alignment=0, fontName="Helvetica-Bold", spaceAfter=3))
+    styles.add(ParagraphStyle(name="ObservacionTexto", fontSize=10, alignment=4, leading=13))
+    styles.add(ParagraphStyle(name="ObservacionDetalle", fontSize=9, alignment=0, textColor=colors.HexColor("#666")))
+    # Tablas y análisis de notas
+    styles.add(ParagraphStyle(name="TablaEncabezado", fontSize=10, alignment=1, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name="TablaContenido", fontSize=9, alignment=1))
+    styles.add(ParagraphStyle(name="TablaAsignatura", fontSize=9, alignment=0))
+    styles.add(ParagraphStyle(name="TablaDesempeno", fontSize=9, alignment=1))
+    styles.add(ParagraphStyle(name="AnalisisTitulo", fontSize=11, alignment=0, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name="AnalisisTexto", fontSize=10, alignment=4))
+    # Firma, sello y pie
+    styles.add(ParagraphStyle(name="Sello", fontSize=9, textColor=colors.HexColor("#0A4BA0")))
+    styles.add(ParagraphStyle(name="PiePagina", fontSize=9, alignment=1, textColor=colors.HexColor("#444")))
+    styles.add(ParagraphStyle(name="FirmaNombre", fontSize=12, alignment=2, fontName="Helvetica-Bold"))
+    styles.add(ParagraphStyle(name="FirmaCargo", fontSize=11, alignment=2))
+    return styles
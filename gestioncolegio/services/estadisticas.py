@@ -0,0 +1,227 @@
+"""
+Estadísticas vectorizadas de calificaciones y demografía
+gestioncolegio/services/estadisticas.py
+
+Las notas y los datos de estudiantes se leen una sola vez (values_list) y se
+calculan con NumPy / pandas: promedio, mediana, moda, desviación, percentiles
+e histograma por banda de desempeño para las calificaciones; edades, rangos,
+géneros y distribución por grado y nivel para el reporte demográfico.
+"""
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# Límite inferior de cada banda de desempeño (escala 1.0 - 5.0)
+BANDAS_DESEMPEÑO = ['Bajo', 'Básico', 'Alto', 'Superior']
+LIMITES_DESEMPEÑO = [3.0, 4.0, 4.6]
+
+PERCENTILES = [25, 50, 75, 90]
+
+RANGOS_EDAD = {
+    '3-5': 'Preescolar (3-5 años)',
+    '6-7': 'Primero-Segundo (6-7 años)',
+    '8-9': 'Tercero-Cuarto (8-9 años)',
+    '10-11': 'Quinto (10-11 años)',
+    '12+': 'Bachillerato (12+ años)',
+}
+LIMITES_EDAD = [3, 6, 8, 10, 12, np.inf]
+
+
+# =============================================
+# CALIFICACIONES
+# =============================================
+
+def notas_validas(asignaturas):
+    """
+    Arreglo float de las calificaciones con nota de una lista de asignaturas
+    (dicts u objetos con tiene_nota y calificacion)
+    """
+    valores = []
+    for a in asignaturas or []:
+        if isinstance(a, dict):
+            tiene_nota, calificacion = a.get('tiene_nota'), a.get('calificacion')
+        else:
+            tiene_nota = getattr(a, 'tiene_nota', False)
+            calificacion = getattr(a, 'calificacion', None)
+        if tiene_nota and isinstance(calificacion, (int, float, Decimal)):
+            valores.append(float(calificacion))
+    return np.asarray(valores, dtype=float)
+
+
+def desempeno(promedio):
+    """Banda de desempeño de una calificación; 'No evaluado' si no hay valor"""
+    if promedio is None:
+        return 'No evaluado'
+    return BANDAS_DESEMPEÑO[int(np.searchsorted(LIMITES_DESEMPEÑO, promedio, side='right'))]
+
+
+def moda(valores):
+    """Valor más frecuente (el menor en caso de empate)"""
+    if len(valores) == 0:
+        return None
+    unicos, conteos = np.unique(valores, return_counts=True)
+    return float(unicos[np.argmax(conteos)])
+
+
+def histograma_desempeno(valores):
+    """Cantidad de calificaciones por banda de desempeño"""
+    valores = np.asarray(valores, dtype=float)
+    indices = np.searchsorted(LIMITES_DESEMPEÑO, valores, side='right')
+    conteos = np.bincount(indices, minlength=len(BANDAS_DESEMPEÑO))
+    return dict(zip(BANDAS_DESEMPEÑO, conteos.tolist()))
+
+
+def resumen_notas(valores, decimales=1):
+    """
+    Estadísticos de un conjunto de calificaciones.
+    Sin valores devuelve ceros y desempeño 'No evaluado'.
+    """
+    valores = np.asarray(valores, dtype=float)
+    if valores.size == 0:
+        return {
+            'cantidad': 0,
+            'promedio': 0,
+            'mediana': 0,
+            'moda': 0,
+            'desviacion': 0,
+            'minimo': 0,
+            'maximo': 0,
+            'percentiles': {p: 0 for p in PERCENTILES},
+            'histograma': dict.fromkeys(BANDAS_DESEMPEÑO, 0),
+            'desempeno': 'No evaluado',
+        }
+
+    promedio = float(valores.mean())
+    return {
+        'cantidad': int(valores.size),
+        'promedio': round(promedio, decimales),
+        'mediana': round(float(np.median(valores)), decimales),
+        'moda': round(moda(valores), decimales),
+        'desviacion': round(float(valores.std()), 2),
+        'minimo': round(float(valores.min()), decimales),
+        'maximo': round(float(valores.max()), decimales),
+        'percentiles': dict(zip(
+            PERCENTILES, (round(float(v), decimales) for v in np.percentile(valores, PERCENTILES))
+        )),
+        'histograma': histograma_desempeno(valores),
+        'desempeno': desempeno(promedio),
+    }
+
+
+def resumen_asignaturas(asignaturas, decimales=1):
+    return resumen_notas(notas_validas(asignaturas), decimales)
+
+
+# =============================================
+# DEMOGRAFÍA
+# =============================================
+
+def edades(fechas_nacimiento, hoy):
+    """Edades cumplidas a la fecha 'hoy'; NaN donde no hay fecha de nacimiento"""
+    fechas = pd.to_datetime(pd.Series(fechas_nacimiento, dtype='object'), errors='coerce')
+    cumplio = (fechas.dt.month * 100 + fechas.dt.day) <= (hoy.month * 100 + hoy.day)
+    return (hoy.year - fechas.dt.year - (~cumplio).astype(int)).where(fechas.notna())
+
+
+def _redondear(valor, decimales=1):
+    return 0 if pd.isna(valor) else round(float(valor), decimales)
+
+
+def _porcentaje(parte, total):
+    return round(parte / total * 100, 2) if total > 0 else 0
+
+
+def estadisticas_demograficas(matriculas, hoy, etiquetas_sexo):
+    """
+    Todas las distribuciones del reporte demográfico a partir de una sola
+    consulta sobre las matrículas: géneros, rangos de edad, estadísticos de
+    edad, distribución por grado y por nivel escolar.
+    """
+    filas = matriculas.values_list(
+        'estudiante__usuario__sexo',
+        'estudiante__usuario__fecha_nacimiento',
+        'grado_año_lectivo__grado__nombre',
+        'grado_año_lectivo__grado__nivel_escolar__nombre',
+    )
+    datos = pd.DataFrame(list(filas), columns=['sexo', 'fecha_nacimiento', 'grado', 'nivel'])
+    datos['edad'] = edades(datos['fecha_nacimiento'], hoy)
+    total = len(datos)
+
+    # ----- Géneros (sin sexo al principio, como el ORDER BY de MySQL) -----
+    generos = []
+    por_sexo = datos.groupby('sexo', dropna=False)['edad'].agg(['size', 'mean'])
+    filas_sexo = [(None if pd.isna(codigo) else codigo, fila) for codigo, fila in por_sexo.iterrows()]
+    for codigo, fila in sorted(filas_sexo, key=lambda item: (item[0] is not None, item[0] or '')):
+        generos.append({
+            'genero': etiquetas_sexo.get(codigo, 'No especificado'),
+            'codigo': codigo,
+            'total': int(fila['size']),
+            'porcentaje': _porcentaje(int(fila['size']), total),
+            'promedio_edad': _redondear(fila['mean']),
+        })
+
+    # ----- Rangos de edad -----
+    datos['rango'] = pd.cut(datos['edad'], LIMITES_EDAD, right=False, labels=list(RANGOS_EDAD))
+    conteo_rangos = pd.crosstab(datos['rango'], datos['sexo'].fillna('')).reindex(list(RANGOS_EDAD), fill_value=0)
+    rangos = {}
+    for clave, descripcion in RANGOS_EDAD.items():
+        fila = conteo_rangos.loc[clave]
+        rangos[clave] = {
+            'count': int(fila.sum()),
+            'hombres': int(fila.get('M', 0)),
+            'mujeres': int(fila.get('F', 0)),
+            'desc': descripcion,
+        }
+
+    # ----- Estadísticos de edad -----
+    con_edad = datos['edad'].dropna().to_numpy()
+    if con_edad.size:
+        edad = {
+            'promedio_edad': round(float(con_edad.mean()), 1),
+            'moda_edad': int(moda(con_edad)),
+            'edad_minima': int(con_edad.min()),
+            'edad_maxima': int(con_edad.max()),
+            'desviacion_edad': round(float(con_edad.std()), 2),
+        }
+    else:
+        edad = dict.fromkeys(['promedio_edad', 'moda_edad', 'edad_minima', 'edad_maxima', 'desviacion_edad'], 0)
+
+    # ----- Por grado -----
+    datos['hombres'] = (datos['sexo'] == 'M').astype(int)
+    datos['mujeres'] = (datos['sexo'] == 'F').astype(int)
+    por_grado = datos.groupby(['nivel', 'grado'], dropna=False).agg(
+        total=('sexo', 'size'), hombres=('hombres', 'sum'), mujeres=('mujeres', 'sum')
+    ).reset_index()
+    grados = [
+        {
+            'grado': None if pd.isna(fila.grado) else fila.grado,
+            'nivel': None if pd.isna(fila.nivel) else fila.nivel,
+            'total': int(fila.total),
+            'hombres': int(fila.hombres),
+            'mujeres': int(fila.mujeres),
+            'porcentaje_hombres': _porcentaje(int(fila.hombres), int(fila.total)),
+            'porcentaje_mujeres': _porcentaje(int(fila.mujeres), int(fila.total)),
+        }
+        for fila in por_grado.itertuples(index=False)
+    ]
+
+    # ----- Por nivel -----
+    por_nivel = datos.groupby('nivel', dropna=False)['edad'].agg(['size', 'mean'])
+    niveles = [
+        {
+            'grado_año_lectivo__grado__nivel_escolar__nombre': None if pd.isna(nivel) else nivel,
+            'total': int(fila['size']),
+            'promedio_edad': _redondear(fila['mean'], 2),
+        }
+        for nivel, fila in por_nivel.iterrows()
+    ]
+
+    return {
+        'total': total,
+        'generos': generos,
+        'rangos_edad': rangos,
+        'edad': edad,
+        'por_grado': grados,
+        'por_nivel': niveles,
+    }
@@ -0,0 +1,220 @@
+"""
+Firma digital por lotes de los PDF generados (pyHanko)
+gestioncolegio/services/firma_digital.py
+
+Firmar un PDF dentro de la petición es lento (cargar el PKCS#12, preparar el
+contexto de validación y calcular la firma). En su lugar:
+
+1. documentos_generados encola cada constancia o boletín guardado en disco
+   (DocumentoFirmado en estado 'PEN').
+2. El comando firmar_documentos toma las filas pendientes y las firma en un
+   pool de procesos. Cada proceso carga el certificado, el firmante y el
+   contexto de validación una sola vez (initializer) y los reutiliza para
+   todos los documentos que le tocan; los procesos no usan la base de datos.
+3. La copia firmada queda junto a la original (sufijo _firmado.pdf), se sirve
+   en lugar de ella y su SHA-256 queda en el registro para verificarla.
+
+Configuración (settings): FIRMA_DIGITAL_ACTIVA, FIRMA_DIGITAL_CERTIFICADO
+(archivo .p12/.pfx), FIRMA_DIGITAL_CLAVE, FIRMA_DIGITAL_PROCESOS y
+FIRMA_DIGITAL_EMBEBER_VALIDACION.
+"""
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from gestioncolegio.models import DocumentoFirmado
+
+SUFIJO_FIRMADO = '_firmado.pdf'
+CAMPO_FIRMA = 'FirmaInstitucional'
+RAZON_FIRMA = 'Documento expedido por la institución'
+TAMAÑO_BLOQUE = 1024 * 1024
+
+
+def firma_activa():
+    return bool(getattr(settings, 'FIRMA_DIGITAL_ACTIVA', False) and getattr(settings, 'FIRMA_DIGITAL_CERTIFICADO', ''))
+
+
+def sha256_archivo(ruta):
+    digest = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(TAMAÑO_BLOQUE), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def ruta_firmada(relativa):
+    return relativa[:-len('.pdf')] + SUFIJO_FIRMADO if relativa.endswith('.pdf') else relativa + SUFIJO_FIRMADO
+
+
+# =============================================
+# COLA
+# =============================================
+
+def encolar(tipo, estudiante_id, relativa):
+    """Registra un PDF recién guardado (ruta relativa a MEDIA_ROOT) para firmarlo"""
+    if not firma_activa():
+        return None
+    # Un archivo regenerado con la misma ruta es otro documento: las firmas
+    # anteriores siguen en el registro para verificar las copias ya entregadas
+    documento, _ = DocumentoFirmado.objects.get_or_create(
+        archivo_original=relativa,
+        estado='PEN',
+        defaults={'tipo': tipo, 'estudiante_id': estudiante_id},
+    )
+    return documento
+
+
+def pendientes(limite=None, reintentar_errores=False, max_intentos=3):
+    estados = ['PEN', 'ERR'] if reintentar_errores else ['PEN']
+    consulta = DocumentoFirmado.objects.filter(
+        estado__in=estados, intentos__lt=max_intentos
+    ).order_by('created_at')
+    return list(consulta[:limite] if limite else consulta)
+
+
+# =============================================
+# PROCESOS DE FIRMA
+# =============================================
+
+# Estado de cada proceso del pool: se carga una vez en _iniciar_proceso
+_firmante = None
+
+
+def _iniciar_proceso(certificado, clave, ubicacion, embeber_validacion):
+    """Carga el PKCS#12 y prepara el PdfSigner que reutilizará el proceso"""
+    global _firmante
+    from pyhanko.sign import signers
+    from pyhanko_certvalidator import ValidationContext
+
+    signer = signers.SimpleSigner.load_pkcs12(
+        pfx_file=certificado,
+        passphrase=clave.encode() if clave else None,
+    )
+    if signer is None:
+        raise ValueError(f"No se pudo cargar el certificado {certificado}")
+
+    contexto = None
+    if embeber_validacion:
+        # Cadena incluida en el PKCS#12 + raíces del sistema; se consulta OCSP/CRL
+        contexto = ValidationContext(
+            extra_trust_roots=list(signer.cert_registry),
+            allow_fetching=True,
+        )
+
+    metadatos = signers.PdfSignatureMetadata(
+        field_name=CAMPO_FIRMA,
+        reason=RAZON_FIRMA,
+        location=ubicacion,
+        validation_context=contexto,
+        embed_validation_info=bool(contexto),
+    )
+    _firmante = signers.PdfSigner(metadatos, signer=signer)
+
+
+def _firmar_archivo(entrada, salida):
+    """Firma entrada -> salida (rutas absolutas); devuelve (sha256, error)"""
+    from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+
+    temporal = salida + '.tmp'
+    try:
+        with open(entrada, 'rb') as original, open(temporal, 'wb') as destino:
+            _firmante.sign_pdf(IncrementalPdfFileWriter(original), output=destino)
+        os.replace(temporal, salida)
+        return sha256_archivo(salida), ''
+    except Exception as e:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        return '', f"{type(e).__name__}: {e}"
+
+
+def firmar_lote(documentos, procesos=None, ubicacion='Valledupar, Cesar'):
+    """
+    Firma los DocumentoFirmado dados en un pool de procesos y actualiza el
+    registro. Devuelve (firmados, errores).
+    """
+    if not documentos:
+        return 0, 0
+
+    trabajos = []
+    for documento in documentos:
+        entrada = os.path.join(settings.MEDIA_ROOT, documento.archivo_original)
+        if not os.path.exists(entrada):
+            # El documento se regeneró o se invalidó antes de firmarlo
+            documento.delete()
+            continue
+        documento.archivo_firmado = ruta_firmada(documento.archivo_original)
+        trabajos.append((documento, entrada, os.path.join(settings.MEDIA_ROOT, documento.archivo_firmado)))
+
+    if not trabajos:
+        return 0, 0
+
+    procesos = procesos or getattr(settings, 'FIRMA_DIGITAL_PROCESOS', None) or os.cpu_count() or 1
+    procesos = min(procesos, len(trabajos))
+
+    # Los hijos no deben heredar las conexiones abiertas del proceso principal
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=procesos,
+        initializer=_iniciar_proceso,
+        initargs=(
+            settings.FIRMA_DIGITAL_CERTIFICADO,
+            getattr(settings, 'FIRMA_DIGITAL_CLAVE', ''),
+            ubicacion,
+            getattr(settings, 'FIRMA_DIGITAL_EMBEBER_VALIDACION', False),
+        ),
+    ) as pool:
+        resultados = list(pool.map(
+            _firmar_archivo,
+            [entrada for _, entrada, _ in trabajos],
+            [salida for _, _, salida in trabajos],
+            chunksize=max(1, len(trabajos) // (procesos * 4)),
+        ))
+
+    firmados = errores = 0
+    ahora = timezone.now()
+    for (documento, _, _), (digest, error) in zip(trabajos, resultados):
+        documento.intentos += 1
+        documento.updated_at = ahora
+        if digest:
+            documento.estado = 'FIR'
+            documento.hash_firmado = digest
+            documento.fecha_firma = ahora
+            documento.error = ''
+            firmados += 1
+        else:
+            documento.estado = 'ERR'
+            documento.archivo_firmado = ''
+            documento.error = error
+            errores += 1
+    DocumentoFirmado.objects.bulk_update(
+        [documento for documento, _, _ in trabajos],
+        ['estado', 'hash_firmado', 'archivo_firmado', 'fecha_firma', 'error', 'intentos', 'updated_at'],
+        batch_size=500,
+    )
+    return firmados, errores
+
+
+# =============================================
+# VERIFICACIÓN
+# =============================================
+
+def verificar_hash(digest):
+    """DocumentoFirmado firmado con ese SHA-256, o None"""
+    digest = (digest or '').strip().lower()
+    if len(digest) != 64:
+        return None
+    return DocumentoFirmado.objects.filter(
+        hash_firmado=digest, estado='FIR'
+    ).select_related('estudiante__usuario').first()
+
+
+def verificar_contenido(archivo):
+    """Calcula el SHA-256 de un archivo subido y lo busca en el registro"""
+    digest = hashlib.sha256()
+    for bloque in archivo.chunks():
+        digest.update(bloque)
+    return verificar_hash(digest.hexdigest())
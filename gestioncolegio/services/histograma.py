@@ -0,0 +1,176 @@
+"""
+Histograma de calificaciones en una sola consulta
+gestioncolegio/services/histograma.py
+
+Cuenta las notas por banda de desempeño y, opcionalmente, por intervalos de
+ancho fijo, junto con promedio, máxima, mínima, total y aprobadas, todo en un
+único aggregate() con Count(filter=...). Se puede recortar por período, año
+lectivo, sede, grado, asignatura o docente; el resultado queda en caché por
+combinación de filtros hasta la próxima nota.
+"""
+import hashlib
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max, Min, Q
+
+from estudiantes.models import Nota
+
+HISTOGRAMA_CACHE_PREFIX = 'histograma_notas'
+HISTOGRAMA_VERSION_KEY = f'{HISTOGRAMA_CACHE_PREFIX}:version'
+HISTOGRAMA_CACHE_TIMEOUT = 60 * 60
+
+NOTA_APROBATORIA = 3.0
+
+# Límites de los intervalos de ancho fijo: cada intervalo es un Count() más
+# en el aggregate, así que un ancho diminuto no puede generar miles de columnas
+ANCHO_MINIMO = Decimal('0.1')
+MAX_INTERVALOS = 50
+
+# Recortes admitidos -> campo de Nota
+FILTROS = {
+    'periodo': 'periodo_academico_id',
+    'año_lectivo': 'periodo_academico__año_lectivo_id',
+    'sede': 'asignatura_grado_año_lectivo__sede_id',
+    'grado': 'asignatura_grado_año_lectivo__grado_año_lectivo__grado_id',
+    'asignatura': 'asignatura_grado_año_lectivo__asignatura_id',
+    'docente': 'asignatura_grado_año_lectivo__docente_id',
+}
+
+
+def bandas_desempeno():
+    """[(etiqueta, desde, hasta)] de las bandas de desempeño; None = sin límite"""
+    # Import diferido: los signals cargan este módulo y no necesitan NumPy/pandas
+    from gestioncolegio.services.estadisticas import BANDAS_DESEMPEÑO, LIMITES_DESEMPEÑO
+    limites = [None] + LIMITES_DESEMPEÑO + [None]
+    return [(banda, limites[i], limites[i + 1]) for i, banda in enumerate(BANDAS_DESEMPEÑO)]
+
+
+def _rango(desde, hasta):
+    """Intervalo semiabierto [desde, hasta)"""
+    condicion = Q()
+    if desde is not None:
+        condicion &= Q(calificacion__gte=desde)
+    if hasta is not None:
+        condicion &= Q(calificacion__lt=hasta)
+    return condicion
+
+
+def _intervalos(ancho, minimo, maximo):
+    """Intervalos de ancho fijo; el último incluye el máximo"""
+    ancho, minimo, maximo = Decimal(str(ancho)), Decimal(str(minimo)), Decimal(str(maximo))
+    if not ancho.is_finite() or ancho < ANCHO_MINIMO:
+        raise ValueError(f"El ancho del intervalo debe ser un número mayor o igual a {ANCHO_MINIMO}")
+    if (maximo - minimo) / ancho > MAX_INTERVALOS:
+        raise ValueError(f"El ancho genera más de {MAX_INTERVALOS} intervalos")
+    intervalos = []
+    desde = minimo
+    while desde < maximo:
+        hasta = min(desde + ancho, maximo)
+        intervalos.append((f'{desde:.1f}-{hasta:.1f}', desde, hasta if hasta < maximo else None))
+        desde = hasta
+    return intervalos
+
+
+def validar_ancho(valor, minimo=0, maximo=5):
+    """
+    Ancho recibido como texto (p. ej. ?ancho=) -> float, o None si viene vacío.
+    ValueError si no es un número, es menor que ANCHO_MINIMO o produciría más
+    de MAX_INTERVALOS intervalos.
+    """
+    if valor in (None, ''):
+        return None
+    try:
+        ancho = float(valor)
+    except (TypeError, ValueError):
+        raise ValueError("El ancho del intervalo debe ser un número")
+    _intervalos(ancho, minimo, maximo)
+    return ancho
+
+
+def _version():
+    version = cache.get(HISTOGRAMA_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(HISTOGRAMA_VERSION_KEY, version, None)
+    return version
+
+
+def invalidar_histogramas():
+    """Se llama al escribir notas o reasignar asignaturas"""
+    try:
+        cache.incr(HISTOGRAMA_VERSION_KEY)
+    except ValueError:
+        cache.set(HISTOGRAMA_VERSION_KEY, 2, None)
+
+
+def calcular_histograma(bandas=None, ancho=None, minimo=0, maximo=5, **filtros):
+    """
+    Un solo aggregate() sobre las notas filtradas.
+    bandas: [(etiqueta, desde, hasta)], por defecto las de desempeño.
+    ancho: si se indica, agrega intervalos de ese ancho entre minimo y maximo.
+    """
+    notas = Nota.objects.filter(**{FILTROS[nombre]: valor for nombre, valor in filtros.items() if valor})
+    bandas = bandas or bandas_desempeno()
+    intervalos = _intervalos(ancho, minimo, maximo) if ancho else []
+
+    agregados = {
+        'promedio': Avg('calificacion'),
+        'maxima': Max('calificacion'),
+        'minima': Min('calificacion'),
+        'total': Count('id'),
+        'aprobadas': Count('id', filter=Q(calificacion__gte=NOTA_APROBATORIA)),
+    }
+    for i, (_, desde, hasta) in enumerate(bandas):
+        agregados[f'banda_{i}'] = Count('id', filter=_rango(desde, hasta))
+    for i, (_, desde, hasta) in enumerate(intervalos):
+        agregados[f'intervalo_{i}'] = Count('id', filter=_rango(desde, hasta))
+
+    fila = notas.aggregate(**agregados)
+    total = fila['total']
+
+    def porcentaje(cantidad):
+        return round(cantidad / total * 100, 1) if total else 0
+
+    return {
+        'bandas': [
+            {'rango': etiqueta, 'cantidad': fila[f'banda_{i}'], 'porcentaje': porcentaje(fila[f'banda_{i}'])}
+            for i, (etiqueta, _, _) in enumerate(bandas)
+        ],
+        'intervalos': [
+            {'rango': etiqueta, 'cantidad': fila[f'intervalo_{i}'], 'porcentaje': porcentaje(fila[f'intervalo_{i}'])}
+            for i, (etiqueta, _, _) in enumerate(intervalos)
+        ],
+        'estadisticas': {
+            'promedio': round(float(fila['promedio'] or 0), 2),
+            'maxima': float(fila['maxima'] or 0),
+            'minima': float(fila['minima'] or 0),
+            'total': total,
+            'aprobadas': fila['aprobadas'],
+            'tasa_aprobacion': porcentaje(fila['aprobadas']),
+        },
+    }
+
+
+def histograma_notas(bandas=None, ancho=None, minimo=0, maximo=5, **filtros):
+    """calcular_histograma() en caché por combinación de filtros y bandas"""
+    desconocidos = set(filtros) - set(FILTROS)
+    if desconocidos:
+        raise ValueError(f"Filtros no admitidos: {', '.join(sorted(desconocidos))}")
+
+    parametros = json.dumps({
+        'filtros': {nombre: str(valor) for nombre, valor in filtros.items() if valor},
+        'bandas': bandas,
+        'ancho': ancho,
+        'minimo': minimo,
+        'maximo': maximo,
+    }, sort_keys=True, default=str)
+    huella = hashlib.sha1(parametros.encode()).hexdigest()
+    key = f'{HISTOGRAMA_CACHE_PREFIX}:v{_version()}:{huella}'
+
+    resultado = cache.get(key)
+    if resultado is None:
+        resultado = calcular_histograma(bandas, ancho, minimo, maximo, **filtros)
+        cache.set(key, resultado, HISTOGRAMA_CACHE_TIMEOUT)
+    return resultado
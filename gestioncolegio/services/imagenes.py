@@ -0,0 +1,177 @@
+"""
+Derivados redimensionados de las imágenes subidas (Pillow)
+gestioncolegio/services/imagenes.py
+
+Las fotos del carrusel, noticias, nosotros y los perfiles de estudiantes y
+docentes se servían con la resolución con que se subieron: fotos de celular
+de varios MB incrustadas como miniaturas de 40 px en listados y dashboards.
+
+Por cada imagen se generan, junto al original, tres tamaños en WebP y JPEG:
+
+    detallecolegio/foto/estudiantes/ana.jpg
+    detallecolegio/foto/estudiantes/ana__thumb.webp / ana__thumb.jpg
+    detallecolegio/foto/estudiantes/ana__card.webp  / ana__card.jpg
+    detallecolegio/foto/estudiantes/ana__hero.webp  / ana__hero.jpg
+
+- thumb: recorte cuadrado (avatares y miniaturas de listados).
+- card y hero: ancho máximo, conservando la proporción; nunca se amplía.
+
+Se generan al confirmar el guardado del modelo (signals) si el derivado aún
+no existe, o después con el comando generar_derivados_imagenes cuando
+IMAGENES_DERIVADOS_AL_SUBIR está desactivado (hosting con poca CPU por
+petición). Las plantillas usan los filtros de imagenes_tags, que devuelven
+el original mientras el derivado no exista.
+"""
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Nombre -> (ancho, alto); alto None = conservar proporción
+TAMAÑOS = {
+    'thumb': (160, 160),
+    'card': (640, None),
+    'hero': (1600, None),
+}
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+SEPARADOR = '__'
+
+# (app_label.Modelo, campo) cuyas imágenes tienen derivados
+CAMPOS_IMAGEN = (
+    ('web.Carrusel', 'image'),
+    ('web.Noticia', 'image'),
+    ('web.NoticiaImagen', 'image'),
+    ('web.About', 'image'),
+    ('estudiantes.Estudiante', 'foto'),
+    ('usuarios.Docente', 'foto'),
+)
+
+
+def al_subir():
+    return getattr(settings, 'IMAGENES_DERIVADOS_AL_SUBIR', True)
+
+
+def nombre_derivado(nombre, tamaño, formato='jpg'):
+    """'noticias/foto.png' -> 'noticias/foto__card.jpg'"""
+    base, _ = os.path.splitext(nombre)
+    return f'{base}{SEPARADOR}{tamaño}.{formato}'
+
+
+def es_derivado(nombre):
+    base = os.path.splitext(os.path.basename(nombre))[0]
+    return any(base.endswith(f'{SEPARADOR}{tamaño}') for tamaño in TAMAÑOS)
+
+
+def tiene_derivados(archivo):
+    """Se generan todos juntos: basta con comprobar el último que se escribe"""
+    if not archivo or not archivo.name:
+        return False
+    return archivo.storage.exists(nombre_derivado(archivo.name, 'hero', 'jpg'))
+
+
+# =============================================
+# GENERACIÓN
+# =============================================
+
+def _abrir(contenido, ancho_maximo):
+    imagen = Image.open(io.BytesIO(contenido))
+    # JPEG: decodificar ya reducido (1/2, 1/4, 1/8) ahorra memoria y tiempo con fotos de celular
+    imagen.draft('RGB', (ancho_maximo * 2, ancho_maximo * 2))
+    imagen = ImageOps.exif_transpose(imagen)
+    if imagen.mode not in ('RGB', 'RGBA'):
+        imagen = imagen.convert('RGBA' if 'transparency' in imagen.info or imagen.mode in ('LA', 'P') else 'RGB')
+    return imagen
+
+
+def _redimensionar(imagen, ancho, alto):
+    if alto:
+        return ImageOps.fit(imagen, (ancho, alto), Image.Resampling.LANCZOS)
+    if imagen.width <= ancho:
+        return imagen.copy()
+    return imagen.resize((ancho, round(imagen.height * ancho / imagen.width)), Image.Resampling.LANCZOS)
+
+
+def _codificar(imagen, formato):
+    nombre_pil, opciones = FORMATOS[formato]
+    if nombre_pil == 'JPEG' and imagen.mode == 'RGBA':
+        fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.getchannel('A'))
+        imagen = fondo
+    salida = io.BytesIO()
+    imagen.save(salida, nombre_pil, **opciones)
+    return salida.getvalue()
+
+
+def generar(archivo, forzar=False):
+    """
+    Crea los derivados de un FieldFile. Devuelve cuántos archivos escribió
+    (0 si ya existían, si el archivo falta o no es una imagen válida).
+    """
+    if not archivo or not archivo.name or es_derivado(archivo.name):
+        return 0
+    if not forzar and tiene_derivados(archivo):
+        return 0
+
+    storage = archivo.storage
+    try:
+        with storage.open(archivo.name, 'rb') as original:
+            contenido = original.read()
+        imagen = _abrir(contenido, max(ancho for ancho, _ in TAMAÑOS.values()))
+    except Exception as e:
+        logger.warning(f"Imagen: no se pudo abrir '{archivo.name}': {e}")
+        return 0
+
+    escritos = 0
+    # 'hero' al final: su existencia marca el conjunto como completo
+    for tamaño in sorted(TAMAÑOS, key=lambda t: t == 'hero'):
+        ancho, alto = TAMAÑOS[tamaño]
+        redimensionada = _redimensionar(imagen, ancho, alto)
+        for formato in FORMATOS:
+            nombre = nombre_derivado(archivo.name, tamaño, formato)
+            if storage.exists(nombre):
+                storage.delete(nombre)
+            storage.save(nombre, ContentFile(_codificar(redimensionada, formato)))
+            escritos += 1
+    return escritos
+
+
+def eliminar(nombre, storage):
+    """Borra los derivados de un original (al borrar o reemplazar la imagen)"""
+    if not nombre:
+        return
+    for tamaño in TAMAÑOS:
+        for formato in FORMATOS:
+            derivado = nombre_derivado(nombre, tamaño, formato)
+            if storage.exists(derivado):
+                storage.delete(derivado)
+
+
+# =============================================
+# URLS PARA PLANTILLAS
+# =============================================
+
+def url(archivo, tamaño, formato='jpg'):
+    """URL del derivado o, si todavía no existe, la del original ('' sin imagen)"""
+    if not archivo or not archivo.name:
+        return ''
+    if tiene_derivados(archivo):
+        return archivo.storage.url(nombre_derivado(archivo.name, tamaño, formato))
+    return archivo.url
+
+
+def srcset(archivo, formato='jpg', tamaños=('card', 'hero')):
+    """'…__card.jpg 640w, …__hero.jpg 1600w' ('' si aún no hay derivados)"""
+    if not tiene_derivados(archivo):
+        return ''
+    return ', '.join(
+        f'{archivo.storage.url(nombre_derivado(archivo.name, tamaño, formato))} {TAMAÑOS[tamaño][0]}w'
+        for tamaño in tamaños
+    )
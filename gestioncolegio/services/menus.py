@@ -0,0 +1,191 @@
+"""
+Registro declarativo de los menús por rol
+gestioncolegio/services/menus.py
+
+Los menús de administrador/rector y docente se declaran aquí como árboles de
+EntradaMenu con nombres de URL. La primera vez que se piden se compilan una
+sola vez por proceso: se resuelven las URL con reverse() y queda un árbol por
+rol. menu_rol() es después una búsqueda en un diccionario.
+
+La huella del registro forma parte de la clave con la que la plantilla guarda
+en caché el fragmento HTML de cada rol: cambiar el registro invalida los
+fragmentos al desplegar.
+
+Los menús de estudiante y acudiente dependen de datos de cada usuario
+(período actual, estudiantes a cargo) y siguen en sus plantillas.
+"""
+import copy
+import hashlib
+import logging
+import threading
+
+from django.urls import NoReverseMatch, reverse
+
+logger = logging.getLogger(__name__)
+
+
+class EntradaMenu:
+    """Enlace del menú; con hijos se muestra como desplegable"""
+    tipo = 'enlace'
+
+    def __init__(self, titulo, url=None, icono='', descripcion='', color='', hijos=(), nueva_pestaña=False):
+        self.titulo = titulo
+        self.url = url
+        self.icono = icono
+        self.descripcion = descripcion
+        self.color = color
+        self.hijos = tuple(hijos)
+        self.nueva_pestaña = nueva_pestaña
+        self.enlace = '#'
+
+    def firma(self):
+        return (self.tipo, self.titulo, self.url, self.icono, self.descripcion, self.color,
+                self.nueva_pestaña, tuple(hijo.firma() for hijo in self.hijos))
+
+
+class EncabezadoMenu(EntradaMenu):
+    tipo = 'encabezado'
+
+    def __init__(self, titulo, icono=''):
+        super().__init__(titulo, icono=icono)
+
+
+class DivisorMenu(EntradaMenu):
+    tipo = 'divisor'
+
+    def __init__(self):
+        super().__init__('')
+
+
+# =============================================
+# REGISTRO
+# =============================================
+
+MENU_ADMINISTRADOR = (
+    EntradaMenu('Usuarios', icono='fa-users', hijos=(
+        EntradaMenu('Estudiantes', 'administrador:estudiante_list', 'fa-user-graduate',
+                    'Gestión de estudiantes', 'text-success'),
+        EntradaMenu('Docentes', 'administrador:docente_list', 'fa-chalkboard-teacher',
+                    'Gestión de docentes', 'text-info'),
+        EntradaMenu('Administradores', 'administrador:administrador_list', 'fa-user-shield',
+                    'Gestión administrativa', 'text-warning'),
+    )),
+    EntradaMenu('Académico', icono='fa-book', hijos=(
+        EntradaMenu('Grados', 'administrador:grado_list', 'fa-graduation-cap', 'Gestión de grados'),
+        EntradaMenu('Areas', 'administrador:area_list', 'fa-book', 'Gestión de Areas'),
+        EntradaMenu('Asignaturas', 'administrador:asignatura_list', 'fa-book-open', 'Gestión de asignaturas'),
+        EntradaMenu('Horarios', 'administrador:horario_list', 'fa-clock', 'Gestión de horarios'),
+        DivisorMenu(),
+        EntradaMenu('Año lectivo', 'administrador:añolectivo_list', 'fa-calendar', 'Gestión de Año lectivo'),
+        DivisorMenu(),
+        EntradaMenu('Sistema de Notas', 'administrador:gestion_calificaciones', 'fa-graduation-cap',
+                    'Gestión de calificaciones'),
+        EntradaMenu('Sistema de Logros', 'administrador:gestion_logros', 'fa-trophy',
+                    'Gestión de Logros/Dificultades'),
+    )),
+    EntradaMenu('Matrículas', icono='fa-clipboard-list', hijos=(
+        EntradaMenu('Lista de Matrículas', 'administrador:matricula_list', 'fa-list', 'Ver todas las matrículas'),
+        EntradaMenu('Nueva Matrícula', 'administrador:matricula_create', 'fa-plus', 'Registrar nueva matrícula'),
+    )),
+    EntradaMenu('Reportes', 'administrador:dashboard_reportes', 'fa-chart-bar'),
+    EntradaMenu('Configuración', icono='fa-cog', hijos=(
+        EncabezadoMenu('Datos Institucionales', 'fa-school'),
+        EntradaMenu('Colegios', 'administrador:colegio_list', 'fa-university', 'Gestión de colegios'),
+        EntradaMenu('Sedes', 'administrador:sede_list', 'fa-building', 'Gestión de sedes'),
+        EntradaMenu('Grados por Año Lectivo', 'administrador:grado_anho_list', 'fa-calendar-alt',
+                    'Gestión de años académicos'),
+        DivisorMenu(),
+        EncabezadoMenu('Ajustes del Sistema', 'fa-sliders-h'),
+        EntradaMenu('Configuración General', 'administrador:configuracion_general', 'fa-cogs',
+                    'Ajustes principales'),
+        EntradaMenu('Parámetros del Sistema', 'administrador:parametro_list', 'fa-database',
+                    'Variables configurables'),
+        DivisorMenu(),
+        EncabezadoMenu('Certificaciones', 'fa-certificate'),
+        EntradaMenu('Admin Django', 'admin:index', 'fa-user-shield', 'Panel administrativo completo',
+                    nueva_pestaña=True),
+    )),
+)
+
+MENU_DOCENTE = (
+    EntradaMenu('Académico', icono='fa-graduation-cap', hijos=(
+        EncabezadoMenu('Gestión Académica', 'fa-graduation-cap'),
+        EntradaMenu('Calificar Estudiantes', 'docentes:calificar_notas', 'fa-edit',
+                    'Registrar calificaciones', 'text-success'),
+        EntradaMenu('Ver Todas las Notas', 'docentes:lista_notas_docente', 'fa-list',
+                    'Historial de notas', 'text-info'),
+        EntradaMenu('Logros Académicos', 'docentes:lista_logros', 'fa-trophy',
+                    'Gestionar logros', 'text-warning'),
+        EntradaMenu('Asistencia', 'docentes:asistencia_principal', 'fa-calendar-check',
+                    'Registrar asistencia', 'text-primary'),
+    )),
+    EntradaMenu('Comportamiento', 'docentes:lista_comportamientos', 'fa-user-check'),
+    EntradaMenu('Información', icono='fa-info-circle', hijos=(
+        EncabezadoMenu('Información del Docente', 'fa-info-circle'),
+        EntradaMenu('Mi Horario', 'academico:horarios_list', 'fa-clock', 'Horario de clases', 'text-primary'),
+        EntradaMenu('Mis Estudiantes', 'docentes:lista_estudiantes', 'fa-user-graduate',
+                    'Lista de estudiantes', 'text-success'),
+        EntradaMenu('Mis Asignaturas', 'docentes:asignaturas_list', 'fa-book',
+                    'Asignaturas asignadas', 'text-warning'),
+    )),
+    EntradaMenu('Ayuda', icono='fa-question-circle'),
+)
+
+# Rol (TipoUsuario.nombre) -> menú
+MENUS = {
+    'Administrador': MENU_ADMINISTRADOR,
+    'Rector': MENU_ADMINISTRADOR,
+    'Docente': MENU_DOCENTE,
+}
+
+
+# =============================================
+# COMPILACIÓN
+# =============================================
+
+_compilados = None
+_lock = threading.Lock()
+
+HUELLA = hashlib.sha1(repr(sorted(
+    (rol, tuple(entrada.firma() for entrada in menu)) for rol, menu in MENUS.items()
+)).encode()).hexdigest()[:12]
+
+
+def _resolver(entradas):
+    """Copias de las entradas con la URL resuelta; el registro no se modifica"""
+    resueltas = []
+    for entrada in entradas:
+        compilada = copy.copy(entrada)
+        if entrada.url:
+            try:
+                compilada.enlace = reverse(entrada.url)
+            except NoReverseMatch:
+                logger.warning(f"Menú: no existe la URL '{entrada.url}', se omite '{entrada.titulo}'")
+                continue
+        compilada.hijos = _resolver(entrada.hijos)
+        resueltas.append(compilada)
+    return tuple(resueltas)
+
+
+def compilar():
+    """Resuelve las URL de todos los menús; se hace una vez por proceso"""
+    global _compilados
+    with _lock:
+        if _compilados is None:
+            _compilados = {rol: _resolver(menu) for rol, menu in MENUS.items()}
+    return _compilados
+
+
+def rol_menu(usuario):
+    """Rol cuyo menú corresponde al usuario ('' si no tiene menú registrado)"""
+    if usuario.is_superuser:
+        return 'Administrador'
+    tipo_usuario = getattr(usuario, 'tipo_usuario', None)
+    nombre = getattr(tipo_usuario, 'nombre', '') if tipo_usuario else ''
+    return nombre if nombre in MENUS else ''
+
+
+def menu_rol(rol):
+    """Árbol compilado del rol (tupla vacía si no hay)"""
+    compilados = _compilados if _compilados is not None else compilar()
+    return compilados.get(rol, ())
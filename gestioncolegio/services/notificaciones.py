@@ -0,0 +1,193 @@
+"""
+Notificaciones del sistema: envío masivo y contadores de no leídas
+gestioncolegio/services/notificaciones.py
+
+- notificar() crea la misma notificación para muchos usuarios con
+  bulk_create por bloques; notificar_audiencia() resuelve primero la
+  audiencia (acudientes de un curso, docentes, una sede, todo el colegio) a
+  ids de usuario en una sola consulta.
+- El número de no leídas de cada usuario vive en la caché: se calcula con un
+  COUNT (índice usuario, leida) y se borra al crear o marcar notificaciones
+  (al confirmar la transacción), así el siguiente acceso vuelve a contar. No
+  se usa incr/decr: en FileBasedCache son un get seguido de un set y los
+  procesos de Passenger perderían actualizaciones. Expira cada hora para
+  corregir cualquier desvío (borrados desde el admin, updates masivos).
+- nuevas_desde() devuelve solo las notificaciones posteriores a un cursor
+  (el último id recibido) para el endpoint de consulta periódica.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from estudiantes.models import Acudiente, Matricula
+from gestioncolegio.models import NotificacionSistema
+from matricula.models import AsignaturaGradoAñoLectivo
+from usuarios.models import Docente, Usuario
+
+CONTADOR_CACHE_PREFIX = 'notificaciones_no_leidas'
+ULTIMA_CACHE_PREFIX = 'notificaciones_ultima'
+CONTADOR_CACHE_TIMEOUT = 60 * 60
+TAMAÑO_LOTE = 1000
+
+MATRICULAS_VIGENTES = ['ACT', 'PEN']
+
+
+def _clave_contador(usuario_id):
+    return f'{CONTADOR_CACHE_PREFIX}:{usuario_id}'
+
+
+def _clave_ultima(usuario_id):
+    return f'{ULTIMA_CACHE_PREFIX}:{usuario_id}'
+
+
+# =============================================
+# AUDIENCIAS
+# =============================================
+
+def usuarios_acudientes_curso(grado_año_lectivo, sede=None):
+    """Usuarios acudientes de los estudiantes matriculados en el curso"""
+    matriculas = Matricula.objects.filter(
+        grado_año_lectivo_id=getattr(grado_año_lectivo, 'id', grado_año_lectivo),
+        estado__in=MATRICULAS_VIGENTES,
+    )
+    if sede is not None:
+        matriculas = matriculas.filter(sede_id=getattr(sede, 'id', sede))
+    return set(Acudiente.objects.filter(
+        estudiante_id__in=matriculas.values('estudiante_id')
+    ).values_list('acudiente_id', flat=True))
+
+
+def usuarios_docentes(sede=None, año_lectivo=None):
+    """Docentes activos; con sede, solo los que dictan alguna asignatura en ella"""
+    docentes = Docente.objects.filter(estado=True, usuario__is_active=True)
+    if sede is not None:
+        asignaciones = AsignaturaGradoAñoLectivo.objects.filter(sede_id=getattr(sede, 'id', sede))
+        if año_lectivo is not None:
+            asignaciones = asignaciones.filter(
+                grado_año_lectivo__año_lectivo_id=getattr(año_lectivo, 'id', año_lectivo)
+            )
+        docentes = docentes.filter(id__in=asignaciones.values('docente_id'))
+    return set(docentes.values_list('usuario_id', flat=True))
+
+
+def usuarios_sede(sede, año_lectivo=None):
+    """Docentes, estudiantes matriculados y sus acudientes en la sede"""
+    matriculas = Matricula.objects.filter(sede_id=getattr(sede, 'id', sede), estado__in=MATRICULAS_VIGENTES)
+    if año_lectivo is not None:
+        matriculas = matriculas.filter(año_lectivo_id=getattr(año_lectivo, 'id', año_lectivo))
+    usuarios = set(matriculas.values_list('estudiante__usuario_id', flat=True))
+    usuarios |= set(Acudiente.objects.filter(
+        estudiante_id__in=matriculas.values('estudiante_id')
+    ).values_list('acudiente_id', flat=True))
+    return usuarios | usuarios_docentes(sede, año_lectivo)
+
+
+def usuarios_colegio():
+    return set(Usuario.objects.filter(is_active=True).values_list('id', flat=True))
+
+
+AUDIENCIAS = {
+    'acudientes_curso': usuarios_acudientes_curso,
+    'docentes': usuarios_docentes,
+    'sede': usuarios_sede,
+    'colegio': usuarios_colegio,
+}
+
+
+# =============================================
+# CREACIÓN
+# =============================================
+
+def guardar(notificaciones, tamaño_lote=TAMAÑO_LOTE):
+    """bulk_create por bloques de NotificacionSistema ya armadas; actualiza los contadores"""
+    total = 0
+    for inicio in range(0, len(notificaciones), tamaño_lote):
+        bloque = NotificacionSistema.objects.bulk_create(notificaciones[inicio:inicio + tamaño_lote])
+        total += len(bloque)
+    usuario_ids = {notificacion.usuario_id for notificacion in notificaciones}
+    transaction.on_commit(lambda: _invalidar_contadores(usuario_ids, nuevas=True))
+    return total
+
+
+def notificar(usuarios, titulo, mensaje, tipo='info', url_destino='', tamaño_lote=TAMAÑO_LOTE):
+    """Crea la misma notificación para cada usuario (ids o instancias)"""
+    ids = {getattr(usuario, 'id', usuario) for usuario in usuarios}
+    return guardar([
+        NotificacionSistema(
+            usuario_id=usuario_id, titulo=titulo, mensaje=mensaje, tipo=tipo, url_destino=url_destino
+        )
+        for usuario_id in sorted(ids)
+    ], tamaño_lote)
+
+
+def notificar_audiencia(audiencia, titulo, mensaje, tipo='info', url_destino='', **parametros):
+    """
+    notificar_audiencia('acudientes_curso', ..., grado_año_lectivo=curso)
+    notificar_audiencia('sede', ..., sede=sede)
+    """
+    if audiencia not in AUDIENCIAS:
+        raise ValueError(f"Audiencia no admitida: {audiencia}")
+    return notificar(AUDIENCIAS[audiencia](**parametros), titulo, mensaje, tipo, url_destino)
+
+
+# =============================================
+# CONTADORES
+# =============================================
+
+def _invalidar_contadores(usuario_ids, nuevas=False):
+    """Borra los contadores; el próximo no_leidas() los vuelve a contar"""
+    cache.delete_many([_clave_contador(usuario_id) for usuario_id in usuario_ids])
+    if nuevas:
+        # Marca para que el long-poll sepa que hay algo nuevo sin consultar la base
+        ahora = timezone.now().timestamp()
+        cache.set_many({_clave_ultima(usuario_id): ahora for usuario_id in usuario_ids}, CONTADOR_CACHE_TIMEOUT)
+
+
+def no_leidas(usuario):
+    usuario_id = getattr(usuario, 'id', usuario)
+    clave = _clave_contador(usuario_id)
+    cantidad = cache.get(clave)
+    if cantidad is None:
+        cantidad = NotificacionSistema.objects.filter(usuario_id=usuario_id, leida=False).count()
+        cache.add(clave, cantidad, CONTADOR_CACHE_TIMEOUT)
+    return max(cantidad, 0)
+
+
+def marcar_leidas(usuario, ids=None):
+    """Marca como leídas las notificaciones dadas (o todas) en un solo UPDATE"""
+    usuario_id = getattr(usuario, 'id', usuario)
+    consulta = NotificacionSistema.objects.filter(usuario_id=usuario_id, leida=False)
+    if ids is not None:
+        consulta = consulta.filter(id__in=ids)
+    ahora = timezone.now()
+    marcadas = consulta.update(leida=True, fecha_lectura=ahora, updated_at=ahora)
+    if marcadas:
+        transaction.on_commit(lambda: _invalidar_contadores([usuario_id]))
+    return marcadas
+
+
+# =============================================
+# CONSULTA INCREMENTAL
+# =============================================
+
+def ultima_actividad(usuario):
+    """Momento de la última notificación creada para el usuario (según la caché)"""
+    return cache.get(_clave_ultima(getattr(usuario, 'id', usuario)))
+
+
+def ultimo_id(usuario):
+    """Cursor inicial: id de la notificación más reciente del usuario"""
+    return NotificacionSistema.objects.filter(
+        usuario_id=getattr(usuario, 'id', usuario)
+    ).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def nuevas_desde(usuario, cursor=0, limite=50):
+    """Notificaciones con id mayor que el cursor, de la más antigua a la más nueva"""
+    usuario_id = getattr(usuario, 'id', usuario)
+    filas = list(NotificacionSistema.objects.filter(
+        usuario_id=usuario_id, id__gt=cursor or 0
+    ).order_by('id').values(
+        'id', 'titulo', 'mensaje', 'tipo', 'leida', 'url_destino', 'created_at'
+    )[:limite])
+    return filas, (filas[-1]['id'] if filas else cursor or 0)
@@ -0,0 +1,182 @@
+"""
+Puesto y percentil de los estudiantes dentro de su curso
+gestioncolegio/services/posiciones.py
+
+PosicionEstudiante guarda, por estudiante, curso (grado_año_lectivo) y sede,
+el promedio de sus notas, el puesto y el percentil en cada período y en el
+año completo (periodo_academico vacío). Se calculan en la base de datos con
+funciones de ventana (RANK y PERCENT_RANK de MySQL 8) sobre el promedio
+agrupado, sin cargar las notas en Python.
+
+Cuando cambia una Nota, el signal programa el recálculo del curso y período
+afectados al confirmar la transacción: guardar una planilla completa dentro
+de un atomic() recalcula el curso una sola vez. Las escrituras masivas sin
+signals deben ir seguidas de reconstruir_posiciones().
+"""
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, F, Q, Window
+from django.db.models.functions import PercentRank, Rank
+
+from estudiantes.models import Matricula, Nota, PosicionEstudiante
+from matricula.models import AsignaturaGradoAñoLectivo
+
+CURSO = 'asignatura_grado_año_lectivo__grado_año_lectivo'
+SEDE = 'asignatura_grado_año_lectivo__sede'
+DOS_DECIMALES = Decimal('0.01')
+
+
+def _calcular(notas, por_periodo):
+    """PosicionEstudiante sin guardar para las notas dadas, por curso y sede (y período)"""
+    campos = ['estudiante_id', CURSO, SEDE]
+    if por_periodo:
+        campos.append('periodo_academico_id')
+    particion = [F(campo) for campo in campos[1:]]
+
+    filas = list(
+        notas.values(*campos).annotate(
+            promedio=Avg('calificacion')
+        ).annotate(
+            puesto=Window(Rank(), partition_by=particion, order_by=F('promedio').desc()),
+            percentil=Window(PercentRank(), partition_by=particion, order_by=F('promedio').asc()),
+        ).order_by()
+    )
+
+    totales = defaultdict(int)
+    for fila in filas:
+        totales[tuple(fila[campo] for campo in campos[1:])] += 1
+
+    return [
+        PosicionEstudiante(
+            estudiante_id=fila['estudiante_id'],
+            grado_año_lectivo_id=fila[CURSO],
+            sede_id=fila[SEDE],
+            periodo_academico_id=fila['periodo_academico_id'] if por_periodo else None,
+            promedio=Decimal(fila['promedio']).quantize(DOS_DECIMALES),
+            puesto=fila['puesto'],
+            total_estudiantes=totales[tuple(fila[campo] for campo in campos[1:])],
+            percentil=Decimal(fila['percentil'] * 100).quantize(DOS_DECIMALES),
+        )
+        for fila in filas
+    ]
+
+
+def actualizar(alcances):
+    """
+    Recalcula las posiciones de los alcances (grado_año_lectivo_id, sede_id, periodo_id):
+    las del período y las del año completo de cada curso.
+    """
+    alcances = set(alcances)
+    if not alcances:
+        return 0
+
+    cursos = {(curso_id, sede_id) for curso_id, sede_id, _ in alcances}
+    filtro_periodos = Q()
+    filtro_cursos = Q()
+    borrar_periodos = Q()
+    borrar_cursos = Q()
+    for curso_id, sede_id, periodo_id in alcances:
+        filtro_periodos |= Q(**{CURSO: curso_id, SEDE: sede_id, 'periodo_academico_id': periodo_id})
+        borrar_periodos |= Q(grado_año_lectivo_id=curso_id, sede_id=sede_id, periodo_academico_id=periodo_id)
+    for curso_id, sede_id in cursos:
+        filtro_cursos |= Q(**{CURSO: curso_id, SEDE: sede_id})
+        borrar_cursos |= Q(grado_año_lectivo_id=curso_id, sede_id=sede_id, periodo_academico__isnull=True)
+
+    nuevas = _calcular(Nota.objects.filter(filtro_periodos), por_periodo=True)
+    nuevas += _calcular(Nota.objects.filter(filtro_cursos), por_periodo=False)
+
+    with transaction.atomic():
+        PosicionEstudiante.objects.filter(borrar_periodos | borrar_cursos).delete()
+        PosicionEstudiante.objects.bulk_create(nuevas, batch_size=1000)
+    return len(nuevas)
+
+
+def reconstruir_posiciones(año_lectivo=None):
+    """Recalcula desde cero las posiciones (todas o de un año lectivo)"""
+    notas = Nota.objects.all()
+    posiciones = PosicionEstudiante.objects.all()
+    if año_lectivo is not None:
+        año_id = getattr(año_lectivo, 'id', año_lectivo)
+        notas = notas.filter(periodo_academico__año_lectivo_id=año_id)
+        posiciones = posiciones.filter(grado_año_lectivo__año_lectivo_id=año_id)
+
+    nuevas = _calcular(notas, por_periodo=True) + _calcular(notas, por_periodo=False)
+
+    with transaction.atomic():
+        posiciones.delete()
+        PosicionEstudiante.objects.bulk_create(nuevas, batch_size=1000)
+    return len(nuevas)
+
+
+# =============================================
+# RECÁLCULO AL CONFIRMAR LA TRANSACCIÓN
+# =============================================
+
+_pendientes = threading.local()
+
+
+def programar_actualizacion(asignatura_grado_id, periodo_id):
+    """Anota el alcance de una Nota modificada y recalcula al confirmar la transacción"""
+    pendientes = getattr(_pendientes, 'claves', None)
+    if pendientes is None:
+        pendientes = _pendientes.claves = set()
+    pendientes.add((asignatura_grado_id, periodo_id))
+    # Los callbacks adicionales de la misma transacción encuentran el conjunto vacío
+    transaction.on_commit(_aplicar_pendientes)
+
+
+def _aplicar_pendientes():
+    claves = getattr(_pendientes, 'claves', None)
+    if not claves:
+        return
+    _pendientes.claves = set()
+
+    cursos = dict(
+        (agal_id, (curso_id, sede_id))
+        for agal_id, curso_id, sede_id in AsignaturaGradoAñoLectivo.objects.filter(
+            id__in={agal_id for agal_id, _ in claves}
+        ).values_list('id', 'grado_año_lectivo_id', 'sede_id')
+    )
+    actualizar(
+        cursos[agal_id] + (periodo_id,)
+        for agal_id, periodo_id in claves
+        if agal_id in cursos
+    )
+
+
+# =============================================
+# LECTURA
+# =============================================
+
+def posicion_estudiante(estudiante, año_lectivo, periodo=None):
+    """
+    PosicionEstudiante del estudiante en su curso del año (o del período).
+    Si el curso aún no tiene posiciones calculadas se calculan en el momento.
+    """
+    matricula = Matricula.objects.filter(
+        estudiante=estudiante,
+        año_lectivo=año_lectivo,
+    ).exclude(grado_año_lectivo__isnull=True).order_by('id').first()
+    if not matricula:
+        return None
+
+    periodo_id = getattr(periodo, 'id', periodo)
+    alcance = PosicionEstudiante.objects.filter(
+        grado_año_lectivo_id=matricula.grado_año_lectivo_id,
+        sede_id=matricula.sede_id,
+        periodo_academico_id=periodo_id,
+    )
+    posicion = alcance.filter(estudiante=estudiante).first()
+    if posicion is None and not alcance.exists():
+        if periodo_id is None:
+            periodos = Nota.objects.filter(
+                **{CURSO: matricula.grado_año_lectivo_id, SEDE: matricula.sede_id}
+            ).values_list('periodo_academico_id', flat=True).distinct()
+        else:
+            periodos = [periodo_id]
+        actualizar((matricula.grado_año_lectivo_id, matricula.sede_id, p) for p in periodos)
+        posicion = alcance.filter(estudiante=estudiante).first()
+    return posicion
@@ -0,0 +1,40 @@
+"""
+Precarga por lotes de la matrícula actual para listados de estudiantes
+gestioncolegio/services/precarga_estudiantes.py
+
+Estudiante.matricula_actual consulta la base de datos cada vez que una
+plantilla la evalúa dentro de un bucle (grado, sede y estado de cada fila).
+precargar_estudiantes() la resuelve para toda la página en una consulta y la
+deja en estudiante._precarga; la propiedad lee de ahí cuando existe.
+"""
+from estudiantes.models import Matricula
+from gestioncolegio.services import calendario
+
+
+def precargar_estudiantes(estudiantes):
+    """
+    Precarga matricula_actual (matrícula ACT/PEN del año lectivo activo) de
+    la lista de estudiantes en una consulta.
+
+    Devuelve la lista de estudiantes (evalúa el queryset si se pasa uno).
+    """
+    estudiantes = list(estudiantes)
+    if not estudiantes:
+        return estudiantes
+
+    ids = [e.id for e in estudiantes]
+
+    # Misma regla que Estudiante.matricula_actual
+    año_actual = calendario.año_activo()
+    actuales = {}
+    if año_actual:
+        for matricula in Matricula.objects.filter(
+            estudiante_id__in=ids,
+            año_lectivo=año_actual,
+            estado__in=['ACT', 'PEN']
+        ).select_related('grado_año_lectivo__grado', 'sede', 'año_lectivo').order_by('id'):
+            actuales.setdefault(matricula.estudiante_id, matricula)
+
+    for estudiante in estudiantes:
+        estudiante._precarga = {'matricula_actual': actuales.get(estudiante.id)}
+    return estudiantes
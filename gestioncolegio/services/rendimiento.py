@@ -0,0 +1,186 @@
+"""
+Instrumentación de rendimiento por vista
+gestioncolegio/services/rendimiento.py
+
+Utilidades del middleware de instrumentación (huellas de SQL, búfer de
+muestras, objetivo de cProfile) y agregados para la página de perfiles:
+percentiles p50/p95/p99 por vista y peores peticiones.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from gestioncolegio.models import MuestraRendimiento
+
+PERFIL_CACHE_KEY = 'instrumentacion:perfil'
+MAX_MUESTRAS_RESUMEN = 50000
+
+_RE_CADENAS = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMEROS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_LISTAS = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_RE_ESPACIOS = re.compile(r'\s+')
+
+
+def huella_sql(sql):
+    """SQL sin literales: dos consultas con la misma huella solo difieren en parámetros"""
+    sql = _RE_CADENAS.sub('?', sql)
+    sql = _RE_NUMEROS.sub('?', sql)
+    sql = _RE_LISTAS.sub('(...)', sql)
+    return _RE_ESPACIOS.sub(' ', sql).strip()[:1000]
+
+
+def duplicadas(huellas):
+    """(consultas repetidas, huella más repetida) de una petición"""
+    if not huellas:
+        return 0, ''
+    conteo = Counter(huellas)
+    huella, veces = conteo.most_common(1)[0]
+    repetidas = len(huellas) - len(conteo)
+    return repetidas, huella if veces > 1 else ''
+
+
+# =============================================
+# BÚFER DE MUESTRAS
+# =============================================
+
+_buffer = []
+_lock = threading.Lock()
+
+
+def registrar_muestra(**datos):
+    """Acumula la muestra en memoria y la escribe por lotes con bulk_create"""
+    lote = getattr(settings, 'INSTRUMENTACION_LOTE', 20)
+    with _lock:
+        _buffer.append(MuestraRendimiento(**datos))
+        if len(_buffer) < lote and not datos.get('perfil'):
+            return
+        pendientes = _buffer[:]
+        del _buffer[:]
+    MuestraRendimiento.objects.bulk_create(pendientes)
+
+
+def vaciar_buffer():
+    with _lock:
+        pendientes = _buffer[:]
+        del _buffer[:]
+    if pendientes:
+        MuestraRendimiento.objects.bulk_create(pendientes)
+    return len(pendientes)
+
+
+# =============================================
+# OBJETIVO DE cProfile
+# =============================================
+
+def objetivo_perfil():
+    """{'vista': nombre, 'restantes': n, 'muestreo': tasa} o None"""
+    return cache.get(PERFIL_CACHE_KEY)
+
+
+def programar_perfil(vista, capturas=5, muestreo=1.0):
+    cache.set(PERFIL_CACHE_KEY, {
+        'vista': vista,
+        'restantes': capturas,
+        'muestreo': muestreo,
+    }, 60 * 60 * 24)
+
+
+def cancelar_perfil():
+    cache.delete(PERFIL_CACHE_KEY)
+
+
+def consumir_perfil(objetivo):
+    """Descuenta una captura; al llegar a cero se desactiva"""
+    restantes = objetivo['restantes'] - 1
+    if restantes <= 0:
+        cancelar_perfil()
+    else:
+        cache.set(PERFIL_CACHE_KEY, dict(objetivo, restantes=restantes), 60 * 60 * 24)
+
+
+# =============================================
+# AGREGADOS PARA LA PÁGINA DE PERFILES
+# =============================================
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not valores_ordenados:
+        return 0
+    indice = max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)
+    return valores_ordenados[min(indice, len(valores_ordenados) - 1)]
+
+
+def resumen_por_vista(dias=7):
+    """Una fila por vista con percentiles de duración y promedios de consultas"""
+    desde = timezone.now() - timedelta(days=dias)
+    filas = MuestraRendimiento.objects.filter(created_at__gte=desde).order_by('-created_at').values_list(
+        'vista', 'duracion_ms', 'consultas', 'tiempo_sql_ms', 'consultas_duplicadas', 'render_ms', 'tamano_bytes'
+    )[:MAX_MUESTRAS_RESUMEN]
+
+    por_vista = defaultdict(lambda: defaultdict(list))
+    for vista, duracion, consultas, sql, repetidas, render, tamano in filas:
+        datos = por_vista[vista]
+        datos['duracion'].append(duracion)
+        datos['consultas'].append(consultas)
+        datos['sql'].append(sql)
+        datos['repetidas'].append(repetidas)
+        if render is not None:
+            datos['render'].append(render)
+        if tamano is not None:
+            datos['tamano'].append(tamano)
+
+    def promedio(valores):
+        return round(sum(valores) / len(valores), 1) if valores else 0
+
+    resumen = []
+    for vista, datos in por_vista.items():
+        duraciones = sorted(datos['duracion'])
+        resumen.append({
+            'vista': vista,
+            'muestras': len(duraciones),
+            'p50': round(percentil(duraciones, 50), 1),
+            'p95': round(percentil(duraciones, 95), 1),
+            'p99': round(percentil(duraciones, 99), 1),
+            'consultas_promedio': promedio(datos['consultas']),
+            'consultas_max': max(datos['consultas']),
+            'sql_promedio': promedio(datos['sql']),
+            'repetidas_promedio': promedio(datos['repetidas']),
+            'render_promedio': promedio(datos['render']),
+            'tamano_promedio': promedio(datos['tamano']),
+        })
+
+    return sorted(resumen, key=lambda r: -r['p95'])
+
+
+def peores_muestras(vista=None, dias=7, limite=20):
+    muestras = MuestraRendimiento.objects.filter(
+        created_at__gte=timezone.now() - timedelta(days=dias)
+    ).defer('perfil')
+    if vista:
+        muestras = muestras.filter(vista=vista)
+    return muestras.order_by('-duracion_ms')[:limite]
+
+
+def huellas_frecuentes(dias=7, limite=10):
+    """Huellas N+1 más repetidas y en cuántas vistas aparecen"""
+    return MuestraRendimiento.objects.filter(
+        created_at__gte=timezone.now() - timedelta(days=dias)
+    ).exclude(huella_duplicada='').values('huella_duplicada').annotate(
+        peticiones=Count('id'),
+        max_repetidas=Max('consultas_duplicadas'),
+    ).order_by('-peticiones')[:limite]
+
+
+def purgar_muestras(dias=30):
+    """Borra las muestras más antiguas que 'dias'"""
+    borradas, _ = MuestraRendimiento.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=dias)
+    ).delete()
+    return borradas
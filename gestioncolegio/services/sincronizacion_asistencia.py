@@ -0,0 +1,300 @@
+"""
+Sincronización por lotes de asistencia capturada sin conexión
+gestioncolegio/services/sincronizacion_asistencia.py
+
+El dispositivo del docente acumula operaciones (estudiante, fecha, estado,
+marca de tiempo del dispositivo) con una clave de idempotencia generada en el
+cliente y las envía en un solo lote. El lote se aplica en una transacción:
+
+- Una clave ya registrada devuelve su resultado original sin volver a aplicar
+  la operación (reintentos seguros ante cortes de red).
+- Dos lotes concurrentes con la misma clave (o que crean la misma celda):
+  el que confirma segundo choca con la restricción única; esa operación se
+  informa como descartada sin afectar al resto del lote.
+- Conflictos: gana la escritura más reciente. La marca de un registro es la
+  del dispositivo que lo sincronizó por última vez, o su updated_at si desde
+  entonces se modificó desde el servidor (formularios web, administración).
+
+La respuesta incluye los cambios del curso posteriores al sync_token recibido
+y un token nuevo para la siguiente sincronización.
+"""
+from datetime import timedelta
+
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from comportamiento.models import Asistencia, SincronizacionAsistencia
+from estudiantes.models import Matricula
+
+MAX_OPERACIONES = 500
+TOKEN_SALT = 'asistencia.sincronizacion'
+
+# Solapamiento del delta para no perder filas de transacciones que
+# confirmaron justo después de emitir el token anterior
+MARGEN_DELTA = timedelta(seconds=30)
+
+
+class ErrorSincronizacion(Exception):
+    """Lote inválido en su conjunto (se responde 400)"""
+
+
+def emitir_token(momento):
+    return signing.dumps({'t': momento.isoformat()}, salt=TOKEN_SALT)
+
+
+def leer_token(token):
+    """Momento codificado en el token, o None si no hay token válido"""
+    if not token:
+        return None
+    try:
+        return parse_datetime(signing.loads(token, salt=TOKEN_SALT)['t'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+def _normalizar(operacion):
+    """Valida el formato de una operación; devuelve (datos, error)"""
+    clave = str(operacion.get('clave') or '').strip()
+    if not clave or len(clave) > 64:
+        return None, 'Clave de idempotencia inválida'
+
+    try:
+        estudiante_id = int(operacion.get('estudiante_id'))
+    except (TypeError, ValueError):
+        return None, 'Estudiante inválido'
+
+    fecha = parse_date(str(operacion.get('fecha') or ''))
+    if not fecha:
+        return None, 'Fecha inválida'
+
+    marca = parse_datetime(str(operacion.get('timestamp') or ''))
+    if not marca:
+        return None, 'Marca de tiempo inválida'
+    if timezone.is_naive(marca):
+        marca = timezone.make_aware(marca)
+
+    estado = operacion.get('estado')
+    if estado not in dict(Asistencia.ESTADO_CHOICES):
+        return None, 'Estado inválido'
+
+    justificacion = (operacion.get('justificacion') or '').strip()
+    if estado == 'J' and not justificacion:
+        justificacion = 'Justificada por docente'
+
+    return {
+        'clave': clave,
+        'estudiante_id': estudiante_id,
+        'fecha': fecha,
+        'estado': estado,
+        'justificacion': justificacion or None,
+        'marca': marca,
+    }, None
+
+
+def _validar_fecha(fecha, periodo, hoy):
+    if fecha.weekday() >= 5:
+        return 'No se puede registrar asistencia en fines de semana'
+    if fecha > hoy:
+        return 'No se puede registrar asistencia para fechas futuras'
+    if not (periodo.fecha_inicio <= fecha <= periodo.fecha_fin):
+        return f'La fecha debe estar entre {periodo.fecha_inicio} y {periodo.fecha_fin}'
+    return None
+
+
+def _marcas_vigentes(asistencias):
+    """{asistencia_id: marca efectiva} para resolver conflictos (una consulta)"""
+    ultimas = {}
+    for asistencia_id, marca, aplicada_en in SincronizacionAsistencia.objects.filter(
+        asistencia_id__in=list(asistencias),
+        resultado='aplicada',
+    ).order_by('asistencia_id', '-created_at').values_list('asistencia_id', 'marca_tiempo', 'created_at'):
+        ultimas.setdefault(asistencia_id, (marca, aplicada_en))
+
+    marcas = {}
+    for asistencia_id, asistencia in asistencias.items():
+        marca, aplicada_en = ultimas.get(asistencia_id, (None, None))
+        if marca is None or asistencia.updated_at > aplicada_en:
+            # Nunca sincronizada o editada desde el servidor después
+            marcas[asistencia_id] = asistencia.updated_at
+        else:
+            marcas[asistencia_id] = marca
+    return marcas
+
+
+def _serializar(asistencia):
+    return {
+        'id': asistencia.id,
+        'estudiante_id': asistencia.estudiante_id,
+        'fecha': asistencia.fecha.isoformat(),
+        'estado': asistencia.estado,
+        'justificacion': asistencia.justificacion or '',
+        'actualizado': asistencia.updated_at.isoformat(),
+    }
+
+
+def cambios_desde(grado_año_lectivo, periodo, desde=None):
+    """Asistencias del curso y período modificadas después de 'desde'"""
+    estudiantes = Matricula.objects.filter(
+        grado_año_lectivo=grado_año_lectivo,
+        estado__in=['ACT', 'PEN'],
+    ).values('estudiante_id')
+
+    asistencias = Asistencia.objects.filter(
+        periodo_academico=periodo,
+        estudiante_id__in=estudiantes,
+    )
+    if desde is not None:
+        asistencias = asistencias.filter(updated_at__gte=desde - MARGEN_DELTA)
+
+    return [_serializar(a) for a in asistencias.order_by('updated_at')]
+
+
+def _aplicar(usuario, periodo, datos, existentes, marcas):
+    """Aplica (o descarta por ser más antigua) una operación y registra su clave"""
+    celda = (datos['estudiante_id'], datos['fecha'])
+    asistencia = existentes.get(celda)
+
+    if asistencia and marcas.get(asistencia.id) and datos['marca'] <= marcas[asistencia.id]:
+        resultado = 'descartada'
+    else:
+        if asistencia is None:
+            asistencia = Asistencia(
+                estudiante_id=datos['estudiante_id'],
+                periodo_academico=periodo,
+                fecha=datos['fecha'],
+            )
+        asistencia.estado = datos['estado']
+        asistencia.justificacion = datos['justificacion']
+        asistencia.save()
+        resultado = 'aplicada'
+
+    SincronizacionAsistencia.objects.create(
+        clave=datos['clave'],
+        usuario=usuario,
+        asistencia=asistencia,
+        estado=datos['estado'],
+        marca_tiempo=datos['marca'],
+        resultado=resultado,
+    )
+    # Solo después de confirmar el savepoint
+    existentes[celda] = asistencia
+    if resultado == 'aplicada':
+        marcas[asistencia.id] = datos['marca']
+    return resultado, asistencia
+
+
+def _recargar_celda(celda, existentes, marcas):
+    """Tras un savepoint revertido, vuelve a leer la celda tal como quedó en la base"""
+    asistencia = Asistencia.objects.select_for_update().filter(
+        estudiante_id=celda[0], fecha=celda[1]
+    ).first()
+    if asistencia is None:
+        existentes.pop(celda, None)
+        return
+    existentes[celda] = asistencia
+    marcas.update(_marcas_vigentes({asistencia.id: asistencia}))
+
+
+def sincronizar(usuario, grado_año_lectivo, periodo, operaciones, sync_token=None):
+    """
+    Aplica un lote de operaciones y devuelve
+    {'resultados': [...], 'cambios': [...], 'sync_token': str}.
+    """
+    if not isinstance(operaciones, list):
+        raise ErrorSincronizacion('Las operaciones deben ser una lista')
+    if len(operaciones) > MAX_OPERACIONES:
+        raise ErrorSincronizacion(f'Máximo {MAX_OPERACIONES} operaciones por lote')
+
+    hoy = timezone.now().date()
+    roster = set(
+        Matricula.objects.filter(
+            grado_año_lectivo=grado_año_lectivo,
+            estado__in=['ACT', 'PEN'],
+        ).values_list('estudiante_id', flat=True)
+    )
+
+    resultados = {}
+    validas = []
+    vistas = set()
+    for indice, operacion in enumerate(operaciones):
+        if not isinstance(operacion, dict):
+            operacion = {}
+        datos, error = _normalizar(operacion)
+        clave = datos['clave'] if datos else str(operacion.get('clave') or indice)
+        if clave in vistas:
+            # Clave repetida dentro del mismo lote
+            continue
+        vistas.add(clave)
+        if not error:
+            if datos['estudiante_id'] not in roster:
+                error = 'El estudiante no está matriculado en este curso'
+            else:
+                error = _validar_fecha(datos['fecha'], periodo, hoy)
+        if error:
+            resultados[clave] = {'clave': clave, 'resultado': 'rechazada', 'error': error}
+        else:
+            validas.append(datos)
+
+    with transaction.atomic():
+        # Claves ya procesadas en lotes anteriores
+        previas = {
+            s.clave: s for s in SincronizacionAsistencia.objects.filter(
+                clave__in=[d['clave'] for d in validas]
+            )
+        }
+
+        pendientes = []
+        for datos in validas:
+            previa = previas.get(datos['clave'])
+            if previa:
+                resultados[datos['clave']] = {
+                    'clave': datos['clave'],
+                    'resultado': previa.resultado,
+                    'duplicada': True,
+                }
+            else:
+                pendientes.append(datos)
+
+        # Dentro del mismo lote, solo la operación más reciente de cada celda
+        pendientes.sort(key=lambda d: d['marca'])
+
+        existentes = {}
+        if pendientes:
+            for asistencia in Asistencia.objects.select_for_update().filter(
+                estudiante_id__in={d['estudiante_id'] for d in pendientes},
+                fecha__in={d['fecha'] for d in pendientes},
+            ):
+                existentes[(asistencia.estudiante_id, asistencia.fecha)] = asistencia
+        marcas = _marcas_vigentes({a.id: a for a in existentes.values()})
+
+        for datos in pendientes:
+            celda = (datos['estudiante_id'], datos['fecha'])
+            try:
+                # Un savepoint por operación: un choque con otro lote concurrente
+                # (misma clave o misma celda recién creada) solo afecta a esta
+                with transaction.atomic():
+                    resultado, asistencia = _aplicar(usuario, periodo, datos, existentes, marcas)
+            except IntegrityError:
+                _recargar_celda(celda, existentes, marcas)
+                resultados[datos['clave']] = {
+                    'clave': datos['clave'],
+                    'resultado': 'descartada',
+                    'error': 'Operación procesada al mismo tiempo por otra sincronización',
+                }
+                continue
+            resultados[datos['clave']] = {
+                'clave': datos['clave'],
+                'resultado': resultado,
+                'asistencia_id': asistencia.id,
+            }
+
+    # Token emitido antes de leer el delta: lo que se escriba después
+    # aparecerá en la siguiente sincronización
+    ahora = timezone.now()
+    return {
+        'resultados': list(resultados.values()),
+        'cambios': cambios_desde(grado_año_lectivo, periodo, leer_token(sync_token)),
+        'sync_token': emitir_token(ahora),
+    }
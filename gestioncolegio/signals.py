@@ -0,0 +1,130 @@
+# signals.py en la app gestioncolegio
+"""
+Invalidación de cachés derivadas cuando cambian los datos académicos,
+mantenimiento de los resúmenes de asistencia y derivados de imágenes
+"""
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from comportamiento.models import Asistencia, Comportamiento
+from estudiantes.models import Estudiante, Matricula, Nota
+from gestioncolegio.models import AñoLectivo
+from gestioncolegio.services import (
+    asistencia, calendario, calificaciones, dashboard_estudiante, histograma, imagenes, posiciones,
+)
+from matricula.models import AsignaturaGradoAñoLectivo, PeriodoAcademico
+
+
+@receiver([post_save, post_delete], sender=Nota)
+@receiver([post_save, post_delete], sender=Asistencia)
+@receiver([post_save, post_delete], sender=Comportamiento)
+@receiver([post_save, post_delete], sender=Matricula)
+def invalidar_dashboard_estudiante(sender, instance, **kwargs):
+    """Invalida el snapshot del dashboard del estudiante afectado"""
+    dashboard_estudiante.invalidar_snapshot(instance.estudiante_id)
+
+
+@receiver(post_save, sender=Estudiante)
+def invalidar_dashboard_perfil(sender, instance, **kwargs):
+    """Cambios de foto o estado del estudiante"""
+    dashboard_estudiante.invalidar_snapshot(instance.id)
+
+
+@receiver([post_save, post_delete], sender=AñoLectivo)
+@receiver([post_save, post_delete], sender=PeriodoAcademico)
+def invalidar_dashboards_calendario(sender, instance, **kwargs):
+    """Un cambio de calendario afecta a todos los dashboards"""
+    dashboard_estudiante.invalidar_todos()
+
+
+@receiver([post_save, post_delete], sender=AñoLectivo)
+@receiver([post_save, post_delete], sender=PeriodoAcademico)
+def invalidar_calendario(sender, instance, **kwargs):
+    """La instantánea del calendario se recarga al confirmar, nunca con datos sin confirmar"""
+    transaction.on_commit(calendario.invalidar)
+
+
+@receiver([post_save, post_delete], sender=Nota)
+@receiver([post_save, post_delete], sender=Matricula)
+@receiver([post_save, post_delete], sender=AsignaturaGradoAñoLectivo)
+@receiver([post_save, post_delete], sender=PeriodoAcademico)
+def invalidar_monitor_calificaciones(sender, instance, **kwargs):
+    """La matriz de avance de calificaciones se recalcula en el siguiente acceso"""
+    calificaciones.invalidar_monitor()
+
+
+@receiver([post_save, post_delete], sender=Nota)
+@receiver([post_save, post_delete], sender=AsignaturaGradoAñoLectivo)
+def invalidar_histogramas_notas(sender, instance, **kwargs):
+    """Los histogramas de calificaciones en caché se recalculan en el siguiente acceso"""
+    histograma.invalidar_histogramas()
+
+
+@receiver([post_save, post_delete], sender=Nota)
+def actualizar_posiciones(sender, instance, **kwargs):
+    """Puesto y percentil del curso se recalculan al confirmar la transacción"""
+    posiciones.programar_actualizacion(instance.asignatura_grado_año_lectivo_id, instance.periodo_academico_id)
+
+
+CAMPOS_CLAVE_ASISTENCIA = ('estudiante_id', 'periodo_academico_id', 'fecha', 'estado')
+
+
+def _clave_asistencia(instance):
+    """Clave (estudiante, período, fecha, estado); None si algún campo está diferido"""
+    valores = instance.__dict__
+    if not all(campo in valores for campo in CAMPOS_CLAVE_ASISTENCIA):
+        return None
+    return tuple(valores[campo] for campo in CAMPOS_CLAVE_ASISTENCIA)
+
+
+@receiver(post_init, sender=Asistencia)
+def recordar_asistencia_original(sender, instance, **kwargs):
+    """Guarda los valores cargados para calcular el delta al guardar (sin consultas extra)"""
+    instance._asistencia_original = _clave_asistencia(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Asistencia)
+def actualizar_resumen_asistencia(sender, instance, created, **kwargs):
+    """Aplica el cambio de estado en los resúmenes de período y de curso"""
+    anterior = getattr(instance, '_asistencia_original', None)
+    if not created and anterior is None:
+        # Instancia cargada con campos diferidos: no hay delta fiable,
+        # se corrige con el comando reconstruir_resumen_asistencia
+        return
+    actual = _clave_asistencia(instance)
+    asistencia.registrar_cambio(None if created else anterior, actual)
+    instance._asistencia_original = actual
+
+
+@receiver(post_delete, sender=Asistencia)
+def descontar_resumen_asistencia(sender, instance, **kwargs):
+    asistencia.registrar_cambio(getattr(instance, '_asistencia_original', None), None)
+
+
+CAMPOS_IMAGEN_MODELO = {}
+for etiqueta, campo in imagenes.CAMPOS_IMAGEN:
+    CAMPOS_IMAGEN_MODELO.setdefault(apps.get_model(etiqueta), []).append(campo)
+
+
+def generar_derivados_imagen(sender, instance, **kwargs):
+    """Miniaturas y tamaños web de la imagen subida, al confirmar la transacción"""
+    if not imagenes.al_subir():
+        return
+    for campo in CAMPOS_IMAGEN_MODELO[sender]:
+        archivo = getattr(instance, campo)
+        if archivo and not imagenes.tiene_derivados(archivo):
+            transaction.on_commit(lambda archivo=archivo: imagenes.generar(archivo))
+
+
+def eliminar_derivados_imagen(sender, instance, **kwargs):
+    for campo in CAMPOS_IMAGEN_MODELO[sender]:
+        archivo = getattr(instance, campo)
+        if archivo:
+            imagenes.eliminar(archivo.name, archivo.storage)
+
+
+for modelo in CAMPOS_IMAGEN_MODELO:
+    post_save.connect(generar_derivados_imagen, sender=modelo, dispatch_uid=f'derivados_imagen_{modelo._meta.label}')
+    post_delete.connect(eliminar_derivados_imagen, sender=modelo, dispatch_uid=f'derivados_eliminar_{modelo._meta.label}')
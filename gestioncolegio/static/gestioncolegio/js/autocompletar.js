@@ -0,0 +1,68 @@
+// Selectores con búsqueda en el servidor (SelectAutocompletar) autocompletar.js
+// Convierte cada <select data-autocompletar="url"> en un Select2 con carga
+// AJAX. Select2 solo se descarga en las páginas que tienen algún selector.
+(function ($) {
+    const SELECT2_JS = 'https://cdn.jsdelivr.net/npm/select2@4.1.0-rc.0/dist/js/select2.min.js';
+    const SELECT2_I18N = 'https://cdn.jsdelivr.net/npm/select2@4.1.0-rc.0/dist/js/i18n/es.js';
+    const SELECT2_CSS = [
+        'https://cdn.jsdelivr.net/npm/select2@4.1.0-rc.0/dist/css/select2.min.css',
+        'https://cdn.jsdelivr.net/npm/select2-bootstrap-5-theme@1.3.0/dist/select2-bootstrap-5-theme.min.css'
+    ];
+
+    function cargarSelect2() {
+        if ($.fn.select2) {
+            return $.Deferred().resolve().promise();
+        }
+        SELECT2_CSS.forEach(function (href) {
+            $('<link>', { rel: 'stylesheet', href: href }).appendTo('head');
+        });
+        return $.ajax({ url: SELECT2_JS, dataType: 'script', cache: true }).then(function () {
+            return $.ajax({ url: SELECT2_I18N, dataType: 'script', cache: true });
+        });
+    }
+
+    function inicializar($select) {
+        if ($select.data('select2')) {
+            return;
+        }
+        $select.select2({
+            theme: 'bootstrap-5',
+            language: 'es',
+            width: '100%',
+            placeholder: $select.data('placeholder') || '',
+            allowClear: !$select.prop('required') && !$select.prop('multiple'),
+            minimumInputLength: parseInt($select.data('minimo'), 10) || 0,
+            ajax: {
+                url: $select.data('autocompletar'),
+                dataType: 'json',
+                delay: 250,
+                cache: true,
+                data: function (params) {
+                    return { q: params.term || '', page: params.page || 1 };
+                }
+            }
+        });
+    }
+
+    // Para fijar un valor desde otro script (la opción puede no estar en el HTML)
+    window.seleccionarAutocompletar = function (selector, id, texto) {
+        const $select = $(selector);
+        if (!$select.find('option[value="' + id + '"]').length) {
+            $select.append(new Option(texto, id, true, true));
+        }
+        $select.val($select.prop('multiple') ? ($select.val() || []).concat([String(id)]) : String(id));
+        $select.trigger('change');
+    };
+
+    $(function () {
+        const $selects = $('select[data-autocompletar]');
+        if (!$selects.length) {
+            return;
+        }
+        cargarSelect2().done(function () {
+            $selects.each(function () {
+                inicializar($(this));
+            });
+        });
+    });
+})(jQuery);
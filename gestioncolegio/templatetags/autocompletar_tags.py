@@ -0,0 +1,19 @@
+# gestioncolegio/templatetags/autocompletar_tags.py
+from django import template
+
+from gestioncolegio.widgets import render_autocompletar
+
+register = template.Library()
+
+@register.simple_tag
+def select_autocompletar(fuente, nombre, valor=None, requerido=False, placeholder=''):
+    """
+    Selector de filtro con búsqueda en el servidor:
+    {% select_autocompletar 'estudiantes' 'estudiante' filtros.estudiante_id %}
+    """
+    attrs = {'id': f'id_{nombre}'}
+    if requerido:
+        attrs['required'] = True
+    if placeholder:
+        attrs['data-placeholder'] = placeholder
+    return render_autocompletar(fuente, nombre, valor, attrs)
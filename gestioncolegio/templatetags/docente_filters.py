@@ -8,6 +8,9 @@ register = template.Library()
 @register.filter
 def count_estudiantes_asignatura(asignatura_grado):
     """Cuenta estudiantes en una asignatura - CORREGIDO"""
+    # Precalculado por la vista para toda la página (DashboardDocenteView)
+    if hasattr(asignatura_grado, 'total_estudiantes'):
+        return asignatura_grado.total_estudiantes
     try:
         # Obtener año lectivo actual
         from gestioncolegio.models import AñoLectivo
@@ -32,9 +35,9 @@ def count_estudiantes_asignatura(asignatura_grado):
 def horas_semana(asignatura_grado):
     """Calcula horas semanales de una asignatura - VERSIÓN MEJORADA"""
     try:
-        from academico.models import HorarioClase
         # Calcular horas totales sumando duración de cada horario
-        horarios = HorarioClase.objects.filter(asignatura_grado=asignatura_grado)
+        # .all() aprovecha prefetch_related('horarios') si la vista lo hizo
+        horarios = asignatura_grado.horarios.all()
         
         total_horas = 0
         for horario in horarios:
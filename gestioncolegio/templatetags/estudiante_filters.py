@@ -1,11 +1,10 @@
 # gestioncolegio/templatetags/estudiante_filters.py
 from django.db import models
 from django import template
-import statistics
 from django.utils import timezone
 from datetime import datetime
 from matricula.models import PeriodoAcademico
-from decimal import Decimal
+from gestioncolegio.services.estadisticas import resumen_asignaturas
 
 register = template.Library()
 
@@ -15,67 +14,18 @@ register = template.Library()
 
 @register.filter
 def calcular_promedio(asignaturas):
-    if not asignaturas:
-        return 0
-    
-    notas_con_valor = []
-    for a in asignaturas:
-        if isinstance(a, dict):
-            if a.get('tiene_nota') and a.get('calificacion') is not None:
-                calificacion = a['calificacion']
-                if isinstance(calificacion, (int, float, Decimal)):
-                    notas_con_valor.append(float(calificacion))
-        else:
-            if getattr(a, 'tiene_nota', False) and getattr(a, 'calificacion', None) is not None:
-                calificacion = getattr(a, 'calificacion')
-                if isinstance(calificacion, (int, float, Decimal)):
-                    notas_con_valor.append(float(calificacion))
-    
-    if not notas_con_valor:
-        return 0
-    
-    # USAR sum_values EN LUGAR DE sum
-    total = sum_values(notas_con_valor)  # ← CAMBIO AQUÍ
-    return round(total / len(notas_con_valor), 1)
+    """Promedio de las calificaciones con nota"""
+    return resumen_asignaturas(asignaturas)['promedio']
 
 @register.filter
 def calcular_mediana(asignaturas):
     """Calcula la mediana de las calificaciones"""
-    notas = []
-    for a in asignaturas:
-        if isinstance(a, dict):
-            if a.get('tiene_nota') and a.get('calificacion'):
-                notas.append(a['calificacion'])
-        elif getattr(a, 'tiene_nota', False) and getattr(a, 'calificacion', None):
-            notas.append(a.calificacion)
-    
-    if not notas:
-        return 0
-    
-    try:
-        return round(statistics.median(notas), 1)
-    except statistics.StatisticsError:
-        return 0
+    return resumen_asignaturas(asignaturas)['mediana']
 
 @register.filter
 def calcular_moda(asignaturas):
     """Calcula la moda de las calificaciones"""
-    notas = []
-    for a in asignaturas:
-        if isinstance(a, dict):
-            if a.get('tiene_nota') and a.get('calificacion'):
-                notas.append(a['calificacion'])
-        elif getattr(a, 'tiene_nota', False) and getattr(a, 'calificacion', None):
-            notas.append(a.calificacion)
-    
-    if not notas:
-        return 0
-    
-    try:
-        moda = statistics.mode(notas)
-        return round(moda, 1)
-    except statistics.StatisticsError:
-        return 0
+    return resumen_asignaturas(asignaturas)['moda']
 
 # ==============================================
 # FILTROS PARA DESEMPEÑO Y COLORES
@@ -83,33 +33,8 @@ def calcular_moda(asignaturas):
 
 @register.filter
 def calcular_desempeno_promedio(asignaturas):
-    notas_validas = []
-    
-    for a in asignaturas:
-        if isinstance(a, dict):
-            if a.get('tiene_nota') and a.get('calificacion') is not None:
-                calificacion = a['calificacion']
-                if isinstance(calificacion, (int, float)):
-                    notas_validas.append(calificacion)
-        else:
-            if getattr(a, 'tiene_nota', False) and getattr(a, 'calificacion', None) is not None:
-                calificacion = getattr(a, 'calificacion')
-                if isinstance(calificacion, (int, float)):
-                    notas_validas.append(calificacion)
-    
-    if not notas_validas:
-        return "No evaluado"
-    
-    promedio = sum(notas_validas) / len(notas_validas)
-    
-    if promedio >= 4.6:
-        return "Superior"
-    elif promedio >= 4.0:
-        return "Alto"
-    elif promedio >= 3.0:
-        return "Básico"
-    else:
-        return "Bajo"
+    """Desempeño del promedio de las calificaciones con nota"""
+    return resumen_asignaturas(asignaturas)['desempeno']
 
 @register.filter
 def color_desempeno(desempeno):
@@ -457,7 +382,7 @@ def calculate_age(fecha_nacimiento):
 def get_academic_level(estudiante):
     """Obtiene el nivel académico del estudiante"""
     if hasattr(estudiante, 'grado_actual'):
-        nivel = get_attr(estudiante, 'grado_actual.nombre')
+        nivel = get_attr(estudiante, 'grado_actual.grado.nombre')
         if nivel:
             return nivel
     return "No definido"
@@ -466,7 +391,6 @@ def get_academic_level(estudiante):
 def get_periodo_actual(estudiante):
     """Obtiene el período actual del estudiante"""
     try:
-        from matricula.models import PeriodoAcademico
         if hasattr(estudiante, 'matricula_actual'):
             matricula = estudiante.matricula_actual
             if matricula and hasattr(matricula, 'año_lectivo'):
@@ -821,7 +745,3 @@ def get_matricula_grado(estudiante, año_lectivo):
     if matricula:
         return matricula.grado_año_lectivo.grado.nombre
     return "No matriculado"
-
-@property
-def matricula_actual(self):
-    return self.matriculas.filter(activa=True).first()
@@ -0,0 +1,33 @@
+# gestioncolegio/templatetags/imagenes_tags.py
+from django import template
+
+from gestioncolegio.services import imagenes
+
+register = template.Library()
+
+@register.filter(name='derivado')
+def derivado(archivo, tamaño='thumb'):
+    """URL JPEG del tamaño pedido (thumb, card, hero); el original si aún no existe"""
+    return imagenes.url(archivo, tamaño)
+
+@register.filter(name='srcset')
+def srcset(archivo, formato='jpg'):
+    """Lista srcset con los anchos card y hero"""
+    return imagenes.srcset(archivo, formato)
+
+@register.inclusion_tag('gestioncolegio/components/imagen_responsive.html')
+def imagen_responsive(archivo, tamaño='card', alt='', clase='', estilo='', sizes='100vw', lazy=True):
+    """<picture> con WebP y respaldo JPEG; sin derivados, el <img> del original"""
+    derivados = imagenes.tiene_derivados(archivo)
+    return {
+        'derivados': derivados,
+        'src': imagenes.url(archivo, tamaño) if derivados else (archivo.url if archivo else ''),
+        'srcset_webp': imagenes.srcset(archivo, 'webp') if derivados and tamaño != 'thumb' else '',
+        'srcset_jpg': imagenes.srcset(archivo, 'jpg') if derivados and tamaño != 'thumb' else '',
+        'webp': imagenes.url(archivo, tamaño, 'webp') if derivados else '',
+        'alt': alt,
+        'clase': clase,
+        'estilo': estilo,
+        'sizes': sizes,
+        'lazy': lazy,
+    }
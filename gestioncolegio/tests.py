@@ -1,3 +1,782 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import socketserver
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from academico.models import Periodo
+from administrador.forms import AcudienteForm, MatriculaForm
+from estudiantes.models import Acudiente, Matricula, Nota, PosicionEstudiante
+from gestioncolegio.models import (
+    AuditoriaArchivada, AuditoriaSistema, AñoLectivo, CorreoSaliente, NotificacionSistema, Sede,
+)
+from gestioncolegio.services import (
+    auditoria, autocompletar, calendario, correo, datos_sinteticos, histograma, imagenes, menus, notificaciones, posiciones,
+)
+from gestioncolegio.widgets import render_autocompletar
+from matricula.models import PeriodoAcademico
+from usuarios.models import Usuario
+from web.models import About, Noticia
+
+# =============================================
+# PRESUPUESTO DE CONSULTAS POR ROL
+# =============================================
+# Máximo de consultas SQL de cada página principal. El mismo presupuesto se
+# verifica con dos tamaños de colegio: una consulta por fila (N+1) supera el
+# límite en el tamaño grande aunque pase en el chico. Cada presupuesto es lo
+# medido (ejecutando la prueba sola) más 2, igual en los dos tamaños.
+
+PRESUPUESTOS = {
+    'dashboard_estudiante': 23,
+    'dashboard_acudiente': 27,
+    'dashboard_docente': 21,
+    'dashboard_administrador': 19,
+    'estudiante_list': 25,
+    'calificar_notas': 15,
+    'obtener_notas_estudiantes': 15,
+    'gestion_calificaciones': 14,
+    'cargar_estudiantes_calificaciones': 10,
+    'acudiente_notas': 22,
+    'acudiente_asistencia': 25,
+    'acudiente_comportamiento': 22,
+}
+
+TAMAÑO_CHICO = {'sedes': 1, 'estudiantes_por_grado': 3, 'años': 1, 'dias_asistencia': 3}
+TAMAÑO_GRANDE = {'sedes': 2, 'estudiantes_por_grado': 12, 'años': 2, 'dias_asistencia': 8}
+
+
+# Caché en memoria para no tocar la caché en disco del proyecto
+CACHE_PRUEBAS = override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+
+
+class PresupuestoConsultasMixin:
+    """Genera el colegio sintético del tamaño de la subclase y mide cada página en frío"""
+    tamaño = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.contexto = datos_sinteticos.generar_colegio(**cls.tamaño)
+
+    def setUp(self):
+        # Sin snapshots ni matrices cacheadas: se mide el camino completo
+        cache.clear()
+
+    def peticion(self, rol, url, datos=None, metodo='get'):
+        self.client.force_login(self.contexto[f'usuario_{rol}'])
+        with CaptureQueriesContext(connection) as consultas:
+            if metodo == 'post':
+                respuesta = self.client.post(url, json.dumps(datos), content_type='application/json')
+            else:
+                respuesta = self.client.get(url, datos)
+        return respuesta, consultas
+
+    def verificar(self, nombre, rol, url, datos=None, metodo='get'):
+        respuesta, consultas = self.peticion(rol, url, datos, metodo)
+        self.assertEqual(respuesta.status_code, 200, f'{nombre}: respuesta {respuesta.status_code}')
+        presupuesto = PRESUPUESTOS[nombre]
+        self.assertLessEqual(
+            len(consultas), presupuesto,
+            f'{nombre}: {len(consultas)} consultas (presupuesto {presupuesto})\n' +
+            '\n'.join(consulta['sql'] for consulta in consultas.captured_queries)
+        )
+
+    # ---------- Estudiante / acudiente ----------
+
+    def test_dashboard_estudiante(self):
+        self.verificar('dashboard_estudiante', 'estudiante', reverse('gestioncolegio:dashboard_estudiante'))
+
+    def test_dashboard_acudiente(self):
+        self.verificar('dashboard_acudiente', 'acudiente', reverse('gestioncolegio:dashboard_acudiente'))
+
+    def test_acudiente_notas(self):
+        self.verificar(
+            'acudiente_notas', 'acudiente',
+            reverse('acudiente:notas_estudiante', args=[self.contexto['estudiante'].id])
+        )
+
+    def test_acudiente_asistencia(self):
+        self.verificar(
+            'acudiente_asistencia', 'acudiente',
+            reverse('acudiente:asistencia_estudiante', args=[self.contexto['estudiante'].id])
+        )
+
+    def test_acudiente_comportamiento(self):
+        self.verificar(
+            'acudiente_comportamiento', 'acudiente',
+            reverse('acudiente:comportamiento_estudiante', args=[self.contexto['estudiante'].id])
+        )
+
+    # ---------- Docente ----------
+
+    def test_dashboard_docente(self):
+        self.verificar('dashboard_docente', 'docente', reverse('gestioncolegio:dashboard_docente'))
+
+    def test_calificar_notas(self):
+        self.verificar('calificar_notas', 'docente', reverse('docentes:calificar_notas'))
+
+    def test_obtener_notas_estudiantes(self):
+        self.verificar(
+            'obtener_notas_estudiantes', 'docente', reverse('docentes:obtener_notas_estudiantes'),
+            {
+                'grado_id': self.contexto['grado'].id,
+                'asignatura_id': self.contexto['asignatura_grado'].asignatura_id,
+                'periodo_id': self.contexto['periodo'].id,
+            }
+        )
+
+    # ---------- Administrador ----------
+
+    def test_dashboard_administrador(self):
+        self.verificar('dashboard_administrador', 'admin', reverse('gestioncolegio:dashboard_administrador'))
+
+    def test_estudiante_list(self):
+        self.verificar('estudiante_list', 'admin', reverse('administrador:estudiante_list'))
+
+    def test_gestion_calificaciones(self):
+        self.verificar('gestion_calificaciones', 'admin', reverse('administrador:gestion_calificaciones'))
+
+    def test_cargar_estudiantes_calificaciones(self):
+        self.verificar(
+            'cargar_estudiantes_calificaciones', 'admin',
+            reverse('administrador:cargar_estudiantes_calificaciones'),
+            {
+                'asignatura_id': self.contexto['asignatura_grado'].id,
+                'grado_id': self.contexto['grado'].id,
+                'sede_id': self.contexto['sede'].id,
+                'periodo_id': self.contexto['periodo'].id,
+            },
+            metodo='post'
+        )
+
+
+@CACHE_PRUEBAS
+class PresupuestoConsultasChicoTests(PresupuestoConsultasMixin, TestCase):
+    tamaño = TAMAÑO_CHICO
+
+
+@CACHE_PRUEBAS
+class PresupuestoConsultasGrandeTests(PresupuestoConsultasMixin, TestCase):
+    tamaño = TAMAÑO_GRANDE
+
+
+# =============================================
+# NOTIFICACIONES MASIVAS
+# =============================================
+
+@CACHE_PRUEBAS
+class NotificacionesTests(TestCase):
+    """Envío por audiencia, contadores en caché y consulta por cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.contexto = datos_sinteticos.generar_colegio(**TAMAÑO_CHICO)
+
+    def setUp(self):
+        cache.clear()
+        self.acudiente = self.contexto['usuario_acudiente']
+
+    def notificar_curso(self, titulo='Reunión de padres'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return notificaciones.notificar_audiencia(
+                'acudientes_curso', titulo, 'El viernes a las 7:00', grado_año_lectivo=self.contexto['curso']
+            )
+
+    def test_audiencia_acudientes_curso(self):
+        esperados = set(Acudiente.objects.filter(
+            estudiante_id__in=Matricula.objects.filter(
+                grado_año_lectivo=self.contexto['curso'], estado__in=['ACT', 'PEN']
+            ).values('estudiante_id')
+        ).values_list('acudiente_id', flat=True))
+
+        creadas = self.notificar_curso()
+
+        self.assertEqual(creadas, len(esperados))
+        self.assertIn(self.acudiente.id, esperados)
+        self.assertEqual(
+            set(NotificacionSistema.objects.filter(titulo='Reunión de padres').values_list('usuario_id', flat=True)),
+            esperados
+        )
+
+    def test_contador_en_cache(self):
+        inicial = notificaciones.no_leidas(self.acudiente)
+        self.notificar_curso()
+        self.notificar_curso('Salida pedagógica')
+
+        # Crear notificaciones borra el contador: se vuelve a contar una vez
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(notificaciones.no_leidas(self.acudiente), inicial + 2)
+            self.assertEqual(notificaciones.no_leidas(self.acudiente), inicial + 2)
+        self.assertEqual(len(consultas), 1)
+
+        ids = list(NotificacionSistema.objects.filter(
+            usuario=self.acudiente, leida=False
+        ).values_list('id', flat=True)[:1])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(notificaciones.marcar_leidas(self.acudiente, ids), 1)
+        self.assertEqual(notificaciones.no_leidas(self.acudiente), inicial + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notificaciones.marcar_leidas(self.acudiente)
+        self.assertEqual(notificaciones.no_leidas(self.acudiente), 0)
+        self.assertFalse(NotificacionSistema.objects.filter(usuario=self.acudiente, leida=False).exists())
+
+    def test_endpoint_devuelve_solo_nuevas(self):
+        self.client.force_login(self.acudiente)
+        url = reverse('gestioncolegio:notificaciones_nuevas')
+        cursor = self.client.get(url).json()['cursor']
+
+        self.notificar_curso()
+        datos = self.client.get(url, {'cursor': cursor}).json()
+        self.assertEqual([n['titulo'] for n in datos['notificaciones']], ['Reunión de padres'])
+        self.assertGreater(datos['cursor'], cursor)
+
+        datos = self.client.get(url, {'cursor': datos['cursor']}).json()
+        self.assertEqual(datos['notificaciones'], [])
+
+    def test_campana_en_el_navbar(self):
+        self.notificar_curso()
+        self.client.force_login(self.acudiente)
+        response = self.client.get(reverse('gestioncolegio:dashboard_acudiente'))
+        self.assertContains(response, 'id="notificaciones-campana"')
+        self.assertContains(response, 'espera=0')
+        self.assertContains(response, f'<span class="cantidad">{notificaciones.no_leidas(self.acudiente)}</span>')
+
+
+# =============================================
+# MENÚS POR ROL
+# =============================================
+
+class MenusTests(SimpleTestCase):
+    """El registro de menús solo usa URL existentes"""
+
+    def enlaces(self, entradas):
+        for entrada in entradas:
+            yield entrada
+            yield from self.enlaces(entrada.hijos)
+
+    def test_todas_las_urls_se_resuelven(self):
+        for rol, registro in menus.MENUS.items():
+            declaradas = [e.url for e in self.enlaces(registro) if e.url]
+            compiladas = [e for e in self.enlaces(menus.menu_rol(rol)) if e.url]
+            self.assertEqual([e.url for e in compiladas], declaradas, f'{rol}: URL inexistente en el menú')
+            self.assertTrue(all(e.enlace.startswith('/') for e in compiladas))
+
+    def test_rol_sin_menu(self):
+        self.assertEqual(menus.menu_rol('Estudiante'), ())
+
+
+# =============================================
+# AUDITORÍA
+# =============================================
+
+class AuditoriaTests(TestCase):
+    """Escritura por lotes y archivo de eventos antiguos"""
+
+    def setUp(self):
+        self.request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1', HTTP_USER_AGENT='pruebas')
+        self.request.user = AnonymousUser()
+        self.addCleanup(auditoria.vaciar_buffer)
+
+    @override_settings(AUDITORIA_LOTE=3, AUDITORIA_INTERVALO=60)
+    def test_eventos_se_escriben_por_lote(self):
+        auditoria.registrar(self.request, 'creacion', 'Logro', 'Primero')
+        auditoria.registrar(self.request, 'creacion', 'Logro', 'Segundo')
+        self.assertEqual(AuditoriaSistema.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as consultas:
+            auditoria.registrar(self.request, 'eliminacion', 'Logro', 'Tercero')
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(AuditoriaSistema.objects.count(), 3)
+        self.assertEqual(AuditoriaSistema.objects.first().ip_address, '10.0.0.1')
+
+    @override_settings(AUDITORIA_LOTE=1)
+    def test_archivar_eventos_antiguos(self):
+        for i in range(4):
+            auditoria.registrar(self.request, 'modificacion', 'Nota', f'Evento {i}')
+        hoy = timezone.localdate()
+        antiguos = list(AuditoriaSistema.objects.order_by('id').values_list('id', flat=True)[:3])
+        AuditoriaSistema.objects.filter(id__in=antiguos).update(created_at=timezone.now() - timedelta(days=400))
+
+        archivados = auditoria.archivar(meses=6, lote=2, hoy=hoy)
+
+        self.assertEqual(archivados, 3)
+        self.assertEqual(AuditoriaSistema.objects.count(), 1)
+        eventos = [e for bloque in AuditoriaArchivada.objects.all() for e in auditoria.leer_archivo(bloque)]
+        self.assertEqual(sorted(e['id'] for e in eventos), antiguos)
+        self.assertEqual(sum(AuditoriaArchivada.objects.values_list('cantidad', flat=True)), 3)
+
+
+# =============================================
+# CACHÉ DEL SITIO PÚBLICO
+# =============================================
+
+@CACHE_PRUEBAS
+class SitioPublicoCacheTests(TestCase):
+    """Páginas públicas en caché para anónimos e invalidadas al publicar"""
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('web:about')
+
+    def test_segunda_visita_sin_consultas(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(consultas), 0)
+
+    def test_guardar_contenido_invalida_su_grupo(self):
+        self.client.get(self.url)
+        Noticia.objects.create(title='Noticia', description='Texto', image='noticias/prueba.jpg')
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        About.objects.create(title='Historia', description='Texto', slug='historia', tipo='historia')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, 'Historia')
+
+    def test_usuario_autenticado_no_usa_cache(self):
+        usuario = Usuario.objects.create_user(
+            username='visitante', password='clave-prueba-123', numero_documento='90000001'
+        )
+        self.client.force_login(usuario)
+        self.client.get(self.url)
+        self.assertNotIn('X-Cache', self.client.get(self.url))
+
+
+# =============================================
+# DERIVADOS DE IMÁGENES
+# =============================================
+
+class DerivadosImagenTests(TestCase):
+    """Tamaños web generados al subir una imagen"""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        configuracion = override_settings(MEDIA_ROOT=media, IMAGENES_DERIVADOS_AL_SUBIR=True)
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+
+    def subir(self, ancho, alto):
+        contenido = io.BytesIO()
+        Image.new('RGB', (ancho, alto), (200, 30, 30)).save(contenido, 'JPEG')
+        return SimpleUploadedFile('foto.jpg', contenido.getvalue(), content_type='image/jpeg')
+
+    def test_derivados_al_guardar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            noticia = Noticia.objects.create(title='Noticia', description='Texto', image=self.subir(2400, 1800))
+
+        archivo = noticia.image
+        self.assertTrue(imagenes.tiene_derivados(archivo))
+        dimensiones = {}
+        for tamaño in imagenes.TAMAÑOS:
+            for formato in imagenes.FORMATOS:
+                with archivo.storage.open(imagenes.nombre_derivado(archivo.name, tamaño, formato)) as derivado:
+                    dimensiones[tamaño, formato] = Image.open(derivado).size
+        self.assertEqual(dimensiones['thumb', 'webp'], (160, 160))
+        self.assertEqual(dimensiones['card', 'jpg'], (640, 480))
+        self.assertEqual(dimensiones['hero', 'webp'], (1600, 1200))
+        self.assertTrue(imagenes.url(archivo, 'card').endswith('__card.jpg'))
+        self.assertIn('1600w', imagenes.srcset(archivo, 'webp'))
+
+    def test_imagen_pequeña_no_se_amplia(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            noticia = Noticia.objects.create(title='Noticia', description='Texto', image=self.subir(300, 200))
+        with noticia.image.storage.open(imagenes.nombre_derivado(noticia.image.name, 'hero')) as derivado:
+            self.assertEqual(Image.open(derivado).size, (300, 200))
+
+    def test_sin_derivados_usa_el_original(self):
+        with override_settings(IMAGENES_DERIVADOS_AL_SUBIR=False):
+            with self.captureOnCommitCallbacks(execute=True):
+                noticia = Noticia.objects.create(title='Noticia', description='Texto', image=self.subir(800, 600))
+
+        self.assertEqual(imagenes.url(noticia.image, 'thumb'), noticia.image.url)
+        self.assertEqual(imagenes.srcset(noticia.image), '')
+        self.assertGreater(imagenes.generar(noticia.image), 0)
+        self.assertEqual(imagenes.generar(noticia.image), 0)
+
+
+# =============================================
+# HISTOGRAMA DE NOTAS
+# =============================================
+
+@CACHE_PRUEBAS
+class HistogramaTests(TestCase):
+    """?ancho= del reporte de notas: intervalos acotados y 400 si es inválido"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.contexto = datos_sinteticos.generar_colegio(**TAMAÑO_CHICO)
+
+    def consultar(self, ancho):
+        self.client.force_login(self.contexto['usuario_admin'])
+        return self.client.get(reverse('administrador:obtener_datos_reporte'), {
+            'tipo': 'estadisticas_notas', 'periodo_id': self.contexto['periodo'].id, 'ancho': ancho,
+        })
+
+    def test_intervalos_de_ancho_valido(self):
+        response = self.consultar('0.5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['intervalos']), 10)
+
+    def test_ancho_invalido(self):
+        for ancho in ('-1', '0', '0.001', 'abc', 'nan'):
+            self.assertEqual(self.consultar(ancho).status_code, 400, ancho)
+        with self.assertRaises(ValueError):
+            histograma._intervalos(-1, 0, 5)
+
+
+# =============================================
+# CALENDARIO ACADÉMICO
+# =============================================
+
+@CACHE_PRUEBAS
+class CalendarioTests(TestCase):
+    """Búsqueda del período por fecha, orden de respaldo e invalidación al confirmar"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.contexto = datos_sinteticos.generar_colegio(**TAMAÑO_CHICO)
+        cls.año = AñoLectivo.objects.create(
+            colegio=cls.contexto['colegio'], sede=cls.contexto['sede'], anho='2030',
+            fecha_inicio=date(2030, 2, 1), fecha_fin=date(2030, 9, 30), estado=False,
+        )
+        # Tres períodos con vacaciones entre ellos; el último inactivo
+        fechas = [
+            (date(2030, 2, 1), date(2030, 3, 31), True),
+            (date(2030, 5, 1), date(2030, 6, 30), True),
+            (date(2030, 8, 1), date(2030, 9, 30), False),
+        ]
+        cls.p1, cls.p2, cls.p3 = [
+            PeriodoAcademico.objects.create(
+                año_lectivo=cls.año, periodo=periodo, fecha_inicio=inicio, fecha_fin=fin, estado=estado,
+            )
+            for periodo, (inicio, fin, estado) in zip(Periodo.objects.order_by('id'), fechas)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        calendario.invalidar()
+
+    def test_periodo_en_fecha(self):
+        self.assertEqual(calendario.periodo_en_fecha(self.año, date(2030, 5, 1)), self.p2)
+        self.assertEqual(calendario.periodo_en_fecha(self.año, date(2030, 6, 30)), self.p2)
+        self.assertIsNone(calendario.periodo_en_fecha(self.año, date(2030, 4, 15)))
+        self.assertIsNone(calendario.periodo_en_fecha(self.año, date(2030, 8, 15), solo_activos=True))
+        self.assertEqual(calendario.periodos(self.año), [self.p1, self.p2, self.p3])
+        self.assertEqual(calendario.periodo_anterior(self.p2), self.p1)
+        self.assertIsNone(calendario.periodo_siguiente(self.p3))
+
+    def test_orden_de_respaldo(self):
+        actual = calendario.periodo_actual
+        # En fecha, último que terminó (antes que el próximo) y próximo
+        self.assertEqual(actual(self.año, hoy=date(2030, 5, 15)), self.p2)
+        self.assertEqual(actual(self.año, hoy=date(2030, 4, 15)), self.p1)
+        self.assertEqual(actual(self.año, hoy=date(2030, 12, 1)), self.p3)
+        self.assertEqual(actual(self.año, hoy=date(2030, 12, 1), solo_activos=True), self.p2)
+        self.assertEqual(actual(self.año, hoy=date(2030, 1, 10)), self.p1)
+        self.assertEqual(actual(self.año, hoy=date(2030, 7, 15), solo_activos=True), self.p2)
+
+        # Sin ninguno de los anteriores, el primero del año
+        sin_resultado = {'return_value': None}
+        with mock.patch.object(calendario._Intervalos, 'en_fecha', **sin_resultado), \
+                mock.patch.object(calendario._Intervalos, 'ultimo_terminado', **sin_resultado), \
+                mock.patch.object(calendario._Intervalos, 'proximo', **sin_resultado):
+            self.assertEqual(actual(self.año, hoy=date(2030, 8, 15)), self.p1)
+
+    def test_invalidacion_al_confirmar(self):
+        self.assertEqual(calendario.periodo_en_fecha(self.año, date(2030, 4, 15)), None)
+        version = cache.get(calendario.VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.p1.fecha_fin = date(2030, 4, 20)
+            self.p1.save()
+            # Hasta confirmar se sigue sirviendo la instantánea anterior
+            self.assertEqual(cache.get(calendario.VERSION_KEY), version)
+            self.assertIsNone(calendario.periodo_en_fecha(self.año, date(2030, 4, 15)))
+
+        self.assertNotEqual(cache.get(calendario.VERSION_KEY), version)
+        self.assertEqual(calendario.periodo_en_fecha(self.año, date(2030, 4, 15)), self.p1)
+
+
+# =============================================
+# PUESTO Y PERCENTIL EN EL CURSO
+# =============================================
+
+class PosicionesTests(TestCase):
+    """Puesto y percentil por curso, sede y período calculados con funciones de ventana"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.contexto = datos_sinteticos.generar_colegio(**TAMAÑO_CHICO)
+
+    def notas_curso(self):
+        return Nota.objects.filter(
+            asignatura_grado_año_lectivo__grado_año_lectivo=self.contexto['curso'],
+            periodo_academico=self.contexto['periodo'],
+        )
+
+    def test_empates_comparten_puesto_y_percentil(self):
+        primero, segundo, tercero = self.contexto['estudiantes_curso'][:3]
+        notas = self.notas_curso()
+        notas.filter(estudiante_id__in=[primero, segundo]).update(calificacion=Decimal('4.00'))
+        notas.filter(estudiante_id=tercero).update(calificacion=Decimal('3.00'))
+        posiciones.reconstruir_posiciones()
+
+        filas = {
+            posicion.estudiante_id: posicion
+            for posicion in PosicionEstudiante.objects.filter(
+                grado_año_lectivo=self.contexto['curso'], periodo_academico=self.contexto['periodo'],
+            )
+        }
+        self.assertEqual([filas[e].puesto for e in (primero, segundo, tercero)], [1, 1, 3])
+        self.assertEqual(
+            [filas[e].percentil for e in (primero, segundo, tercero)],
+            [Decimal('50.00'), Decimal('50.00'), Decimal('0.00')],
+        )
+        self.assertEqual({filas[e].total_estudiantes for e in filas}, {3})
+
+    def test_notas_del_curso_en_dos_sedes(self):
+        # Una asignatura del mismo curso dictada en otra sede
+        asignatura_grado = self.contexto['asignatura_grado']
+        otra_sede = Sede.objects.create(colegio=self.contexto['colegio'], nombre='Sede 2', direccion='Carrera 2')
+        asignatura_grado.pk = None
+        asignatura_grado.sede = otra_sede
+        asignatura_grado.save()
+        estudiante = self.contexto['estudiante']
+        posiciones.reconstruir_posiciones()
+
+        # El recálculo al confirmar agrega la fila de la otra sede junto a la existente
+        with self.captureOnCommitCallbacks(execute=True):
+            Nota.objects.create(
+                estudiante=estudiante, asignatura_grado_año_lectivo=asignatura_grado,
+                periodo_academico=self.contexto['periodo'], calificacion=Decimal('2.00'),
+            )
+        por_periodo = PosicionEstudiante.objects.filter(estudiante=estudiante, periodo_academico=self.contexto['periodo'])
+        self.assertEqual(set(por_periodo.values_list('sede_id', flat=True)), {self.contexto['sede'].id, otra_sede.id})
+        self.assertEqual(posiciones.reconstruir_posiciones(), PosicionEstudiante.objects.count())
+
+        # La lectura usa la sede de la matrícula
+        posicion = posiciones.posicion_estudiante(estudiante, self.contexto['año_lectivo'], self.contexto['periodo'])
+        self.assertEqual(posicion.sede_id, self.contexto['sede'].id)
+
+
+# =============================================
+# SELECTORES CON AUTOCOMPLETADO
+# =============================================
+
+class AutocompletarTests(TestCase):
+    """Búsqueda de opciones en el servidor y render solo del valor elegido"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.contexto = datos_sinteticos.generar_colegio(**TAMAÑO_CHICO)
+        cls.estudiante = cls.contexto['usuario_estudiante'].estudiante_profile.get()
+
+    def test_busqueda_por_prefijo(self):
+        self.client.force_login(self.contexto['usuario_admin'])
+        usuario = self.estudiante.usuario
+        response = self.client.get(
+            reverse('gestioncolegio:autocompletar', args=['estudiantes']), {'q': usuario.apellidos[:3]}
+        )
+        datos = response.json()
+        self.assertIn(self.estudiante.id, [opcion['id'] for opcion in datos['results']])
+        self.assertIn('more', datos['pagination'])
+
+        resultados, _ = autocompletar.buscar('estudiantes', usuario.numero_documento)
+        self.assertIn(self.estudiante.id, [r['id'] for r in resultados])
+        self.assertEqual(autocompletar.buscar('estudiantes', 'a'), ([], False))
+
+    def test_fuente_restringida_por_rol(self):
+        self.client.force_login(self.contexto['usuario_acudiente'])
+        response = self.client.get(reverse('gestioncolegio:autocompletar', args=['usuarios']), {'q': 'ana'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_selector_y_campo_usan_el_mismo_queryset(self):
+        self.estudiante.estado = False
+        self.estudiante.save()
+        documento = self.estudiante.usuario.numero_documento
+
+        # Un estudiante inactivo se puede volver a matricular: el selector lo ofrece
+        año_lectivo_id = self.contexto['periodo'].año_lectivo_id
+        campo = MatriculaForm(año_lectivo_id=año_lectivo_id).fields['estudiante_existente']
+        self.assertIn(self.estudiante.id, [r['id'] for r in autocompletar.buscar(campo.widget.fuente, documento)[0]])
+        self.assertEqual(campo.clean(self.estudiante.id), self.estudiante)
+
+        for campo in (campo, AcudienteForm().fields['estudiante']):
+            self.assertEqual(
+                set(campo.queryset.values_list('pk', flat=True)),
+                set(autocompletar.fuente(campo.widget.fuente).queryset().values_list('pk', flat=True)),
+            )
+
+    def test_render_solo_valor_elegido(self):
+        with CaptureQueriesContext(connection) as consultas:
+            html = render_autocompletar('estudiantes', 'estudiante', self.estudiante.id)
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual(html.count('<option'), 2)
+        self.assertIn(f'value="{self.estudiante.id}" selected', html)
+
+
+# =============================================
+# BANDEJA DE SALIDA DE CORREO
+# =============================================
+
+class ServidorSMTPPrueba(socketserver.ThreadingTCPServer):
+    """
+    Servidor SMTP mínimo en 127.0.0.1 que cuenta conexiones y mensajes.
+    Rechaza con 550 las direcciones de 'rechazados' y responde 451 al DATA
+    mientras 'fallo_temporal' sea verdadero.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), ManejadorSMTPPrueba)
+        self.conexiones = 0
+        self.mensajes = []
+        self.rechazados = set()
+        self.fallo_temporal = False
+
+
+class ManejadorSMTPPrueba(socketserver.StreamRequestHandler):
+
+    def responder(self, linea):
+        self.wfile.write(f'{linea}\r\n'.encode())
+
+    def handle(self):
+        servidor = self.server
+        servidor.conexiones += 1
+        destinatarios = []
+        self.responder('220 localhost SMTP de pruebas')
+        while True:
+            linea = self.rfile.readline()
+            if not linea:
+                return
+            comando = linea.decode(errors='replace').strip()
+            verbo = comando[:4].upper()
+            if verbo in ('EHLO', 'HELO'):
+                self.responder('250 localhost')
+            elif verbo == 'MAIL':
+                destinatarios = []
+                self.responder('250 OK')
+            elif verbo == 'RCPT':
+                direccion = comando.split(':', 1)[1].strip().strip('<>').split('>')[0]
+                if direccion in servidor.rechazados:
+                    self.responder('550 5.1.1 Usuario inexistente')
+                else:
+                    destinatarios.append(direccion)
+                    self.responder('250 OK')
+            elif verbo == 'DATA':
+                self.responder('354 Fin con <CRLF>.<CRLF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                if servidor.fallo_temporal:
+                    self.responder('451 Fallo temporal, intente luego')
+                else:
+                    servidor.mensajes.append(destinatarios)
+                    self.responder('250 OK')
+            elif verbo in ('RSET', 'NOOP'):
+                self.responder('250 OK')
+            elif verbo == 'QUIT':
+                self.responder('221 Hasta luego')
+                return
+            else:
+                self.responder('502 Comando no implementado')
+
+
+class BandejaSalidaTests(TestCase):
+    """procesar_cola() contra un servidor SMTP local"""
+
+    def setUp(self):
+        self.servidor = ServidorSMTPPrueba()
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+
+        configuracion = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.servidor.server_address[1],
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+            DEFAULT_FROM_EMAIL='colegio@example.com',
+        )
+        configuracion.enable()
+        self.addCleanup(configuracion.disable)
+
+    def procesar(self, **kwargs):
+        kwargs.setdefault('limite_minuto', 0)
+        kwargs.setdefault('limite_diario', 500)
+        return correo.procesar_cola(**kwargs)
+
+    def test_lote_por_una_sola_conexion(self):
+        for i in range(5):
+            correo.encolar(f'Aviso {i}', 'Cuerpo', [f'docente{i}@example.com'], html='<p>Cuerpo</p>')
+
+        resumen = self.procesar()
+
+        self.assertEqual(resumen['enviados'], 5)
+        self.assertEqual(self.servidor.conexiones, 1)
+        self.assertEqual(len(self.servidor.mensajes), 5)
+        self.assertFalse(CorreoSaliente.objects.exclude(estado='ENV').exists())
+
+    def test_rechazo_permanente_no_se_reintenta(self):
+        self.servidor.rechazados.add('inexistente@example.com')
+        rechazado = correo.encolar('Aviso', 'Cuerpo', 'inexistente@example.com')
+        valido = correo.encolar('Aviso', 'Cuerpo', 'docente@example.com')
+
+        resumen = self.procesar()
+
+        self.assertEqual((resumen['enviados'], resumen['fallidos']), (1, 1))
+        rechazado.refresh_from_db()
+        valido.refresh_from_db()
+        self.assertEqual(rechazado.estado, 'ERR')
+        self.assertEqual(valido.estado, 'ENV')
+
+    def test_fallo_temporal_programa_reintento(self):
+        self.servidor.fallo_temporal = True
+        pendiente = correo.encolar('Aviso', 'Cuerpo', 'docente@example.com')
+
+        resumen = self.procesar()
+
+        self.assertEqual(resumen['reintentos'], 1)
+        pendiente.refresh_from_db()
+        self.assertEqual((pendiente.estado, pendiente.intentos), ('PEN', 1))
+        self.assertGreater(pendiente.proximo_intento, timezone.now() + timedelta(seconds=30))
+
+        # Antes de la espera no se vuelve a tomar; después se entrega
+        self.servidor.fallo_temporal = False
+        self.assertEqual(self.procesar()['enviados'], 0)
+        CorreoSaliente.objects.filter(id=pendiente.id).update(proximo_intento=timezone.now())
+        self.assertEqual(self.procesar()['enviados'], 1)
+
+    def test_limite_diario(self):
+        for i in range(3):
+            correo.encolar(f'Aviso {i}', 'Cuerpo', [f'docente{i}@example.com'])
+
+        resumen = self.procesar(limite_diario=2)
+
+        self.assertEqual(resumen['enviados'], 2)
+        self.assertTrue(resumen['cuota_agotada'])
+        self.assertEqual(CorreoSaliente.objects.filter(estado='PEN').count(), 1)
+        self.assertTrue(self.procesar(limite_diario=2)['cuota_agotada'])
+        self.assertEqual(len(self.servidor.mensajes), 2)
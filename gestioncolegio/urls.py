@@ -16,5 +16,21 @@ urlpatterns = [
     path('dashboard/estudiante/', views.DashboardEstudianteView.as_view(), name='dashboard_estudiante'),
     path('dashboard/acudiente/', views.DashboardAcudienteView.as_view(), name='dashboard_acudiente'),
     path('dashboard/rector/', views.DashboardRectorView.as_view(), name='dashboard_rector'),
+
+    # ========================
+    # DOCUMENTOS
+    # ========================
+    path('documentos/verificar/', views.VerificarDocumentoView.as_view(), name='verificar_documento'),
+
+    # ========================
+    # NOTIFICACIONES
+    # ========================
+    path('notificaciones/nuevas/', views.NotificacionesNuevasView.as_view(), name='notificaciones_nuevas'),
+    path('notificaciones/marcar-leidas/', views.MarcarNotificacionesLeidasView.as_view(), name='marcar_notificaciones_leidas'),
+
+    # ========================
+    # AUTOCOMPLETADO
+    # ========================
+    path('autocompletar/<slug:fuente>/', views.AutocompletarView.as_view(), name='autocompletar'),
     
 ]
\ No newline at end of file
@@ -3,6 +3,9 @@ Exportación de todas las vistas del sistema - VERSIÓN FINAL
 """
 from .dashboard_views import *
 from .usuario_views import *
+from .documentos_views import VerificarDocumentoView
+from .notificaciones_views import NotificacionesNuevasView, MarcarNotificacionesLeidasView
+from .autocompletar_views import AutocompletarView
 
 __all__ = [
     # ============================
@@ -33,4 +36,20 @@ __all__ = [
     'DocenteListView',
     'EstudianteListView',
 
+    # ============================
+    # DOCUMENTOS
+    # ============================
+    'VerificarDocumentoView',
+
+    # ============================
+    # NOTIFICACIONES
+    # ============================
+    'NotificacionesNuevasView',
+    'MarcarNotificacionesLeidasView',
+
+    # ============================
+    # AUTOCOMPLETADO
+    # ============================
+    'AutocompletarView',
+
 ]
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""
+Opciones de los selectores con autocompletado (SelectAutocompletar)
+"""
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.views import View
+
+from gestioncolegio.services import autocompletar
+
+
+class AutocompletarView(LoginRequiredMixin, View):
+    """
+    GET /autocompletar/<fuente>/?q=<texto>&page=<n>
+    Responde en el formato de Select2: {'results': [{'id', 'text'}], 'pagination': {'more'}}
+    """
+
+    def get(self, request, fuente, *args, **kwargs):
+        try:
+            origen = autocompletar.fuente(fuente)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=404)
+
+        if not origen.permitida(request.user):
+            return JsonResponse({'success': False, 'error': 'No autorizado'}, status=403)
+
+        try:
+            pagina = int(request.GET.get('page') or 1)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Parámetros inválidos'}, status=400)
+
+        try:
+            resultados, hay_mas = autocompletar.buscar(fuente, request.GET.get('q', ''), pagina)
+        except Exception as e:
+            print(f"Error en autocompletado de {fuente}: {e}")
+            return JsonResponse({'success': False, 'error': 'Error en la búsqueda'}, status=500)
+
+        return JsonResponse({'results': resultados, 'pagination': {'more': hay_mas}})
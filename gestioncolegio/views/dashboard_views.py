@@ -1,6 +1,7 @@
 """
 Vistas de dashboard - VERSIÓN SIN SERVICIOS
 """
+from django.db.models import Count
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.shortcuts import redirect
 from django.views.generic import TemplateView
@@ -9,12 +10,13 @@ from datetime import timedelta
 
 # Mixins
 from gestioncolegio.mixins import RoleRequiredMixin
+from gestioncolegio.services import auditoria, calendario, obtener_snapshot, progreso_asignaturas, resumen_progreso
 
 # Modelos básicos
 from estudiantes.models import Estudiante, Matricula, Nota, Acudiente
 from usuarios.models import Docente, Usuario
-from gestioncolegio.models import AñoLectivo, Sede, Colegio, AuditoriaSistema
-from matricula.models import AsignaturaGradoAñoLectivo, PeriodoAcademico
+from gestioncolegio.models import Sede, Colegio
+from matricula.models import AsignaturaGradoAñoLectivo
 from django.utils import timezone
 from comportamiento.models import Asistencia, Comportamiento
 
@@ -58,7 +60,7 @@ class DashboardView(RoleRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Datos básicos
-        context['año_lectivo_actual'] = AñoLectivo.objects.filter(estado=True).first()
+        context['año_lectivo_actual'] = calendario.año_activo()
         return context
 
 class DashboardAcudienteView(RoleRequiredMixin, TemplateView):
@@ -86,7 +88,7 @@ class DashboardAcudienteView(RoleRequiredMixin, TemplateView):
                 return context
             
             # Obtener año lectivo actual
-            año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_lectivo_actual = calendario.año_activo()
             
             # Obtener matrículas activas para optimizar
             estudiante_ids = [a.estudiante.id for a in acudientes]
@@ -145,10 +147,7 @@ class DashboardAcudienteView(RoleRequiredMixin, TemplateView):
             
             # Período académico actual
             if año_lectivo_actual:
-                periodo_actual = PeriodoAcademico.objects.filter(
-                    año_lectivo=año_lectivo_actual,
-                    estado=True
-                ).first()
+                periodo_actual = calendario.periodo_actual(año_lectivo_actual, solo_activos=True)
                 context['periodo_actual'] = periodo_actual
             
             # Calcular estadísticas
@@ -171,7 +170,7 @@ class DashboardAcudienteView(RoleRequiredMixin, TemplateView):
         """Obtiene las notas más recientes del estudiante"""
         try:
             # Obtener año lectivo actual
-            año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_lectivo_actual = calendario.año_activo()
             if not año_lectivo_actual:
                 return []
             
@@ -194,7 +193,7 @@ class DashboardAcudienteView(RoleRequiredMixin, TemplateView):
         """Obtiene las faltas recientes del estudiante"""
         try:
             # Obtener año lectivo actual
-            año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_lectivo_actual = calendario.año_activo()
             if not año_lectivo_actual:
                 return []
             
@@ -218,7 +217,7 @@ class DashboardAcudienteView(RoleRequiredMixin, TemplateView):
         """Obtiene los comportamientos recientes del estudiante"""
         try:
             # Obtener año lectivo actual
-            año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_lectivo_actual = calendario.año_activo()
             if not año_lectivo_actual:
                 return []
             
@@ -244,7 +243,7 @@ class DashboardAcudienteView(RoleRequiredMixin, TemplateView):
         """Calcula el promedio general del estudiante"""
         try:
             # Obtener año lectivo actual
-            año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_lectivo_actual = calendario.año_activo()
             if not año_lectivo_actual:
                 return 0.0
             
@@ -343,7 +342,7 @@ class DashboardRectorView(RoleRequiredMixin, TemplateView):
         context['total_sedes'] = Sede.objects.filter(estado=True).count()
         
         # Matrículas por año
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if año_actual:
             context['matriculas_actual'] = Matricula.objects.filter(
                 año_lectivo=año_actual
@@ -369,7 +368,7 @@ class DashboardAdministradorView(RoleRequiredMixin, TemplateView):
         context['total_matriculas'] = Matricula.objects.filter(estado='ACT').count()
         
         # Año actual
-        año_actual = AñoLectivo.objects.filter(estado=True).first()
+        año_actual = calendario.año_activo()
         if año_actual:
             context['año_lectivo_actual'] = año_actual
             context['matriculas_actual'] = Matricula.objects.filter(
@@ -385,9 +384,7 @@ class DashboardAdministradorView(RoleRequiredMixin, TemplateView):
             context['colegio_info'] = colegio_info
         
         # Últimas actividades (auditoría)
-        context['ultimas_actividades'] = AuditoriaSistema.objects.select_related(
-            'usuario'
-        ).order_by('-created_at')[:10]
+        context['ultimas_actividades'] = auditoria.ultimas_actividades(10)
         
         return context
 
@@ -404,8 +401,7 @@ class DashboardDocenteView(RoleRequiredMixin, TemplateView):
             context['docente'] = docente
             
             # Obtener año lectivo actual
-            from gestioncolegio.models import AñoLectivo
-            año_lectivo_actual = AñoLectivo.objects.filter(estado=True).first()
+            año_lectivo_actual = calendario.año_activo()
             
             if not año_lectivo_actual:
                 return self.get_valores_por_defecto()
@@ -419,7 +415,8 @@ class DashboardDocenteView(RoleRequiredMixin, TemplateView):
             # 3. Detalle de calificaciones pendientes por periodo
             if context.get('periodo_actual'):
                 context['detalle_pendientes'] = self.calcular_detalle_pendientes(
-                    docente, año_lectivo_actual, context['periodo_actual']
+                    docente, año_lectivo_actual, context['periodo_actual'],
+                    progreso=context.get('progreso_calificaciones')
                 )
             
         except Docente.DoesNotExist:
@@ -436,7 +433,7 @@ class DashboardDocenteView(RoleRequiredMixin, TemplateView):
             'asignatura',
             'grado_año_lectivo__grado',
             'sede'
-        ).order_by('asignatura__nombre')
+        ).prefetch_related('horarios').order_by('asignatura__nombre')
         
         page = self.request.GET.get('page_asignaturas', 1)
         paginator = Paginator(mis_asignaturas_query, 6)
@@ -446,6 +443,18 @@ class DashboardDocenteView(RoleRequiredMixin, TemplateView):
         except (PageNotAnInteger, EmptyPage):
             asignaturas_paginadas = paginator.page(1)
         
+        # Estudiantes por curso de la página en una consulta (count_estudiantes_asignatura)
+        asignaturas = list(asignaturas_paginadas.object_list)
+        totales = dict(
+            Matricula.objects.filter(
+                grado_año_lectivo__in={a.grado_año_lectivo_id for a in asignaturas},
+                estado__in=['ACT', 'PEN']
+            ).values('grado_año_lectivo_id').annotate(total=Count('id')).values_list('grado_año_lectivo_id', 'total')
+        )
+        for asignatura in asignaturas:
+            asignatura.total_estudiantes = totales.get(asignatura.grado_año_lectivo_id, 0)
+        asignaturas_paginadas.object_list = asignaturas
+        
         return {
             'mis_asignaturas': asignaturas_paginadas,
             'asignaturas_paginator': paginator
@@ -453,8 +462,7 @@ class DashboardDocenteView(RoleRequiredMixin, TemplateView):
     
     def calcular_estadisticas_principales(self, docente, año_lectivo_actual):
         """Calcula las estadísticas principales con una sola consulta optimizada"""
-        from estudiantes.models import Matricula, Nota
-        from matricula.models import PeriodoAcademico
+        from estudiantes.models import Matricula
         
         resultados = {
             'total_asignaturas': 0,
@@ -485,89 +493,39 @@ class DashboardDocenteView(RoleRequiredMixin, TemplateView):
             ).values_list('estudiante_id', flat=True).distinct().count()
             
             # 4. Período actual
-            periodo_actual = PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo_actual,
-                estado=True
-            ).first()
+            periodo_actual = calendario.periodo_actual(año_lectivo_actual, solo_activos=True)
             resultados['periodo_actual'] = periodo_actual
             
             # 5. Calificaciones pendientes (solo si hay periodo actual)
             if periodo_actual:
-                # Obtener todas las asignaturas del docente con sus grados
-                asignaturas_grados = docente.asignaturas_dictadas.filter(
-                    grado_año_lectivo__año_lectivo=año_lectivo_actual
-                ).select_related('grado_año_lectivo__grado')
-                
-                total_pendientes = 0
-                
-                for ag in asignaturas_grados:
-                    # Estudiantes del grado de esta asignatura
-                    estudiantes_grado = Matricula.objects.filter(
-                        grado_año_lectivo=ag.grado_año_lectivo,
-                        año_lectivo=año_lectivo_actual,
-                    estado__in=['ACT', 'PEN', 'INA', 'RET', 'OTRO']
-                    ).values_list('estudiante_id', flat=True)
-                    
-                    # Estudiantes ya calificados en esta asignatura
-                    estudiantes_calificados = Nota.objects.filter(
-                        asignatura_grado_año_lectivo=ag,
-                        periodo_academico=periodo_actual
-                    ).values_list('estudiante_id', flat=True)
-                    
-                    # Convertir a sets y calcular diferencia
-                    estudiantes_set = set(estudiantes_grado)
-                    calificados_set = set(estudiantes_calificados)
-                    pendientes = len(estudiantes_set - calificados_set)
-                    
-                    total_pendientes += pendientes
-                
-                resultados['calificaciones_pendientes'] = total_pendientes
+                progreso = progreso_asignaturas(
+                    periodo_actual,
+                    docente=docente,
+                    asignaturas=AsignaturaGradoAñoLectivo.objects.filter(
+                        grado_año_lectivo__año_lectivo=año_lectivo_actual
+                    )
+                )
+                resultados['progreso_calificaciones'] = progreso
+                resultados['calificaciones_pendientes'] = resumen_progreso(progreso)['pendientes']
             
         except Exception as e:
             print(f"Error en calcular_estadisticas_principales: {str(e)}")
         
         return resultados
     
-    def calcular_detalle_pendientes(self, docente, año_lectivo_actual, periodo_actual):
+    def calcular_detalle_pendientes(self, docente, año_lectivo_actual, periodo_actual, progreso=None):
         """Calcula detalle de pendientes por asignatura"""
-        from estudiantes.models import Matricula, Nota
-        
         try:
-            detalle = []
-            asignaturas_docente = docente.asignaturas_dictadas.filter(
-                grado_año_lectivo__año_lectivo=año_lectivo_actual
-            ).select_related(
-                'asignatura',
-                'grado_año_lectivo__grado'
-            )
+            if progreso is None:
+                progreso = progreso_asignaturas(
+                    periodo_actual,
+                    docente=docente,
+                    asignaturas=AsignaturaGradoAñoLectivo.objects.filter(
+                        grado_año_lectivo__año_lectivo=año_lectivo_actual
+                    )
+                )
             
-            for ag in asignaturas_docente:
-                # Contar estudiantes del grado
-                total_estudiantes = Matricula.objects.filter(
-                    grado_año_lectivo=ag.grado_año_lectivo,
-                    año_lectivo=año_lectivo_actual,
-                    estado__in=['ACT', 'PEN', 'INA', 'RET', 'OTRO']
-                ).count()
-                
-                # Contar estudiantes calificados
-                calificados = Nota.objects.filter(
-                    asignatura_grado_año_lectivo=ag,
-                    periodo_academico=periodo_actual
-                ).count()
-                
-                pendientes = total_estudiantes - calificados
-                
-                if pendientes > 0:
-                    detalle.append({
-                        'asignatura': ag.asignatura.nombre,
-                        'grado': ag.grado_año_lectivo.grado.nombre,
-                        'total_estudiantes': total_estudiantes,
-                        'calificados': calificados,
-                        'pendientes': pendientes,
-                        'porcentaje': round((calificados / total_estudiantes * 100), 1) if total_estudiantes > 0 else 0
-                    })
-            
-            return detalle
+            return [fila for fila in progreso if fila['pendientes'] > 0]
             
         except Exception as e:
             print(f"Error en calcular_detalle_pendientes: {str(e)}")
@@ -615,202 +573,14 @@ class DashboardEstudianteView(RoleRequiredMixin, TemplateView):
         
         try:
             # 1. Obtener estudiante
-            estudiante = Estudiante.objects.get(usuario=self.request.user)
+            estudiante = Estudiante.objects.select_related('usuario').get(usuario=self.request.user)
             
             # Guardar objeto estudiante completo en contexto
             context['estudiante_obj'] = estudiante
-            context['estudiante'] = {
-                'id': estudiante.id,
-                'nombres': estudiante.usuario.nombres,
-                'apellidos': estudiante.usuario.apellidos,
-                'nombre_completo': f"{estudiante.usuario.nombres} {estudiante.usuario.apellidos}",
-                'foto_url': estudiante.foto.url if estudiante.foto else None,
-                'estado': estudiante.estado,
-            }
-            
-            # 2. LÓGICA INTELIGENTE PARA AÑO LECTIVO
-            hoy = timezone.now().date()
             
-            # Opción A: Buscar año lectivo activo del estudiante (matrícula ACT o PEN)
-            matricula_actual = estudiante.matriculas.filter(
-                estado__in=['ACT', 'PEN'],
-                año_lectivo__estado=True,
-                año_lectivo__fecha_inicio__lte=hoy,
-                año_lectivo__fecha_fin__gte=hoy
-            ).select_related(
-                'año_lectivo', 'grado_año_lectivo__grado', 'sede'
-            ).first()
-            
-            # Opción B: Si no hay matrícula en año activo, buscar último año matriculado
-            if not matricula_actual:
-                matricula_actual = estudiante.matriculas.filter(
-                    estado__in=['ACT', 'PEN', 'INA']
-                ).select_related(
-                    'año_lectivo', 'grado_año_lectivo__grado', 'sede'
-                ).order_by('-año_lectivo__anho').first()
-            
-            # Si hay matrícula, configurar contexto
-            if matricula_actual:
-                context['matricula_actual'] = matricula_actual
-                context['año_lectivo_actual'] = matricula_actual.año_lectivo
-                context['grado_actual'] = matricula_actual.grado_año_lectivo.grado.nombre
-                context['sede_actual'] = matricula_actual.sede.nombre
-                
-                # 3. OBTENER PERÍODO ACTUAL
-                periodo_actual = self.obtener_periodo_actual_inteligente(
-                    matricula_actual.año_lectivo, hoy
-                )
-                context['periodo_actual'] = periodo_actual
-                
-                # 4. OBTENER DATOS DEL PERÍODO ACTUAL
-                if periodo_actual:
-                    # Notas del período
-                    notas_periodo = Nota.objects.filter(
-                        estudiante=estudiante,
-                        periodo_academico=periodo_actual
-                    ).select_related(
-                        'asignatura_grado_año_lectivo__asignatura',
-                        'asignatura_grado_año_lectivo__asignatura__area'
-                    )
-                    
-                    # Formatear notas para el dashboard
-                    notas_formateadas = []
-                    for nota in notas_periodo:
-                        notas_formateadas.append({
-                            'nombre': nota.asignatura_grado_año_lectivo.asignatura.nombre,
-                            'calificacion': float(nota.calificacion) if nota.calificacion else None,
-                            'area': nota.asignatura_grado_año_lectivo.asignatura.area.nombre if nota.asignatura_grado_año_lectivo.asignatura.area else 'General',
-                        })
-                    
-                    context['notas_periodo_actual'] = notas_formateadas
-                    
-                    # Estadísticas de notas
-                    if notas_formateadas:
-                        calificaciones = [n['calificacion'] for n in notas_formateadas if n['calificacion'] is not None]
-                        if calificaciones:
-                            context['promedio_actual'] = sum(calificaciones) / len(calificaciones)
-                            context['nota_maxima'] = max(calificaciones)
-                            context['nota_minima'] = min(calificaciones)
-                    
-                    # 5. COMPORTAMIENTOS RECIENTES
-                    comportamientos = Comportamiento.objects.filter(
-                        estudiante=estudiante,
-                        periodo_academico__año_lectivo=matricula_actual.año_lectivo
-                    ).select_related(
-                        'docente__usuario',
-                        'periodo_academico__periodo'
-                    ).order_by('-fecha')[:5]  # SOLO AQUÍ aplicamos slice después de todo
-        
-                    context['comportamientos_recientes'] = list(comportamientos)  # Convertir a lista para evitar problemas
-                    
-                    # Estadísticas de comportamiento
-                    if comportamientos:
-                        positivos = sum(1 for c in comportamientos if c.tipo == 'Positivo')
-                        negativos = sum(1 for c in comportamientos if c.tipo == 'Negativo')
-                        context['comportamientos_positivos'] = positivos
-                        context['comportamientos_negativos'] = negativos
-            
-            # 6. TODOS LOS AÑOS LECTIVOS DEL ESTUDIANTE (SIN SLICE)
-            años_lectivos_estudiante = AñoLectivo.objects.filter(
-                matriculas__estudiante=estudiante,
-                matriculas__estado__in=['ACT', 'INA', 'RET']
-            ).distinct().order_by('-anho')
-            
-            context['años_lectivos_estudiante'] = años_lectivos_estudiante
-            
-            # 7. MATRÍCULAS ANTERIORES (CORREGIDO - slice al final)
-            if matricula_actual:
-                # Primero aplicar todos los filtros, luego el slice
-                matriculas_anteriores_qs = estudiante.matriculas.filter(
-                    estado__in=['INA', 'RET']
-                ).exclude(id=matricula_actual.id).select_related(
-                    'año_lectivo', 'grado_año_lectivo__grado', 'sede'
-                ).order_by('-año_lectivo__anho')
-                
-                # Ahora aplicar el slice
-                matriculas_anteriores = list(matriculas_anteriores_qs[:5])
-            else:
-                # Sin matrícula actual, tomar las últimas 5
-                matriculas_anteriores = list(
-                    estudiante.matriculas.filter(
-                        estado__in=['INA', 'RET']
-                    ).select_related(
-                        'año_lectivo', 'grado_año_lectivo__grado', 'sede'
-                    ).order_by('-año_lectivo__anho')[:5]
-                )
-            
-            context['matriculas_anteriores'] = matriculas_anteriores
-            
-            # 8. DOCUMENTOS DISPONIBLES POR AÑO (CORREGIDO)
-            documentos_por_año = []
-            for año in años_lectivos_estudiante:
-                # Obtener matrícula para este año
-                matricula_año = estudiante.matriculas.filter(
-                    año_lectivo=año
-                ).first()
-                
-                documentos_año = {
-                    'año': año,
-                    'matricula': matricula_año,
-                    'tiene_notas': Nota.objects.filter(
-                        estudiante=estudiante,
-                        periodo_academico__año_lectivo=año
-                    ).exists(),
-                    'tiene_comportamientos': Comportamiento.objects.filter(
-                        estudiante=estudiante,
-                        periodo_academico__año_lectivo=año
-                    ).exists(),
-                }
-                
-                # Verificar si tiene boletín final (notas del 4to período)
-                periodo_cuarto = PeriodoAcademico.objects.filter(
-                    año_lectivo=año,
-                    periodo__nombre='Cuarto'
-                ).first()
-                
-                if periodo_cuarto:
-                    documentos_año['tiene_boletin_final'] = Nota.objects.filter(
-                        estudiante=estudiante,
-                        periodo_academico=periodo_cuarto
-                    ).exists()
-                else:
-                    documentos_año['tiene_boletin_final'] = False
-                
-                documentos_por_año.append(documentos_año)
-            
-            context['documentos_por_año'] = documentos_por_año
-            
-            # 9. ESTADÍSTICAS GLOBALES
-            context['total_años_cursados'] = años_lectivos_estudiante.count()
-            
-            if matricula_actual:
-                context['es_año_actual'] = matricula_actual.año_lectivo.estado
-            else:
-                context['es_año_actual'] = False
-                context['mensaje_estado'] = "Actualmente no estás matriculado en el año lectivo en curso"
-            
-            # 10. ASISTENCIA (si hay período actual)
-            if 'periodo_actual' in context and context['periodo_actual']:
-                # Primero el QuerySet completo, luego count
-                asistencias_qs = Asistencia.objects.filter(
-                    estudiante=estudiante,
-                    periodo_academico=context['periodo_actual']
-                )
-                
-                if asistencias_qs.exists():
-                    total = asistencias_qs.count()
-                    # Para contar asistencias positivas, usar otro QuerySet
-                    asistio_qs = Asistencia.objects.filter(
-                        estudiante=estudiante,
-                        periodo_academico=context['periodo_actual'],
-                        estado='A'
-                    )
-                    asistio = asistio_qs.count()
-                    
-                    porcentaje = (asistio / total) * 100 if total > 0 else 0
-                    context['porcentaje_asistencia'] = round(porcentaje, 1)
-                    context['total_asistencias'] = total
-                    context['asistencias_positivas'] = asistio
+            # 2. Snapshot en caché (se invalida al cambiar notas, asistencia,
+            #    comportamiento o matrículas del estudiante)
+            context.update(obtener_snapshot(estudiante))
         
         except Estudiante.DoesNotExist:
             messages.error(self.request, "No tienes un perfil de estudiante asociado")
@@ -823,46 +593,3 @@ class DashboardEstudianteView(RoleRequiredMixin, TemplateView):
             traceback.print_exc()
         
         return context
-    
-    def obtener_periodo_actual_inteligente(self, año_lectivo, hoy):
-        """Obtiene el período académico actual o más reciente"""
-        if not año_lectivo:
-            return None
-        
-        try:
-            # 1. Buscar período activo que contenga la fecha actual
-            periodo = PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo,
-                fecha_inicio__lte=hoy,
-                fecha_fin__gte=hoy
-            ).first()
-            
-            if periodo:
-                return periodo
-            
-            # 2. Buscar último período que terminó
-            periodo = PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo,
-                fecha_fin__lt=hoy
-            ).order_by('-fecha_fin').first()
-            
-            if periodo:
-                return periodo
-            
-            # 3. Buscar próximo período
-            periodo = PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo,
-                fecha_inicio__gt=hoy
-            ).order_by('fecha_inicio').first()
-            
-            if periodo:
-                return periodo
-            
-            # 4. Usar cualquier período del año
-            return PeriodoAcademico.objects.filter(
-                año_lectivo=año_lectivo
-            ).first()
-            
-        except Exception as e:
-            print(f"Error obteniendo período: {e}")
-            return None
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+Verificación pública de documentos firmados
+"""
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from gestioncolegio.services import firma_digital
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class VerificarDocumentoView(View):
+    """
+    Comprueba si un PDF fue expedido y firmado por el colegio buscando su
+    SHA-256 en el registro de documentos firmados.
+    GET ?hash=<sha256> o POST con el archivo en 'documento'.
+    """
+
+    def get(self, request, *args, **kwargs):
+        digest = request.GET.get('hash', '')
+        if not digest:
+            return JsonResponse({'success': False, 'error': 'Debe indicar el hash SHA-256 del documento'}, status=400)
+        return self._respuesta(firma_digital.verificar_hash(digest))
+
+    def post(self, request, *args, **kwargs):
+        archivo = request.FILES.get('documento')
+        if not archivo:
+            return JsonResponse({'success': False, 'error': 'Debe adjuntar el documento PDF'}, status=400)
+        return self._respuesta(firma_digital.verificar_contenido(archivo))
+
+    def _respuesta(self, documento):
+        if documento is None:
+            return JsonResponse({'success': True, 'valido': False})
+        estudiante = documento.estudiante
+        return JsonResponse({
+            'success': True,
+            'valido': True,
+            'tipo': documento.get_tipo_display(),
+            'estudiante': estudiante.usuario.get_full_name() if estudiante else None,
+            'fecha_firma': documento.fecha_firma.isoformat() if documento.fecha_firma else None,
+        })
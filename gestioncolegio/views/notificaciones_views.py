@@ -0,0 +1,84 @@
+"""
+Notificaciones del usuario: consulta incremental y marcado como leídas
+"""
+import json
+import time
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.views import View
+
+from gestioncolegio.services import notificaciones
+
+# El long-poll ocupa un worker mientras espera: se limita la espera
+ESPERA_MAXIMA = 25
+INTERVALO_REVISION = 1
+
+
+class NotificacionesNuevasView(LoginRequiredMixin, View):
+    """
+    GET ?cursor=<último id recibido>&espera=<segundos>
+    Devuelve las notificaciones posteriores al cursor y el nuevo cursor. Con
+    'espera' mantiene la petición abierta hasta que llegue alguna (long-poll),
+    revisando solo la caché mientras tanto. Sin cursor devuelve solo el
+    cursor actual para empezar a consultar desde ahí.
+
+    La campana del navbar (gestioncolegio/includes/navbar.html) usa espera=0
+    cada 45 s; el long-poll queda para clientes que lo pidan explícitamente.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if 'cursor' not in request.GET:
+            return JsonResponse({
+                'success': True,
+                'notificaciones': [],
+                'cursor': notificaciones.ultimo_id(request.user),
+                'no_leidas': notificaciones.no_leidas(request.user),
+            })
+
+        try:
+            cursor = int(request.GET.get('cursor') or 0)
+            espera = min(max(int(request.GET.get('espera') or 0), 0), ESPERA_MAXIMA)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'Parámetros inválidos'}, status=400)
+
+        usuario = request.user
+        actividad = notificaciones.ultima_actividad(usuario)
+        nuevas, cursor = notificaciones.nuevas_desde(usuario, cursor)
+        limite = time.monotonic() + espera
+        while not nuevas and time.monotonic() < limite:
+            time.sleep(INTERVALO_REVISION)
+            reciente = notificaciones.ultima_actividad(usuario)
+            if reciente != actividad:
+                actividad = reciente
+                nuevas, cursor = notificaciones.nuevas_desde(usuario, cursor)
+
+        for notificacion in nuevas:
+            notificacion['created_at'] = notificacion['created_at'].isoformat()
+        return JsonResponse({
+            'success': True,
+            'notificaciones': nuevas,
+            'cursor': cursor,
+            'no_leidas': notificaciones.no_leidas(usuario),
+        })
+
+
+class MarcarNotificacionesLeidasView(LoginRequiredMixin, View):
+    """POST JSON {'ids': [...]} o {'todas': true}"""
+
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body or '{}')
+            ids = None if data.get('todas') else [int(i) for i in data.get('ids', [])]
+        except (ValueError, TypeError):
+            return JsonResponse({'success': False, 'error': 'Datos inválidos'}, status=400)
+
+        if ids is not None and not ids:
+            return JsonResponse({'success': False, 'error': 'No se indicaron notificaciones'}, status=400)
+
+        marcadas = notificaciones.marcar_leidas(request.user, ids)
+        return JsonResponse({
+            'success': True,
+            'marcadas': marcadas,
+            'no_leidas': notificaciones.no_leidas(request.user),
+        })
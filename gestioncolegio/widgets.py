@@ -0,0 +1,64 @@
+"""
+Widgets de formulario compartidos
+gestioncolegio/widgets.py
+"""
+from django import forms
+from django.urls import reverse
+
+from gestioncolegio.services import autocompletar
+
+
+class SelectAutocompletar(forms.Select):
+    """
+    <select> que solo renderiza la opción elegida; el resto se busca en
+    gestioncolegio:autocompletar con Select2 (gestioncolegio/js/autocompletar.js).
+    El campo sigue siendo un ModelChoiceField: el id enviado se valida
+    contra su queryset en el servidor.
+
+        estudiante = forms.ModelChoiceField(
+            queryset=autocompletar.fuente('estudiantes').queryset(),
+            widget=SelectAutocompletar('estudiantes'),
+        )
+    """
+
+    def __init__(self, fuente, attrs=None, placeholder='Buscar por nombre o documento...'):
+        super().__init__(attrs)
+        self.fuente = fuente
+        self.placeholder = placeholder
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs.setdefault('class', 'form-select')
+        attrs.setdefault('data-placeholder', self.placeholder)
+        attrs.update({
+            'data-autocompletar': reverse('gestioncolegio:autocompletar', args=[self.fuente]),
+            'data-minimo': autocompletar.MINIMO_CARACTERES,
+        })
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        """Solo las opciones seleccionadas (una consulta por pk) en lugar de todo el queryset"""
+        seleccionados = {str(v) for v in value if v not in ('', None)}
+        opciones = []
+        if not self.allow_multiple_selected:
+            opciones.append(self.create_option(name, '', '', not seleccionados, 0))
+        if seleccionados:
+            origen = autocompletar.fuente(self.fuente)
+            filas = self.choices.queryset.filter(pk__in=[v for v in seleccionados if v.isdigit()])
+            for indice, fila in enumerate(filas, start=len(opciones)):
+                opciones.append(self.create_option(name, fila.pk, origen.etiqueta(fila), True, indice))
+        return [(None, opciones, 0)]
+
+
+class SelectMultipleAutocompletar(SelectAutocompletar, forms.SelectMultiple):
+    allow_multiple_selected = True
+
+
+def render_autocompletar(fuente, nombre, valor=None, attrs=None):
+    """HTML del selector para filtros de plantilla que no usan un Form"""
+    campo = forms.ModelChoiceField(
+        queryset=autocompletar.fuente(fuente).queryset(),
+        widget=SelectAutocompletar(fuente),
+        required=False,
+    )
+    return campo.widget.render(nombre, valor, attrs=attrs)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['apellidos', 'nombres'], name='usuario_apellidos_nombres_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['nombres'], name='usuario_nombres_idx'),
+        ),
+    ]
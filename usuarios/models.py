@@ -84,6 +84,11 @@ class Usuario(AbstractUser, BaseModel):
 
     class Meta:
         db_table = 'usuarios_usuario'
+        indexes = [
+            # Búsqueda por prefijo de los selectores con autocompletado
+            models.Index(fields=['apellidos', 'nombres'], name='usuario_apellidos_nombres_idx'),
+            models.Index(fields=['nombres'], name='usuario_nombres_idx'),
+        ]
 
 class Docente(BaseModel):
     """Perfil de docente"""
@@ -0,0 +1,139 @@
+"""
+Caché del sitio web público
+web/cache_sitio.py
+
+Las páginas públicas (inicio, nosotros, noticias, páginas, admisiones,
+programas) se guardan completas en la caché para visitantes anónimos, por URL
+e idioma; los usuarios autenticados y las peticiones que no son GET/HEAD
+pasan directo a la vista.
+
+Cada página depende de uno o más grupos de contenido; cada grupo tiene un
+número de versión en la caché que forma parte de la clave. Guardar o borrar
+un modelo de web incrementa solo la versión de su grupo (signals), así una
+noticia nueva no invalida la página de admisiones. El grupo 'comun' (navbar y
+footer: programas, páginas legales, redes sociales) está en todas las páginas.
+Los fragmentos de navbar y footer también se guardan con la versión de
+'comun' para las páginas que no se cachean completas.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.translation import get_language
+
+CACHE_PREFIX = 'sitio_publico'
+
+GRUPO_COMUN = 'comun'
+
+# Modelo de web -> grupo de contenido que invalida
+GRUPOS_MODELO = {
+    'ProgramaAcademico': GRUPO_COMUN,
+    'Pagina': GRUPO_COMUN,
+    'RedSocial': GRUPO_COMUN,
+    'Carrusel': 'inicio',
+    'Welcome': 'inicio',
+    'Noticia': 'noticias',
+    'NoticiaImagen': 'noticias',
+    'About': 'nosotros',
+    'Admision': 'admision',
+    'CaracteristicaPrograma': 'programas',
+}
+
+
+def timeout():
+    return getattr(settings, 'SITIO_PUBLICO_CACHE_TIMEOUT', 6 * 60 * 60)
+
+
+def _clave_version(grupo):
+    return f'{CACHE_PREFIX}:version:{grupo}'
+
+
+def versiones(*grupos):
+    """Versión actual de cada grupo (una sola lectura a la caché)"""
+    claves = [_clave_version(grupo) for grupo in grupos]
+    encontradas = cache.get_many(claves)
+    faltantes = {clave: 1 for clave in claves if clave not in encontradas}
+    for clave in faltantes:
+        cache.add(clave, 1, None)
+    return tuple(encontradas.get(clave, 1) for clave in claves)
+
+
+def version_comun():
+    return versiones(GRUPO_COMUN)[0]
+
+
+def invalidar(grupo):
+    try:
+        cache.incr(_clave_version(grupo))
+    except ValueError:
+        cache.set(_clave_version(grupo), 2, None)
+
+
+def invalidar_modelo(nombre_modelo):
+    grupo = GRUPOS_MODELO.get(nombre_modelo)
+    if grupo:
+        invalidar(grupo)
+
+
+# =============================================
+# PÁGINAS COMPLETAS
+# =============================================
+
+def _cacheable(request):
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    # Mensajes pendientes (p. ej. tras el formulario de contacto): la página es de ese visitante
+    return 'messages' not in request.COOKIES
+
+
+def cache_pagina_publica(*grupos):
+    """
+    Decorador de vista: respuesta 200 completa en caché para anónimos.
+    Uso con vistas de clase: method_decorator(cache_pagina_publica('noticias'), name='dispatch')
+    """
+    grupos = (GRUPO_COMUN,) + tuple(g for g in grupos if g != GRUPO_COMUN)
+
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if not _cacheable(request):
+                return vista(request, *args, **kwargs)
+
+            version = '.'.join(str(v) for v in versiones(*grupos))
+            ruta = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+            clave = f'{CACHE_PREFIX}:pagina:{get_language()}:{version}:{ruta}'
+
+            guardada = cache.get(clave)
+            if guardada is not None:
+                contenido, tipo = guardada
+                response = HttpResponse(contenido, content_type=tipo)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = vista(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(clave, (response.content, response['Content-Type']), timeout())
+                response['X-Cache'] = 'MISS'
+            return response
+        return envoltura
+    return decorador
+
+
+# =============================================
+# DATOS COMPARTIDOS
+# =============================================
+
+def programas_navbar():
+    """Programas activos del menú (lista en caché con la versión de 'comun')"""
+    from web.models import ProgramaAcademico
+
+    clave = f'{CACHE_PREFIX}:programas_navbar:{version_comun()}'
+    programas = cache.get(clave)
+    if programas is None:
+        programas = list(ProgramaAcademico.objects.filter(is_active=True).order_by('orden')[:10])
+        cache.set(clave, programas, timeout())
+    return programas
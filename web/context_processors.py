@@ -1,13 +1,11 @@
-from .models import ProgramaAcademico
+from django.utils.functional import SimpleLazyObject
+
+from . import cache_sitio
 
 def programas_context(request):
-    try:
-        programas = ProgramaAcademico.objects.filter(
-            is_active=True
-        ).order_by('orden')[:10]
-    except:
-        programas = []
-    
+    # Perezoso: solo toca la caché si la plantilla usa las variables
     return {
-        'programas_navbar': programas
-    }
\ No newline at end of file
+        'programas_navbar': SimpleLazyObject(cache_sitio.programas_navbar),
+        'sitio_version': SimpleLazyObject(cache_sitio.version_comun),
+        'sitio_cache_timeout': cache_sitio.timeout(),
+    }
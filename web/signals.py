@@ -0,0 +1,16 @@
+# web/signals.py
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from web import cache_sitio
+
+
+def invalidar_sitio_publico(sender, **kwargs):
+    """Incrementa la versión del grupo de contenido del modelo de web modificado"""
+    cache_sitio.invalidar_modelo(sender.__name__)
+
+
+for nombre_modelo in cache_sitio.GRUPOS_MODELO:
+    modelo = apps.get_model('web', nombre_modelo)
+    post_save.connect(invalidar_sitio_publico, sender=modelo, dispatch_uid=f'sitio_publico_save_{nombre_modelo}')
+    post_delete.connect(invalidar_sitio_publico, sender=modelo, dispatch_uid=f'sitio_publico_delete_{nombre_modelo}')
@@ -2,13 +2,15 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import TemplateView, ListView, DetailView
 from django.views.generic.edit import FormView
 from django.urls import reverse
-from django.core.mail import EmailMessage
 from .forms import ContactForm
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.conf import settings
 from .models import *  # Esto importa solo los modelos de la app web
+from django.utils.decorators import method_decorator
+from gestioncolegio.services import correo
+from .cache_sitio import cache_pagina_publica
 
 class PerfilView(LoginRequiredMixin, TemplateView):
     template_name = 'web/perfil.html'
@@ -239,6 +241,7 @@ class PerfilView(LoginRequiredMixin, TemplateView):
         
         return data
     
+@method_decorator(cache_pagina_publica('inicio', 'noticias'), name='dispatch')
 class HomeView(TemplateView):
     template_name = 'web/home.html'
     
@@ -255,6 +258,7 @@ class HomeView(TemplateView):
                 
         return context
 
+@method_decorator(cache_pagina_publica('nosotros'), name='dispatch')
 class AboutView(TemplateView):
     template_name = 'web/about.html'
     
@@ -302,10 +306,11 @@ class ContactView(FormView):
         phone = form.cleaned_data.get('phone')
         content = form.cleaned_data.get('content')
 
-        # Enviar correo
-        email = EmailMessage(
-            subject=f'Nuevo mensaje de contacto de {name}',
-            body=f"""
+        # Encolar el correo: lo envía el comando enviar_correos fuera de la petición
+        try:
+            correo.encolar(
+                asunto=f'Nuevo mensaje de contacto de {name}',
+                cuerpo=f"""
 Nombre: {name}
 Email: {email_sender}
 Teléfono: {phone}
@@ -316,23 +321,21 @@ Mensaje:
 ---
 Este mensaje fue enviado desde el formulario de contacto del sitio web.
             """,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[settings.EMAIL_HOST_USER],  # Enviar al mismo email
-            reply_to=[email_sender]  # Para que puedan responder directamente
-        )
-        
-        try:
-            email.send()
+                destinatarios=[settings.EMAIL_HOST_USER],  # Enviar al mismo email
+                responder_a=[email_sender],  # Para que puedan responder directamente
+                origen='contacto',
+            )
             messages.success(self.request, '¡Mensaje enviado correctamente! Nos pondremos en contacto contigo pronto.')
         except Exception as e:
             messages.error(self.request, f'Error al enviar el mensaje: {str(e)}')
             # También puedes loggear el error
             import logging
             logger = logging.getLogger(__name__)
-            logger.error(f"Error enviando email de contacto: {e}")
+            logger.error(f"Error encolando email de contacto: {e}")
 
         return super().form_valid(form)
     
+@method_decorator(cache_pagina_publica('noticias'), name='dispatch')
 class NoticiaListView(ListView):
     model = Noticia
     template_name = 'web/noticias.html'
@@ -359,6 +362,7 @@ class NoticiaListView(ListView):
                 
         return context
 
+@method_decorator(cache_pagina_publica('noticias'), name='dispatch')
 class NoticiaDetailView(DetailView):
     model = Noticia
     template_name = 'web/noticia_detalle.html'
@@ -382,6 +386,7 @@ class NoticiaDetailView(DetailView):
                 
         return context
 
+@method_decorator(cache_pagina_publica(), name='dispatch')
 class PaginaDetailView(DetailView):
     model = Pagina
     template_name = 'web/pagina.html'
@@ -401,6 +406,7 @@ class PaginaDetailView(DetailView):
                 
         return context
 
+@method_decorator(cache_pagina_publica('admision'), name='dispatch')
 class AdmisionView(TemplateView):
     template_name = 'web/admision.html'
 
@@ -440,6 +446,7 @@ class AdmisionView(TemplateView):
                 
         return context
 
+@method_decorator(cache_pagina_publica('programas'), name='dispatch')
 class ProgramasView(TemplateView):
     template_name = 'web/programas.html'
     
@@ -455,6 +462,7 @@ class ProgramasView(TemplateView):
                 
         return context
 
+@method_decorator(cache_pagina_publica('programas'), name='dispatch')
 class ProgramaDetailView(DetailView):
     model = ProgramaAcademico
     template_name = 'web/programa_detalle.html'